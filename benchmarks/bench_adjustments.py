@@ -0,0 +1,92 @@
+"""
+Total-return adjustments on a synthetic market with quarterly dividends and
+splits: backfills a total-return price store, then updates it with a week in
+which one ticker splits and another pays a dividend, and times the vectorized
+total-return closes against a per-ticker reinvestment loop. The correctness
+checks live in tests/python/test_adjustments.py.
+
+    python benchmarks/bench_adjustments.py [--tickers 530] [--years 50]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import synthetic
+from Adjustments import TR_SUFFIX, total_return_close
+from PriceStore import PriceStore
+
+
+def reinvested(close, actions):
+    """
+    Per-ticker loop: shares held start at 1 and grow by dividend / close on each ex-date.
+    """
+    result = {}
+    for symbol, events in actions[actions["dividend"] > 0].groupby("symbol"):
+        series = close[symbol]
+        dividends = events.groupby("date")["dividend"].sum()
+        shares, values = 1.0, []
+        pending = 0.0
+        for date, price in series.items():
+            pending += dividends.get(date, 0.0)
+            if pending and price == price:
+                shares *= 1 + pending / price
+                pending = 0.0
+            values.append(shares * price)
+        result[symbol + TR_SUFFIX] = values
+    return pd.DataFrame(result, index=close.index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=50)
+    args = parser.parse_args()
+
+    market = synthetic.make_market(args.tickers, args.years)
+    dates = market.close.index
+    before = dates[-6]
+    # A ticker splits 3:1 and another pays a dividend during the last week
+    splitter, payer = market.symbols[10], market.symbols[11]
+    market.actions = pd.concat([market.actions, pd.DataFrame({
+        "symbol": [splitter, payer], "date": [dates[-3], dates[-2]],
+        "dividend": [0.0, 0.02 * market.close[payer].iloc[-2]], "split": [3.0, 1.0]})], ignore_index=True)
+    with tempfile.TemporaryDirectory() as work_dir, synthetic.no_network():
+        with PriceStore(os.path.join(work_dir, "prices.sqlite")) as store:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                store.update(market.symbols, provider=market.provider(until=before), today="2000-01-01",
+                             total_return=True)
+                backfill_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                store.update(market.symbols, provider=market.provider(), today="2100-01-01", total_return=True)
+                update_seconds = time.perf_counter() - start
+            close = store.load()
+            actions = store.load_actions()
+
+    print(f"{len(market.symbols)} symbols x {len(dates)} sessions, {len(actions)} events "
+          f"({int((actions['dividend'] > 0).sum())} dividends, {int((actions['split'] != 1).sum())} splits)")
+    print(f"{'store backfill':<36}{backfill_seconds:>9.3f}s")
+    print(f"{'store update (last week)':<36}{update_seconds:>9.3f}s")
+
+    start = time.perf_counter()
+    tr = total_return_close(close, actions)
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    loop = reinvested(close, actions)
+    looped = time.perf_counter() - start
+    print(f"{'total-return closes (vectorized)':<36}{vectorized:>9.3f}s")
+    print(f"{'total-return closes (per ticker)':<36}{looped:>9.3f}s  {looped / vectorized:.0f}x slower")
+    spy = tr["SPY" + TR_SUFFIX].dropna()
+    price = close["SPY"].loc[spy.index]
+    print(f"SPY over {len(spy)} sessions: price return {price.iloc[-1] / price.iloc[0] - 1:+.0%}, "
+          f"total return {spy.iloc[-1] / spy.iloc[0] - 1:+.0%}")
+
+
+if __name__ == "__main__":
+    main()
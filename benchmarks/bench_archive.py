@@ -0,0 +1,82 @@
+"""
+Writes the float32 daily archive of a synthetic market, then times queries
+against the memory-mapped file (ticker subsets, date ranges, weekly/monthly/N
+point sampling, denominators) and an in-place update with the latest sessions.
+The correctness checks live in tests/python/test_archive.py.
+
+    python benchmarks/bench_archive.py [--tickers 530] [--years 100]
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import numpy as np
+
+import synthetic
+from Archive import PriceArchive, write_archive
+from Assembly import assemble_matrix
+
+
+def timed_best(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best or float("inf"), time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    market = synthetic.make_market(args.tickers, args.years)
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    keys = sorted(labels)
+    dates = list(close.index)
+    with contextlib.redirect_stdout(io.StringIO()):
+        values = assemble_matrix(dates, keys, labels, close, cpi_multipliers=market.cpi_multipliers,
+                                 historical_gold=market.historical_gold, round_closes=False)
+    memory = PriceArchive.from_matrix(dates, keys, values)
+    print(f"{len(keys)} columns x {len(dates)} daily rows ({values.astype(np.float32).nbytes / 1e6:.1f} MB float32)")
+
+    with tempfile.TemporaryDirectory() as archive_dir:
+        # Everything but the last five sessions, then the update with them
+        head = PriceArchive.from_matrix(dates[:-5], keys, values[:-5])
+        write_seconds, _ = timed_best(lambda: write_archive(head, archive_dir), 1)
+        update_seconds, _ = timed_best(lambda: write_archive(memory, archive_dir), 1)
+        print(f"{'full write':<34}{write_seconds * 1000:9.1f} ms")
+        print(f"{'update (5 new sessions)':<34}{update_seconds * 1000:9.1f} ms")
+
+
+        open_seconds, archive = timed_best(lambda: PriceArchive.open(archive_dir), args.repeat)
+        print(f"{'open (manifest, date index, mmap)':<34}{open_seconds * 1000:9.1f} ms")
+
+        some = keys[3:8]
+        start, end = dates[-min(2520, len(dates))], dates[-1]
+        queries = [
+            ("5 tickers, full daily", dict(columns=some)),
+            ("5 tickers, 10y daily, in Gold", dict(columns=some, start=start, end=end, denominator="Gold")),
+            ("1 ticker, full weekly", dict(columns=some[:1], sampling="weekly")),
+            ("all columns, 10y monthly", dict(start=start, end=end, sampling="monthly")),
+            ("all columns, 100 points, Real Gold", dict(sampling=100, denominator="Real Gold")),
+        ]
+        print(f"\n{'query':<38}{'rows':>7}{'cells':>10}{'ms':>9}")
+        for name, query in queries:
+            seconds, (q_dates, q_columns, q_values) = timed_best(lambda: archive.query(**query), args.repeat)
+            print(f"{name:<38}{len(q_dates):>7}{q_values.size:>10,}{seconds * 1000:>9.2f}")
+
+        timeframe_dates = synthetic.make_timeframe_dates(market.close.index)
+        seconds, from_disk = timed_best(lambda: archive.assembled(timeframe_dates), args.repeat)
+        print(f"{'Data.json timeframes (every column)':<38}{len(from_disk.dates):>7}{from_disk.values.size:>10,}"
+              f"{seconds * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Times the legacy per-cell timeframe assembly loop against
+Assembly.assemble_timeframes() on a synthetic panel (their outputs are
+compared byte for byte in tests/python/test_assembly.py).
+
+    python benchmarks/bench_assembly.py --tickers 530 --years 50
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+import synthetic
+from Assembly import assemble_timeframes, build_close_matrix
+
+
+def legacy_assemble(timeframe_dates, all_keys, tickers_map, all_data_frames,
+                    existing_lookup, cpi_multipliers, historical_gold):
+    """
+    The original GetStockData.main() loop, kept verbatim as the reference.
+    """
+    final_data = {}
+    for tf_label, dates in timeframe_dates.items():
+        columns = ["Date"] + all_keys
+        tf_rows = []
+        for date_str in dates:
+            row_values = [date_str]
+            for key in all_keys:
+                symbol = tickers_map[key]
+                val = None
+                if key == "Inflation Adjusted $":
+                    month_key = date_str[:7]
+                    val = cpi_multipliers.get(month_key)
+                    if val is None and cpi_multipliers:
+                        latest_month = sorted(cpi_multipliers.keys())[-1]
+                        val = cpi_multipliers[latest_month]
+                elif date_str in existing_lookup and key in existing_lookup[date_str]:
+                    val = existing_lookup[date_str][key]
+                else:
+                    found = False
+                    for df in all_data_frames:
+                        if isinstance(df.columns, pd.MultiIndex):
+                            if symbol in df.columns.levels[0]:
+                                try:
+                                    if date_str in df.index:
+                                        raw_val = df.loc[date_str][(symbol, "Close")]
+                                        if not pd.isna(raw_val):
+                                            val = round(float(raw_val), 4)
+                                            found = True
+                                except KeyError:
+                                    pass
+                        if found:
+                            break
+                    if not found and key == "Gold":
+                        hist_val = historical_gold.get(date_str[:7])
+                        if hist_val is not None:
+                            val = hist_val
+                row_values.append(val)
+            tf_rows.append(row_values)
+        final_data[tf_label] = {"columns": columns, "rows": tf_rows}
+    return final_data
+
+
+def build_inputs(n_tickers, years):
+    panel = synthetic.make_close_panel(n_tickers, years)
+    frames = synthetic.to_yfinance_chunks(panel)
+    timeframe_dates = synthetic.make_timeframe_dates(panel.index)
+
+    tickers_map = {"Gold": "GC=F", "Silver": "SI=F", "Platinum": "PL=F", "Inflation Adjusted $": "CPI"}
+    for symbol in panel.columns[3:]:
+        tickers_map[symbol] = symbol
+    all_keys = sorted(tickers_map)
+
+    # Pretend a previous run already published the older half of the "1y" dates
+    existing_lookup = {}
+    one_year = timeframe_dates["1y"]
+    for date_str in one_year[:len(one_year) // 2]:
+        existing_lookup[date_str] = {k: 1.2345 for k in all_keys[::3]}
+
+    return {
+        "timeframe_dates": timeframe_dates,
+        "all_keys": all_keys,
+        "tickers_map": tickers_map,
+        "all_data_frames": frames,
+        "existing_lookup": existing_lookup,
+        "cpi_multipliers": synthetic.make_cpi_multipliers(),
+        "historical_gold": synthetic.make_historical_gold(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the vectorized path")
+    args = parser.parse_args()
+
+    inputs = build_inputs(args.tickers, args.years)
+    cells = sum(len(d) for d in inputs["timeframe_dates"].values()) * len(inputs["all_keys"])
+    print(f"Synthetic panel: {args.tickers} tickers x {args.years} years, {cells} output cells")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        close = build_close_matrix(inputs["all_data_frames"])
+        assemble_timeframes(
+            inputs["timeframe_dates"], inputs["all_keys"], inputs["tickers_map"], close,
+            existing_lookup=inputs["existing_lookup"],
+            cpi_multipliers=inputs["cpi_multipliers"],
+            historical_gold=inputs["historical_gold"]
+        )
+    vectorized_time = time.perf_counter() - start
+    print(f"Vectorized assembly: {vectorized_time:.3f}s")
+
+    if args.skip_legacy:
+        return
+
+    start = time.perf_counter()
+    legacy_assemble(**inputs)
+    legacy_time = time.perf_counter() - start
+    print(f"Legacy assembly:     {legacy_time:.3f}s ({legacy_time / vectorized_time:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
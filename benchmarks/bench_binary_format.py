@@ -0,0 +1,59 @@
+"""
+Writes public/Data.json through BinaryFormat, times the full and single
+column reads, and compares the size of the binary columnar files against
+the JSON document (the round trip is tested in tests/python/test_binary_format.py).
+
+    python benchmarks/bench_binary_format.py [path/to/Data.json]
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+import synthetic  # noqa: F401 (puts helperScripts on sys.path)
+from BinaryFormat import read_binary, read_timeframe, write_binary
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    data_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(PROJECT_ROOT, "public", "Data.json")
+    with open(data_path, "rb") as f:
+        raw = f.read()
+    final_data = json.loads(raw)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        manifest = write_binary(final_data, out_dir)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_binary(out_dir)
+        read_time = time.perf_counter() - start
+
+        # Lazy access to a single column of a single timeframe
+        start = time.perf_counter()
+        dates, columns = read_timeframe(out_dir, "Max", columns=["Gold"], manifest=manifest)
+        column_time = time.perf_counter() - start
+
+        files = [os.path.join(out_dir, name) for name in os.listdir(out_dir)]
+        binary_size = sum(os.path.getsize(p) for p in files)
+        binary_gzip = sum(len(gzip.compress(open(p, "rb").read())) for p in files)
+        manifest_size = os.path.getsize(os.path.join(out_dir, "manifest.json"))
+        tf_bytes = max(tf["byteLength"] for tf in manifest["timeframes"].values())
+        column_bytes = max(tf["columnBytes"] for tf in manifest["timeframes"].values())
+
+    json_gzip = len(gzip.compress(raw))
+    print(f"Data.json:            {len(raw):>10,} bytes ({json_gzip:,} gzipped)")
+    print(f"Columnar (all files): {binary_size:>10,} bytes ({binary_gzip:,} gzipped)")
+    print(f"  manifest.json:      {manifest_size:>10,} bytes")
+    print(f"  one timeframe:      {tf_bytes:>10,} bytes")
+    print(f"  one ticker column:  {column_bytes:>10,} bytes")
+    print(f"Write {write_time * 1000:.1f} ms, full read {read_time * 1000:.1f} ms, "
+          f"single column read {column_time * 1000:.2f} ms ({len(columns['Gold'])} of {len(dates)} points)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Materializes the default preview bundles (FastData.json, first paint per
+timeframe, categories, top movers) from a synthetic assembled matrix and
+compares the single pass with cutting each bundle out of the nested
+final_data rows the way FastData.json used to be built. The bundle contents
+and budget checks live in tests/python/test_bundles.py.
+
+    python benchmarks/bench_bundles.py [--tickers 530] [--years 100]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import synthetic
+from Assembly import AssembledData, assemble_data
+from Bundles import DEFAULT_BUNDLES, REFERENCE_COLUMNS, expand_specs, save_bundles
+
+
+def build_inputs(n_tickers, years):
+    """
+    An assembled synthetic market whose first tickers are labelled as crypto, ETFs and an index.
+    """
+    market = synthetic.make_market(n_tickers, years)
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    tickers = [s for s in market.symbols if s.startswith("T")]
+    universe = [{"label": label, "symbol": symbol, "name": label, "type": "SP500"} for label, symbol in labels.items()]
+    kinds = {t: "Crypto" for t in tickers[:10]}
+    kinds.update({t: "ETF" for t in tickers[10:13]})
+    kinds[tickers[13]] = "Index"
+    kinds["SPY"] = "ETF"
+    for entry in universe:
+        entry["type"] = kinds.get(entry["label"], "Metal" if entry["label"] in REFERENCE_COLUMNS else "SP500")
+    timeframe_dates = synthetic.make_timeframe_dates(market.close.index)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assembled = assemble_data(timeframe_dates, sorted(labels), labels, close,
+                                  cpi_multipliers=market.cpi_multipliers, historical_gold=market.historical_gold)
+    return assembled, universe
+
+
+def legacy_bundles(assembled, universe, out_dir):
+    """
+    Each bundle cut from the nested rows with per-row index lookups, written with json.dump.
+    """
+    copy = AssembledData(assembled.dates, assembled.keys, assembled.values, assembled.timeframes)
+    with contextlib.redirect_stdout(io.StringIO()):
+        final_data = copy.to_final_data()
+    types = {e["label"]: e["type"] for e in universe}
+    for spec in expand_specs(DEFAULT_BUNDLES, list(final_data)):
+        wanted = (REFERENCE_COLUMNS if spec.get("reference") else []) + [
+            c for entry in spec["columns"] for c in (
+                [entry] if isinstance(entry, str) else
+                [k for k in assembled.keys if types.get(k) == entry.get("type")])]
+        bundle = {}
+        for tf in spec.get("timeframes") or final_data:
+            src_cols = final_data[tf]["columns"]
+            idx = [0] + [src_cols.index(c) for c in dict.fromkeys(wanted) if c in src_cols]
+            bundle[tf] = {"columns": [src_cols[i] for i in idx],
+                          "rows": [[row[i] for i in idx] for row in final_data[tf]["rows"]]}
+        with open(os.path.join(out_dir, f"{spec['name']}.json"), "w") as f:
+            json.dump(bundle, f, indent=None, separators=(',', ':'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    assembled, universe = build_inputs(args.tickers, args.years)
+    print(f"{len(assembled.keys)} columns x {len(assembled.dates)} union rows")
+    with tempfile.TemporaryDirectory() as public_dir:
+        legacy_dir = os.path.join(public_dir, "legacy")
+        os.makedirs(legacy_dir)
+        timings = {}
+        for name, func in (("per-bundle row loops", lambda: legacy_bundles(assembled, universe, legacy_dir)),
+                           ("single pass", lambda: save_bundles(assembled, public_dir, universe=universe))):
+            best = None
+            for _ in range(args.repeat):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    func()
+                    elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            print(f"{name:<22} {best * 1000:8.1f} ms")
+        print(f"{timings['per-bundle row loops'] / timings['single pass']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
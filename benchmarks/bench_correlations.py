@@ -0,0 +1,96 @@
+"""
+Correlation neighbours and relative-strength ranks on a synthetic market:
+times the blocked float32 pass and measures its peak memory against pandas
+DataFrame.corr() and the dense N x N matrix at a larger universe, then times
+writing public/correlations/ for every timeframe. The correctness checks live
+in tests/python/test_correlations.py.
+
+    python benchmarks/bench_correlations.py [--tickers 530] [--years 30] [--large 5000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from Archive import PriceArchive
+from Assembly import assemble_matrix
+from Correlation import log_returns, save_correlations, top_neighbours
+
+
+def gold_returns(market, n_rows):
+    """
+    Log-returns in Gold of the last n_rows sessions, with the first years of some tickers missing.
+    """
+    close = market.close.iloc[-n_rows:]
+    prices = close.drop(columns="GC=F").div(close["GC=F"], axis=0).to_numpy(copy=True)
+    prices[: n_rows // 3, ::7] = np.nan
+    return log_returns(prices)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--large", type=int, default=5000, help="Tickers of the memory/timing run")
+    parser.add_argument("--rows", type=int, default=1300, help="Returns per column (MAX_ROWS by default)")
+    args = parser.parse_args()
+
+    market = synthetic.make_market(args.tickers, args.years)
+    k = 10
+
+    # Timing and peak memory at a larger universe
+    large = synthetic.make_market(args.large, max(1, args.rows // 252 + 1))
+    large_returns = gold_returns(large, args.rows)
+    n_large = large_returns.shape[1]
+    print(f"{n_large} columns x {len(large_returns)} returns")
+    subset = large_returns[:, :1000]
+    subset_seconds, subset_peak = peak_memory(lambda: top_neighbours(subset, k))
+    dense_seconds, dense_peak = peak_memory(lambda: pd.DataFrame(subset.astype(float)).corr(min_periods=20))
+    blocked_seconds, blocked_peak = peak_memory(lambda: top_neighbours(large_returns, k))
+    print(f"{'blocked float32 top-k, 1000 columns':<38}{subset_seconds:>9.2f}s {subset_peak / 1e6:>9.1f} MB peak")
+    print(f"{'DataFrame.corr(), 1000 columns':<38}{dense_seconds:>9.2f}s {dense_peak / 1e6:>9.1f} MB peak")
+    print(f"{f'blocked float32 top-k, {n_large} columns':<38}{blocked_seconds:>9.2f}s {blocked_peak / 1e6:>9.1f} MB peak")
+    dense_bytes = n_large * n_large * 8
+    print(f"{'dense float64 N x N matrix alone':<38}{'':>10} {dense_bytes / 1e6:>9.1f} MB")
+    if blocked_peak >= dense_bytes:
+        raise SystemExit("FAIL: the blocked pass used more memory than the dense matrix")
+
+    # Every timeframe of the synthetic market, written like export-correlations
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    keys = sorted(labels)
+    dates = list(close.index)
+    with contextlib.redirect_stdout(io.StringIO()):
+        values = assemble_matrix(dates, keys, labels, close, cpi_multipliers=market.cpi_multipliers,
+                                 historical_gold=market.historical_gold, round_closes=False)
+    archive = PriceArchive.from_matrix(dates, keys, values)
+    assembled = archive.assembled(synthetic.make_timeframe_dates(market.close.index))
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        manifest = save_correlations(archive, assembled, out_dir)
+        seconds = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(out_dir, n)) for n in os.listdir(out_dir))
+    samplings = {tf: entry["sampling"] for tf, entry in manifest["timeframes"].items()}
+    print(f"\n{len(manifest['columns'])} columns x {len(samplings)} timeframes in {seconds:.2f}s, "
+          f"{size / 1e6:.2f} MB written ({', '.join(f'{tf} {s}' for tf, s in samplings.items())})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compares the legacy melt/merge/sort CSV export with the streaming exporter in
+CsvExport: peak traced memory and wall time (the outputs are compared byte for
+byte in tests/python/test_csv_export.py).
+
+    python benchmarks/bench_csv_export.py [--tickers 530] [--years 50]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import synthetic
+from CsvExport import process_and_save_csv, weekly_close
+
+
+def legacy_process_and_save_csv(weekly_close, daily_close, output_file, gold_ticker='GC=F'):
+    """
+    Verbatim copy of the original collect_data.process_and_save_csv.
+    """
+    combined_close = weekly_close.copy()
+
+    if not daily_close.empty:
+        last_weekly_date = weekly_close.index[-1].date()
+        last_daily_date = daily_close.index[-1].date()
+
+        if last_daily_date > last_weekly_date:
+            combined_close = pd.concat([weekly_close, daily_close])
+
+    combined_close.index.name = 'Date'
+
+    if gold_ticker not in combined_close.columns:
+        print("Gold price not found!")
+        return
+
+    gold_price = combined_close[gold_ticker]
+    price_in_gold = combined_close.div(gold_price, axis=0)
+
+    price_in_gold_reset = price_in_gold.reset_index().melt(id_vars='Date', var_name='Ticker', value_name='PriceGold')
+    prices_usd_reset = combined_close.reset_index().melt(id_vars='Date', var_name='Ticker', value_name='PriceUSD')
+
+    final_df = pd.merge(price_in_gold_reset, prices_usd_reset, on=['Date', 'Ticker'])
+
+    final_df = final_df.dropna(subset=['PriceGold'])
+    final_df = final_df.sort_values(by=['Date', 'Ticker'])
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    final_df.to_csv(output_file, index=False)
+    print(f"Data saved to {output_file}")
+
+
+def measure(func, *args):
+    """
+    Runs func(*args) twice: once timed, once under tracemalloc (which slows
+    allocation-heavy code too much to time it). Returns (seconds, peak bytes).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=50)
+    args = parser.parse_args()
+
+    daily = synthetic.make_close_panel(args.tickers, args.years)
+    weekly = weekly_close(daily.iloc[:-1])
+    latest = daily.iloc[-1:]
+    print(f"{weekly.shape[0]} weeks x {weekly.shape[1]} symbols")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        legacy_path = os.path.join(out_dir, "legacy.csv")
+        stream_path = os.path.join(out_dir, "stream.csv")
+        gzip_path = os.path.join(out_dir, "stream.csv.gz")
+
+        legacy_time, legacy_peak = measure(legacy_process_and_save_csv, weekly, latest, legacy_path)
+        stream_time, stream_peak = measure(process_and_save_csv, weekly, latest, stream_path)
+        gzip_time, gzip_peak = measure(process_and_save_csv, weekly, latest, gzip_path)
+
+        print(f"legacy:    {legacy_time:6.2f} s, peak {legacy_peak / 2**20:7.1f} MiB, "
+              f"{os.path.getsize(legacy_path):,} bytes")
+        print(f"streaming: {stream_time:6.2f} s, peak {stream_peak / 2**20:7.1f} MiB, "
+              f"{os.path.getsize(stream_path):,} bytes")
+        print(f"gzip:      {gzip_time:6.2f} s, peak {gzip_peak / 2**20:7.1f} MiB, "
+              f"{os.path.getsize(gzip_path):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Load-tests a local DataServer instance: requests/sec and latency percentiles
+for per-ticker /series queries, whole-file downloads and ETag revalidations.
+The response checks against the files on disk live in
+tests/python/test_data_server.py.
+
+    python benchmarks/bench_data_server.py [--tickers 530] [--years 50] [--connections 32] [--seconds 5]
+
+The server runs in its own process; the load generator uses keep-alive
+connections from one asyncio loop, so on a small machine both compete for
+the same cores.
+"""
+import argparse
+import asyncio
+import contextlib
+import http.client
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from Assembly import assemble_timeframes
+from BinaryFormat import write_binary
+
+SERVER = os.path.join(synthetic.HELPER_DIR, "DataServer.py")
+
+
+def build_public_dir(public_dir, n_tickers, years):
+    panel = synthetic.make_close_panel(n_tickers, years)
+    panel.index = panel.index.strftime("%Y-%m-%d")
+    timeframe_dates = synthetic.make_timeframe_dates(pd.DatetimeIndex(panel.index))
+    tickers_map = {"Gold": "GC=F", "Silver": "SI=F", "Platinum": "PL=F", "Inflation Adjusted $": "CPI"}
+    for symbol in panel.columns[3:]:
+        tickers_map[symbol] = symbol
+    with contextlib.redirect_stdout(io.StringIO()):
+        final_data = assemble_timeframes(timeframe_dates, sorted(tickers_map), tickers_map, panel,
+                                         cpi_multipliers=synthetic.make_cpi_multipliers(),
+                                         historical_gold=synthetic.make_historical_gold())
+        write_binary(final_data, os.path.join(public_dir, "columnar"))
+    with open(os.path.join(public_dir, "Data.json"), "w") as f:
+        json.dump(final_data, f, indent=None, separators=(',', ':'))
+    with open(os.path.join(public_dir, "tickers.json"), "w") as f:
+        json.dump([{"symbol": s, "name": label} for label, s in sorted(tickers_map.items())], f)
+    return final_data, tickers_map
+
+
+def start_server(public_dir):
+    process = subprocess.Popen([sys.executable, SERVER, "--public-dir", public_dir, "--port", "0"],
+                               stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        if line.startswith("Serving"):
+            return process, int(line.rsplit(":", 1)[1])
+    raise SystemExit("FAIL: the server did not start")
+
+
+def get(port, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response.status, dict(response.getheaders()), body
+
+
+async def _client(port, requests, deadline, latencies, counts):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            raw = random.choice(requests)
+            start = time.perf_counter()
+            writer.write(raw)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            status = int(head[9:12])
+            counts[status] = counts.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def _load(port, requests, connections, seconds):
+    latencies, counts = [], {}
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(port, requests, deadline, latencies, counts) for _ in range(connections)))
+    return latencies, counts, time.perf_counter() - start
+
+
+def load_test(name, port, requests, connections, seconds):
+    latencies, counts, elapsed = asyncio.run(_load(port, requests, connections, seconds))
+    ms = np.array(latencies) * 1000
+    print(f"{name:<28} {len(ms) / elapsed:8.0f} req/s  p50 {np.percentile(ms, 50):6.2f} ms  "
+          f"p99 {np.percentile(ms, 99):6.2f} ms  {counts}")
+    return len(ms) / elapsed, np.percentile(ms, 99)
+
+
+def request(path, headers=()):
+    lines = [f"GET {path} HTTP/1.1", "Host: 127.0.0.1"] + [f"{k}: {v}" for k, v in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--queries", type=int, default=200, help="Distinct /series queries in the mix")
+    parser.add_argument("--min-rps", type=float, default=0, help="Fail if /series throughput is lower")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as public_dir:
+        final_data, tickers_map = build_public_dir(public_dir, args.tickers, args.years)
+        process, port = start_server(public_dir)
+        try:
+            print(f"{os.cpu_count()} CPUs, {args.connections} keep-alive connections, {args.seconds:.0f}s per scenario")
+
+            labels = sorted(tickers_map)
+            timeframes = list(final_data)
+            series = [request(f"/series?tickers={','.join(rng.sample(labels[4:], rng.randint(1, 5)))},Gold"
+                              f"&tf={rng.choice(timeframes)}", [("Accept-Encoding", "gzip, br")])
+                      for _ in range(args.queries)]
+            rps, _ = load_test("/series (gzip)", port, series, args.connections, args.seconds)
+
+            _, headers, _ = get(port, "/Data.json", {"Accept-Encoding": "gzip"})
+            load_test("/Data.json (gzip)", port, [request("/Data.json", [("Accept-Encoding", "gzip")])],
+                      args.connections, args.seconds)
+            load_test("/Data.json revalidation", port,
+                      [request("/Data.json", [("Accept-Encoding", "gzip"), ("If-None-Match", headers["ETag"])])],
+                      args.connections, args.seconds)
+            load_test("/columnar/5y.f32 ranges", port,
+                      [request("/columnar/5y.f32", [("Range", f"bytes={i * 400}-{i * 400 + 399}")]) for i in range(50)],
+                      args.connections, args.seconds)
+        finally:
+            process.terminate()
+            process.wait()
+
+    if rps < args.min_rps:
+        raise SystemExit(f"FAIL: /series served {rps:.0f} req/s, expected at least {args.min_rps:.0f}")
+
+
+if __name__ == "__main__":
+    main()
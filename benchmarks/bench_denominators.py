@@ -0,0 +1,111 @@
+"""
+Times the denominator engine on the full universe across a dozen denominators
+(metals, crypto, indices, CPI, baskets, CPI-deflated gold): one-at-a-time
+ratio() calls, a single batch() pass and warm LRU hits. The LRU and the
+cell-by-cell reference checks live in tests/python/test_denominators.py.
+
+    python benchmarks/bench_denominators.py [--tickers 530] [--years 50]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from Denominators import CPI_COLUMN, DenominatorEngine, parse_denominator
+
+DENOMINATORS = [
+    "USD", "Gold", "Silver", "Platinum", CPI_COLUMN, "Bitcoin", "Ethereum", "SPY", "S&P 500 Index",
+    "Real Gold", "Metals Basket",
+    {"name": "Crypto Basket", "components": {"Bitcoin": 1, "Ethereum": 10}},
+    {"name": "Real Silver", "components": {"Silver": 1}, "deflate": True}
+]
+
+# Synthetic symbols standing in for the named reference assets
+LABELS = {"GC=F": "Gold", "SI=F": "Silver", "PL=F": "Platinum", "T00000": "Bitcoin",
+          "T00001": "Ethereum", "T00002": "SPY", "T00003": "S&P 500 Index"}
+
+
+def build_matrices(n_tickers, years):
+    """
+    {"Daily": full history, plus ~100-point timeframes}, each (dates, columns, values).
+    """
+    panel = synthetic.make_close_panel(n_tickers, years)
+    dates = pd.DatetimeIndex(panel.index)
+    cpi = pd.Series(synthetic.make_cpi_multipliers())
+    cpi.index = pd.PeriodIndex(cpi.index, freq="M")
+    panel[CPI_COLUMN] = cpi.reindex(dates.to_period("M")).to_numpy()
+    panel = panel.rename(columns=LABELS)
+
+    columns = list(panel.columns)
+    values = panel.to_numpy(dtype=float)
+    matrices = {"Daily": (list(dates.strftime("%Y-%m-%d")), columns, values)}
+    position = {d: i for i, d in enumerate(matrices["Daily"][0])}
+    for tf, tf_dates in synthetic.make_timeframe_dates(dates).items():
+        rows = [position[d] for d in tf_dates]
+        matrices[tf] = (tf_dates, columns, values[rows])
+    return matrices
+
+
+def reference(values, columns, spec, sample):
+    """
+    Cell-by-cell computation of one denominator for the `sample` column indices.
+    """
+    denominator = parse_denominator(spec)
+    index = {c: i for i, c in enumerate(columns)}
+    out = np.empty((values.shape[0], len(sample)))
+    for j, c in enumerate(sample):
+        for r in range(values.shape[0]):
+            price = values[r, c]
+            if denominator.name == "USD":
+                out[r, j] = price
+                continue
+            cpi = values[r, index[CPI_COLUMN]]
+            if denominator.name == CPI_COLUMN:
+                out[r, j] = price * cpi if cpi > 0 else np.nan
+                continue
+            ref = sum(w * values[r, index[label]] for label, w in denominator.components.items())
+            if denominator.deflate:
+                ref = ref * cpi if cpi > 0 else np.nan
+            out[r, j] = price / ref if ref > 0 else np.nan
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=50)
+    args = parser.parse_args()
+
+    matrices = build_matrices(args.tickers, args.years)
+    daily = matrices["Daily"]
+    print(f"{len(daily[1])} columns, {len(daily[0])} daily rows + {len(matrices) - 1} timeframes, "
+          f"{len(DENOMINATORS)} denominators")
+
+    engine = DenominatorEngine(matrices, max_cached=len(DENOMINATORS) * len(matrices))
+    start = time.perf_counter()
+    for spec in DENOMINATORS:
+        for tf in matrices:
+            engine.ratio(spec, tf)
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for spec in DENOMINATORS:
+        for tf in matrices:
+            engine.ratio(spec, tf)
+    warm_time = time.perf_counter() - start
+
+    batch_engine = DenominatorEngine(matrices, max_cached=len(DENOMINATORS) * len(matrices))
+    start = time.perf_counter()
+    tensors = batch_engine.batch(DENOMINATORS)
+    batch_time = time.perf_counter() - start
+
+    cells = sum(t.size for t in tensors.values())
+    print(f"ratio() one at a time: {single_time * 1000:8.1f} ms ({cells / single_time / 1e6:.0f} M cells/s)")
+    print(f"batch() one pass:      {batch_time * 1000:8.1f} ms ({cells / batch_time / 1e6:.0f} M cells/s)")
+    print(f"warm LRU hits:         {warm_time * 1000:8.1f} ms ({engine.hits} hits, {engine.misses} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Times min/max and LTTB downsampling of every series in every timeframe on
+full daily history and prints their error against the raw series next to the
+fixed equidistant sampling used by Data.json. The extremes and drawdown checks
+live in tests/python/test_downsample.py.
+
+    python benchmarks/bench_downsample.py [--tickers 530] [--years 100] [--budget 3.0]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from Downsample import METHODS, PYRAMID_LEVELS, build_pyramid, reconstruction_error
+
+
+def equidistant_mask(values, n_points):
+    """
+    The same rows for every column, evenly spaced, as get_timeframe_dates() picks them.
+    """
+    mask = np.zeros(values.shape, dtype=bool)
+    mask[np.linspace(0, len(values) - 1, min(n_points, len(values)), dtype=int)] = True
+    return mask & ~np.isnan(values)
+
+
+def summarize(errors):
+    return (f"median max err {np.nanmedian(errors['maxRelError']) * 100:6.2f}%, "
+            f"worst drawdown err {np.nanmax(errors['drawdownError']) * 100:6.2f} pts, "
+            f"median drawdown err {np.nanmedian(errors['drawdownError']) * 100:5.2f} pts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=100)
+    parser.add_argument("--budget", type=float, default=3.0, help="Fail if one level of one method takes longer (seconds)")
+    args = parser.parse_args()
+
+    panel = synthetic.make_close_panel(args.tickers, args.years)
+    values = panel.to_numpy(dtype=float)
+    dates = pd.DatetimeIndex(panel.index)
+    day_strings = list(dates.strftime("%Y-%m-%d"))
+    windows = {}
+    for tf, tf_dates in synthetic.make_timeframe_dates(dates).items():
+        windows[tf] = (day_strings.index(tf_dates[0]), day_strings.index(tf_dates[-1]) + 1)
+    print(f"{values.shape[1]} series x {values.shape[0]} daily rows, {len(windows)} timeframes")
+
+    max_start, max_end = windows["Max"]
+    raw_max = values[max_start:max_end]
+    equi = {level: reconstruction_error(raw_max, equidistant_mask(raw_max, level)) for level in PYRAMID_LEVELS}
+
+    for method in METHODS:
+        for level in PYRAMID_LEVELS:
+            start = time.perf_counter()
+            pyramid = build_pyramid(values, windows, [level], method)
+            elapsed = time.perf_counter() - start
+
+            mask = pyramid["Max"][level]
+            errors = reconstruction_error(raw_max, mask)
+            points = mask.sum(axis=0).max()
+            print(f"{method:>6} {level:>5}: {elapsed:5.2f}s all timeframes, Max {points:>5} pts/series, {summarize(errors)}")
+            if elapsed > args.budget:
+                raise SystemExit(f"FAIL: {method} at {level} points took {elapsed:.2f}s, budget {args.budget:.2f}s")
+
+    for level in PYRAMID_LEVELS:
+        print(f"equidistant {level:>5}: {summarize(equi[level])}")
+
+
+if __name__ == "__main__":
+    main()
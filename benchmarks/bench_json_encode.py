@@ -0,0 +1,96 @@
+"""
+Compares writing Data.json with json.dump over the nested row lists (the
+previous path) against JsonEncode.write_timeframes() with orjson and with
+the stdlib fallback: encode time, decode time and file size. That every cell
+decodes to the assembled value within its significant digits is tested in
+tests/python/test_json_encode.py.
+
+    python benchmarks/bench_json_encode.py [--tickers 530] [--years 100] [--digits 6]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import synthetic
+from Assembly import AssembledData, assemble_data
+from JsonEncode import _fast_backend, parse_digits, write_timeframes
+
+
+def build_assembled(n_tickers, years):
+    market = synthetic.make_market(n_tickers, years)
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    timeframe_dates = synthetic.make_timeframe_dates(market.close.index)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return assemble_data(timeframe_dates, sorted(labels), labels, close,
+                             cpi_multipliers=market.cpi_multipliers, historical_gold=market.historical_gold)
+
+
+def timed_best(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best or float("inf"), time.perf_counter() - start)
+    return best
+
+
+def legacy_write(assembled, path):
+    # A fresh copy, so the nested lists are built inside the timing like before
+    copy = AssembledData(assembled.dates, assembled.keys, assembled.values, assembled.timeframes)
+    with contextlib.redirect_stdout(io.StringIO()):
+        final_data = copy.to_final_data()
+    with open(path, "w") as f:
+        json.dump(final_data, f, indent=None, separators=(',', ':'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=100)
+    parser.add_argument("--digits", default=None, help="Significant-digits policy (see JsonEncode.parse_digits)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    assembled = build_assembled(args.tickers, args.years)
+    digits = parse_digits(args.digits)
+    cells = sum(len(i) for i in assembled.timeframes.values()) * len(assembled.keys)
+    print(f"{len(assembled.keys)} columns x {len(assembled.dates)} union rows, {cells:,} timeframe cells, "
+          f"digits {digits}")
+
+    orjson = _fast_backend()
+    backends = ["json"] + (["orjson"] if orjson is not None else [])
+    if orjson is None:
+        print("orjson is not installed, only the stdlib backend is measured")
+
+    print(f"\n{'path':<26}{'encode':>10}{'decode':>10}{'bytes':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.json")
+        encode = timed_best(lambda: legacy_write(assembled, legacy_path), args.repeat)
+        decode = timed_best(lambda: json.load(open(legacy_path)), args.repeat)
+        legacy_size = os.path.getsize(legacy_path)
+        print(f"{'json.dump (previous)':<26}{encode:>9.3f}s{decode:>9.3f}s{legacy_size:>14,}")
+        legacy_encode = encode
+
+        for backend in backends:
+            path = os.path.join(tmp, f"{backend}.json")
+            encode = timed_best(lambda: write_timeframes(path, assembled, digits=digits, backend=backend),
+                                args.repeat)
+            with open(path, "rb") as f:
+                raw = f.read()
+            decoders = [("json", json.loads)] + ([("orjson", orjson.loads)] if orjson is not None else [])
+            for name, loads in decoders:
+                decode = timed_best(lambda: loads(raw), args.repeat)
+                if name == "json":
+                    print(f"{'write_timeframes/' + backend:<26}{encode:>9.3f}s{decode:>9.3f}s{len(raw):>14,}")
+                else:
+                    print(f"{'  decoded with orjson':<26}{'':>10}{decode:>9.3f}s")
+            print(f"{'':<26}{legacy_encode / encode:>9.1f}x faster, {1 - len(raw) / legacy_size:.1%} smaller")
+
+
+if __name__ == "__main__":
+    main()
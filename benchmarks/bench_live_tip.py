@@ -0,0 +1,87 @@
+"""
+Live tip on a synthetic market: publishes Data.json, the bundles and Tip.json
+as of the previous session, then refreshes the tip with the latest session's
+quotes and times it against re-assembling and re-writing the outputs. The
+correctness checks live in tests/python/test_live_tip.py.
+
+    python benchmarks/bench_live_tip.py [--tickers 530] [--years 50]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import synthetic
+import Instrument
+from Adjustments import dividend_growth, with_total_return
+from Assembly import assemble_data
+from Bundles import save_bundles
+from JsonEncode import write_timeframes
+from LiveTip import refresh_tip, save_tip
+
+
+def dividend_events(market, close):
+    """
+    The dividends before the last session of `close`, with their growth factors as the price store computes them.
+    """
+    events = market.actions[market.actions["dividend"] > 0].assign(date=lambda e: e["date"].dt.strftime("%Y-%m-%d"))
+    events = events[events["date"] < close.index[-1]]
+    ex_closes = close.stack().reindex(list(zip(events["date"], events["symbol"]))).to_numpy()
+    return events.assign(growth=dividend_growth(events["dividend"].to_numpy(), ex_closes))
+
+
+def publish(close, market, labels, events, public_dir):
+    """
+    Assembles the timeframes of `close` (and its total-return columns) and writes Data.json, the bundles and Tip.json.
+    """
+    close, labels = with_total_return(close, labels, events)
+    timeframe_dates = synthetic.make_timeframe_dates(pd.DatetimeIndex(close.index))
+    assembled = assemble_data(timeframe_dates, sorted(labels), labels, close, cpi_multipliers=market.cpi_multipliers,
+                              historical_gold=market.historical_gold)
+    write_timeframes(os.path.join(public_dir, "Data.json"), assembled)
+    save_bundles(assembled, public_dir)
+    save_tip(assembled, public_dir, labels)
+    return assembled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=50)
+    args = parser.parse_args()
+
+    market = synthetic.make_market(args.tickers, args.years)
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    events = dividend_events(market, close)
+
+    with tempfile.TemporaryDirectory() as public_dir, synthetic.no_network():
+        with contextlib.redirect_stdout(io.StringIO()):
+            publish(close.iloc[:-1], market, labels, events, public_dir)
+
+        Instrument.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            tip = refresh_tip(public_dir, provider=market.provider(), data_json=True)
+            tip_seconds = time.perf_counter() - start
+        download_seconds = Instrument.report()["spans"]["download.synthetic"]["seconds"]
+
+        with tempfile.TemporaryDirectory() as rebuild_dir, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            publish(close, market, labels, events, rebuild_dir)
+            rebuild_seconds = time.perf_counter() - start
+
+        print(f"{len(tip['columns'])} columns, {len(close)} sessions")
+        print(f"{'rebuild (assembly and writes)':<36}{rebuild_seconds:>9.3f}s")
+        print(f"{'live tip, Data.json included':<36}{tip_seconds:>9.3f}s")
+        print(f"{'  of which the quotes download':<36}{download_seconds:>9.3f}s")
+        print(f"{'  tip row and file patches':<36}{tip_seconds - download_seconds:>9.3f}s  "
+              f"{rebuild_seconds / (tip_seconds - download_seconds):.0f}x faster than the rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Times the column-sharded assembly at several universe sizes and worker counts.
+The check that sharded output matches the single-process output lives in
+tests/python/test_sharding.py.
+
+    python benchmarks/bench_parallel_assembly.py [--sizes 500 2000 10000] [--workers 1 2 4 8] [--years 50]
+
+Speedups are bounded by the cores available (printed first). Blocks smaller
+than --min-cells per worker and workers beyond the available CPUs stay in
+process (see Sharding.shard_workers()); the processes actually used are
+printed next to each timing; --min-cells 1 also shards small panels.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+import synthetic
+import Sharding
+from Assembly import assemble_data
+from Instrument import report, reset
+
+CHUNK_TICKERS = 1000
+
+
+def build_inputs(n_tickers, years):
+    """
+    Close matrix restricted to the sampled dates, generated 1000 tickers at a
+    time so a 10k universe never holds its full daily panel in memory.
+    """
+    trading_days = pd.bdate_range(end="2026-08-14", periods=int(years * 252))
+    timeframe_dates = synthetic.make_timeframe_dates(trading_days)
+    union = pd.DatetimeIndex(sorted(set(d for dates in timeframe_dates.values() for d in dates)))
+
+    parts = []
+    for chunk, offset in enumerate(range(0, n_tickers, CHUNK_TICKERS)):
+        size = min(CHUNK_TICKERS, n_tickers - offset)
+        if not offset:
+            parts.append(synthetic.make_close_panel(size, years, seed=chunk).loc[union])
+            continue
+        # Later chunks skip the metal futures and continue the T numbering
+        panel = synthetic.make_close_panel(size + 3, years, seed=chunk).loc[union].iloc[:, 3:]
+        panel.columns = [f"T{offset - 3 + i:05d}" for i in range(size)]
+        parts.append(panel)
+    close = pd.concat(parts, axis=1)
+    close.index = union.strftime("%Y-%m-%d")
+
+    tickers_map = {"Gold": "GC=F", "Silver": "SI=F", "Platinum": "PL=F", "Inflation Adjusted $": "CPI"}
+    for symbol in close.columns[3:]:
+        tickers_map[symbol] = symbol
+    all_keys = sorted(tickers_map)
+
+    existing_lookup = {}
+    one_year = timeframe_dates["1y"]
+    for date_str in one_year[:len(one_year) // 2]:
+        existing_lookup[date_str] = {k: 1.2345 for k in all_keys[::3]}
+    return timeframe_dates, all_keys, tickers_map, close, existing_lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--min-cells", type=int, default=Sharding.MIN_SHARD_CELLS,
+                        help="Smallest block per worker process (Sharding.MIN_SHARD_CELLS)")
+    args = parser.parse_args()
+
+    Sharding.MIN_SHARD_CELLS = args.min_cells
+    print(f"{Sharding.available_cpus()} CPUs available")
+    cpi_multipliers = synthetic.make_cpi_multipliers()
+    historical_gold = synthetic.make_historical_gold()
+
+    for n_tickers in args.sizes:
+        timeframe_dates, all_keys, tickers_map, close, existing_lookup = build_inputs(n_tickers, args.years)
+        print(f"\n{len(all_keys)} columns x {close.shape[0]} sampled dates")
+        baseline_time = None
+        for workers in args.workers:
+            reset()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                assemble_data(timeframe_dates, all_keys, tickers_map, close,
+                              existing_lookup=existing_lookup,
+                              cpi_multipliers=cpi_multipliers,
+                              historical_gold=historical_gold,
+                              workers=workers).to_final_data()
+            elapsed = time.perf_counter() - start
+            baseline_time = baseline_time or elapsed
+            processes = report()["counters"].get("assembly.shards", 1)
+            print(f"  {workers} workers ({processes} processes): {elapsed:6.2f}s ({baseline_time / elapsed:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Simulates daily runs of Exports.save_data_json() on public/Data.json in both
+publish modes and reports how many bytes each day adds with base + deltas
+compared with rewriting the whole file (--publish-mode full), and on how many
+days base + deltas load back to that day's Data.json (asserted in
+tests/python/test_publish.py).
+
+    python benchmarks/bench_publish.py --days 45 [--json-digits 6]
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import synthetic  # noqa: F401 (puts helperScripts on sys.path)
+import Publish
+from Assembly import AssembledData
+from Exports import save_data_json
+from JsonEncode import load_json, parse_digits
+from Publish import load_published, split_rows
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def next_day(final_data, date_str, drift):
+    """
+    Rolls every timeframe forward one session: drops its oldest point and
+    appends a new last row (with the previous last value revised as well).
+    """
+    final_data = copy.deepcopy(final_data)
+    for tf_data in final_data.values():
+        rows = tf_data["rows"]
+        last = rows[-1]
+        new_row = [date_str] + [None if v is None else round(v * drift, 4) for v in last[1:]]
+        tf_data["rows"] = rows[1:] + [new_row]
+    return final_data
+
+
+def to_assembled(final_data):
+    """
+    The AssembledData behind Data.json content, as Pipeline.assembled() hands it to the exports.
+    """
+    columns, rows, timeframes = split_rows(final_data)
+    dates = sorted(rows)
+    position = {d: i for i, d in enumerate(dates)}
+    values = np.array([[np.nan if v is None else v for v in rows[d]] for d in dates],
+                      dtype=float).reshape(len(dates), len(columns))
+    return AssembledData(dates, columns, values,
+                         {tf: [position[d] for d in tf_dates] for tf, tf_dates in timeframes.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=45)
+    parser.add_argument("--compact-every", type=int, default=30)
+    parser.add_argument("--json-digits", default=None)
+    args = parser.parse_args()
+
+    Publish.COMPACT_EVERY = args.compact_every
+    digits = parse_digits(args.json_digits)
+    with open(os.path.join(PROJECT_ROOT, "public", "Data.json"), "r") as f:
+        final_data = json.load(f)
+    last_date = pd.Timestamp(final_data["Max"]["rows"][-1][0])
+
+    full_bytes = 0
+    reproduced = 0
+    with tempfile.TemporaryDirectory() as full_dir, tempfile.TemporaryDirectory() as delta_dir:
+        out_dir = os.path.join(delta_dir, "snapshots")
+
+        def dir_size():
+            return sum(os.path.getsize(os.path.join(out_dir, n)) for n in os.listdir(out_dir))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_data_json(to_assembled(final_data), delta_dir, "delta", digits)
+        written = []
+        for day, date in enumerate(pd.bdate_range(last_date + pd.Timedelta(days=1), periods=args.days)):
+            final_data = next_day(final_data, date.strftime("%Y-%m-%d"), 1 + 0.001 * (day % 7 - 3))
+            assembled = to_assembled(final_data)
+            before = set(os.listdir(out_dir))
+            with contextlib.redirect_stdout(io.StringIO()):
+                save_data_json(assembled, full_dir, "full", digits)
+                save_data_json(assembled, delta_dir, "delta", digits)
+            new_files = set(os.listdir(out_dir)) - before - {"manifest.json"}
+            written.append(sum(os.path.getsize(os.path.join(out_dir, n)) for n in new_files))
+            full_bytes += os.path.getsize(os.path.join(full_dir, "Data.json"))
+            reproduced += load_published(out_dir) == load_json(os.path.join(full_dir, "Data.json"))
+
+        print(f"{args.days} daily runs, compaction every {args.compact_every} deltas")
+        print(f"Full Data.json rewrites: {full_bytes:>12,} bytes")
+        print(f"Base + delta files:      {sum(written):>12,} bytes "
+              f"(median {sorted(written)[len(written) // 2]:,} bytes/day)")
+        print(f"Snapshot dir now:        {dir_size():>12,} bytes")
+        print(f"Base + deltas reproduce the full-mode Data.json on {reproduced} of {args.days} days")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Times the vectorized monthly CPI join against the old per-date dict lookups.
+The cache (TTL, ETag revalidation, offline fallback) and parsing checks live in
+tests/python/test_reference_series.py.
+
+    python benchmarks/bench_reference_series.py [--dates 30000]
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from ReferenceSeries import monthly_join
+
+
+def legacy_cpi_multipliers(csv_data):
+    """
+    The original row-by-row get_cpi_multipliers() body.
+    """
+    df = pd.read_csv(io.StringIO(csv_data))
+    df = df.dropna(subset=['CPIAUCSL'])
+    latest_cpi = df['CPIAUCSL'].iloc[-1]
+    df['observation_date'] = pd.to_datetime(df['observation_date'])
+    df = df.set_index('observation_date').resample('MS').ffill()
+    multipliers = {}
+    for idx, row in df.iterrows():
+        cpi_val = row['CPIAUCSL']
+        if not pd.isna(cpi_val) and cpi_val > 0:
+            multipliers[idx.strftime('%Y-%m')] = round(latest_cpi / cpi_val, 4)
+    return multipliers
+
+
+def legacy_historical_gold(csv_data):
+    df = pd.read_csv(io.StringIO(csv_data)).dropna()
+    gold_map = {}
+    for idx, row in df.iterrows():
+        gold_map[row['Date']] = float(row['Price'])
+    return gold_map
+
+
+def legacy_lookup(dates, cpi_multipliers):
+    """
+    Per-date dict probe with a sorted() of the keys on every miss, as the old assembly loop did.
+    """
+    values = []
+    for date_str in dates:
+        val = cpi_multipliers.get(date_str[:7])
+        if val is None and cpi_multipliers:
+            val = cpi_multipliers[sorted(cpi_multipliers.keys())[-1]]
+        values.append(val)
+    return np.array(values, dtype=float)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dates", type=int, default=30000)
+    args = parser.parse_args()
+
+    cpi_map = legacy_cpi_multipliers(synthetic.make_cpi_csv())
+
+    # Dates from before the first CPI print to past the last one
+    dates = list(pd.bdate_range(end="2026-12-31", periods=args.dates).strftime("%Y-%m-%d"))
+
+    start = time.perf_counter()
+    legacy_lookup(dates, cpi_map)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    joined = monthly_join(cpi_map, dates, ffill=True)
+    np.where(np.isnan(joined), cpi_map[max(cpi_map)], joined)
+    join_time = time.perf_counter() - start
+
+    print(f"{len(dates)} dates: dict lookups {legacy_time * 1000:.1f} ms, "
+          f"monthly join {join_time * 1000:.1f} ms ({legacy_time / join_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
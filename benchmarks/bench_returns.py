@@ -0,0 +1,61 @@
+"""
+Times Returns.compute_return_matrices() over the full universe (the values
+are checked against a per-ticker reference in tests/python/test_returns.py).
+
+    python benchmarks/bench_returns.py [--tickers 530] [--budget 1.0]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+import pandas as pd
+
+import synthetic
+from Assembly import assemble_timeframes
+from Returns import DENOMINATORS, METRICS, compute_return_matrices
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def synthetic_final_data(n_tickers):
+    panel = synthetic.make_close_panel(n_tickers, 50)
+    panel.index = panel.index.strftime("%Y-%m-%d")
+    timeframe_dates = synthetic.make_timeframe_dates(pd.DatetimeIndex(panel.index))
+    tickers_map = {"Gold": "GC=F", "Silver": "SI=F", "Platinum": "PL=F", "Inflation Adjusted $": "CPI"}
+    tickers_map.update({s: s for s in panel.columns[3:]})
+    with contextlib.redirect_stdout(io.StringIO()):
+        return assemble_timeframes(timeframe_dates, sorted(tickers_map), tickers_map, panel,
+                                   cpi_multipliers=synthetic.make_cpi_multipliers())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=0, help="Use a synthetic universe instead of public/Data.json")
+    parser.add_argument("--budget", type=float, default=1.0, help="Fail if the computation takes longer (seconds)")
+    args = parser.parse_args()
+
+    if args.tickers:
+        final_data = synthetic_final_data(args.tickers)
+        source = f"synthetic {args.tickers} tickers"
+    else:
+        with open(os.path.join(PROJECT_ROOT, "public", "Data.json"), "r") as f:
+            final_data = json.load(f)
+        source = "public/Data.json"
+
+    start = time.perf_counter()
+    matrices = compute_return_matrices(final_data)
+    elapsed = time.perf_counter() - start
+
+    n = len(matrices["tickers"])
+    cells = n * len(final_data) * len(DENOMINATORS) * len(METRICS)
+    print(f"{source}: {n} assets x {len(final_data)} timeframes x {len(DENOMINATORS)} denominators "
+          f"-> {cells:,} metrics in {elapsed * 1000:.1f} ms")
+    if elapsed > args.budget:
+        raise SystemExit(f"FAIL: took {elapsed:.3f}s, budget {args.budget:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
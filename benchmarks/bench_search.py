@@ -0,0 +1,131 @@
+"""
+Ticker search index on a synthetic 10,000-symbol universe: builds search.json,
+reports how often a single-edit typo finds the entry it was made from, and
+times the reference query against the linear substring filter the search box
+runs over tickers.json today. The correctness checks and the typo recall floor
+live in tests/python/test_search.py.
+
+    python benchmarks/bench_search.py [--symbols 10000] [--queries 2000]
+"""
+import argparse
+import gzip
+import json
+import string
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts helperScripts on sys.path)
+from SearchIndex import SearchIndex, build_search_index, normalize
+
+SYLLABLES = ["ar", "bel", "cor", "dan", "el", "fin", "gal", "hor", "in", "jet", "kin", "lux", "mar", "nor",
+             "or", "pel", "quan", "ro", "sol", "tek", "ul", "ver", "win", "xen", "yor", "zen"]
+SUFFIXES = ["Inc.", "Corp.", "Holdings", "Group", "Technologies", "Energy", "Bank", "Systems", "Pharma", ""]
+
+
+def make_universe(n, seed=7):
+    """
+    n entries shaped like Universe.build_universe(): unique 1-5 letter symbols and two-word company names.
+    """
+    rng = np.random.default_rng(seed)
+    letters = np.array(list(string.ascii_uppercase))
+    symbols = set()
+    while len(symbols) < n:
+        length = rng.choice([1, 2, 3, 4, 5], p=[0.02, 0.08, 0.35, 0.45, 0.10])
+        symbols.add("".join(rng.choice(letters, length)))
+    universe = []
+    for i, symbol in enumerate(sorted(symbols, key=lambda s: rng.random())):
+        words = ["".join(rng.choice(SYLLABLES, rng.integers(2, 4))).capitalize() for _ in range(rng.integers(1, 3))]
+        name = " ".join(words + [SUFFIXES[rng.integers(len(SUFFIXES))]]).strip()
+        kind = "Crypto" if i % 50 == 0 else "ETF" if i % 23 == 0 else "SP500"
+        if kind == "Crypto":
+            symbol, label = symbol + "-USD", words[0]
+        else:
+            label = symbol
+        universe.append({"label": label, "symbol": symbol, "name": name, "type": kind})
+    # Crypto labels are names, keep them unique like the real universe
+    seen = set()
+    return [e for e in universe if not (e["label"] in seen or seen.add(e["label"]))]
+
+
+def make_queries(universe, n, rng):
+    """
+    Prefixes (1 to 6 characters) of random symbols and name words, and single-edit
+    typos of symbols and name words. Typos leave out the SUFFIXES words, which
+    thousands of entries share, so the entry a typo was made from can be told apart.
+    """
+    generic = {normalize(s) for s in SUFFIXES}
+    prefixes, typos = [], []
+    for _ in range(n):
+        entry = universe[rng.integers(len(universe))]
+        words = normalize(entry["symbol"]), *[normalize(w) for w in entry["name"].split()]
+        word = words[rng.integers(len(words))] or words[0]
+        prefixes.append(word[:rng.integers(1, 7)])
+        long_words = [w for w in words if len(w) >= 5 and w not in generic]
+        if long_words:
+            w = long_words[rng.integers(len(long_words))]
+            i = int(rng.integers(1, len(w) - 1))
+            edit = rng.integers(3)
+            typo = w[:i] + w[i + 1:] if edit == 0 else w[:i] + w[i + 1] + w[i] + w[i + 2:] if edit == 1 \
+                else w[:i] + "q" + w[i + 1:]
+            typos.append((typo, entry["label"]))
+    return prefixes, typos
+
+
+def timed_queries(func, queries):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        func(q)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1e6
+
+
+def linear_filter(tickers, query):
+    """
+    The search box today: a substring test over every {symbol, name}, first 10 hits.
+    """
+    q = query.lower()
+    return [t for t in tickers if q in t["symbol"].lower() or q in t["name"].lower()][:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    universe = make_universe(args.symbols)
+    start = time.perf_counter()
+    index = build_search_index(universe)
+    build_seconds = time.perf_counter() - start
+    payload = json.dumps(index, separators=(',', ':')).encode()
+    tickers = [{"symbol": e["symbol"], "name": e["label"]} for e in universe]
+    tickers_bytes = json.dumps(tickers, separators=(',', ':')).encode()
+    start = time.perf_counter()
+    search = SearchIndex(json.loads(payload))
+    load_seconds = time.perf_counter() - start
+    print(f"{len(universe)} entries, {len(index['keys'])} keys, built in {build_seconds:.2f}s")
+    print(f"search.json  {len(payload) / 1e3:9.1f} KB  ({len(gzip.compress(payload)) / 1e3:.1f} KB gzip), "
+          f"parsed and loaded in {load_seconds * 1e3:.1f} ms")
+    print(f"tickers.json {len(tickers_bytes) / 1e3:9.1f} KB  ({len(gzip.compress(tickers_bytes)) / 1e3:.1f} KB gzip)")
+
+    rng = np.random.default_rng(11)
+    prefixes, typos = make_queries(universe, args.queries, rng)
+    found = sum(label in [e["label"] for e in search.query(typo, 10)] for typo, label in typos)
+    print(f"The intended entry is in the top 10 for {found}/{len(typos)} single-edit typos")
+    print(f"\n{'':<34}{'median us':>10}{'p99 us':>10}")
+    for name, func, queries in (
+            ("index, prefixes", lambda q: search.query(q, 10), prefixes),
+            ("index, typos", lambda q: search.query(q, 10), [t for t, _ in typos]),
+            ("linear filter, prefixes", lambda q: linear_filter(tickers, q), prefixes),
+            ("linear filter, typos", lambda q: linear_filter(tickers, q), [t for t, _ in typos])):
+        latencies = timed_queries(func, queries)
+        print(f"{name:<34}{np.median(latencies):>10.1f}{np.percentile(latencies, 99):>10.1f}")
+    latencies = timed_queries(lambda q: search.query(q, 10), prefixes + [t for t, _ in typos])
+    if np.median(latencies) >= 1000:
+        raise SystemExit("FAIL: median query over a millisecond")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Times every pipeline stage on synthetic markets of several sizes, fully offline.
+
+    python benchmarks/bench_suite.py [--sizes 100,530,1000] [--years 50] [--repeat 3]
+    python benchmarks/bench_suite.py --save baseline.json          # e.g. on the main branch
+    python benchmarks/bench_suite.py --baseline baseline.json      # fails on a regression
+
+Stages: trading calendar and date sampling, price store backfill and
+incremental update, store reload (full daily and sampled dates), validation,
+assembly, denominator ratios and return matrices, and the JSON / columnar / CSV
+writers. Prices come from synthetic.make_market() through a provider, the
+reference series are passed in directly and every socket connection is
+refused while the suite runs. Each stage keeps its best time over --repeat
+runs (slow stages run once); with --baseline, stages slower than --threshold
+times the baseline (and above --min-seconds) fail the run.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import synthetic
+import Exports
+from Assembly import AssembledData, assemble_data
+from Bundles import save_bundles
+from CsvExport import process_and_save_csv, weekly_close
+from Denominators import DenominatorEngine, PRESETS
+from Instrument import compare
+from JsonEncode import rounded_matrices
+from PriceStore import PriceStore
+from ReferenceSeries import monthly_series
+from Returns import DENOMINATORS, compute_return_matrices
+from TimeFrame import TradingCalendar, get_timeframe_dates
+from Validation import validate_closes
+
+RATIO_DENOMINATORS = DENOMINATORS + list(PRESETS)
+# In the order run_size() runs them
+STAGES = ["calendar", "sampling", "fetch.backfill", "fetch.incremental", "reload.daily", "reload.sampled",
+          "validate", "assemble", "assemble.lists", "ratios", "returns", "write.json", "write.columnar",
+          "write.csv"]
+
+
+class StageTimer:
+    """
+    Runs each stage up to `repeat` times (output silenced) and keeps the best
+    time per stage. A stage slower than `long_seconds` is not repeated, its
+    timing noise is small next to its length. `stages` keeps each stage's
+    (func, setup), so benchmarks/test_stages.py can time them again.
+    """
+
+    def __init__(self, size, repeat, long_seconds=5.0):
+        self.size = size
+        self.repeat = repeat
+        self.long_seconds = long_seconds
+        self.seconds = {}
+        self.stages = {}
+
+    def run(self, name, func, setup=None):
+        best, result = None, None
+        for _ in range(self.repeat):
+            args = setup() if setup else ()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                result = func(*args)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            if elapsed > self.long_seconds:
+                break
+        self.seconds[name] = best
+        self.stages[name] = (func, setup)
+        return result
+
+
+def run_size(size, years, repeat, work_dir, timer=None):
+    """
+    Runs every stage on one synthetic market; returns ({stage: best seconds}, daily shape).
+    """
+    market = synthetic.make_market(size, years)
+    timer = timer or StageTimer(size, repeat)
+    symbols = market.symbols
+    labels = market.tickers_map()
+    cpi_multipliers = monthly_series(market.cpi_multipliers)
+    historical_gold = monthly_series(market.historical_gold)
+    dates = market.close.index
+    now = datetime.combine(dates[-1].date(), datetime.max.time())
+    before = dates[-6].strftime("%Y-%m-%d")
+
+    def fresh(name):
+        path = os.path.join(work_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+        return path
+
+    # Trading calendar: first download into the cache, then sampling from the cached days
+    def calendar():
+        cal = TradingCalendar(fresh("trading_days.json"), provider=market.provider())
+        return cal.trading_days(today="2100-01-01")
+
+    timer.run("calendar", calendar)
+    cached = TradingCalendar(os.path.join(work_dir, "trading_days.json"))
+    timeframe_dates = timer.run("sampling", lambda: (get_timeframe_dates("anchored", cached, now),
+                                                     get_timeframe_dates("equidistant", cached, now))[1])
+    sorted_dates = sorted(set(d for tf_dates in timeframe_dates.values() for d in tf_dates))
+
+    # Price store: full history up to a week ago, then the last sessions
+    def backfill(path):
+        with PriceStore(path) as store:
+            store.update(symbols, provider=market.provider(until=before), today="2000-01-01")
+
+    def incremental(path):
+        with PriceStore(path) as store:
+            store.update(symbols, provider=market.provider(), today="2100-01-01")
+
+    backfilled = os.path.join(work_dir, "backfilled.sqlite")
+    timer.run("fetch.backfill", backfill, lambda: (fresh("prices.sqlite"),))
+    shutil.copy(os.path.join(work_dir, "prices.sqlite"), backfilled)
+    timer.run("fetch.incremental", incremental,
+              lambda: (shutil.copy(backfilled, fresh("prices.sqlite")),))
+    store_path = os.path.join(work_dir, "prices.sqlite")
+
+    def reload(sampled):
+        with PriceStore(store_path) as store:
+            return store.load(symbols, dates=sorted_dates if sampled else None)
+
+    daily = timer.run("reload.daily", reload, lambda: (False,))
+    timer.run("reload.sampled", reload, lambda: (True,))
+
+    validation = timer.run("validate", lambda: validate_closes(daily, historical_gold=historical_gold))
+    close = validation.apply(daily)
+    assembled = timer.run("assemble", lambda: assemble_data(
+        timeframe_dates, sorted(labels), labels, close,
+        cpi_multipliers=cpi_multipliers, historical_gold=historical_gold))
+    final_data = timer.run("assemble.lists", lambda: AssembledData(
+        assembled.dates, assembled.keys, assembled.values, assembled.timeframes).to_final_data())
+
+    timer.run("ratios", lambda: DenominatorEngine.from_final_data(final_data).batch(RATIO_DENOMINATORS))
+    timer.run("returns", lambda: compute_return_matrices(final_data))
+
+    public_dir = os.path.join(work_dir, "public")
+    os.makedirs(public_dir, exist_ok=True)
+    timer.run("write.json", lambda: (Exports.save_data_json(assembled, public_dir),
+                                     save_bundles(assembled, public_dir),
+                                     Exports.save_tickers(labels, public_dir)))
+    timer.run("write.columnar", lambda: Exports.save_columnar(rounded_matrices(assembled), public_dir))
+    dated = close.set_axis(pd.DatetimeIndex(close.index))
+    timer.run("write.csv", lambda: process_and_save_csv(weekly_close(dated), dated.iloc[-1:],
+                                                        os.path.join(public_dir, "data.csv")))
+    return timer.seconds, daily.shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,530,1000", help="Comma-separated universe sizes")
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Write the results (run-report layout) to this file")
+    parser.add_argument("--baseline", help="Results of an earlier --save to compare with")
+    parser.add_argument("--threshold", type=float, default=1.3, help="Fail when a stage is this many times slower")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Stages faster than this are not compared")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    spans, shapes = {}, {}
+    with synthetic.no_network():
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as work_dir:
+                start = time.perf_counter()
+                seconds, shapes[size] = run_size(size, args.years, args.repeat, work_dir)
+                print(f"{size} tickers: {shapes[size][1]} symbols x {shapes[size][0]} daily rows, "
+                      f"{time.perf_counter() - start:.1f}s")
+            for stage, value in seconds.items():
+                spans[f"{size}/{stage}"] = {"calls": args.repeat, "seconds": round(value, 4)}
+
+    stages = list(dict.fromkeys(path.split("/", 1)[1] for path in spans))
+    print(f"\n{'stage':<20}" + "".join(f"{size:>12}" for size in sizes))
+    for stage in stages:
+        print(f"{stage:<20}" + "".join(f"{spans[f'{size}/{stage}']['seconds']:>11.3f}s" for size in sizes))
+
+    current = {
+        "startedAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "meta": {"sizes": sizes, "years": args.years, "repeat": args.repeat, "cpus": os.cpu_count()},
+        "spans": spans
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResults saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        slower = compare(current, [baseline], args.threshold, args.min_seconds)
+        if slower:
+            raise SystemExit("FAIL: stages regressed beyond "
+                             f"{args.threshold:.2f}x the baseline:\n  " + "\n  ".join(slower))
+        print(f"OK: no stage slower than {args.threshold:.2f}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Times the constituent-list manager on a large Wikipedia-style fixture page
+served locally: a first run, then a run with additions and removals. The
+diff, outage, JSON source and backfill checks live in
+tests/python/test_universe.py.
+
+    python benchmarks/bench_universe.py [--large 10000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import synthetic  # noqa: F401 (puts helperScripts on sys.path)
+from Constituents import SP500_LIST, UniverseManager
+from Universe import fetch_symbols
+
+PAGES = {}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_constituents(n, start=0):
+    return [{"symbol": f"S{i:05d}" if i % 50 else f"B{i:04d}.B", "name": f"Company {i}",
+             "added": f"{1957 + i % 60}-03-04"} for i in range(start, start + n)]
+
+
+def make_page(constituents):
+    """
+    The first table of the Wikipedia "List of S&P 500 companies" page, trimmed to its relevant columns.
+    """
+    rows = "".join(f"<tr><td>{c['symbol']}</td><td>{c['name']}</td><td>Industrials</td><td>{c['added']}</td></tr>"
+                   for c in constituents)
+    return ("<html><body><table class=\"wikitable\"><tr><th>Symbol</th><th>Security</th>"
+            f"<th>GICS Sector</th><th>Date added</th></tr>{rows}</table></body></html>")
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def refresh(cache_dir, url, today, ttl_hours=0):
+    manager = UniverseManager(cache_dir, sp500_source=url, ttl_hours=ttl_hours)
+    diff = quiet(manager.refresh, today=today)
+    return manager, diff
+
+
+def time_large(base_url, work_dir, n):
+    cache_dir = os.path.join(work_dir, "large")
+    constituents = make_constituents(n)
+    PAGES["/large.html"] = make_page(constituents)
+    start = time.perf_counter()
+    refresh(cache_dir, base_url + "/large.html", "2026-01-02")
+    first_time = time.perf_counter() - start
+
+    PAGES["/large.html"] = make_page(constituents[10:] + make_constituents(10, start=n))
+    start = time.perf_counter()
+    manager, diff = refresh(cache_dir, base_url + "/large.html", "2026-01-05")
+    diff_time = time.perf_counter() - start
+    universe = manager.universe()
+    print(f"{n} constituents: first run {first_time:.2f}s, diffed run {diff_time:.2f}s "
+          f"(+{len(diff[SP500_LIST]['added'])}/-{len(diff[SP500_LIST]['removed'])}), "
+          f"{len(fetch_symbols(universe))} symbols to fetch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--large", type=int, default=10000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            time_large(base_url, work_dir, args.large)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
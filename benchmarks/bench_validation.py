@@ -0,0 +1,129 @@
+"""
+Injects known anomalies (zero closes, bad ticks, an unadjusted split, a stale
+run, a coverage gap, gold spikes and a gold level error) into a synthetic full
+daily panel and times the validation stage against its budget. The checks that
+each anomaly is found, the policy applied and the gold problems gated live in
+tests/python/test_validation.py.
+
+    python benchmarks/bench_validation.py [--tickers 530] [--years 100] [--budget 10]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+import synthetic
+from ReferenceSeries import monthly_join, monthly_series
+from Validation import DEFAULT_THRESHOLDS, GOLD_SYMBOL, validate_closes
+
+# inject() damages 13 distinct tickers; with less than 3 years of sessions the
+# historical gold series (to 2024-12) barely overlaps the panel, and the short
+# histories of late listings put one stale run over the gate's share of bad closes
+MIN_TICKERS = 13
+MIN_YEARS = 3
+
+
+def make_panel(n_tickers, years, historical_gold):
+    """
+    Synthetic closes with a GC=F column that tracks the historical monthly gold series.
+    """
+    panel = synthetic.make_close_panel(n_tickers, years)
+    panel.index = panel.index.strftime("%Y-%m-%d")
+    rng = np.random.default_rng(1)
+    reference = monthly_join(historical_gold, list(panel.index))
+    last = np.flatnonzero(~np.isnan(reference))[-1]
+    noise = np.exp(np.cumsum(rng.normal(0, 0.002, len(panel))))
+    gold = reference * noise / noise[np.arange(len(panel)) // 21 * 21]
+    tail = reference[last] * np.exp(np.cumsum(rng.normal(0.0002, 0.01, len(panel) - last - 1)))
+    gold[last + 1:] = tail
+    panel[GOLD_SYMBOL] = gold
+    return panel
+
+
+def inject(panel, historical_gold):
+    """
+    Returns the damaged panel and {check: [(date index, symbol)]} of what was injected.
+    Positions are fractions of each series' length, so any panel of at least
+    MIN_TICKERS tickers and a few years of sessions works.
+    """
+    values = panel.copy()
+    tickers = [c for c in values.columns if c.startswith("T")]
+    if len(tickers) < MIN_TICKERS:
+        raise ValueError(f"Need at least {MIN_TICKERS} tickers to inject every anomaly, got {len(tickers)}")
+    expected = {"nonpositive": [], "spike": [], "level_shift": [], "stale": [], "gap": [], "gold_mismatch": []}
+
+    def valid_row(symbol, fraction):
+        rows = np.flatnonzero(values[symbol].notna().to_numpy())
+        return rows[int(fraction * (len(rows) - 1))]
+
+    for i, symbol in enumerate(tickers[:5]):
+        row = valid_row(symbol, 0.55 + 0.02 * i)
+        values.iloc[row, values.columns.get_loc(symbol)] = 0.0
+        expected["nonpositive"].append((row, symbol))
+    for i, symbol in enumerate(tickers[5:10]):
+        row = valid_row(symbol, 0.35 + 0.02 * i)
+        values.iloc[row, values.columns.get_loc(symbol)] *= 12.0
+        expected["spike"].append((row, symbol))
+    symbol = tickers[10]
+    row = valid_row(symbol, 0.8)
+    values.iloc[row:, values.columns.get_loc(symbol)] /= 4.0
+    expected["level_shift"].append((row, symbol))
+    symbol = tickers[11]
+    row = valid_row(symbol, 0.75)
+    col = values.columns.get_loc(symbol)
+    # A few sessions past the stale threshold, short enough to stay under the gate's share of bad closes
+    run = DEFAULT_THRESHOLDS["stale_days"] + 5
+    values.iloc[row:row + run, col] = values.iloc[row, col]
+    expected["stale"].append((row + run - 1, symbol))
+    symbol = tickers[12]
+    row = valid_row(symbol, 0.7)
+    values.iloc[row:row + 40, values.columns.get_loc(symbol)] = np.nan
+    expected["gap"].append((row + 40, symbol))
+
+    # Gold anomalies within the sessions the historical series covers
+    gold = values.columns.get_loc(GOLD_SYMBOL)
+    covered = np.flatnonzero(~np.isnan(monthly_join(historical_gold, list(values.index))))
+    if len(covered) < 63:
+        raise ValueError("Need at least 3 months of sessions covered by the historical gold series")
+    for fraction in (0.15, 0.9):
+        row = covered[int(fraction * (len(covered) - 1))]
+        values.iloc[row, gold] *= 1.3
+        expected["spike"].append((row, GOLD_SYMBOL))
+    # A month of gold quoted at twice the price
+    start = covered[int(0.4 * (len(covered) - 1))]
+    values.iloc[start:start + 21, gold] *= 2.0
+    expected["gold_mismatch"] += [(r, GOLD_SYMBOL) for r in range(start, start + 21)]
+    return values, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=530)
+    parser.add_argument("--years", type=int, default=100)
+    parser.add_argument("--budget", type=float, default=10.0, help="Fail if validation takes longer (seconds)")
+    args = parser.parse_args()
+    if args.tickers < MIN_TICKERS + 3:
+        parser.error(f"--tickers must be at least {MIN_TICKERS + 3} (3 metals + {MIN_TICKERS} damaged tickers)")
+    if args.years < MIN_YEARS:
+        parser.error(f"--years must be at least {MIN_YEARS}")
+
+    historical_gold = monthly_series(synthetic.make_historical_gold(end="2024-12"))
+    clean = make_panel(args.tickers, args.years, historical_gold)
+    damaged, _ = inject(clean, historical_gold)
+    print(f"{damaged.shape[1]} symbols x {damaged.shape[0]} daily rows")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = validate_closes(damaged, historical_gold=historical_gold)
+        elapsed = time.perf_counter() - start
+    print(result.summary())
+
+    print(f"validation: {elapsed:.2f}s for {damaged.size:,} cells")
+    if elapsed > args.budget:
+        raise SystemExit(f"FAIL: validation took {elapsed:.2f}s, budget {args.budget:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+import contextlib
+import os
+import socket
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Benchmarks import the pipeline modules the same way the scripts do
+HELPER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "helperScripts")
+if HELPER_DIR not in sys.path:
+    sys.path.insert(0, HELPER_DIR)
+
+from Providers import MarketDataProvider
+
+# First sessions of the series that do not go back to the start of a long panel
+METAL_START = "2000-08-30"
+SPY_START = "1993-01-29"
+
+
+def make_symbols(n_tickers):
+    """
+    Returns n synthetic ticker symbols plus the metal futures the pipeline expects.
+    """
+    return ["GC=F", "SI=F", "PL=F"] + [f"T{i:05d}" for i in range(n_tickers - 3)]
+
+
+def make_close_panel(n_tickers=530, years=50, seed=0):
+    """
+    Generates a business-day date x symbol Close matrix with geometric random walks.
+    Roughly a third of the symbols "IPO" late and carry leading NaNs.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp("2026-08-14")
+    dates = pd.bdate_range(end=end, periods=int(years * 252))
+    symbols = make_symbols(n_tickers)
+
+    returns = rng.normal(0.0003, 0.02, size=(len(dates), len(symbols)))
+    prices = 50.0 * np.exp(np.cumsum(returns, axis=0))
+
+    ipo = rng.integers(0, len(dates), size=len(symbols))
+    late = rng.random(len(symbols)) < 0.33
+    for col in np.flatnonzero(late):
+        prices[:ipo[col], col] = np.nan
+
+    return pd.DataFrame(prices, index=dates, columns=symbols)
+
+
+def to_yfinance_chunks(panel, chunk_size=100):
+    """
+    Splits a Close panel into yf.download(group_by='ticker') shaped frames.
+    """
+    frames = []
+    symbols = list(panel.columns)
+    for i in range(0, len(symbols), chunk_size):
+        chunk = panel[symbols[i:i + chunk_size]]
+        parts = {}
+        for symbol in chunk.columns:
+            parts[(symbol, "Close")] = chunk[symbol]
+            parts[(symbol, "Volume")] = 1_000_000.0
+        df = pd.DataFrame(parts, index=chunk.index)
+        df.columns = pd.MultiIndex.from_tuples(df.columns, names=["Ticker", "Price"])
+        df.index.name = "Date"
+        frames.append(df)
+    return frames
+
+
+def make_timeframe_dates(trading_days, target_points=100):
+    """
+    Same equidistant sampling as TimeFrame.get_timeframe_dates(), anchored
+    at the last trading day instead of datetime.now().
+    """
+    horizons = {
+        "Max": 365 * 100, "30y": 365 * 30, "20y": 365 * 20, "10y": 365 * 10,
+        "5y": 365 * 5, "2y": 365 * 2, "1y": 365, "6m": 30 * 6, "3m": 30 * 3
+    }
+    now = trading_days[-1]
+    result = {}
+    for label, days_back in horizons.items():
+        valid = trading_days[trading_days >= now - pd.Timedelta(days=days_back)]
+        if len(valid) > target_points:
+            valid = valid[np.linspace(0, len(valid) - 1, target_points, dtype=int)]
+        result[label] = [d.strftime("%Y-%m-%d") for d in valid]
+    return result
+
+
+def make_cpi_multipliers(start="1947-01", end="2026-06"):
+    """
+    Monthly {YYYY-MM: multiplier} map shaped like get_cpi_multipliers().
+    """
+    months = pd.period_range(start, end, freq="M")
+    cpi = np.linspace(21.0, 320.0, len(months))
+    return {str(m): round(cpi[-1] / v, 4) for m, v in zip(months, cpi)}
+
+
+def make_historical_gold(start="1833-01", end="2020-12"):
+    """
+    Monthly {YYYY-MM: price} map shaped like get_historical_gold().
+    """
+    months = pd.period_range(start, end, freq="M")
+    prices = np.round(np.linspace(18.93, 1850.0, len(months)), 3)
+    return {str(m): float(p) for m, p in zip(months, prices)}
+
+
+def make_cpi_csv(start="1947-01", end="2026-06", seed=0):
+    """
+    FRED CPIAUCSL download (observation_date, CPIAUCSL) with a missing last print.
+    """
+    rng = np.random.default_rng(seed)
+    months = pd.date_range(start, end, freq="MS")
+    cpi = np.round(21.0 * np.exp(np.cumsum(rng.normal(0.0028, 0.003, len(months)))), 3)
+    lines = ["observation_date,CPIAUCSL"]
+    lines += [f"{d:%Y-%m-%d},{v}" for d, v in zip(months, cpi)]
+    lines[-1] = lines[-1].split(",")[0] + ","
+    return "\n".join(lines) + "\n"
+
+
+def make_gold_csv(start="1833-01", end="2020-12", seed=0):
+    """
+    datasets/gold-prices monthly.csv (Date=YYYY-MM, Price).
+    """
+    rng = np.random.default_rng(seed)
+    months = pd.period_range(start, end, freq="M")
+    prices = np.round(18.93 * np.exp(np.cumsum(rng.normal(0.0025, 0.02, len(months)))), 3)
+    return "Date,Price\n" + "".join(f"{m},{p}\n" for m, p in zip(months, prices))
+
+
+class SyntheticMarket:
+    """
+    A generated market: daily closes for the metal futures, SPY and N tickers
+    (date x symbol, DatetimeIndex), the ^GSPC-like index level used as the
+    trading calendar, and the monthly CPI multipliers and historical gold
+    prices ({YYYY-MM: value}) that the pipeline joins them with.
+
+    `actions` lists dividend and split events (symbol, date, dividend, split)
+    in today's split-adjusted terms, like `close`.
+    """
+
+    def __init__(self, close, index_level, cpi_multipliers, historical_gold, actions=None):
+        self.close = close
+        self.index_level = index_level
+        self.cpi_multipliers = cpi_multipliers
+        self.historical_gold = historical_gold
+        self.actions = actions if actions is not None else pd.DataFrame(columns=["symbol", "date", "dividend", "split"])
+
+    @property
+    def symbols(self):
+        return list(self.close.columns)
+
+    def tickers_map(self):
+        """
+        {label: symbol} shaped like Universe.tickers_map().
+        """
+        labels = {"Gold": "GC=F", "Silver": "SI=F", "Platinum": "PL=F", "Inflation Adjusted $": "CPI"}
+        labels.update((s, s) for s in self.symbols if s not in labels.values())
+        return labels
+
+    def provider(self, until=None):
+        return SyntheticProvider(self, until)
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Serves a SyntheticMarket in the yf.download(group_by='ticker') layout, as if
+    the last session were `until` (so a later provider gives an incremental update).
+    Symbols with events also get 'Dividends' and 'Stock Splits' fields; a split
+    after `until` has not happened yet, so the closes and dividends are not
+    adjusted for it.
+    """
+    name = "synthetic"
+
+    def __init__(self, market, until=None, requests_per_second=None):
+        super().__init__(requests_per_second)
+        self.market = market
+        self.until = until
+        self.calls = []
+        self._events = {symbol: events.set_index("date") for symbol, events in market.actions.groupby("symbol")}
+
+    def _unadjusted(self, symbol):
+        """
+        Ratio of the splits after `until`: the provider's prices are this many times today's.
+        """
+        events = self._events.get(symbol)
+        if events is None or self.until is None:
+            return 1.0
+        return float(events.loc[events.index > pd.Timestamp(self.until), "split"].prod())
+
+    def _download(self, symbols, start=None, period=None, interval="1d"):
+        self.calls.append((tuple(symbols), start, period, interval))
+        parts = {}
+        for symbol in symbols:
+            if symbol == "^GSPC":
+                series = self.market.index_level
+            elif symbol in self.market.close.columns:
+                series = self.market.close[symbol].dropna() * self._unadjusted(symbol)
+            else:
+                continue
+            if self.until is not None:
+                series = series[series.index <= pd.Timestamp(self.until)]
+            if start is not None:
+                series = series[series.index >= pd.Timestamp(start)]
+            if interval == "1wk":
+                series = series.resample("W-MON", label="left", closed="left").last().dropna()
+            elif period == "1d":
+                series = series.iloc[-1:]
+            if len(series):
+                parts[(symbol, "Close")] = series
+                events = self._events.get(symbol)
+                if events is not None and interval == "1d":
+                    events = events.reindex(series.index)
+                    parts[(symbol, "Dividends")] = events["dividend"].fillna(0.0) * self._unadjusted(symbol)
+                    parts[(symbol, "Stock Splits")] = events["split"].where(events["split"] != 1.0).fillna(0.0)
+
+        columns = pd.MultiIndex.from_tuples(list(parts), names=["Ticker", "Price"]) if parts \
+            else pd.MultiIndex.from_arrays([[], []], names=["Ticker", "Price"])
+        frame = pd.DataFrame(parts, columns=columns)
+        frame.index.name = "Date"
+        return frame
+
+
+def _garch_volatility(rng, n, daily_vol=0.01, alpha=0.08, beta=0.9):
+    """
+    Daily volatility path of a GARCH(1,1) process (clustered calm and stressed periods).
+    """
+    omega = daily_vol ** 2 * (1 - alpha - beta)
+    shocks = rng.standard_normal(n)
+    variance = np.empty(n)
+    v = daily_vol ** 2
+    for t in range(n):
+        variance[t] = v
+        v = omega + alpha * v * shocks[t] ** 2 + beta * v
+    return np.sqrt(variance)
+
+
+def _monthly_walk(rng, months, last_value, drift, vol):
+    """
+    Monthly random walk over `months` that ends at `last_value`.
+    """
+    path = np.cumsum(rng.normal(drift, vol, len(months)))
+    return last_value * np.exp(path - path[-1])
+
+
+def make_market(n_tickers=530, years=50, seed=0, end="2026-08-14", chunk=256):
+    """
+    Generates a SyntheticMarket with realistic structure:
+
+    - one market factor with GARCH volatility, per-ticker betas and fat-tailed
+      (Student-t) idiosyncratic moves, ending at today's typical share prices;
+    - IPO dates spread over the history (leading NaNs) for about 60% of the
+      tickers, and a few missing sessions;
+    - gold, silver and platinum futures from 2000, SPY from 1993;
+    - monthly historical gold back to 1833 that agrees with the futures (the
+      dataset lags a couple of months), and monthly CPI from 1947;
+    - quarterly dividends (0.5-4% a year) for SPY and about 40% of the
+      tickers, and a 2:1 to 4:1 split for about 2% of them.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp(end), periods=int(years * 252))
+    n = len(dates)
+    tickers = [f"T{i:05d}" for i in range(max(0, n_tickers - 4))]
+    symbols = ["GC=F", "SI=F", "PL=F", "SPY"] + tickers
+
+    market = 0.0003 + _garch_volatility(rng, n) * rng.standard_t(5, n) / np.sqrt(5 / 3)
+    close = np.full((n, len(symbols)), np.nan)
+
+    # Metals: gold drifts up with low beta, silver and platinum follow it loosely
+    gold_ret = 0.0002 + 0.1 * market + rng.normal(0, 0.009, n)
+    gold_path = np.exp(np.cumsum(gold_ret))
+    gold_path *= 2400.0 / gold_path[-1]
+    close[:, 0] = gold_path
+    close[:, 1] = gold_path / 80.0 * np.exp(np.cumsum(rng.normal(0, 0.012, n)))
+    close[:, 2] = gold_path / 2.4 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[dates < pd.Timestamp(METAL_START), :3] = np.nan
+    spy = np.exp(np.cumsum(market))
+    close[:, 3] = spy * 550.0 / spy[-1]
+    close[dates < pd.Timestamp(SPY_START), 3] = np.nan
+
+    # Tickers, in column chunks to keep the temporaries small
+    beta = rng.uniform(0.5, 1.6, len(tickers))
+    idio = rng.uniform(0.008, 0.03, len(tickers))
+    last_price = np.exp(rng.normal(np.log(80.0), 1.0, len(tickers)))
+    late = rng.random(len(tickers)) < 0.6
+    ipo = np.where(late, rng.integers(0, n, len(tickers)), 0)
+    for lo in range(0, len(tickers), chunk):
+        hi = min(lo + chunk, len(tickers))
+        shocks = rng.standard_t(5, (n, hi - lo)) / np.sqrt(5 / 3)
+        returns = 0.0002 + beta[lo:hi] * (market[:, None] - 0.0003) + idio[lo:hi] * shocks
+        block = np.exp(np.cumsum(returns, axis=0))
+        block *= last_price[lo:hi] / block[-1]
+        block[np.arange(n)[:, None] < ipo[lo:hi]] = np.nan
+        close[:, 4 + lo:4 + hi] = block
+    missing = rng.integers(0, n, (len(tickers) // 20, 2))
+    close[missing[:, 0], 4 + missing[:, 1] % max(1, len(tickers))] = np.nan
+
+    frame = pd.DataFrame(close, index=dates, columns=symbols)
+    index_level = pd.Series(spy * 5500.0 / spy[-1], index=dates)
+
+    # Historical gold: monthly means of the daily path, a random walk before it, ends two months early
+    end_month = pd.Period(dates[-1], freq="M")
+    daily_gold = pd.Series(gold_path, index=dates)
+    monthly = daily_gold.groupby(dates.to_period("M")).mean()
+    earlier = pd.period_range("1833-01", monthly.index[0] - 1, freq="M")
+    walk = _monthly_walk(rng, earlier, monthly.iloc[0], 0.003, 0.03) if len(earlier) else []
+    gold = pd.concat([pd.Series(walk, index=earlier, dtype=float), monthly])
+    gold = gold[gold.index <= end_month - 2]
+    historical_gold = {str(m): round(float(v), 3) for m, v in gold.items()}
+
+    months = pd.period_range("1947-01", end_month - 1, freq="M")
+    cpi = 21.0 * np.exp(np.cumsum(rng.normal(0.0029, 0.003, len(months))))
+    cpi_multipliers = {str(m): round(float(cpi[-1] / v), 4) for m, v in zip(months, cpi)}
+    return SyntheticMarket(frame, index_level, cpi_multipliers, historical_gold,
+                           _make_actions(np.random.default_rng(seed + 1), frame))
+
+
+def _make_actions(rng, close):
+    """
+    Dividend and split events for a close panel, in split-adjusted terms.
+    Uses its own generator so the prices do not depend on it.
+    """
+    n = len(close)
+    symbols = list(close.columns[3:])
+    payers = [s for s in symbols if s == "SPY" or rng.random() < 0.4]
+    events = []
+    for symbol in payers:
+        closes = close[symbol].to_numpy()
+        rows = np.arange(rng.integers(0, 63), n, 63)
+        rows = rows[~np.isnan(closes[rows])]
+        dividends = rng.uniform(0.005, 0.04) / 4 * closes[rows]
+        events.append(pd.DataFrame({"symbol": symbol, "date": close.index[rows], "dividend": dividends, "split": 1.0}))
+    splitters = [s for s in symbols[1:] if rng.random() < 0.02]
+    for symbol in splitters:
+        valid = np.flatnonzero(~np.isnan(close[symbol].to_numpy()))
+        row = valid[rng.integers(len(valid) // 2, len(valid))] if len(valid) > 1 else None
+        if row is not None:
+            events.append(pd.DataFrame({"symbol": [symbol], "date": [close.index[row]], "dividend": [0.0],
+                                        "split": [float(rng.integers(2, 5))]}))
+    if not events:
+        return None
+    actions = pd.concat(events, ignore_index=True)
+    actions = actions.groupby(["symbol", "date"], as_index=False).agg({"dividend": "sum", "split": "prod"})
+    return actions.sort_values(["date", "symbol"]).reset_index(drop=True)
+
+
+@contextlib.contextmanager
+def no_network():
+    """
+    Makes every outgoing connection fail, so an offline benchmark cannot
+    silently reach Yahoo, FRED, GitHub or Wikipedia.
+    """
+    def refuse(*args, **kwargs):
+        raise ConnectionRefusedError("network access is disabled in the benchmarks")
+
+    saved = socket.socket.connect, socket.socket.connect_ex, socket.create_connection, socket.getaddrinfo
+    socket.socket.connect = socket.socket.connect_ex = refuse
+    socket.create_connection = socket.getaddrinfo = refuse
+    try:
+        yield
+    finally:
+        socket.socket.connect, socket.socket.connect_ex, socket.create_connection, socket.getaddrinfo = saved
@@ -0,0 +1,41 @@
+"""
+Every bench_suite stage as a pytest-benchmark test, on one small synthetic market.
+
+    pytest benchmarks --benchmark-only --benchmark-save=main               # e.g. on the main branch
+    pytest benchmarks --benchmark-only --benchmark-compare=0001_main \
+        --benchmark-compare-fail=min:40%                                   # fails on a regression
+
+The CI workflow (.github/workflows/python.yml) runs both on the same runner:
+the base branch first, then the pull request against it.
+"""
+import pytest
+
+import synthetic
+from bench_suite import STAGES, StageTimer, run_size
+
+SIZE = 100
+YEARS = 20
+# Rounds per stage: enough for about TARGET_SECONDS, within [MIN_ROUNDS, MAX_ROUNDS]
+TARGET_SECONDS = 2.0
+MIN_ROUNDS = 3
+MAX_ROUNDS = 30
+
+
+@pytest.fixture(scope="module")
+def stages(tmp_path_factory):
+    """
+    Runs the suite once (offline) and keeps every stage's (func, setup, seconds) for the tests to time.
+    """
+    timer = StageTimer(SIZE, repeat=1)
+    with synthetic.no_network():
+        run_size(SIZE, YEARS, 1, str(tmp_path_factory.mktemp("suite")), timer=timer)
+        assert list(timer.stages) == STAGES
+        yield {name: (*timer.stages[name], timer.seconds[name]) for name in STAGES}
+
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_stage(benchmark, stages, stage):
+    func, setup, seconds = stages[stage]
+    rounds = int(min(MAX_ROUNDS, max(MIN_ROUNDS, TARGET_SECONDS / max(seconds, 1e-6))))
+    benchmark.group = f"{SIZE} tickers x {YEARS} years"
+    benchmark.pedantic(func, setup=(lambda: (setup(), {})) if setup else None, rounds=rounds, warmup_rounds=1)
@@ -3,8 +3,12 @@
 # ------------------------------------------------------------------------------
 # Stock in Ounces - Automated Daily Update Script
 # Updates the data files using Python and pushes changes back to GitHub.
+# Usage: update_data.sh            nightly rebuild from the settled closes
+#        update_data.sh live-tip   intraday refresh of the latest point only
 # ------------------------------------------------------------------------------
 
+RUN_MODE="${1:-nightly}"
+
 # Get absolute path to the directory containing this script
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
@@ -38,17 +42,73 @@ if ! command -v "$PYTHON" &> /dev/null; then
   exit 1
 fi
 
-# Run data collection python script
-echo "2. Fetching latest market data..."
-"$PYTHON" helperScripts/GetStockData.py
-if [ $? -ne 0 ]; then
-  echo "Error: Data collection failed."
-  exit 1
+if [ "$RUN_MODE" = "live-tip" ]; then
+  # Latest quotes over the last point of Tip.json, FastData.json and the bundles
+  echo "2. Refreshing the live tip..."
+  LIVE_TIP_ARGS=()
+  if [ "$LIVE_TIP_DATA_JSON" = "1" ]; then
+    LIVE_TIP_ARGS+=(--data-json)
+  fi
+  if ! "$PYTHON" helperScripts/Pipeline.py live-tip "${LIVE_TIP_ARGS[@]}"; then
+    echo "Error: Live tip refresh failed."
+    exit 1
+  fi
+  UPDATED_FILES=("public/Tip.json" "public/FastData.json" "public/bundles")
+  if [ "$LIVE_TIP_DATA_JSON" = "1" ]; then
+    UPDATED_FILES+=("public/Data.json")
+  fi
+  COMMIT_MESSAGE="Auto-update live tip"
+else
+  # Run data collection python script
+  echo "2. Fetching latest market data..."
+  PUBLISH_MODE="${PUBLISH_MODE:-full}"
+  SAMPLING="${SAMPLING:-equidistant}"
+  WORKERS="${WORKERS:-1}"
+  QUALITY="${QUALITY:-report}"
+  # Every run leaves a timing report in cache/reports/ (kept for the last REPORT_KEEP runs)
+  REPORTS_DIR="cache/reports"
+  REPORT_KEEP="${REPORT_KEEP:-90}"
+  RUN_ID=$(date +"%Y%m%d-%H%M%S")
+  EXTRA_ARGS=()
+  if [ "$PROFILE" = "1" ]; then
+    EXTRA_ARGS+=(--profile "$REPORTS_DIR/run-$RUN_ID.prof")
+  fi
+  if [ "$PYRAMID" = "1" ]; then
+    EXTRA_ARGS+=(--pyramid)
+  fi
+  # Nothing is written (so nothing is committed) when the data-quality checks find blocking issues
+  if [ "${QUALITY_GATE:-1}" = "1" ]; then
+    EXTRA_ARGS+=(--quality-gate)
+  fi
+  "$PYTHON" helperScripts/GetStockData.py --publish-mode "$PUBLISH_MODE" --sampling "$SAMPLING" \
+    --workers "$WORKERS" --quality "$QUALITY" --report "$REPORTS_DIR/run-$RUN_ID.json" "${EXTRA_ARGS[@]}"
+  STATUS=$?
+
+  # Compare with earlier runs and drop the oldest reports
+  "$PYTHON" helperScripts/Instrument.py "$REPORTS_DIR"
+  ls -1 "$REPORTS_DIR"/run-*.json 2>/dev/null | head -n -"$REPORT_KEEP" | while read -r old; do
+    rm -f "$old" "${old%.json}.prof"
+  done
+
+  if [ $STATUS -ne 0 ]; then
+    echo "Error: Data collection failed."
+    exit 1
+  fi
+
+  # Files to commit
+  UPDATED_FILES=("public/Data.json" "public/FastData.json" "public/bundles" "public/Tip.json" "public/tickers.json"
+                 "public/search.json" "public/columnar" "public/Returns.json")
+  if [ "$PUBLISH_MODE" = "delta" ]; then
+    # Base snapshot + deltas; -A also stages snapshots removed by compaction
+    git add -A public/snapshots
+  fi
+  if [ "$PYRAMID" = "1" ]; then
+    UPDATED_FILES+=("public/pyramid")
+  fi
+  COMMIT_MESSAGE="Auto-update stock data"
 fi
 
 echo "3. Staging changes..."
-# Files to commit
-UPDATED_FILES=("public/Data.json" "public/FastData.json" "public/tickers.json")
 git add "${UPDATED_FILES[@]}"
 
 # Check if there are actual changes staged
@@ -71,7 +131,7 @@ if [ -n "$GIT_USER_EMAIL" ]; then
 fi
 
 DATE_STR=$(date +"%Y-%m-%d %H:%M:%S")
-git commit -m "Auto-update stock data: $DATE_STR"
+git commit -m "$COMMIT_MESSAGE: $DATE_STR"
 COMMIT_STATUS=$?
 
 # Restore old repository settings to prevent local state pollution
@@ -0,0 +1,126 @@
+"""
+Dividend and split adjustments: total-return closes next to the price-return ones.
+
+Closes in the price store are split-adjusted price returns (yfinance with
+auto_adjust=False). Dividends and splits are stored as events next to them
+(PriceStore, "actions" table), and every dividend gets its growth factor
+1 + dividend / ex-date close once, when it is stored. The total-return close
+of a ticker is its close times the cumulative product of the growth factors
+of every dividend up to that date, i.e. the value of one share with every
+dividend reinvested at the ex-date close. growth_factors() builds that
+(date x symbol) matrix for the whole universe in one NumPy pass.
+
+The factors are accumulated forward from each ticker's first dividend, so a
+new dividend only changes its own ticker's rows from the ex-date on.
+"""
+import numpy as np
+import pandas as pd
+
+from Instrument import count
+
+# "VOO" -> "VOO (TR)": the total-return column of a label (and of its symbol in the close matrix)
+TR_SUFFIX = " (TR)"
+
+EVENT_COLUMNS = ["symbol", "date", "dividend", "split"]
+
+
+def build_actions(data_frames):
+    """
+    Dividend and split events of downloaded chunks (yf.download(actions=True)
+    layout, see build_close_matrix()) as a DataFrame with EVENT_COLUMNS; a
+    dividend of 0 or a split of 1 means none. Dates are 'YYYY-MM-DD' strings.
+    """
+    parts = []
+    for df in data_frames:
+        if not isinstance(df.columns, pd.MultiIndex) or df.empty:
+            continue
+        fields = set(df.columns.get_level_values(1))
+        if not fields.intersection(("Dividends", "Stock Splits")):
+            continue
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        dates = pd.DatetimeIndex(index).strftime("%Y-%m-%d")
+        events = {}
+        for field, name in (("Dividends", "dividend"), ("Stock Splits", "split")):
+            if field in fields:
+                panel = df.xs(field, level=1, axis=1).set_axis(dates)
+                events[name] = panel[~panel.index.duplicated(keep="first")].stack()
+        frame = pd.DataFrame(events)
+        frame.index.names = ["date", "symbol"]
+        parts.append(frame.reset_index())
+
+    if not parts:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    actions = pd.concat(parts, ignore_index=True).reindex(columns=EVENT_COLUMNS)
+    actions["dividend"] = actions["dividend"].fillna(0.0).astype(float)
+    actions["split"] = actions["split"].fillna(0.0).astype(float)
+    actions.loc[actions["split"] <= 0, "split"] = 1.0
+    actions = actions[(actions["dividend"] > 0) | (actions["split"] != 1.0)]
+    return actions.drop_duplicates(["symbol", "date"]).reset_index(drop=True)
+
+
+def _event_positions(dates, event_dates):
+    """
+    Row of the first date on or after each event date (len(dates) when past the end).
+    """
+    return np.searchsorted(np.asarray(dates).astype(str), np.asarray(event_dates).astype(str), side="left")
+
+
+def dividend_growth(dividends, ex_closes):
+    """
+    Growth factor 1 + dividend / ex-date close of each dividend (NaN without a positive close).
+    """
+    dividends = np.asarray(dividends, dtype=float)
+    ex_closes = np.asarray(ex_closes, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = 1.0 + dividends / np.where(ex_closes > 0, ex_closes, np.nan)
+    count("adjust.growth", int(np.isfinite(growth).sum()))
+    return growth
+
+
+def growth_factors(dates, symbols, events):
+    """
+    (date x symbol) cumulative total-return factors for any sorted dates
+    (daily or sampled): the product of the growth of every dividend on or
+    before each date. `events` needs symbol, date and growth columns; events
+    without a growth factor count as 1.
+    """
+    factors = np.ones((len(dates), len(symbols)))
+    if not len(events) or not len(dates):
+        return factors
+    cols = pd.Index(symbols).get_indexer(events["symbol"])
+    rows = _event_positions(dates, events["date"])
+    growth = events["growth"].to_numpy(dtype=float)
+    keep = (cols >= 0) & (rows < len(dates)) & np.isfinite(growth)
+    # Several dividends between two sampled dates all land on the later one
+    np.multiply.at(factors, (rows[keep], cols[keep]), growth[keep])
+    return np.cumprod(factors, axis=0, out=factors)
+
+
+def total_return_close(close, events):
+    """
+    Total-return closes of every symbol in `close` with at least one dividend,
+    as a date x symbol DataFrame whose columns carry TR_SUFFIX.
+    """
+    events = events[(events["dividend"] > 0) & events["symbol"].isin(close.columns)]
+    symbols = list(dict.fromkeys(events["symbol"]))
+    factors = growth_factors(list(close.index), symbols, events)
+    values = close.reindex(columns=symbols).to_numpy(dtype=float) * factors
+    count("adjust.tr_columns", len(symbols))
+    return pd.DataFrame(values, index=close.index, columns=[s + TR_SUFFIX for s in symbols])
+
+
+def with_total_return(close, tickers_map, events):
+    """
+    Returns (close, tickers_map) extended with a "<label> (TR)" column for every label whose symbol paid dividends.
+    """
+    tr_close = total_return_close(close, events)
+    if not len(tr_close.columns):
+        return close, tickers_map
+    labels = dict(tickers_map)
+    paying = set(tr_close.columns)
+    for label, symbol in tickers_map.items():
+        if symbol + TR_SUFFIX in paying:
+            labels[label + TR_SUFFIX] = symbol + TR_SUFFIX
+    return pd.concat([close, tr_close], axis=1), labels
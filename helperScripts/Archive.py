@@ -0,0 +1,280 @@
+"""
+Full daily price archive with date-range queries.
+
+The archive holds every session's resolved close (the same values Data.json
+is assembled from: Gold with its historical fallback, the CPI multipliers,
+every ticker) for every column:
+
+    cache/archive/manifest.json   columns, rows, capacity, first/last date
+    cache/archive/dates.i4        int32 days since 1970-01-01, one per row
+    cache/archive/closes.f32      float32, column-major: (column, capacity)
+
+Each column is stored with `capacity` slots, so a new session is written into
+the free slots of every column in place; the file is only rewritten (with
+GROWTH_ROWS more slots) when it is full or the columns change.
+
+PriceArchive.query() returns any columns over any date range, daily, weekly,
+monthly or as N evenly spaced points, in any denominator (see Denominators).
+The timeframes of Data.json are one such query (PriceArchive.assembled()).
+"""
+import json
+import os
+
+import numpy as np
+
+from Instrument import count, timed
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+VALUES_NAME = "closes.f32"
+DATES_NAME = "dates.i4"
+DTYPE = np.dtype("<f4")
+DAY_DTYPE = np.dtype("<i4")
+
+# Free slots added per column when the file is (re)written, about a year of sessions
+GROWTH_ROWS = 256
+
+SAMPLINGS = ("daily", "weekly", "monthly")
+
+
+def to_days(dates):
+    """
+    'YYYY-MM-DD' strings (or datetimes) -> int32 days since 1970-01-01.
+    """
+    return np.asarray(np.array(dates, dtype="datetime64[D]").astype(np.int64), dtype=DAY_DTYPE)
+
+
+def to_dates(days):
+    return np.datetime_as_string(np.asarray(days, dtype=np.int64).astype("datetime64[D]")).tolist()
+
+
+def parse_sampling(sampling):
+    """
+    "daily", "weekly", "monthly", or a number of evenly spaced points (int or digits).
+    """
+    if sampling is None:
+        return "daily"
+    if isinstance(sampling, int) or str(sampling).isdigit():
+        points = int(sampling)
+        if points < 2:
+            raise ValueError(f"Sampling needs at least 2 points: {sampling}")
+        return points
+    if sampling not in SAMPLINGS:
+        raise ValueError(f"Unknown sampling: {sampling!r} (daily, weekly, monthly or a number of points)")
+    return sampling
+
+
+def sample_rows(days, sampling="daily"):
+    """
+    Positions in `days` (sorted) kept by a sampling: every day, the last session
+    of each week (Monday to Sunday) or month, or N evenly spaced sessions that
+    include the first and last (the "equidistant" timeframe sampling).
+    """
+    sampling = parse_sampling(sampling)
+    n = len(days)
+    if sampling == "daily" or n == 0:
+        return np.arange(n)
+    if isinstance(sampling, int):
+        if n <= sampling:
+            return np.arange(n)
+        return np.linspace(0, n - 1, sampling, dtype=int)
+    if sampling == "weekly":
+        # 1970-01-01 is a Thursday, so (day + 3) // 7 changes every Monday
+        period = (np.asarray(days, dtype=np.int64) + 3) // 7
+    else:
+        period = np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return np.flatnonzero(np.append(period[1:] != period[:-1], True))
+
+
+class PriceArchive:
+    """
+    Full daily closes: `days` (sorted int32 days since 1970-01-01), `columns`
+    and `values`, a (column x row) float matrix. from_matrix() wraps the
+    assembled float64 matrix in memory; open() memory-maps the float32 copy
+    written by write_archive(), so a query only reads the columns it needs.
+    """
+
+    def __init__(self, days, columns, values):
+        self.days = np.asarray(days, dtype=DAY_DTYPE)
+        self.columns = list(columns)
+        self.values = values
+        self._index = {c: i for i, c in enumerate(self.columns)}
+
+    @classmethod
+    def from_matrix(cls, dates, columns, matrix):
+        """
+        Wraps a (date x column) matrix, e.g. Assembly.assemble_matrix() over every session.
+        """
+        return cls(to_days(dates), columns, matrix.T)
+
+    @classmethod
+    def open(cls, archive_dir):
+        manifest = read_manifest(archive_dir)
+        rows, capacity = manifest["rows"], manifest["capacity"]
+        days = np.fromfile(os.path.join(archive_dir, DATES_NAME), dtype=DAY_DTYPE, count=rows)
+        values = np.memmap(os.path.join(archive_dir, VALUES_NAME), dtype=DTYPE, mode="r",
+                           shape=(len(manifest["columns"]), capacity))
+        return cls(days, manifest["columns"], values[:, :rows])
+
+    def __len__(self):
+        return len(self.days)
+
+    def dates(self, rows=None):
+        return to_dates(self.days if rows is None else self.days[rows])
+
+    def rows(self, start=None, end=None, sampling="daily"):
+        """
+        Row positions of the sessions in [start, end] ('YYYY-MM-DD', inclusive) kept by `sampling`.
+        """
+        lo = int(np.searchsorted(self.days, to_days([start])[0], side="left")) if start else 0
+        hi = int(np.searchsorted(self.days, to_days([end])[0], side="right")) if end else len(self.days)
+        hi = max(lo, hi)
+        return lo + sample_rows(self.days[lo:hi], sampling)
+
+    def rows_for(self, dates):
+        """
+        Row positions of exact dates; raises KeyError for dates without a row.
+        """
+        days = to_days(dates)
+        rows = np.searchsorted(self.days, days)
+        found = rows < len(self.days)
+        found[found] = self.days[rows[found]] == days[found]
+        if not found.all():
+            missing = [d for d, ok in zip(dates, found) if not ok]
+            raise KeyError(f"{len(missing)} dates are not in the archive: {', '.join(missing[:5])}")
+        return rows
+
+    def matrix(self, rows, columns=None):
+        """
+        (row x column) float64 block; only the requested cells are read from disk.
+        """
+        columns = self.columns if columns is None else list(columns)
+        missing = [c for c in columns if c not in self._index]
+        if missing:
+            raise KeyError(f"Not in the archive: {', '.join(missing)}")
+        cols = [self._index[c] for c in columns]
+        block = self.values[np.ix_(cols, np.asarray(rows, dtype=np.intp))]
+        return np.ascontiguousarray(block.T, dtype=float)
+
+    @timed("archive.query")
+    def query(self, columns=None, start=None, end=None, sampling="daily", denominator="USD"):
+        """
+        Returns (dates, columns, values) for `columns` (default: all) between
+        `start` and `end`, sampled daily, weekly, monthly or as N points, with
+        values (date x column, NaN for no close) in `denominator` (any
+        Denominators spec: "USD", "Gold", "Real Gold", {"components": ...}).
+        Columns the denominator needs are read even when they are not returned.
+        """
+        from Denominators import CPI_COLUMN, USD, denominate, parse_denominator
+
+        columns = self.columns if columns is None else list(columns)
+        rows = self.rows(start, end, sampling)
+        parsed = parse_denominator(denominator)
+        needed = list(parsed.components)
+        if parsed.deflate or parsed.name == CPI_COLUMN:
+            needed.append(CPI_COLUMN)
+        extra = [c for c in dict.fromkeys(needed) if c not in columns and c in self._index]
+        values = self.matrix(rows, columns + extra)
+        if parsed.name != USD or parsed.components:
+            values = denominate(values, columns + extra, [parsed])[0]
+        count("archive.cells", len(rows) * len(columns))
+        return self.dates(rows), columns, values[:, :len(columns)]
+
+    def assembled(self, timeframe_dates, columns=None):
+        """
+        The AssembledData behind Data.json: the union of the timeframes' dates, every column.
+        """
+        from Assembly import AssembledData
+
+        union_dates = sorted(set(d for dates in timeframe_dates.values() for d in dates))
+        columns = self.columns if columns is None else list(columns)
+        values = self.matrix(self.rows_for(union_dates), columns)
+        position = {d: i for i, d in enumerate(union_dates)}
+        timeframes = {}
+        for tf_label, dates in timeframe_dates.items():
+            timeframes[tf_label] = [position[d] for d in dates]
+            count("assembly.rows", len(dates))
+            count("assembly.cells", len(dates) * len(columns))
+        return AssembledData(union_dates, columns, values, timeframes)
+
+
+def read_manifest(archive_dir):
+    with open(os.path.join(archive_dir, MANIFEST_NAME), "r") as f:
+        return json.load(f)
+
+
+def _replace(path, data):
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def _first_changed_row(stored, values, n_rows, chunk=4096):
+    """
+    First row where the stored float32 cells differ from `values`, or n_rows.
+    Cells are compared bit for bit, so NaN matches NaN.
+    """
+    for lo in range(0, n_rows, chunk):
+        hi = min(lo + chunk, n_rows)
+        old = np.asarray(stored[:, lo:hi]).view(np.uint32)
+        new = values[:, lo:hi].astype(DTYPE).view(np.uint32)
+        differs = (old != new).any(axis=0)
+        if differs.any():
+            return lo + int(np.argmax(differs))
+    return n_rows
+
+
+@timed("export.archive")
+def write_archive(archive, archive_dir, growth=GROWTH_ROWS):
+    """
+    Saves an in-memory PriceArchive as float32. When the stored archive has
+    the same columns, its dates are a prefix of the new ones and the free
+    slots suffice, only the rows from the first changed one on are written;
+    otherwise the file is rewritten with `growth` free slots per column.
+    The manifest is replaced last. Returns the number of rows written.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    values_path = os.path.join(archive_dir, VALUES_NAME)
+    n_rows, n_cols = len(archive.days), len(archive.columns)
+
+    manifest = None
+    if os.path.exists(os.path.join(archive_dir, MANIFEST_NAME)) and os.path.exists(values_path):
+        manifest = read_manifest(archive_dir)
+
+    start = None
+    if (manifest and manifest.get("version") == FORMAT_VERSION and manifest["columns"] == archive.columns
+            and manifest["rows"] <= n_rows <= manifest["capacity"]):
+        stored_days = np.fromfile(os.path.join(archive_dir, DATES_NAME), dtype=DAY_DTYPE, count=manifest["rows"])
+        if np.array_equal(stored_days, archive.days[:len(stored_days)]):
+            capacity = manifest["capacity"]
+            stored = np.memmap(values_path, dtype=DTYPE, mode="r+", shape=(n_cols, capacity))
+            start = _first_changed_row(stored, archive.values, len(stored_days))
+            stored[:, start:n_rows] = archive.values[:, start:n_rows]
+            stored.flush()
+            del stored
+
+    if start is None:
+        capacity = n_rows + growth
+        block = np.full((n_cols, capacity), np.nan, dtype=DTYPE)
+        block[:, :n_rows] = archive.values
+        _replace(values_path, block.tobytes())
+        start = 0
+        count("archive.rewrite")
+
+    _replace(os.path.join(archive_dir, DATES_NAME), archive.days.astype(DAY_DTYPE).tobytes())
+    manifest = {
+        "version": FORMAT_VERSION,
+        "dtype": "float32",
+        "byteOrder": "little",
+        "layout": "column-major",
+        "null": "NaN",
+        "columns": archive.columns,
+        "rows": n_rows,
+        "capacity": capacity,
+        "first": to_dates(archive.days[:1])[0] if n_rows else None,
+        "last": to_dates(archive.days[-1:])[0] if n_rows else None
+    }
+    _replace(os.path.join(archive_dir, MANIFEST_NAME),
+             json.dumps(manifest, indent=None, separators=(',', ':')).encode())
+    count("archive.rows_written", n_rows - start)
+    return n_rows - start
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+from Instrument import count, timed
+from ReferenceSeries import monthly_join, monthly_series
+
+
+def build_close_matrix(data_frames):
+    """
+    Concatenate the Close panels of every downloaded chunk into a single
+    date x symbol DataFrame indexed by 'YYYY-MM-DD' strings.
+    When a symbol appears in several chunks, the first non-null value wins.
+    """
+    panel = None
+    for df in data_frames:
+        if not isinstance(df.columns, pd.MultiIndex) or df.empty:
+            continue  # Single ticker logic omitted
+
+        close = df.xs("Close", level=1, axis=1)
+
+        # Match dates the same way the rows are keyed: by calendar day
+        index = close.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        close.index = pd.DatetimeIndex(index).strftime("%Y-%m-%d")
+        close = close[~close.index.duplicated(keep="first")]
+        close = close.loc[:, ~close.columns.duplicated(keep="first")]
+
+        panel = close if panel is None else panel.combine_first(close)
+
+    if panel is None:
+        return pd.DataFrame(dtype=float)
+    return panel.astype(float)
+
+
+def rows_to_matrix(tf_data):
+    """
+    Converts one timeframe's {columns, rows} into (dates, value columns, float matrix).
+    The matrix is shaped (len(dates), len(columns)) with NaN for null.
+    """
+    columns = tf_data["columns"][1:]
+    rows = tf_data["rows"]
+    dates = [row[0] for row in rows]
+    values = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), len(columns))
+    return dates, columns, values
+
+
+def _round_matrix(values, digits=4):
+    """
+    Round every cell with Python's round() so the output repr matches the
+    per-cell path exactly (np.round can differ in the last binary digit).
+    """
+    flat = values.ravel().tolist()
+    rounded = np.fromiter((round(v, digits) for v in flat), dtype=float, count=len(flat))
+    return rounded.reshape(values.shape)
+
+
+def _existing_matrix(existing_lookup, dates, keys):
+    """
+    Turn a {date: {label: value}} lookup into a float matrix aligned to (dates, keys), NaN where nothing was stored.
+    """
+    if not existing_lookup:
+        return np.full((len(dates), len(keys)), np.nan)
+    existing = pd.DataFrame.from_dict(existing_lookup, orient="index", dtype=float)
+    return existing.reindex(index=dates, columns=keys).to_numpy(dtype=float)
+
+
+def _resolve_columns(fetched, dates, keys, existing_lookup=None,
+                     cpi_multipliers=None, historical_gold=None, round_closes=True):
+    """
+    Applies steps 1-3 below to a (date x key) block of closes. Every column is
+    resolved on its own, so a block can be any subset of the columns. `dates`
+    is only read for stored values and the gold/CPI columns.
+    """
+    # 1. Closes, one column per label
+    if round_closes:
+        fetched = _round_matrix(fetched)
+
+    # 2. Explicit per-cell values take precedence over the closes
+    matrix = fetched
+    if existing_lookup:
+        existing = _existing_matrix(existing_lookup, dates, keys)
+        matrix = np.where(np.isnan(existing), fetched, existing)
+
+    # 3. Column-wise fallbacks
+    if "Gold" in keys and historical_gold is not None and len(historical_gold):
+        gold_idx = keys.index("Gold")
+        fallback = monthly_join(historical_gold, dates)
+        gold_col = matrix[:, gold_idx]
+        matrix[:, gold_idx] = np.where(np.isnan(gold_col), fallback, gold_col)
+
+    if "Inflation Adjusted $" in keys:
+        cpi_idx = keys.index("Inflation Adjusted $")
+        if cpi_multipliers is not None and len(cpi_multipliers):
+            # Months past the latest CPI print use the latest multiplier (forward-filled),
+            # and so do months before the first one
+            cpi_multipliers = monthly_series(cpi_multipliers)
+            cpi_col = monthly_join(cpi_multipliers, dates, ffill=True)
+            matrix[:, cpi_idx] = np.where(np.isnan(cpi_col), cpi_multipliers.iloc[-1], cpi_col)
+        else:
+            matrix[:, cpi_idx] = np.nan
+    return matrix
+
+
+def assemble_matrix(dates, all_keys, tickers_map, close, existing_lookup=None,
+                    cpi_multipliers=None, historical_gold=None, round_closes=True, workers=1):
+    """
+    Resolves the date x label float matrix behind Data.json for `dates`.
+
+    `close` is a date x symbol Close matrix (see build_close_matrix() and
+    PriceStore.load()) or a Sharding.StoreCloses; `cpi_multipliers` and `historical_gold` are monthly
+    series or {YYYY-MM: value} dicts (see ReferenceSeries). Columns are
+    resolved with the same precedence as before: CPI multipliers for
+    "Inflation Adjusted $", then any values in `existing_lookup`
+    ({date: {label: value}}), then the closes (rounded to 4 decimals unless
+    round_closes=False), then the monthly historical gold fallback.
+
+    With workers > 1 and a large enough block the columns are split into
+    shards, each loaded and resolved by a worker process (see Sharding); the
+    result is identical.
+    """
+    keys = list(all_keys)
+    symbols = [tickers_map[key] for key in keys]
+    if workers > 1:
+        from Sharding import resolve_sharded, shard_workers
+        workers = shard_workers(len(dates), len(keys), workers)
+        if workers > 1:
+            return resolve_sharded(close, dates, keys, symbols, existing_lookup, cpi_multipliers,
+                                   historical_gold, round_closes, workers)
+        count("assembly.single_process")
+    if isinstance(close, pd.DataFrame):
+        fetched = close.reindex(index=dates, columns=symbols).to_numpy(dtype=float, copy=True)
+    else:
+        fetched = close.block(symbols, dates)
+    return _resolve_columns(fetched, dates, keys, existing_lookup, cpi_multipliers,
+                            historical_gold, round_closes)
+
+
+class AssembledData:
+    """
+    The matrix behind Data.json: `dates` (the union of every timeframe's dates,
+    sorted), `keys` (column labels), `values` (date x key floats, NaN for null,
+    closes not rounded) and `timeframes` ({label: row indices into dates}).
+    Writers can serialize straight from it (see JsonEncode); to_final_data()
+    builds the nested {timeframe: {columns, rows}} lists once, on demand.
+    """
+
+    def __init__(self, dates, keys, values, timeframes):
+        self.dates = dates
+        self.keys = keys
+        self.values = values
+        self.timeframes = timeframes
+        self._final_data = None
+
+    def timeframe_dates(self, tf_label):
+        return [self.dates[i] for i in self.timeframes[tf_label]]
+
+    def to_final_data(self):
+        """
+        Returns the {timeframe: {columns, rows}} structure, cells rounded to 4 decimals.
+        """
+        if self._final_data is not None:
+            return self._final_data
+        if not self.timeframes:
+            return {}
+
+        # NaN -> null, then slice rows per timeframe
+        matrix = _round_matrix(self.values)
+        cells = matrix.astype(object)
+        cells[np.isnan(matrix)] = None
+        union_rows = cells.tolist()
+
+        columns = ["Date"] + list(self.keys)
+        final_data = {}
+        for tf_label, indices in self.timeframes.items():
+            print(f"Processing {tf_label}...")
+            final_data[tf_label] = {
+                "columns": columns,
+                "rows": [[self.dates[i]] + union_rows[i] for i in indices]
+            }
+        self._final_data = final_data
+        return final_data
+
+
+@timed("assemble.data")
+def assemble_data(timeframe_dates, all_keys, tickers_map, close,
+                  existing_lookup=None, cpi_multipliers=None, historical_gold=None, workers=1):
+    """
+    Resolves the union of every timeframe's dates once with assemble_matrix()
+    (sharded over `workers` processes when > 1) and returns an AssembledData.
+    Closes are kept unrounded so the writers can apply their own precision.
+    """
+    union_dates = sorted(set(d for dates in timeframe_dates.values() for d in dates))
+    matrix = assemble_matrix(union_dates, all_keys, tickers_map, close, existing_lookup,
+                             cpi_multipliers, historical_gold, round_closes=False, workers=workers)
+    position = {d: i for i, d in enumerate(union_dates)}
+    timeframes = {}
+    for tf_label, dates in timeframe_dates.items():
+        timeframes[tf_label] = [position[d] for d in dates]
+        count("assembly.rows", len(dates))
+        count("assembly.cells", len(dates) * len(all_keys))
+    return AssembledData(union_dates, list(all_keys), matrix, timeframes)
+
+
+@timed("assemble.timeframes")
+def assemble_timeframes(timeframe_dates, all_keys, tickers_map, close,
+                        existing_lookup=None, cpi_multipliers=None, historical_gold=None, workers=1):
+    """
+    Build the {timeframe: {columns, rows}} structure written to Data.json
+    (see assemble_data() and AssembledData.to_final_data()).
+    """
+    return assemble_data(timeframe_dates, all_keys, tickers_map, close, existing_lookup,
+                         cpi_multipliers, historical_gold, workers).to_final_data()
@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+
+from Assembly import rows_to_matrix
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DTYPE = np.dtype("<f4")
+
+
+def to_matrix(tf_data):
+    """
+    Converts one timeframe's {columns, rows} into (dates, value columns, float32 matrix).
+    null becomes NaN. The matrix is column-major: shape (len(columns), len(dates)).
+    """
+    dates, columns, values = rows_to_matrix(tf_data)
+    return dates, columns, np.ascontiguousarray(values.T, dtype=DTYPE)
+
+
+def write_binary(final_data, out_dir):
+    """
+    Writes Data.json content as a JSON manifest plus one Float32 file per timeframe.
+
+    Each <timeframe>.f32 file stores the timeframe column-major, so ticker i
+    occupies bytes [i * columnBytes, (i + 1) * columnBytes) and can be fetched
+    with a single HTTP range request and viewed as a Float32Array without copying.
+    """
+    return write_matrices({tf_label: rows_to_matrix(tf_data) for tf_label, tf_data in final_data.items()}, out_dir)
+
+
+def write_matrices(matrices, out_dir):
+    """
+    write_binary() for {timeframe: (dates, columns, date x column values)}
+    matrices (see JsonEncode.rounded_matrices()), NaN for null.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        "version": FORMAT_VERSION,
+        "dtype": "float32",
+        "byteOrder": "little",
+        "layout": "column-major",
+        "null": "NaN",
+        "columns": None,
+        "timeframes": {}
+    }
+
+    for tf_label, (dates, columns, values) in matrices.items():
+        matrix = np.ascontiguousarray(np.asarray(values).T, dtype=DTYPE)
+        if manifest["columns"] is None:
+            manifest["columns"] = columns
+        elif columns != manifest["columns"]:
+            raise ValueError(f"Timeframe {tf_label} has a different column set")
+
+        file_name = f"{tf_label}.f32"
+        with open(os.path.join(out_dir, file_name), "wb") as f:
+            f.write(matrix.tobytes())
+
+        manifest["timeframes"][tf_label] = {
+            "file": file_name,
+            "dates": dates,
+            "rows": len(dates),
+            "columnBytes": len(dates) * DTYPE.itemsize,
+            "byteLength": matrix.nbytes
+        }
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=None, separators=(',', ':'))
+    return manifest
+
+
+def read_manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST_NAME), "r") as f:
+        return json.load(f)
+
+
+def read_timeframe(out_dir, tf_label, columns=None, manifest=None):
+    """
+    Returns (dates, {column: float32 array}) for one timeframe.
+    The file is memory-mapped and each requested column is a view into it.
+    """
+    manifest = manifest or read_manifest(out_dir)
+    tf = manifest["timeframes"][tf_label]
+    all_columns = manifest["columns"]
+    if tf["rows"] == 0:
+        return tf["dates"], {c: np.empty(0, dtype=DTYPE) for c in (columns or all_columns)}
+
+    matrix = np.memmap(os.path.join(out_dir, tf["file"]), dtype=DTYPE, mode="r",
+                       shape=(len(all_columns), tf["rows"]))
+    wanted = columns or all_columns
+    index = {c: i for i, c in enumerate(all_columns)}
+    return tf["dates"], {c: matrix[index[c]] for c in wanted}
+
+
+def read_binary(out_dir):
+    """
+    Rebuilds the {timeframe: {columns, rows}} structure from the binary files (NaN -> None).
+    """
+    manifest = read_manifest(out_dir)
+    final_data = {}
+    for tf_label in manifest["timeframes"]:
+        dates, values = read_timeframe(out_dir, tf_label, manifest=manifest)
+        matrix = np.array([values[c] for c in manifest["columns"]], dtype=float).reshape(len(manifest["columns"]), len(dates)).T
+        cells = matrix.astype(object)
+        cells[np.isnan(matrix)] = None
+        final_data[tf_label] = {
+            "columns": ["Date"] + manifest["columns"],
+            "rows": [[d] + row for d, row in zip(dates, cells.tolist())]
+        }
+    return final_data
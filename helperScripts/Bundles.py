@@ -0,0 +1,205 @@
+"""
+Preview bundles: small JSON files cut from the assembled matrix so the site
+can paint before Data.json arrives.
+
+A bundle spec is a dict (DEFAULT_BUNDLES, or a JSON list passed with --bundles):
+
+    {"name": "crypto",                  output public/bundles/crypto.json
+     "path": "FastData.json",           or an explicit path under public/
+     "columns": ["Gold", {"type": "Crypto"}, {"movers": "3m", "count": 20}],
+     "reference": true,                 prepend Gold, Silver, Platinum, Inflation Adjusted $
+     "timeframes": ["Max", "1y"],       default: every timeframe
+     "perTimeframe": true,              one bundle per timeframe ("{tf}" in the name)
+     "points": 50,                      rows per timeframe, evenly spaced (default: all)
+     "budget": 8192}                    maximum bytes
+
+Column entries are labels, {"type": ...} (Universe entry types) or
+{"movers": timeframe, "count": n}: the n/2 best and n/2 worst total returns
+over that timeframe. Every bundle is cut from one rounded copy of the
+matrix with index arrays. A bundle over its budget is re-cut with half the
+points until it fits; when it cannot fit, BundleBudgetError is raised once
+the bundles are written (see check_budgets()).
+"""
+import json
+import os
+
+import numpy as np
+
+from Instrument import count, timed
+from JsonEncode import column_digits, column_types, dumps_timeframes, round_significant
+
+REFERENCE_COLUMNS = ["Gold", "Silver", "Platinum", "Inflation Adjusted $"]
+BUNDLES_DIR = "bundles"
+MANIFEST_NAME = "manifest.json"
+MIN_POINTS = 16
+
+DEFAULT_BUNDLES = [
+    # Default stock and timeframe of the chart, loaded before anything else
+    {"name": "fast", "path": "FastData.json", "columns": ["Gold", "SPY", "Inflation Adjusted $"],
+     "timeframes": ["Max"], "budget": 16 * 1024},
+    {"name": "first-paint-{tf}", "columns": ["SPY", "S&P 500 Index", "Bitcoin"], "reference": True,
+     "perTimeframe": True, "points": 60, "budget": 12 * 1024},
+    {"name": "metals", "columns": [{"type": "Metal"}], "reference": True, "budget": 96 * 1024},
+    {"name": "crypto", "columns": [{"type": "Crypto"}], "reference": True, "budget": 256 * 1024},
+    {"name": "etfs", "columns": [{"type": "ETF"}, {"type": "Index"}], "reference": True, "budget": 384 * 1024},
+    {"name": "movers", "columns": [{"movers": "3m", "count": 20}], "reference": True,
+     "timeframes": ["1y", "6m", "3m"], "budget": 96 * 1024}
+]
+
+
+class BundleBudgetError(RuntimeError):
+    pass
+
+
+def load_specs(path=None):
+    """
+    The bundle specs in `path` (a JSON list), or DEFAULT_BUNDLES.
+    """
+    if not path:
+        return DEFAULT_BUNDLES
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def expand_specs(specs, timeframes):
+    """
+    Resolves "perTimeframe" specs into one spec per timeframe.
+    """
+    expanded = []
+    for spec in specs:
+        if spec.get("perTimeframe"):
+            for tf in spec.get("timeframes") or timeframes:
+                expanded.append(dict(spec, name=spec["name"].format(tf=tf), timeframes=[tf], perTimeframe=False))
+        else:
+            expanded.append(spec)
+    return expanded
+
+
+def total_returns(assembled, tf_label):
+    """
+    Last / first valid value - 1 of every column over a timeframe's rows (NaN without two points).
+    """
+    values = assembled.values[assembled.timeframes[tf_label]]
+    valid = ~np.isnan(values)
+    has = valid.any(axis=0)
+    first = values[valid.argmax(axis=0), np.arange(values.shape[1])]
+    last = values[len(values) - 1 - valid[::-1].argmax(axis=0), np.arange(values.shape[1])] if len(values) else first
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(has & (first > 0), last / first - 1, np.nan)
+
+
+def select_columns(spec, assembled, types, returns_cache):
+    """
+    Column indices of a spec, in order and without duplicates; labels missing from the matrix are skipped.
+    """
+    position = {k: i for i, k in enumerate(assembled.keys)}
+    entries = (REFERENCE_COLUMNS if spec.get("reference") else []) + list(spec.get("columns", []))
+    picked = []
+    for entry in entries:
+        if isinstance(entry, str):
+            picked += [position[entry]] if entry in position else []
+        elif "type" in entry:
+            picked += [i for i, t in enumerate(types) if t == entry["type"]]
+        elif "movers" in entry:
+            tf = entry["movers"]
+            if tf not in assembled.timeframes:
+                continue
+            if tf not in returns_cache:
+                returns_cache[tf] = total_returns(assembled, tf)
+            returns = returns_cache[tf]
+            assets = np.flatnonzero(~np.isnan(returns) & np.isin(np.array(types), ["Metal", "CPI"], invert=True))
+            ranked = assets[np.argsort(-returns[assets], kind="stable")]
+            half = entry.get("count", 20) // 2
+            picked += ranked[:half].tolist() + ranked[max(half, len(ranked) - half):].tolist()
+    return list(dict.fromkeys(picked))
+
+
+def sample_rows(indices, points):
+    """
+    `points` evenly spaced entries of a timeframe's row indices, always keeping the first and last.
+    """
+    if not points or len(indices) <= points:
+        return list(indices)
+    return [indices[i] for i in np.linspace(0, len(indices) - 1, points).round().astype(int)]
+
+
+def cut_bundle(spec, assembled, rounded, columns, backend=None):
+    """
+    Encodes one bundle, halving its points until it fits its budget.
+    Returns (bytes, timeframes, points per timeframe, whether the points were reduced).
+    """
+    points = spec.get("points")
+    timeframes = [tf for tf in (spec.get("timeframes") or assembled.timeframes) if tf in assembled.timeframes]
+    keys = [assembled.keys[i] for i in columns]
+    block = rounded[:, columns]
+    budget = spec.get("budget")
+    reduced = False
+    while True:
+        rows = {tf: sample_rows(assembled.timeframes[tf], points) for tf in timeframes}
+        payload = dumps_timeframes(assembled.dates, keys, block, rows, backend)
+        longest = max((len(r) for r in rows.values()), default=0)
+        if not budget or len(payload) <= budget or longest <= MIN_POINTS:
+            return payload, timeframes, longest, reduced
+        points = max(MIN_POINTS, longest // 2)
+        reduced = True
+
+
+def over_budget(manifest):
+    """
+    The manifest entries of bundles larger than their budget.
+    """
+    return [entry for entry in manifest if entry["budget"] and entry["bytes"] > entry["budget"]]
+
+
+def check_budgets(manifest):
+    """
+    Raises BundleBudgetError when a bundle of a save_bundles() manifest does not fit its budget.
+    """
+    over = [f"{e['name']} ({e['bytes']:,} bytes, budget {e['budget']:,})" for e in over_budget(manifest)]
+    if over:
+        raise BundleBudgetError("Bundles over budget: " + ", ".join(over))
+
+
+@timed("export.bundles")
+def save_bundles(assembled, public_dir, specs=None, digits=None, universe=None, backend=None, check=True):
+    """
+    Writes every bundle and public/bundles/manifest.json (bytes, budget, columns,
+    timeframes and points per bundle). Returns the manifest entries.
+    With check=False a bundle over its budget is written and reported, and the
+    caller runs check_budgets() once its other outputs are written.
+    """
+    specs = expand_specs(specs or DEFAULT_BUNDLES, list(assembled.timeframes))
+    types = column_types(assembled.keys, universe)
+    rounded = round_significant(assembled.values, column_digits(assembled.keys, digits, universe))
+    returns_cache = {}
+    bundles_dir = os.path.join(public_dir, BUNDLES_DIR)
+    os.makedirs(bundles_dir, exist_ok=True)
+
+    manifest = []
+    for spec in specs:
+        columns = select_columns(spec, assembled, types, returns_cache)
+        payload, timeframes, points, reduced = cut_bundle(spec, assembled, rounded, columns, backend)
+        relative = spec.get("path") or f"{BUNDLES_DIR}/{spec['name']}.json"
+        path = os.path.join(public_dir, relative)
+        with open(path + ".tmp", "wb") as f:
+            f.write(payload)
+        os.replace(path + ".tmp", path)
+
+        budget = spec.get("budget")
+        entry = {"name": spec["name"], "path": relative, "bytes": len(payload), "budget": budget,
+                 "columns": len(columns), "timeframes": timeframes, "points": points, "reduced": reduced}
+        manifest.append(entry)
+        count(f"bytes.bundle.{spec['name']}", len(payload))
+
+    with open(os.path.join(bundles_dir, MANIFEST_NAME), "w") as f:
+        json.dump({"bundles": manifest}, f, indent=None, separators=(',', ':'))
+    for entry in manifest:
+        note = " (resolution reduced to fit)" if entry["reduced"] else ""
+        if entry in over_budget(manifest):
+            note = " (OVER BUDGET)"
+        print(f"  {entry['path']:<32} {entry['bytes']:>9,} bytes / {entry['budget'] or 0:>9,} "
+              f"{entry['columns']} columns x {entry['points']} points{note}")
+    if check:
+        check_budgets(manifest)
+    print(f"Successfully saved {len(manifest)} bundles to {bundles_dir}")
+    return manifest
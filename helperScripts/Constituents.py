@@ -0,0 +1,182 @@
+"""
+Constituent lists (S&P 500, ETFs, crypto, metals, indices) with effective dates.
+
+The lists are kept in cache/universe/constituents.json together with every
+change seen between runs:
+
+    {"version": 1, "updatedAt": ...,
+     "lists": {"SP500": {"source": ..., "members": {symbol: {label, name, type, since, until}}}, ...},
+     "history": [{"date", "list", "added": [...], "removed": [...]}, ...]}
+
+`since` is the date a symbol joined the list (the index's own "Date added"
+when the source has one, otherwise the first run that saw it); `until` is the
+run that no longer found it. Removed symbols stay in the file and in the
+price store, so they are neither refetched nor dropped; a symbol that comes
+back simply continues from its stored history.
+
+The S&P 500 source page is cached like the reference CSVs (see
+ReferenceSeries.ReferenceCache), so it is downloaded at most once a day.
+"""
+import json
+import os
+from datetime import datetime
+
+from Instrument import count, timed
+from ReferenceSeries import ReferenceCache
+from Universe import (WIKIPEDIA_HEADERS, WIKIPEDIA_SP500_URL, build_universe, parse_sp500_source,
+                      snapshot_sp500, static_groups)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_UNIVERSE_DIR = os.path.join(PROJECT_ROOT, "cache", "universe")
+STATE_NAME = "constituents.json"
+FORMAT_VERSION = 1
+
+SP500_LIST = "SP500"
+DEFAULT_TTL_HOURS = 24
+
+
+class UniverseManager:
+    """
+    Resolves the current constituent lists, diffs them against the previous
+    run and records the changes.
+
+    sp500_source is "snapshot" (the SP500_TICKERS list in Universe.py),
+    "wikipedia" (WIKIPEDIA_SP500_URL) or any URL serving the Wikipedia table
+    or a JSON list (see Universe.parse_sp500_source()).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_UNIVERSE_DIR, sp500_source="snapshot", offline=False,
+                 ttl_hours=DEFAULT_TTL_HOURS):
+        self.cache_dir = cache_dir
+        self.sp500_source = sp500_source
+        self.offline = offline
+        self.source_cache = ReferenceCache(cache_dir, ttl_hours=ttl_hours, offline=offline, suffix=".html")
+        self.state = self._load()
+        self.diff = None
+        self._order = {}
+
+    @property
+    def path(self):
+        return os.path.join(self.cache_dir, STATE_NAME)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {"version": FORMAT_VERSION, "updatedAt": None, "lists": {}, "history": []}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(self.path + ".tmp", self.path)
+
+    def members(self, name, include_removed=False):
+        """
+        {symbol: entry} of one list as of the last refresh().
+        """
+        members = self.state["lists"].get(name, {}).get("members", {})
+        return {s: m for s, m in members.items() if include_removed or m.get("until") is None}
+
+    def _sp500(self):
+        """
+        Returns (entries, source) for the S&P 500. When the source cannot be read
+        the previous run's members are kept, so a failed download never shows up
+        as the whole index being replaced by the snapshot.
+        """
+        if self.sp500_source == "snapshot":
+            return snapshot_sp500(), "snapshot"
+
+        url = WIKIPEDIA_SP500_URL if self.sp500_source == "wikipedia" else self.sp500_source
+        text = self.source_cache.get(SP500_LIST.lower(), url, headers=WIKIPEDIA_HEADERS)
+        if text is not None:
+            try:
+                entries = parse_sp500_source(text)
+                if entries:
+                    return entries, url
+            except Exception as e:
+                print(f"Error parsing the S&P 500 list from {url}: {e}")
+
+        previous = self.members(SP500_LIST)
+        if previous:
+            print("Keeping the previous S&P 500 constituents.")
+            return [{"symbol": s, "name": m["name"], "type": m["type"], "added": m.get("since")}
+                    for s, m in previous.items()], self.state["lists"][SP500_LIST].get("source")
+        return snapshot_sp500(), "snapshot"
+
+    def current_lists(self):
+        """
+        {list name: (entries in fetch order, source)}; entries are {label, symbol, name, type[, added]}.
+        """
+        lists = {group: (entries, "Universe.ASSETS") for group, entries in static_groups().items()}
+        sp500, source = self._sp500()
+        lists[SP500_LIST] = ([{"label": e["symbol"], **e} for e in sp500], source)
+        return lists
+
+    @timed("universe.refresh")
+    def refresh(self, today=None):
+        """
+        Updates every list and returns {list: {"added": [...], "removed": [...], "initial": bool}}
+        for the lists that changed since the previous run (all of them on the first run).
+        """
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        lists = self.current_lists()
+        diff = {}
+        for name, (entries, source) in lists.items():
+            state = self.state["lists"].get(name)
+            initial = state is None
+            members = {} if initial else state["members"]
+            current = {e["symbol"]: e for e in entries}
+
+            added = [s for s in current if s not in members or members[s].get("until") is not None]
+            removed = [s for s, m in members.items() if m.get("until") is None and s not in current]
+            for symbol in added:
+                entry = current[symbol]
+                members[symbol] = {"label": entry["label"], "name": entry["name"], "type": entry["type"],
+                                   "since": entry.get("added") or today, "until": None}
+            for symbol, entry in current.items():
+                # Names can improve (snapshot -> Wikipedia) without membership changing
+                members[symbol]["name"] = entry["name"]
+            for symbol in removed:
+                members[symbol]["until"] = today
+
+            self.state["lists"][name] = {"source": source, "members": members}
+            if added or removed:
+                diff[name] = {"added": added, "removed": removed, "initial": initial}
+                if not initial:
+                    self.state["history"].append({"date": today, "list": name, "added": added, "removed": removed})
+                    count("universe.added", len(added))
+                    count("universe.removed", len(removed))
+
+        self.state["updatedAt"] = datetime.now().isoformat(timespec="seconds")
+        self._save()
+        self.diff = diff
+        self._order = {name: [e["symbol"] for e in entries] for name, (entries, _) in lists.items()}
+        return diff
+
+    def universe(self):
+        """
+        The current universe, in the same order and shape as Universe.build_universe().
+        """
+        if self.diff is None:
+            self.refresh()
+        sp500 = [dict(self.members(SP500_LIST)[s], symbol=s) for s in self._order[SP500_LIST]]
+        return build_universe(sp500=sp500)
+
+    def added_symbols(self):
+        """
+        Symbols that joined a list in the last refresh() (not counting the first run).
+        """
+        return [s for change in (self.diff or {}).values() if not change["initial"] for s in change["added"]]
+
+    def summary(self):
+        lines = []
+        for name, change in (self.diff or {}).items():
+            if change["initial"]:
+                lines.append(f"{name}: {len(change['added'])} constituents recorded")
+                continue
+            for label, symbols in (("added", change["added"]), ("removed", change["removed"])):
+                if symbols:
+                    lines.append(f"{name}: {len(symbols)} {label} ({', '.join(symbols[:10])}"
+                                 f"{', ...' if len(symbols) > 10 else ''})")
+        return "\n".join(lines) or "Universe unchanged."
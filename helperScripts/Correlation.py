@@ -0,0 +1,241 @@
+"""
+Correlation and relative-strength screens across the universe, in metal terms.
+
+For every timeframe:
+
+  - the correlation of the log-returns of every pair of columns in a
+    denominator (Gold by default), over the timeframe's window of the daily
+    archive: every session, or the last session of each week or month when
+    the window has more than MAX_ROWS of them. Correlations are Pearson over
+    the sessions both columns have, computed in float32 for BLOCK columns at
+    a time against all the others (six matrix products per block), so memory
+    grows with N x BLOCK rather than N x N. Only the k most and least
+    correlated neighbours of each column are kept.
+  - the correlation of every column's USD log-returns with Gold's, i.e.
+    whether it moves with or against gold.
+  - a rolling relative-strength rank versus gold: at every row of the
+    timeframe, the percentile (0-100) of each column's log-return in Gold over
+    the previous `window` rows among every column with one.
+
+Written to public/correlations/:
+
+    manifest.json   columns, denominator, k, window, and per timeframe the
+                    dates of its rows, sampling and number of returns
+    <tf>.json       top-k neighbours: indices into columns and correlations
+    rs_<tf>.u8      relative-strength ranks, uint8 (row x column), 255 for none
+"""
+import json
+import os
+
+import numpy as np
+
+from Instrument import count, timed
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+NO_RANK = 255
+
+# Columns per block of the correlation matrix, and most rows per window
+BLOCK = 256
+MAX_ROWS = 1300
+DEFAULT_NEIGHBOURS = 10
+DEFAULT_WINDOW = 20
+# Fewer common returns than this and a pair has no correlation
+MIN_PERIODS = 20
+
+
+def window_sampling(n_sessions, max_rows=MAX_ROWS):
+    """
+    "daily" for windows of at most max_rows sessions, else "weekly", else "monthly".
+    """
+    if n_sessions <= max_rows:
+        return "daily"
+    if n_sessions / 5 <= max_rows:
+        return "weekly"
+    return "monthly"
+
+
+def log_returns(prices):
+    """
+    float32 log-returns between consecutive rows of a (row x column) price
+    matrix; NaN where either price is missing or not positive.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log(np.where(prices > 0, prices, np.nan)).astype(np.float32)
+    return np.diff(logs, axis=0)
+
+
+def pair_moments(returns):
+    """
+    Demeaned returns with NaN as 0, their squares and the 0/1 mask, as float32.
+    """
+    mask = ~np.isnan(returns)
+    with np.errstate(invalid="ignore"):
+        mean = np.nanmean(np.where(mask.any(axis=0), returns, 0), axis=0)
+    x = np.where(mask, returns - mean, 0).astype(np.float32)
+    return x, x * x, mask.astype(np.float32)
+
+
+def correlation_block(x, x2, mask, lo, hi, min_periods=MIN_PERIODS):
+    """
+    (hi - lo) x N pairwise-complete correlations of columns lo:hi with every
+    column, from pair_moments(). NaN below min_periods common returns or
+    when either column is flat over them.
+    """
+    xb, x2b, mb = x[:, lo:hi], x2[:, lo:hi], mask[:, lo:hi]
+    n = mb.T @ mask
+    sx, sy = xb.T @ mask, mb.T @ x
+    sxx, syy = x2b.T @ mask, mb.T @ x2
+    sxy = xb.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 0)] = np.nan
+    np.clip(corr, -1, 1, out=corr)
+    return corr, n
+
+
+def _top(values, k):
+    """
+    Columns of the k largest finite values of every row, sorted descending, padded with -1 / NaN.
+    """
+    k = min(k, values.shape[1])
+    filled = np.where(np.isfinite(values), values, -np.inf)
+    index = np.argpartition(-filled, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(filled, index, axis=1)
+    order = np.argsort(-top, axis=1, kind="stable")
+    index = np.take_along_axis(index, order, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    index[~np.isfinite(top)] = -1
+    top[~np.isfinite(top)] = np.nan
+    return index.astype(np.int32), top.astype(np.float32)
+
+
+@timed("correlation.neighbours")
+def top_neighbours(returns, k=DEFAULT_NEIGHBOURS, block=BLOCK, min_periods=MIN_PERIODS):
+    """
+    The k most and k least correlated other columns of every column of a
+    (row x column) log-return matrix. Returns (with_index, with_corr,
+    against_index, against_corr, observations): (column x k) arrays, -1 / NaN
+    where a column has fewer neighbours, and each column's number of returns.
+    """
+    x, x2, mask = pair_moments(returns)
+    n_cols = returns.shape[1]
+    k = min(k, max(n_cols - 1, 1))
+    with_index = np.full((n_cols, k), -1, dtype=np.int32)
+    against_index = np.full((n_cols, k), -1, dtype=np.int32)
+    with_corr = np.full((n_cols, k), np.nan, dtype=np.float32)
+    against_corr = np.full((n_cols, k), np.nan, dtype=np.float32)
+    for lo in range(0, n_cols, block):
+        hi = min(lo + block, n_cols)
+        corr, _ = correlation_block(x, x2, mask, lo, hi, min_periods)
+        corr[np.arange(hi - lo), np.arange(lo, hi)] = np.nan
+        with_index[lo:hi], with_corr[lo:hi] = _top(corr, k)
+        against_index[lo:hi], against = _top(-corr, k)
+        against_corr[lo:hi] = -against
+        count("correlation.pairs", (hi - lo) * n_cols)
+    return with_index, with_corr, against_index, against_corr, mask.sum(axis=0).astype(np.int64)
+
+
+def correlation_with(returns, column, min_periods=MIN_PERIODS):
+    """
+    Pairwise-complete correlation of every column of `returns` with one of them.
+    """
+    x, x2, mask = pair_moments(returns)
+    corr, _ = correlation_block(x, x2, mask, column, column + 1, min_periods)
+    return corr[0]
+
+
+def rs_ranks(prices, window=DEFAULT_WINDOW):
+    """
+    uint8 percentile (0-100) of every column's log-return over the previous
+    `window` rows among the columns with one, at every row of a (row x column)
+    price matrix in Gold; NO_RANK where a column has no such return.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log(np.where(prices > 0, prices, np.nan))
+    strength = np.full(logs.shape, np.nan)
+    if len(logs) > window:
+        strength[window:] = logs[window:] - logs[:-window]
+    valid = np.isfinite(strength)
+    # Missing values sort last, so the rank of a valid cell counts valid cells only
+    order = np.argsort(np.where(valid, strength, np.inf), axis=1, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(strength.shape[1])[None, :], axis=1)
+    n_valid = valid.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(n_valid > 1, np.round(100 * rank / (n_valid - 1)), 100)
+    return np.where(valid, pct, NO_RANK).astype(np.uint8)
+
+
+def _rounded(values, decimals=3):
+    cells = np.round(values.astype(float), decimals).astype(object)
+    cells[~np.isfinite(values)] = None
+    return cells.tolist()
+
+
+@timed("export.correlations")
+def save_correlations(archive, assembled, out_dir, denominator="Gold", k=DEFAULT_NEIGHBOURS,
+                      window=DEFAULT_WINDOW, max_rows=MAX_ROWS, block=BLOCK):
+    """
+    Writes the correlation neighbours and relative-strength ranks of every
+    timeframe of an AssembledData, with the returns read from the daily
+    PriceArchive it was queried from (see Archive). Returns the manifest.
+    """
+    from Denominators import denominate, parse_denominator
+    from Returns import NON_ASSET_COLUMNS
+
+    os.makedirs(out_dir, exist_ok=True)
+    parsed = parse_denominator(denominator)
+    columns = [c for c in archive.columns if c not in NON_ASSET_COLUMNS]
+    gold = columns.index("Gold") if "Gold" in columns else None
+    keys = list(assembled.keys)
+    tf_index = [keys.index(c) for c in columns]
+    manifest = {
+        "version": FORMAT_VERSION,
+        "columns": columns,
+        "denominator": parsed.name,
+        "neighbours": k,
+        "minPeriods": MIN_PERIODS,
+        "window": window,
+        "rsFormat": {"dtype": "uint8", "layout": "row-major", "null": NO_RANK},
+        "timeframes": {}
+    }
+
+    for tf_label in assembled.timeframes:
+        dates = assembled.timeframe_dates(tf_label)
+        if len(dates) < 2:
+            continue
+        sampling = window_sampling(len(archive.rows(dates[0], dates[-1])), max_rows)
+        _, all_columns, usd = archive.query(None, dates[0], dates[-1], sampling)
+        prices = denominate(usd, all_columns, [parsed])[0]
+        column_index = [all_columns.index(c) for c in columns]
+        returns = log_returns(prices[:, column_index])
+        with_index, with_corr, against_index, against_corr, observations = top_neighbours(returns, k, block)
+        entry = {
+            "with": with_index.tolist(),
+            "withCorr": _rounded(with_corr),
+            "against": against_index.tolist(),
+            "againstCorr": _rounded(against_corr),
+            "observations": observations.tolist()
+        }
+        if gold is not None:
+            entry["gold"] = _rounded(correlation_with(log_returns(usd[:, column_index]), gold))
+        file_name = f"{tf_label}.json"
+        with open(os.path.join(out_dir, file_name), "w") as f:
+            json.dump(entry, f, indent=None, separators=(',', ':'))
+
+        tf_prices = assembled.values[np.ix_(assembled.timeframes[tf_label], tf_index)]
+        ranks = rs_ranks(denominate(tf_prices, columns, ["Gold"])[0], window)
+        rs_name = f"rs_{tf_label}.u8"
+        with open(os.path.join(out_dir, rs_name), "wb") as f:
+            f.write(ranks.tobytes())
+
+        manifest["timeframes"][tf_label] = {"file": file_name, "rsFile": rs_name, "sampling": sampling,
+                                            "returns": len(returns), "dates": dates}
+        count("correlation.timeframes")
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=None, separators=(',', ':'))
+    return manifest
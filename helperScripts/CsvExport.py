@@ -0,0 +1,117 @@
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+
+from Instrument import count
+
+GOLD_TICKER = 'GC=F'
+
+# Dates written per chunk; bounds the size of the long-format frame in memory
+CHUNK_DATES = 256
+
+CSV_COLUMNS = ['Date', 'Ticker', 'PriceGold', 'PriceUSD']
+
+
+def weekly_close(daily_close):
+    """
+    Resamples a daily date x symbol Close matrix to weekly bars labelled by
+    their Monday (the same labels yfinance uses for interval="1wk").
+    """
+    daily_close = daily_close.copy()
+    daily_close.index = pd.DatetimeIndex(daily_close.index)
+    return daily_close.resample("W-MON", label="left", closed="left").last().dropna(how="all")
+
+
+def combine_close(weekly_close, daily_close):
+    """
+    Appends the latest daily row when it is newer than the last weekly bar.
+    """
+    if not daily_close.empty:
+        last_weekly_date = weekly_close.index[-1].date()
+        last_daily_date = daily_close.index[-1].date()
+
+        if last_daily_date > last_weekly_date:
+            return pd.concat([weekly_close, daily_close])
+    return weekly_close
+
+
+def iter_long_chunks(combined_close, gold_ticker=GOLD_TICKER, chunk_dates=CHUNK_DATES):
+    """
+    Yields long-format (Date, Ticker, PriceGold, PriceUSD) frames, `chunk_dates`
+    dates at a time, ordered by Date then Ticker and without rows where the
+    gold price is missing.
+
+    The gold ratio is computed on the wide matrix one chunk at a time, so the
+    only full-size array is the wide USD matrix itself.
+    """
+    combined_close = combined_close.sort_index()
+    tickers = np.array(sorted(combined_close.columns), dtype=object)
+    usd_all = combined_close[list(tickers)].to_numpy(dtype=float)
+    gold_all = combined_close[gold_ticker].to_numpy(dtype=float)
+    dates = combined_close.index
+
+    for start in range(0, len(dates), chunk_dates):
+        usd = usd_all[start:start + chunk_dates]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = usd / gold_all[start:start + chunk_dates, None]
+        row_idx, col_idx = np.nonzero(~np.isnan(ratio))
+        yield pd.DataFrame({
+            'Date': dates[start:start + chunk_dates][row_idx],
+            'Ticker': tickers[col_idx],
+            'PriceGold': ratio[row_idx, col_idx],
+            'PriceUSD': usd[row_idx, col_idx]
+        })
+
+
+def _write_parquet(chunks, output_file):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Parquet output needs pyarrow (pip install pyarrow).")
+        return False
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_file, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return True
+
+
+def process_and_save_csv(weekly_close, daily_close, output_file, gold_ticker=GOLD_TICKER, chunk_dates=CHUNK_DATES):
+    """
+    Calculates price in Gold and streams the long-format rows to `output_file`.
+    A ".gz" suffix writes gzip-compressed CSV, ".parquet" writes Parquet (needs pyarrow).
+    """
+    combined_close = combine_close(weekly_close, daily_close)
+
+    # Ensure Gold price is available
+    if gold_ticker not in combined_close.columns:
+        print("Gold price not found!")
+        return
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    chunks = iter_long_chunks(combined_close, gold_ticker, chunk_dates)
+
+    if output_file.endswith(".parquet"):
+        if not _write_parquet(chunks, output_file):
+            return
+    else:
+        opener = gzip.open if output_file.endswith(".gz") else open
+        with opener(output_file, "wt", newline="") as f:
+            header = True
+            for chunk in chunks:
+                chunk.to_csv(f, index=False, header=header)
+                header = False
+            if header:
+                f.write(",".join(CSV_COLUMNS) + "\n")
+    count(f"bytes.{os.path.basename(output_file)}", os.path.getsize(output_file))
+    print(f"Data saved to {output_file}")
@@ -0,0 +1,388 @@
+"""
+Small asyncio HTTP server for the pipeline outputs in public/.
+
+    python helperScripts/DataServer.py [--public-dir public] [--host 127.0.0.1] [--port 8000]
+
+Endpoints:
+
+    GET /series?tickers=AAPL,Gold&tf=5y   only the requested columns, in the Data.json
+                                          shape ({tf: {columns, rows}}); `tf` may list
+                                          several timeframes or be left out for all of them
+    GET /tickers                          tickers.json
+    GET /health                           timeframes, columns and when the data was loaded
+    GET /<path>                           any file under public/ (Data.json, columnar/1y.f32, ...)
+
+Data.json (or the published snapshots, see Publish) is loaded once at startup
+into a columnar index: for every timeframe, each column is kept as its list of
+already JSON-encoded cells, so a /series response is only string joins.
+Static files are compressed once at startup (gzip, plus brotli when the
+`brotli` package is installed); /series bodies are compressed on first use and
+kept in an LRU. Every response has an ETag and Cache-Control, If-None-Match
+answers 304, and static files honour single byte-range requests.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from collections import OrderedDict
+from datetime import datetime
+from email.utils import formatdate
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from JsonEncode import load_json
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLIC_DIR = os.path.join(PROJECT_ROOT, "public")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+MAX_AGE = 300
+SERIES_CACHE_SIZE = 256
+# Below this size compression costs more than it saves
+MIN_COMPRESS_BYTES = 512
+
+REASONS = {200: "OK", 206: "Partial Content", 304: "Not Modified", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed", 416: "Range Not Satisfiable"}
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class Payload:
+    """
+    A response body with its ETag and lazily built compressed variants.
+    """
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self._variants = {}
+
+    def variant(self, encoding):
+        """
+        Returns (body, etag) for "br", "gzip" or "identity".
+        """
+        if encoding == "identity":
+            return self.body, self.etag
+        if encoding not in self._variants:
+            if encoding == "br":
+                data = _brotli().compress(self.body, quality=9)
+            else:
+                data = gzip.compress(self.body, compresslevel=6, mtime=0)
+            self._variants[encoding] = data
+        return self._variants[encoding], self.etag[:-1] + "-" + encoding + '"'
+
+    def precompress(self, encodings):
+        for encoding in encodings:
+            if encoding != "identity":
+                self.variant(encoding)
+
+
+class SeriesIndex:
+    """
+    Columnar, pre-encoded view of Data.json for per-ticker queries.
+    """
+
+    def __init__(self, final_data, aliases=None):
+        self.timeframes = {}
+        for tf, tf_data in final_data.items():
+            rows = tf_data["rows"]
+            columns = tf_data["columns"]
+            encoded = {}
+            for i, label in enumerate(columns):
+                cells = [row[i] for row in rows]
+                # Numbers, null and dates never contain a comma, so one dumps() + split() encodes every cell
+                encoded[label] = json.dumps(cells, separators=(',', ':'))[1:-1].split(",") if cells else []
+            self.timeframes[tf] = (encoded.pop("Date"), encoded)
+        self.labels = list(next(iter(self.timeframes.values()))[1]) if self.timeframes else []
+        self.aliases = {alias: label for alias, label in (aliases or {}).items() if label in self.labels}
+
+    def resolve(self, tickers):
+        """
+        Maps requested tickers (labels, or provider symbols such as GC=F) to column labels.
+        Returns (labels, unknown).
+        """
+        labels, unknown = [], []
+        for ticker in tickers:
+            label = ticker if ticker in self.labels else self.aliases.get(ticker)
+            if label is None:
+                unknown.append(ticker)
+            elif label not in labels:
+                labels.append(label)
+        return labels, unknown
+
+    def query(self, labels, timeframes):
+        """
+        JSON bytes of {tf: {columns, rows}} restricted to `labels`.
+        """
+        parts = []
+        columns = json.dumps(["Date"] + labels, separators=(',', ':'))
+        for tf in timeframes:
+            dates, encoded = self.timeframes[tf]
+            cols = [encoded[label] for label in labels]
+            rows = ",".join("[" + ",".join([d] + [c[i] for c in cols]) + "]" for i, d in enumerate(dates))
+            parts.append(f'{json.dumps(tf)}:{{"columns":{columns},"rows":[{rows}]}}')
+        return ("{" + ",".join(parts) + "}").encode()
+
+
+def load_final_data(public_dir):
+    """
+    Data.json, or its reconstruction from public/snapshots/ when only the delta files are published.
+    """
+    path = os.path.join(public_dir, "Data.json")
+    if os.path.exists(path):
+        return load_json(path)
+    from Publish import load_published
+    return load_published(os.path.join(public_dir, "snapshots"))
+
+
+def parse_range(header, size):
+    """
+    Parses a single "bytes=start-end" range. Returns (start, end_exclusive), None when
+    the header should be ignored, or False when it cannot be satisfied.
+    """
+    if not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(0, size - length), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        return False
+    return start, min(end, size)
+
+
+class DataServer:
+    """
+    Request handling for the endpoints above; serve() runs it on an asyncio server.
+    handle() is a plain function of the request, so it can be exercised without sockets.
+    """
+
+    def __init__(self, public_dir=PUBLIC_DIR, max_age=MAX_AGE, cache_size=SERIES_CACHE_SIZE):
+        self.public_dir = os.path.abspath(public_dir)
+        self.max_age = max_age
+        self.cache_size = cache_size
+        self.encodings = (["br"] if _brotli() else []) + ["gzip"]
+        self._series = OrderedDict()
+        self._static = {}
+        self.requests = 0
+        self.load()
+
+    def load(self):
+        """
+        (Re)loads the columnar index and precompresses the public files.
+        """
+        aliases = {}
+        tickers_path = os.path.join(self.public_dir, "tickers.json")
+        if os.path.exists(tickers_path):
+            with open(tickers_path, "r") as f:
+                # tickers.json is [{symbol, name}] with the Data.json column as "name"
+                aliases = {t["symbol"]: t["name"] for t in json.load(f)}
+        self.index = SeriesIndex(load_final_data(self.public_dir), aliases)
+        self._series.clear()
+        self._static.clear()
+        for root, _, files in os.walk(self.public_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.public_dir).replace(os.sep, "/")
+                self._static[rel] = self._load_static(path)
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        print(f"Loaded {len(self.index.timeframes)} timeframes x {len(self.index.labels)} columns "
+              f"and {len(self._static)} files from {self.public_dir}")
+
+    def _load_static(self, path):
+        with open(path, "rb") as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        payload = Payload(body, content_type)
+        if len(body) >= MIN_COMPRESS_BYTES:
+            payload.precompress(self.encodings)
+        return payload
+
+    def _negotiate(self, accept_encoding, payload):
+        if len(payload.body) < MIN_COMPRESS_BYTES:
+            return "identity"
+        offered = set()
+        for token in accept_encoding.split(","):
+            name, _, params = token.strip().partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                offered.add(name.strip().lower())
+        for encoding in self.encodings:
+            if encoding in offered or "*" in offered:
+                return encoding
+        return "identity"
+
+    def _series_payload(self, params):
+        tickers = [t.strip() for value in params.get("tickers", []) for t in value.split(",") if t.strip()]
+        timeframes = [t.strip() for value in params.get("tf", []) for t in value.split(",") if t.strip()]
+        if not tickers:
+            return self._error(400, "tickers is required, e.g. /series?tickers=AAPL,Gold&tf=5y")
+        timeframes = list(dict.fromkeys(timeframes)) or list(self.index.timeframes)
+        unknown_tf = [tf for tf in timeframes if tf not in self.index.timeframes]
+        if unknown_tf:
+            return self._error(400, f"Unknown timeframes: {', '.join(unknown_tf)}")
+        labels, unknown = self.index.resolve(tickers)
+        if unknown:
+            return self._error(404, f"Unknown tickers: {', '.join(unknown)}")
+
+        key = (tuple(timeframes), tuple(labels))
+        payload = self._series.get(key)
+        if payload is None:
+            payload = Payload(self.index.query(labels, timeframes), "application/json")
+            self._series[key] = payload
+            while len(self._series) > self.cache_size:
+                self._series.popitem(last=False)
+        else:
+            self._series.move_to_end(key)
+        return 200, payload
+
+    def _error(self, status, message):
+        return status, Payload(json.dumps({"error": message}).encode(), "application/json")
+
+    def _health(self):
+        body = {"status": "ok", "loadedAt": self.loaded_at, "timeframes": list(self.index.timeframes),
+                "columns": len(self.index.labels), "files": len(self._static), "encodings": self.encodings,
+                "requests": self.requests}
+        return 200, Payload(json.dumps(body).encode(), "application/json")
+
+    def handle(self, method, target, headers):
+        """
+        Returns (status, [(header, value)], body) for one request. `headers` has lower-case names.
+        """
+        self.requests += 1
+        if method not in ("GET", "HEAD"):
+            status, payload = self._error(405, f"{method} not allowed")
+            return self._respond(status, payload, "identity", headers, method, extra=[("Allow", "GET, HEAD")])
+
+        url = urlsplit(target)
+        path = unquote(url.path).lstrip("/")
+        static = False
+        if path == "series":
+            status, payload = self._series_payload(parse_qs(url.query))
+        elif path == "health":
+            status, payload = self._health()
+        elif path in ("tickers", "tickers.json") and "tickers.json" in self._static:
+            status, payload, static = 200, self._static["tickers.json"], True
+        elif path in self._static:
+            status, payload, static = 200, self._static[path], True
+        else:
+            status, payload = self._error(404, f"Not found: /{path}")
+
+        if status != 200:
+            return self._respond(status, payload, "identity", headers, method)
+
+        range_header = headers.get("range")
+        if static and range_header:
+            span = parse_range(range_header, len(payload.body))
+            if span is False:
+                return self._respond(416, Payload(b"", payload.content_type), "identity", headers, method,
+                                     extra=[("Content-Range", f"bytes */{len(payload.body)}")])
+            if span is not None:
+                if_range = headers.get("if-range")
+                if if_range is None or if_range == payload.etag:
+                    return self._respond_range(payload, span, method)
+
+        encoding = self._negotiate(headers.get("accept-encoding", ""), payload)
+        return self._respond(200, payload, encoding, headers, method,
+                             extra=[("Accept-Ranges", "bytes")] if static else [])
+
+    def _cache_headers(self, etag):
+        return [("ETag", etag), ("Cache-Control", f"public, max-age={self.max_age}"), ("Vary", "Accept-Encoding")]
+
+    def _respond(self, status, payload, encoding, headers, method, extra=()):
+        body, etag = payload.variant(encoding)
+        if status == 200:
+            if_none_match = headers.get("if-none-match")
+            if if_none_match and (if_none_match.strip() == "*" or
+                                  {payload.etag, etag} & {t.strip() for t in if_none_match.split(",")}):
+                return 304, self._cache_headers(etag), b""
+        response = [("Content-Type", payload.content_type), ("Content-Length", str(len(body)))]
+        if status == 200:
+            response += self._cache_headers(etag)
+        if encoding != "identity":
+            response.append(("Content-Encoding", encoding))
+        response += list(extra)
+        return status, response, b"" if method == "HEAD" else body
+
+    def _respond_range(self, payload, span, method):
+        start, end = span
+        body = payload.body[start:end]
+        response = [("Content-Type", payload.content_type), ("Content-Length", str(len(body))),
+                    ("Content-Range", f"bytes {start}-{end - 1}/{len(payload.body)}"),
+                    ("Accept-Ranges", "bytes")] + self._cache_headers(payload.etag)
+        return 206, response, b"" if method == "HEAD" else body
+
+    async def _client(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                if headers.get("content-length"):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                status, response, body = self.handle(method, target, headers)
+                keep_alive = version.strip() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                out = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Date: {formatdate(usegmt=True)}"]
+                out += [f"{name}: {value}" for name, value in response]
+                if status == 304:
+                    out.append("Content-Length: 0")
+                out.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+                writer.write(("\r\n".join(out) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self._client, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving {self.public_dir} on http://{address[0]}:{address[1]}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the pipeline outputs over HTTP.")
+    parser.add_argument("--public-dir", default=PUBLIC_DIR, help="Folder to serve (default: public/)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    parser.add_argument("--max-age", type=int, default=MAX_AGE, help="Cache-Control max-age in seconds")
+    args = parser.parse_args(argv)
+
+    server = DataServer(args.public_dir, max_age=args.max_age)
+    if "br" not in server.encodings:
+        print("brotli not installed (pip install brotli), serving gzip only.")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
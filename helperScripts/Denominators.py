@@ -0,0 +1,243 @@
+"""
+Prices expressed in any denominator, derived from the USD matrices on demand.
+
+A denominator spec is either a string or a dict:
+
+    "USD"                    the USD prices as they are
+    "Gold", "Bitcoin", ...   any column: price / column
+    "Inflation Adjusted $"   price * CPI multiplier (today's dollars)
+    {"name": "Metals Basket", "components": {"Gold": 1, "Silver": 50, "Platinum": 1}}
+                             price / (1 oz gold + 50 oz silver + 1 oz platinum)
+    {"name": "Real Gold", "components": {"Gold": 1}, "deflate": True}
+                             price / (gold in today's dollars)
+
+These follow the chart's conventions, so "Gold" here matches the frontend.
+"""
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from Assembly import rows_to_matrix
+from Instrument import count
+
+USD = "USD"
+CPI_COLUMN = "Inflation Adjusted $"
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DTYPE = np.dtype("<f4")
+
+# Named specs that can be referred to by name
+PRESETS = {
+    "Real Gold": {"components": {"Gold": 1}, "deflate": True},
+    "Metals Basket": {"components": {"Gold": 1, "Silver": 50, "Platinum": 1}}
+}
+
+
+class Denominator:
+    """
+    A parsed denominator spec. `components` maps column labels to weights (units
+    held); with deflate=True the basket is valued in today's dollars.
+    """
+
+    def __init__(self, name, components=None, deflate=False):
+        self.name = name
+        self.components = dict(components or {})
+        self.deflate = deflate
+
+    def __repr__(self):
+        return f"Denominator({self.name!r})"
+
+    @property
+    def key(self):
+        """
+        What the denominator computes, whatever its name: the weighted
+        components and deflate flag (the name for USD and CPI).
+        """
+        if not self.components:
+            return (self.name,)
+        return tuple(sorted(self.components.items())), self.deflate
+
+    def reference(self, values, index):
+        """
+        Returns (reference series over the dates, "div" or "mul"), or (None, None) for USD.
+        Any missing component, or a non-positive basket value, gives NaN on that date.
+        """
+        n_dates = values.shape[0]
+        if self.name == USD and not self.components:
+            return None, None
+
+        if self.name == CPI_COLUMN and not self.components:
+            ref = values[:, index[CPI_COLUMN]] if CPI_COLUMN in index else np.full(n_dates, np.nan)
+            return np.where(ref > 0, ref, np.nan), "mul"
+
+        if any(label not in index for label in self.components):
+            return np.full(n_dates, np.nan), "div"
+        ref = None
+        for label, weight in self.components.items():
+            part = weight * values[:, index[label]]
+            ref = part if ref is None else ref + part
+        if self.deflate:
+            cpi = values[:, index[CPI_COLUMN]] if CPI_COLUMN in index else np.nan
+            ref = ref * np.where(cpi > 0, cpi, np.nan)
+        return np.where(ref > 0, ref, np.nan), "div"
+
+
+def parse_denominator(spec):
+    """
+    Turns a spec (see module docstring), a preset name or a Denominator into a Denominator.
+    """
+    if isinstance(spec, Denominator):
+        return spec
+    if isinstance(spec, str):
+        if spec in PRESETS:
+            return parse_denominator(dict(PRESETS[spec], name=spec))
+        if spec in (USD, CPI_COLUMN):
+            return Denominator(spec)
+        return Denominator(spec, {spec: 1})
+    if isinstance(spec, dict):
+        components = spec.get("components")
+        if not components:
+            raise ValueError(f"Denominator spec needs components: {spec}")
+        name = spec.get("name") or " + ".join(components)
+        return Denominator(name, components, deflate=spec.get("deflate", False))
+    raise TypeError(f"Unsupported denominator spec: {spec!r}")
+
+
+def denominate(values, columns, denominators):
+    """
+    Returns a (denominator, date, column) tensor of `values` (date x column, USD)
+    expressed in each denominator. Each slice is written in place into the
+    preallocated tensor, without intermediate (date x column) temporaries.
+    """
+    index = {c: i for i, c in enumerate(columns)}
+    parsed = [parse_denominator(d) for d in denominators]
+    out = np.empty((len(parsed),) + values.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for d, denominator in enumerate(parsed):
+            ref, op = denominator.reference(values, index)
+            if op is None:
+                out[d] = values
+            elif op == "mul":
+                np.multiply(values, ref[:, None], out=out[d])
+            else:
+                np.divide(values, ref[:, None], out=out[d])
+    return out
+
+
+class DenominatorEngine:
+    """
+    Lazily computed ratio matrices for every (denominator, timeframe) pair.
+
+    `matrices` is {timeframe: (dates, columns, values)} with USD prices (see
+    from_final_data()). Results are kept in an LRU cache of `max_cached`
+    matrices; batch() computes several denominators in one pass per timeframe.
+    """
+
+    def __init__(self, matrices, max_cached=32):
+        self.matrices = matrices
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_final_data(cls, final_data, max_cached=32):
+        return cls({tf: rows_to_matrix(tf_data) for tf, tf_data in final_data.items()}, max_cached=max_cached)
+
+    @property
+    def timeframes(self):
+        return list(self.matrices)
+
+    def columns(self, timeframe):
+        return self.matrices[timeframe][1]
+
+    def dates(self, timeframe):
+        return self.matrices[timeframe][0]
+
+    def _remember(self, key, matrix):
+        self._cache[key] = matrix
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def ratio(self, denominator, timeframe):
+        """
+        Returns the (date x column) matrix of `timeframe` expressed in `denominator`.
+        """
+        denominator = parse_denominator(denominator)
+        key = (denominator.key, timeframe)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            count("denominator.hit")
+            return cached
+
+        self.misses += 1
+        count("denominator.miss")
+        dates, columns, values = self.matrices[timeframe]
+        matrix = denominate(values, columns, [denominator])[0]
+        self._remember(key, matrix)
+        return matrix
+
+    def batch(self, denominators, timeframes=None):
+        """
+        Returns {timeframe: (denominator, date, column) tensor} for several
+        denominators at once; the per-denominator slices are also cached.
+        """
+        parsed = [parse_denominator(d) for d in denominators]
+        result = {}
+        for tf in timeframes or self.timeframes:
+            dates, columns, values = self.matrices[tf]
+            tensor = denominate(values, columns, parsed)
+            for denominator, matrix in zip(parsed, tensor):
+                self._remember((denominator.key, tf), matrix)
+            result[tf] = tensor
+        return result
+
+    def export(self, denominators, out_dir, timeframes=None):
+        """
+        Writes every denominator for every timeframe as Float32 files plus a manifest.
+
+        <timeframe>.f32 holds a (denominator, column, date) block, so the series of
+        column c in denominator d starts at byte
+        (d * len(columns) + c) * columnBytes, like the columnar copy of Data.json.
+        """
+        parsed = [parse_denominator(d) for d in denominators]
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = {
+            "version": FORMAT_VERSION,
+            "dtype": "float32",
+            "byteOrder": "little",
+            "layout": "denominator-column-major",
+            "null": "NaN",
+            "denominators": [d.name for d in parsed],
+            "columns": None,
+            "timeframes": {}
+        }
+        for tf in timeframes or self.timeframes:
+            tensor = self.batch(parsed, [tf])[tf]
+            dates, columns, _ = self.matrices[tf]
+            if manifest["columns"] is None:
+                manifest["columns"] = columns
+            elif columns != manifest["columns"]:
+                raise ValueError(f"Timeframe {tf} has a different column set")
+
+            block = np.ascontiguousarray(tensor.transpose(0, 2, 1), dtype=DTYPE)
+            file_name = f"{tf}.f32"
+            with open(os.path.join(out_dir, file_name), "wb") as f:
+                f.write(block.tobytes())
+            manifest["timeframes"][tf] = {
+                "file": file_name,
+                "dates": dates,
+                "rows": len(dates),
+                "columnBytes": len(dates) * DTYPE.itemsize,
+                "byteLength": block.nbytes
+            }
+
+        with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=None, separators=(',', ':'))
+        return manifest
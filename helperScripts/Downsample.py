@@ -0,0 +1,266 @@
+"""
+Adaptive downsampling of full daily series, per column.
+
+Both methods work on a (date x column) matrix and return a boolean mask of
+the same shape marking the points kept for each column, so every column is
+processed in the same numpy operations:
+
+    minmax_mask()  keeps the lowest and highest point of every bucket, so
+                   peaks and crashes survive and drawdowns are exact unless
+                   the peak and the trough fall in the same bucket.
+    lttb_mask()    Largest-Triangle-Three-Buckets: one point per bucket,
+                   chosen to preserve the visual shape of the line.
+
+Leading/trailing NaNs (IPOs, delistings) are skipped and each column always
+keeps its first and last valid point.
+"""
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+VALUE_DTYPE = np.dtype("<f4")
+INDEX_DTYPE = np.dtype("<u4")
+
+PYRAMID_LEVELS = (100, 400, 1600)
+METHODS = ("minmax", "lttb")
+
+
+def _endpoints(valid):
+    """
+    First and last valid row per column (0 / -1 for all-NaN columns), plus which columns have data.
+    """
+    has = valid.any(axis=0)
+    first = np.argmax(valid, axis=0)
+    last = valid.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    return first, last, has
+
+
+def _keep_endpoints(mask, valid):
+    first, last, has = _endpoints(valid)
+    cols = np.flatnonzero(has)
+    mask[first[cols], cols] = True
+    mask[last[cols], cols] = True
+    return mask
+
+
+def minmax_mask(values, n_points):
+    """
+    Keeps the min and the max of each column in n_points // 2 equal buckets of dates.
+    """
+    n_dates, n_cols = values.shape
+    valid = ~np.isnan(values)
+    if n_dates <= n_points:
+        return valid.copy()
+
+    n_buckets = max(1, (n_points - 2) // 2)
+    size = -(-n_dates // n_buckets)
+    padded = np.full((n_buckets * size, n_cols), np.nan)
+    padded[:n_dates] = values
+    buckets = padded.reshape(n_buckets, size, n_cols)
+
+    offsets = np.arange(n_buckets)[:, None] * size
+    cols = np.broadcast_to(np.arange(n_cols), (n_buckets, n_cols))
+    mask = np.zeros((n_dates, n_cols), dtype=bool)
+    for filled, pick in ((np.inf, np.argmin), (-np.inf, np.argmax)):
+        rows = offsets + pick(np.where(np.isnan(buckets), filled, buckets), axis=1)
+        # A bucket with no valid value for a column picks padding or NaN; drop those
+        ok = rows < n_dates
+        ok[ok] = valid[rows[ok], cols[ok]]
+        mask[rows[ok], cols[ok]] = True
+    return _keep_endpoints(mask, valid)
+
+
+def lttb_mask(values, n_points):
+    """
+    Largest-Triangle-Three-Buckets, run for every column at once.
+
+    The buckets are walked in order (each choice depends on the previous one);
+    every step handles all columns together. Dates are evenly spaced sessions,
+    so x is the row number.
+    """
+    n_dates, n_cols = values.shape
+    valid = ~np.isnan(values)
+    if n_dates <= n_points:
+        return valid.copy()
+
+    first, last, has = _endpoints(valid)
+    cols = np.arange(n_cols)
+    mask = np.zeros((n_dates, n_cols), dtype=bool)
+    zeroed = np.where(valid, values, 0.0)
+
+    n_buckets = n_points - 2
+    edges = np.linspace(1, n_dates - 1, n_buckets + 1).astype(int)
+    a_x = first.astype(float)
+    a_y = values[first, cols]
+
+    for b in range(n_buckets):
+        lo, hi = edges[b], edges[b + 1]
+        if hi <= lo:
+            continue
+        # Third vertex: average of the next bucket (the last point for the final bucket)
+        if b + 2 <= n_buckets:
+            nlo, nhi = edges[b + 1], edges[b + 2]
+            n_valid = valid[nlo:nhi].sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                c_y = zeroed[nlo:nhi].sum(axis=0) / n_valid
+            c_x = (nlo + nhi - 1) / 2.0
+        else:
+            c_y = values[last, cols]
+            c_x = float(n_dates - 1)
+        c_y = np.where(np.isnan(c_y), a_y, c_y)
+
+        xs = np.arange(lo, hi, dtype=float)[:, None]
+        area = np.abs((a_x - c_x) * (values[lo:hi] - a_y) - (a_x - xs) * (c_y - a_y))
+        area = np.where(valid[lo:hi], area, -1.0)
+        pick = np.argmax(area, axis=0)
+        ok = area[pick, cols] >= 0
+        rows = lo + pick
+        mask[rows[ok], cols[ok]] = True
+        a_x = np.where(ok, rows, a_x)
+        a_y = np.where(ok, values[rows, cols], a_y)
+        # Columns that have not started yet keep their first valid point as the anchor
+        a_y = np.where(np.isnan(a_y), values[first, cols], a_y)
+
+    mask[:, ~has] = False
+    return _keep_endpoints(mask, valid)
+
+
+def downsample_mask(values, n_points, method="minmax"):
+    if method == "lttb":
+        return lttb_mask(values, n_points)
+    if method == "minmax":
+        return minmax_mask(values, n_points)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+
+def _max_drawdown(points):
+    peak = np.fmax.accumulate(points)
+    return np.min(points / peak - 1) if points.size else np.nan
+
+
+def reconstruction_error(values, mask):
+    """
+    Compares each column rebuilt from its kept points (linear interpolation)
+    with the raw series. Returns per-column arrays:
+    {"maxRelError", "meanRelError", "drawdownError"} where drawdownError is the
+    absolute difference in max drawdown (0.25 = 25 percentage points).
+    """
+    n_dates, n_cols = values.shape
+    result = {name: np.full(n_cols, np.nan) for name in ("maxRelError", "meanRelError", "drawdownError")}
+    rows = np.arange(n_dates)
+    for c in range(n_cols):
+        valid = ~np.isnan(values[:, c])
+        kept = mask[:, c] & valid
+        if not kept.any():
+            continue
+        raw = values[valid, c]
+        rebuilt = np.interp(rows[valid], rows[kept], values[kept, c])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rel = np.abs(rebuilt - raw) / np.abs(raw)
+        result["maxRelError"][c] = np.nanmax(rel)
+        result["meanRelError"][c] = np.nanmean(rel)
+        result["drawdownError"][c] = abs(_max_drawdown(raw) - _max_drawdown(values[kept, c]))
+    return result
+
+
+def build_pyramid(values, windows, levels=PYRAMID_LEVELS, method="minmax", select_on=None):
+    """
+    Downsamples every window of a full daily (date x column) matrix at each level.
+
+    `windows` is {timeframe: (start_row, end_row)}. `select_on` optionally lists
+    extra (date x column) matrices (e.g. the same prices in gold) whose kept
+    points are added to each column's selection, so the series stays faithful
+    in those denominators too.
+    Returns {timeframe: {level: mask}} with masks covering the window's rows.
+    Levels above the first one that already holds every row are left out.
+    """
+    pyramid = {}
+    for tf, (start, end) in windows.items():
+        variants = [values[start:end]] + [m[start:end] for m in (select_on or [])]
+        pyramid[tf] = {}
+        for level in sorted(levels):
+            mask = downsample_mask(variants[0], level, method)
+            for variant in variants[1:]:
+                mask |= downsample_mask(variant, level, method)
+            pyramid[tf][level] = mask
+            if end - start <= level:
+                break
+    return pyramid
+
+
+def write_pyramid(values, dates, columns, pyramid, windows, out_dir, method="minmax",
+                  reference_columns=()):
+    """
+    Writes the pyramid as a JSON manifest plus one binary file per timeframe and level.
+
+    <timeframe>-<level>.bin holds every kept row index (uint32, relative to the
+    manifest's "dates") followed by the matching values (float32), column after
+    column; the manifest's "counts" give how many points each column kept.
+    reference.f32 holds the full daily `reference_columns` (column-major) so a
+    client can divide any kept point by gold, silver, ... on the same date.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        "version": FORMAT_VERSION,
+        "method": method,
+        "indexDtype": "uint32",
+        "dtype": "float32",
+        "byteOrder": "little",
+        "null": "NaN",
+        "dates": list(dates),
+        "columns": list(columns),
+        "reference": None,
+        "timeframes": {}
+    }
+
+    if reference_columns:
+        ref_idx = [columns.index(c) for c in reference_columns]
+        block = np.ascontiguousarray(values[:, ref_idx].T, dtype=VALUE_DTYPE)
+        with open(os.path.join(out_dir, "reference.f32"), "wb") as f:
+            f.write(block.tobytes())
+        manifest["reference"] = {"file": "reference.f32", "columns": list(reference_columns),
+                                 "columnBytes": len(dates) * VALUE_DTYPE.itemsize}
+
+    for tf, levels in pyramid.items():
+        start, end = windows[tf]
+        window = values[start:end]
+        entry = {"start": start, "end": end, "levels": {}}
+        for level, mask in levels.items():
+            # Column-major order: transpose so nonzero() walks column by column
+            col_idx, row_idx = np.nonzero(mask.T)
+            counts = np.bincount(col_idx, minlength=mask.shape[1])
+            file_name = f"{tf}-{level}.bin"
+            with open(os.path.join(out_dir, file_name), "wb") as f:
+                f.write((row_idx + start).astype(INDEX_DTYPE).tobytes())
+                f.write(window[row_idx, col_idx].astype(VALUE_DTYPE).tobytes())
+            entry["levels"][str(level)] = {
+                "file": file_name,
+                "points": int(counts.sum()),
+                "counts": counts.tolist()
+            }
+        manifest["timeframes"][tf] = entry
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=None, separators=(',', ':'))
+    return manifest
+
+
+def read_pyramid_column(out_dir, tf, level, column, manifest=None):
+    """
+    Returns (dates, float32 values) of one column at one level, reading only its byte ranges.
+    """
+    if manifest is None:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r") as f:
+            manifest = json.load(f)
+    entry = manifest["timeframes"][tf]["levels"][str(level)]
+    counts = entry["counts"]
+    c = manifest["columns"].index(column)
+    before, n, total = sum(counts[:c]), counts[c], entry["points"]
+    path = os.path.join(out_dir, entry["file"])
+    rows = np.fromfile(path, dtype=INDEX_DTYPE, count=n, offset=before * INDEX_DTYPE.itemsize)
+    vals = np.fromfile(path, dtype=VALUE_DTYPE, count=n,
+                       offset=total * INDEX_DTYPE.itemsize + before * VALUE_DTYPE.itemsize)
+    return [manifest["dates"][i] for i in rows], vals
@@ -0,0 +1,84 @@
+import json
+import os
+
+from BinaryFormat import write_matrices
+from Instrument import count, timed
+from JsonEncode import rounded_matrices, rounded_rows, write_timeframes
+from Publish import publish_rows
+from Returns import compute_returns, save_return_matrices
+
+
+def count_bytes(path):
+    """
+    Adds the size of a written file (or folder) to the "bytes.<name>" counter of the run report.
+    """
+    if os.path.isdir(path):
+        size = sum(os.path.getsize(os.path.join(path, n)) for n in os.listdir(path))
+    else:
+        size = os.path.getsize(path)
+    count(f"bytes.{os.path.basename(path)}", size)
+
+
+@timed("export.data_json")
+def save_data_json(assembled, public_dir, publish_mode="full", digits=None, universe=None):
+    """
+    Saves Data.json from an AssembledData (see JsonEncode for the precision
+    policy). publish_mode="delta" also publishes it as base snapshot + daily
+    delta, rounded the same way, so base + deltas reproduce Data.json. The
+    frontend still loads Data.json, so it is written in both modes.
+    """
+    if publish_mode == "delta":
+        snapshots_dir = os.path.join(public_dir, "snapshots")
+        publish_rows(rounded_rows(assembled, digits, universe), snapshots_dir)
+        count_bytes(snapshots_dir)
+        print(f"\nSuccessfully published full stock data to {snapshots_dir}")
+    output_path = os.path.join(public_dir, "Data.json")
+    write_timeframes(output_path, assembled, digits=digits, universe=universe)
+    count_bytes(output_path)
+    print(f"\nSuccessfully saved full stock data to {output_path}")
+
+
+@timed("export.columnar")
+def save_columnar(matrices, public_dir):
+    """
+    Binary columnar copy (manifest + one Float32 file per timeframe) of the
+    rounded Data.json matrices (see JsonEncode.rounded_matrices()).
+    """
+    columnar_dir = os.path.join(public_dir, "columnar")
+    write_matrices(matrices, columnar_dir)
+    count_bytes(columnar_dir)
+    print(f"Successfully saved columnar data to {columnar_dir}")
+
+
+@timed("export.returns")
+def save_returns(matrices, public_dir):
+    """
+    Return matrices (total return, CAGR, drawdown, volatility) for screening,
+    from the rounded Data.json matrices.
+    """
+    returns_path = os.path.join(public_dir, "Returns.json")
+    save_return_matrices(compute_returns(matrices), returns_path)
+    count_bytes(returns_path)
+    print(f"Successfully saved return matrices to {returns_path}")
+
+
+@timed("export.tickers")
+def save_tickers(tickers_map, public_dir):
+    """
+    tickers.json: sorted list of {symbol, name} for every column in Data.json.
+    """
+    tickers_list = []
+
+    # Sorted list of all tickers
+    sorted_tickers = sorted(list(tickers_map.keys()))
+    for ticker_name in sorted_tickers:
+        tickers_list.append({
+            "symbol": tickers_map[ticker_name],
+            "name": ticker_name
+        })
+
+    tickers_output_path = os.path.join(public_dir, "tickers.json")
+    with open(tickers_output_path, "w") as f:
+        json.dump(tickers_list, f, indent=None, separators=(',', ':'))
+    count_bytes(tickers_output_path)
+    print(f"Successfully saved tickers list to {tickers_output_path}")
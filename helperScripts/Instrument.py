@@ -0,0 +1,187 @@
+"""
+Lightweight run instrumentation: timed spans, counters and a JSON run report.
+
+    from Instrument import count, span, timed
+
+    with span("calendar"):
+        ...
+    count("download.rows", len(frame))
+
+Spans nest per thread ("assemble/store.load"); a span opened on a worker
+thread is recorded under its own name. Everything is kept in module-level
+totals until reset(), which the pipeline calls at the start of each run.
+
+    python helperScripts/Instrument.py cache/reports
+
+compares the newest report in a folder with the median of the earlier ones.
+"""
+import functools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+_lock = threading.Lock()
+_local = threading.local()
+_spans = {}
+_counters = {}
+_started = [time.perf_counter(), datetime.now()]
+
+
+def reset():
+    """
+    Clears every span and counter and restarts the run clock.
+    """
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _started[:] = [time.perf_counter(), datetime.now()]
+
+
+@contextmanager
+def span(name):
+    """
+    Times the enclosed block and adds it to the totals of `name` (prefixed by any enclosing spans).
+    """
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(name)
+    path = "/".join(stack)
+    with _lock:
+        stats = _spans.get(path)
+        if stats is None:
+            stats = _spans[path] = {"calls": 0, "seconds": 0.0, "maxSeconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        with _lock:
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            stats["maxSeconds"] = max(stats["maxSeconds"], elapsed)
+
+
+def timed(name=None):
+    """
+    Decorator form of span(); the span defaults to the function's qualified name.
+    """
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    """
+    Adds `n` to the counter `name`.
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def report(**meta):
+    """
+    Returns the run report: metadata, wall time, spans (in first-seen order) and counters.
+    """
+    with _lock:
+        return {
+            "startedAt": _started[1].isoformat(timespec="seconds"),
+            "wallSeconds": round(time.perf_counter() - _started[0], 4),
+            "python": platform.python_version(),
+            "meta": meta,
+            "spans": {path: {"calls": s["calls"], "seconds": round(s["seconds"], 4),
+                             "maxSeconds": round(s["maxSeconds"], 4)} for path, s in _spans.items()},
+            "counters": dict(sorted(_counters.items()))
+        }
+
+
+def write_report(path, **meta):
+    """
+    Writes report(**meta) as indented JSON to `path`.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report(**meta), f, indent=2)
+    print(f"Run report saved to {path}")
+
+
+@contextmanager
+def profiled(path):
+    """
+    Runs the enclosed block under cProfile and dumps the stats to `path`
+    (inspect with `python -m pstats <path>`). A no-op when path is None.
+    """
+    if not path:
+        yield
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        profiler.dump_stats(path)
+        print(f"Profile saved to {path}")
+
+
+def compare(current, history, threshold=1.5, min_seconds=0.5):
+    """
+    Lists the spans of `current` that took more than `threshold` times their
+    median over `history` (earlier reports). Spans faster than `min_seconds`
+    are ignored, they are too noisy to compare.
+    """
+    lines = []
+    for path, stats in current["spans"].items():
+        previous = sorted(r["spans"][path]["seconds"] for r in history if path in r.get("spans", {}))
+        if not previous or stats["seconds"] < min_seconds:
+            continue
+        median = previous[len(previous) // 2]
+        if median > 0 and stats["seconds"] > threshold * median:
+            lines.append(f"{path}: {stats['seconds']:.2f}s vs median {median:.2f}s over {len(previous)} runs")
+    return lines
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the newest run report with earlier ones.")
+    parser.add_argument("reports_dir")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    names = sorted(n for n in os.listdir(args.reports_dir) if n.endswith(".json"))
+    if not names:
+        print(f"No run reports in {args.reports_dir}")
+        return 0
+    reports = []
+    for name in names:
+        with open(os.path.join(args.reports_dir, name), "r") as f:
+            reports.append(json.load(f))
+
+    current, history = reports[-1], reports[:-1]
+    print(f"{names[-1]}: {current['wallSeconds']:.1f}s wall, compared with {len(history)} earlier runs")
+    slower = compare(current, history, args.threshold)
+    for line in slower:
+        print(f"  slower: {line}")
+    if not slower:
+        print("  no stage regressed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
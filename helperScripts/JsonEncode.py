@@ -0,0 +1,225 @@
+"""
+Data.json / FastData.json written straight from the assembled NumPy matrix.
+
+Cells are rounded to a number of significant digits that depends on the
+column type (see DEFAULT_DIGITS), so a $0.00001 coin keeps its digits and a
+$600,000 share does not carry four decimals. Every union row is encoded
+once and reused by each timeframe that samples it, and the file is streamed
+one timeframe at a time. orjson is used when it is installed; the stdlib json
+module gives the same JSON (floats may differ only in exponent notation).
+"""
+import json
+import os
+
+import numpy as np
+
+from Instrument import count, timed
+
+# Significant digits per column type (Universe entry types, plus "CPI" for
+# the "Inflation Adjusted $" multipliers). Metals are the denominators of
+# every other price, so they keep one more digit.
+DEFAULT_DIGITS = {
+    "Metal": 7,
+    "CPI": 6,
+    "Crypto": 6,
+    "Stock": 6
+}
+CPI_COLUMN = "Inflation Adjusted $"
+
+_orjson = []
+
+
+def _fast_backend():
+    """
+    orjson when it is installed (imported once), else None.
+    """
+    if not _orjson:
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        _orjson.append(orjson)
+    return _orjson[0]
+
+
+def parse_digits(spec):
+    """
+    Parses a --json-digits value: "6" (every type) or "Metal=7,Crypto=8"
+    (overrides of DEFAULT_DIGITS). Returns the full {type: digits} policy.
+    """
+    digits = dict(DEFAULT_DIGITS)
+    if not spec:
+        return digits
+    for part in str(spec).split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            digits[name.strip()] = int(value)
+        else:
+            digits = {name: int(part) for name in digits}
+    return digits
+
+
+def column_types(keys, universe=None):
+    """
+    Returns the type of every column label: the Universe entry type ("Metal",
+    "Crypto", ...), "CPI" for the inflation multipliers, "Stock" otherwise.
+    """
+    by_label = {entry["label"]: entry["type"] for entry in universe or []}
+    types = []
+    for key in keys:
+        if key == CPI_COLUMN:
+            types.append("CPI")
+        elif key in ("Gold", "Silver", "Platinum"):
+            types.append("Metal")
+        else:
+            types.append(by_label.get(key, "Stock"))
+    return types
+
+
+def round_significant(values, digits):
+    """
+    Rounds every cell of a float matrix to `digits` significant digits (one
+    value per column). The rounded values are the doubles nearest to short
+    decimals, so they print with at most `digits` digits. NaN stays NaN.
+    """
+    out = np.array(values, dtype=float)
+    digits = np.broadcast_to(np.asarray(digits), out.shape)
+    nonzero = np.isfinite(out) & (out != 0)
+    cells = out[nonzero]
+    decimals = digits[nonzero] - 1 - np.floor(np.log10(np.abs(cells))).astype(int)
+    # Grouped by the decimals to keep, which take few distinct values
+    for k in np.unique(decimals):
+        mask = decimals == k
+        cells[mask] = np.round(cells[mask], min(int(k), 20))
+    out[nonzero] = cells
+    return out
+
+
+def encode_rows(dates, values, backend=None):
+    """
+    Encodes each row as bytes: ["YYYY-MM-DD",v1,v2,...] with NaN as null.
+    backend is "orjson", "json" or None (orjson when available).
+    """
+    orjson = _fast_backend() if backend in (None, "orjson") else None
+    if backend == "orjson" and orjson is None:
+        raise ImportError("orjson is not installed")
+    prefixes = [json.dumps([d])[:-1].encode() for d in dates]
+    if not values.shape[1]:
+        return [p + b"]" for p in prefixes]
+    if orjson is not None:
+        # One call for the whole block (orjson writes NaN as null), split back into rows
+        if not len(prefixes):
+            return []
+        block = orjson.dumps(np.ascontiguousarray(values, dtype=np.float64), option=orjson.OPT_SERIALIZE_NUMPY)
+        return [p + b"," + row + b"]" for p, row in zip(prefixes, block[2:-2].split(b"],["))]
+
+    cells = values.astype(object)
+    cells[np.isnan(values)] = None
+    return [p + b"," + json.dumps(row, separators=(',', ':')).encode()[1:] for p, row in zip(prefixes, cells.tolist())]
+
+
+def column_digits(keys, digits=None, universe=None):
+    """
+    Significant digits of every column under a {type: digits} policy.
+    """
+    digits = digits or DEFAULT_DIGITS
+    return [digits.get(t, digits.get("Stock", 6)) for t in column_types(keys, universe)]
+
+
+def dumps_timeframes(dates, keys, values, timeframes, backend=None):
+    """
+    Returns {timeframe: {columns, rows}} JSON bytes for an already rounded
+    date x key matrix; `timeframes` is {label: row indices into dates}.
+    Rows are encoded once, however many timeframes sample them.
+    """
+    used = sorted(set(i for indices in timeframes.values() for i in indices))
+    encoded = dict(zip(used, encode_rows([dates[i] for i in used], values[used], backend)))
+    header = json.dumps(["Date"] + list(keys), separators=(',', ':')).encode()
+    parts = [json.dumps(tf).encode() + b':{"columns":' + header + b',"rows":[' +
+             b",".join(encoded[i] for i in indices) + b"]}" for tf, indices in timeframes.items()]
+    count("encode.rows", len(used))
+    return b"{" + b",".join(parts) + b"}"
+
+
+@timed("export.encode")
+def write_timeframes(path, assembled, columns=None, timeframes=None, digits=None, universe=None, backend=None):
+    """
+    Writes an AssembledData (see Assembly) as {timeframe: {columns, rows}} JSON,
+    one timeframe at a time. `columns` restricts the output to those labels
+    (in that order), `timeframes` to those timeframes; `digits` is a
+    {type: significant digits} policy (see parse_digits()).
+    Returns the number of bytes written.
+    """
+    keys = list(columns) if columns is not None else list(assembled.keys)
+    index = [assembled.keys.index(k) for k in keys]
+    policy = column_digits(keys, digits, universe)
+    timeframes = [tf for tf in (timeframes or assembled.timeframes) if tf in assembled.timeframes]
+
+    # Only the rows some written timeframe samples
+    used = sorted(set(i for tf in timeframes for i in assembled.timeframes[tf]))
+    values = round_significant(assembled.values[np.ix_(used, index)], policy)
+    encoded = dict(zip(used, encode_rows([assembled.dates[i] for i in used], values, backend)))
+
+    header = json.dumps(["Date"] + keys, separators=(',', ':')).encode()
+    written = 0
+    with open(path + ".tmp", "wb") as f:
+        for n, tf in enumerate(timeframes):
+            chunk = (b"{" if n == 0 else b",") + json.dumps(tf).encode() + b':{"columns":' + header + b',"rows":['
+            chunk += b",".join(encoded[i] for i in assembled.timeframes[tf]) + b"]}"
+            f.write(chunk)
+            written += len(chunk)
+        f.write(b"}" if timeframes else b"{}")
+        written += 1 if timeframes else 2
+    os.replace(path + ".tmp", path)
+    count("encode.rows", len(used))
+    return written
+
+
+def rounded_rows(assembled, digits=None, universe=None):
+    """
+    The (columns, {date: values}, {timeframe: [dates]}) split of Data.json
+    (see Publish.split_rows()), with every cell rounded as write_timeframes()
+    writes it and NaN as None.
+    """
+    keys = list(assembled.keys)
+    used = sorted(set(i for indices in assembled.timeframes.values() for i in indices))
+    timeframes = {tf: [assembled.dates[i] for i in indices] for tf, indices in assembled.timeframes.items()}
+    if not used:
+        return keys, {}, timeframes
+    values = round_significant(assembled.values[used], column_digits(keys, digits, universe))
+    cells = values.astype(object)
+    cells[np.isnan(values)] = None
+    return keys, dict(zip([assembled.dates[i] for i in used], cells.tolist())), timeframes
+
+
+def rounded_matrices(assembled, digits=None, universe=None):
+    """
+    {timeframe: (dates, columns, date x column values)} of an AssembledData,
+    every cell rounded as write_timeframes() writes it (NaN stays NaN), for
+    the exports that read matrices rather than JSON rows.
+    """
+    keys = list(assembled.keys)
+    values = round_significant(assembled.values, column_digits(keys, digits, universe))
+    return {tf: ([assembled.dates[i] for i in indices], keys, values[indices])
+            for tf, indices in assembled.timeframes.items()}
+
+
+def load_json(path):
+    """
+    Reads a JSON file with orjson when it is installed, else with the json module.
+    """
+    orjson = _fast_backend()
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def dump_json(path, data):
+    """
+    Writes compact JSON (orjson when it is installed) through a temporary file.
+    """
+    orjson = _fast_backend()
+    raw = orjson.dumps(data) if orjson is not None else json.dumps(data, separators=(',', ':')).encode()
+    with open(path + ".tmp", "wb") as f:
+        f.write(raw)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,218 @@
+"""
+Intraday "live tip": the latest quote of every column without a rebuild.
+
+export-json writes public/Tip.json next to Data.json: the columns, their
+symbols, significant digits and the latest value of every column. refresh_tip()
+then downloads the latest quote of every symbol in one batched request
+(period="1d") and
+
+  - rewrites Tip.json with the tip row (date, asOf, one value per column),
+  - puts the tip row at the end of every timeframe of FastData.json and the
+    preview bundles (and Data.json with data_json=True): the last row is
+    replaced when it is the same session and a newer session is appended.
+
+Columns without a fresh quote keep their last value, "Inflation Adjusted $"
+keeps its multiplier and a "(TR)" column moves with its price column. The
+price store and the daily archive are not touched; the next full run
+replaces the tip with the settled closes.
+"""
+import datetime
+import os
+from collections import Counter
+
+import numpy as np
+
+from Instrument import count, timed
+from JsonEncode import column_digits, dump_json, load_json, round_significant
+
+TIP_NAME = "Tip.json"
+DATA_NAME = "Data.json"
+
+
+def _latest_values(values):
+    """
+    Last non-NaN value of every column of a date x column matrix (NaN when there is none).
+    """
+    valid = ~np.isnan(values)
+    last = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+    latest = values[last, np.arange(values.shape[1])]
+    latest[~valid.any(axis=0)] = np.nan
+    return latest
+
+
+def column_symbols(keys, tickers_map):
+    """
+    The symbol behind every column label (None for columns without one, such
+    as the CPI multipliers); "<label> (TR)" maps to "<symbol> (TR)".
+    """
+    from Adjustments import TR_SUFFIX
+
+    symbols = []
+    for key in keys:
+        symbol = tickers_map.get(key)
+        if symbol is None and key.endswith(TR_SUFFIX):
+            base = tickers_map.get(key[:-len(TR_SUFFIX)])
+            symbol = base + TR_SUFFIX if base else None
+        symbols.append(None if symbol == "CPI" else symbol)
+    return symbols
+
+
+@timed("export.tip")
+def save_tip(assembled, public_dir, tickers_map, digits=None, universe=None):
+    """
+    Writes Tip.json, the starting point of refresh_tip(), from an AssembledData:
+    the latest value of every column, rounded like Data.json.
+    """
+    keys = list(assembled.keys)
+    policy = column_digits(keys, digits, universe)
+    latest = round_significant(_latest_values(assembled.values)[None, :], policy)[0]
+    filled = np.flatnonzero(~np.isnan(assembled.values).all(axis=1))
+    # Later timeframe dates without any close yet are what the tip fills in
+    date = assembled.dates[filled[-1]] if len(filled) else None
+    tip = {
+        "date": date,
+        "base": date,
+        "asOf": None,
+        "columns": keys,
+        "symbols": column_symbols(keys, tickers_map),
+        "digits": policy,
+        "values": [None if v != v else float(v) for v in latest],
+        "baseValues": [None if v != v else float(v) for v in latest],
+        "quoted": 0
+    }
+    path = os.path.join(public_dir, TIP_NAME)
+    dump_json(path, tip)
+    print(f"Successfully saved the tip base to {path}")
+
+
+def latest_quotes(symbols, provider):
+    """
+    {symbol: (date, close)} of the latest session of every symbol, downloaded in one batched request.
+    """
+    from Assembly import build_close_matrix
+    from Providers import fetch_chunks
+
+    result = fetch_chunks(provider, symbols, period="1d", chunk_size=max(1, len(symbols)), max_workers=1)
+    if result.failed or result.empty:
+        print(result.summary())
+    close = build_close_matrix(result.frames)
+    quotes = {}
+    if len(close):
+        values = close.to_numpy(dtype=float)
+        rows = len(values) - 1 - np.argmax(~np.isnan(values[::-1]), axis=0)
+        latest = values[rows, np.arange(values.shape[1])]
+        quotes = {symbol: (close.index[row], float(value))
+                  for symbol, row, value in zip(close.columns, rows, latest) if value == value}
+    count("tip.quotes", len(quotes))
+    return quotes
+
+
+def tip_row(tip, quotes):
+    """
+    Returns (date, values, quoted) of the tip row: fresh quotes (on or after the base
+    session) where there is one, the base values elsewhere. The date is the
+    session most quotes are from; crypto quoted on a weekend still counts
+    towards Friday's row.
+    """
+    from Adjustments import TR_SUFFIX
+
+    base = tip["base"]
+    fresh = {s: q for s, q in quotes.items() if base is None or q[0] >= base}
+    dates = Counter(d for d, _ in fresh.values())
+    date = dates.most_common(1)[0][0] if dates else tip["date"]
+
+    base_values = [np.nan if v is None else v for v in tip["baseValues"]]
+    by_symbol = dict(zip(tip["symbols"], base_values))
+    values = np.array(base_values, dtype=float)
+    quoted = 0
+    for i, symbol in enumerate(tip["symbols"]):
+        if symbol is None:
+            continue
+        if symbol.endswith(TR_SUFFIX):
+            # Same reinvested shares as at the base session
+            price = symbol[:-len(TR_SUFFIX)]
+            if price in fresh and by_symbol.get(price):
+                values[i] = base_values[i] / by_symbol[price] * fresh[price][1]
+        elif symbol in fresh:
+            values[i] = fresh[symbol][1]
+            quoted += 1
+    values = round_significant(values[None, :], tip["digits"])[0]
+    return date, values, quoted
+
+
+def patch_timeframes(data, date, columns, values):
+    """
+    Puts the tip row at the end of every timeframe of a {timeframe: {columns, rows}}
+    structure, in place: replaces the last row of the same session, appends after
+    an older one. Returns the number of timeframes changed (none without a date).
+    """
+    if date is None:
+        return 0
+    cells = {c: (None if v != v else float(v)) for c, v in zip(columns, values)}
+    patched = 0
+    for tf_data in data.values():
+        rows = tf_data["rows"]
+        if rows and rows[-1][0] > date:
+            continue
+        row = [date] + [cells.get(c) for c in tf_data["columns"][1:]]
+        if rows and rows[-1][0] == date:
+            # Keep the stored value of any column the tip has no value for
+            row = [v if v is not None else old for v, old in zip(row, rows[-1])]
+            rows[-1] = row
+        else:
+            rows.append(row)
+        patched += 1
+    return patched
+
+
+def _patch_targets(public_dir, data_json=False):
+    """
+    FastData.json and every preview bundle listed in bundles/manifest.json, plus Data.json if asked.
+    """
+    from Bundles import BUNDLES_DIR, MANIFEST_NAME
+
+    paths = [os.path.join(public_dir, DATA_NAME)] if data_json else []
+    manifest_path = os.path.join(public_dir, BUNDLES_DIR, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        paths += [os.path.join(public_dir, entry["path"]) for entry in load_json(manifest_path)["bundles"]]
+    else:
+        paths.append(os.path.join(public_dir, "FastData.json"))
+    return [p for p in dict.fromkeys(paths) if os.path.exists(p)]
+
+
+@timed("live_tip")
+def refresh_tip(public_dir, provider=None, data_json=False, now=None):
+    """
+    Downloads the latest quotes and writes the tip row to Tip.json and the end
+    of every timeframe of FastData.json and the bundles (Data.json too with
+    data_json=True). Returns the tip (see save_tip()).
+    """
+    from Adjustments import TR_SUFFIX
+    from Providers import YFinanceProvider
+
+    path = os.path.join(public_dir, TIP_NAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} is missing, run export-json first")
+    tip = load_json(path)
+    symbols = sorted({s for s in tip["symbols"] if s is not None and not s.endswith(TR_SUFFIX)})
+    print(f"Downloading the latest quotes of {len(symbols)} symbols...")
+    quotes = latest_quotes(symbols, provider or YFinanceProvider())
+
+    date, values, quoted = tip_row(tip, quotes)
+    tip.update(date=date, quoted=quoted, values=[None if v != v else float(v) for v in values],
+               asOf=(now or datetime.datetime.now(datetime.timezone.utc)).isoformat(timespec="seconds"))
+    dump_json(path, tip)
+    if date is None:
+        # No closes published and no fresh quote: there is no session to put the row at
+        print("No tip session yet, the timeframes are left as they are")
+        return tip
+
+    for target in _patch_targets(public_dir, data_json):
+        data = load_json(target)
+        patched = patch_timeframes(data, date, tip["columns"], values)
+        if patched:
+            dump_json(target, data)
+        count("tip.timeframes", patched)
+        print(f"  {os.path.relpath(target, public_dir):<32} {patched} timeframes")
+    print(f"Live tip for {date}: {quoted}/{len(tip['columns'])} columns quoted")
+    return tip
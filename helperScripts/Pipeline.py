@@ -0,0 +1,611 @@
+"""
+Stock in Ounces data pipeline.
+
+    python helperScripts/Pipeline.py <command> [options]
+
+Commands run their upstream stages in memory, so `run` performs a single
+fetch and a single assembly for every output. Heavy dependencies (pandas,
+numpy, yfinance) are only imported by the stages that need them.
+"""
+import argparse
+import json
+from bisect import bisect_left, bisect_right
+import os
+import sqlite3
+import sys
+import traceback
+
+import Instrument
+from Instrument import timed
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLIC_DIR = os.path.join(PROJECT_ROOT, "public")
+DEFAULT_STORE_PATH = os.path.join(PROJECT_ROOT, "cache", "prices.sqlite")
+DEFAULT_CSV_PATH = os.path.join(PUBLIC_DIR, "data.csv")
+DEFAULT_REPORT_PATH = os.path.join(PROJECT_ROOT, "cache", "last_run.json")
+DEFAULT_ARCHIVE_DIR = os.path.join(PROJECT_ROOT, "cache", "archive")
+
+JSON_DIGITS_HELP = ("Significant digits in Data.json/FastData.json: a number for every column, or "
+                    "overrides per type such as Metal=7,Crypto=8 (default: JsonEncode.DEFAULT_DIGITS).")
+BUNDLES_HELP = "JSON list of preview bundle specs (default: Bundles.DEFAULT_BUNDLES, FastData.json included)."
+SEARCH_POPULARITY_HELP = "JSON {label: score} file ranking the search results, e.g. page views (default: by category)."
+
+
+class Pipeline:
+    """
+    Lazily evaluated pipeline stages. Each stage is computed at most once and
+    its result (universe, dates, close matrix, assembled timeframes) is shared
+    by every export.
+    """
+
+    def __init__(self, public_dir=PUBLIC_DIR, store_path=DEFAULT_STORE_PATH, sp500_source="snapshot",
+                 sampling="equidistant", offline=False, provider=None, workers=1, quality="report",
+                 quality_gate=False, quality_report=None, total_return=False):
+        self.public_dir = public_dir
+        self.store_path = store_path
+        self.sp500_source = sp500_source
+        self.sampling = sampling
+        self.offline = offline
+        self.provider = provider
+        self.workers = workers
+        self.quality = quality
+        self.quality_gate = quality_gate
+        self.quality_report = quality_report
+        self.total_return = total_return
+        self.universe_dir = os.path.join(os.path.dirname(os.path.abspath(store_path)), "universe")
+        self._universe = None
+        self._constituents = None
+        self._fetched = False
+        self._calendar = None
+        self._timeframe_dates = None
+        self._assembled = None
+        self._reference = None
+        self._daily = None
+        self._validation = None
+        self._archive = None
+
+    # --- Stages ---
+
+    @timed("universe")
+    def universe(self):
+        """
+        Current constituents, diffed against the previous run (see Constituents).
+        """
+        if self._universe is None:
+            self._universe = self.constituents().universe()
+            print(self._constituents.summary())
+        return self._universe
+
+    def constituents(self):
+        if self._constituents is None:
+            from Constituents import UniverseManager
+            self._constituents = UniverseManager(self.universe_dir, self.sp500_source, offline=self.offline)
+            self._constituents.refresh()
+        return self._constituents
+
+    def symbols(self):
+        from Universe import fetch_symbols
+        return fetch_symbols(self.universe())
+
+    def open_store(self):
+        from PriceStore import PriceStore
+        return PriceStore(self.store_path)
+
+    @timed("fetch")
+    def fetch(self):
+        """
+        Brings the local price store up to date (skipped with offline=True).
+        """
+        if self._fetched or self.offline:
+            return
+        symbols = self.symbols()
+        print(f"Total assets to fetch: {len(symbols)}")
+        added = self.constituents().added_symbols()
+        if added:
+            # Only these need their full history; removed symbols keep theirs in the store
+            print(f"New constituents to backfill: {', '.join(added)}")
+        with self.open_store() as store:
+            store.update(symbols, provider=self.provider, total_return=self.total_return)
+        self._fetched = True
+
+    def calendar(self):
+        """
+        The cached trading calendar (see TimeFrame.TradingCalendar), not refreshed with offline=True.
+        """
+        if self._calendar is None:
+            from TimeFrame import TradingCalendar
+            self._calendar = TradingCalendar(provider=self.provider, offline=self.offline)
+        return self._calendar
+
+    @timed("timeframe_dates")
+    def timeframe_dates(self):
+        if self._timeframe_dates is None:
+            from TimeFrame import get_timeframe_dates
+            print("Generating TimeFrame dates...")
+            self._timeframe_dates = get_timeframe_dates(sampling=self.sampling, calendar=self.calendar())
+        return self._timeframe_dates
+
+    def reference_series(self):
+        """
+        Inflation data and historical gold backfill (cached in cache/reference/).
+        """
+        if self._reference is None:
+            from ReferenceSeries import ReferenceCache, load_cpi_multipliers, load_historical_gold
+            reference_cache = ReferenceCache(offline=self.offline)
+            self._reference = (load_cpi_multipliers(reference_cache), load_historical_gold(reference_cache))
+        return self._reference
+
+    def _raw_daily(self):
+        if self._daily is None:
+            self.fetch()
+            with self.open_store() as store:
+                self._daily = store.load(self.symbols())
+        return self._daily
+
+    @timed("validate")
+    def validate(self):
+        """
+        Data-quality checks over the full daily closes (see Validation), run once.
+        Writes the quality report; with quality_gate=True blocking issues stop the run.
+        """
+        if self._validation is None:
+            from Validation import CHECKS, DEFAULT_REPORT_PATH, QualityGateError, validate_closes
+            _, historical_gold = self.reference_series()
+            policy = None if self.quality == "fix" else {check: "report" for check in CHECKS}
+            self._validation = validate_closes(self._raw_daily(), historical_gold=historical_gold, policy=policy)
+            path = self._validation.write_report(self.quality_report or DEFAULT_REPORT_PATH)
+            print(self._validation.summary())
+            print(f"Quality report saved to {path}")
+            if self.quality_gate and self._validation.blocking():
+                raise QualityGateError("Data-quality gate failed: " + "; ".join(self._validation.blocking()))
+        return self._validation
+
+    def with_total_return(self, close, labels):
+        """
+        With total_return=True, adds a "<label> (TR)" column for every dividend payer (see Adjustments).
+        """
+        if not self.total_return:
+            return close, labels
+        from Adjustments import with_total_return
+        with self.open_store() as store:
+            actions = store.load_actions(list(close.columns))
+        return with_total_return(close, labels, actions)
+
+    def daily_close(self):
+        """
+        Full daily date x symbol Close matrix, with the quality policy applied unless quality="off".
+        """
+        if self.quality == "off":
+            return self._raw_daily()
+        return self.validate().apply(self._raw_daily())
+
+    @timed("assemble.daily")
+    def daily_archive(self):
+        """
+        Every session's resolved closes for every column, as an in-memory PriceArchive (see Archive).
+        Sessions run up to the last stored close, plus any later timeframe date (empty rows).
+        """
+        if self._archive is None:
+            from Archive import PriceArchive
+            from Assembly import assemble_matrix
+            from TimeFrame import get_trading_days
+            from Universe import tickers_map
+
+            cpi_multipliers, historical_gold = self.reference_series()
+            close, labels = self.with_total_return(self.daily_close(), tickers_map(self.universe()))
+            dates = list(get_trading_days(self.calendar()).strftime("%Y-%m-%d"))
+            dates = dates[:bisect_right(dates, close.index[-1])] if len(close) else []
+            dates = sorted(set(dates).union(*self.timeframe_dates().values()))
+            keys = sorted(labels)
+            print(f"Assembling {len(dates)} daily rows x {len(keys)} columns...")
+            values = assemble_matrix(dates, keys, labels, close, cpi_multipliers=cpi_multipliers,
+                                     historical_gold=historical_gold, round_closes=False, workers=self.workers)
+            self._archive = PriceArchive.from_matrix(dates, keys, values)
+        return self._archive
+
+    @timed("assemble")
+    def assembled(self):
+        """
+        Returns the AssembledData (union-of-dates matrix) behind Data.json: only
+        the timeframe dates are assembled (the daily archive is queried instead
+        when another output already built it). With quality="off" the closes are
+        read from the store column by column group.
+        """
+        if self._assembled is not None:
+            return self._assembled
+
+        from Assembly import AssembledData, assemble_data
+        from Universe import tickers_map
+
+        timeframe_dates = self.timeframe_dates()
+        sorted_dates = sorted(set(d for dates in timeframe_dates.values() for d in dates))
+        if not sorted_dates:
+            print("No dates to fetch.")
+            self._assembled = AssembledData([], [], None, {})
+            return self._assembled
+
+        if self._archive is not None:
+            print("\nProcessing data into timeframes...")
+            self._assembled = self._archive.assembled(timeframe_dates)
+            return self._assembled
+
+        cpi_multipliers, historical_gold = self.reference_series()
+        if self.quality == "off":
+            from Sharding import StoreCloses
+            self.fetch()
+            # Read from the store column by column group, in the worker processes when sharded
+            close = StoreCloses(self.store_path, total_return=self.total_return)
+            labels = close.labels(tickers_map(self.universe()))
+        else:
+            close, labels = self.with_total_return(self.daily_close(), tickers_map(self.universe()))
+        print("\nProcessing data into timeframes...")
+        self._assembled = assemble_data(
+            timeframe_dates,
+            sorted(labels),
+            labels,
+            close,
+            cpi_multipliers=cpi_multipliers,
+            historical_gold=historical_gold,
+            workers=self.workers
+        )
+        return self._assembled
+
+    def assemble(self):
+        """
+        Returns the {timeframe: {columns, rows}} structure behind Data.json.
+        """
+        return self.assembled().to_final_data()
+
+    # --- Outputs ---
+
+    @timed("export_json")
+    def export_json(self, publish_mode="full", json_digits=None, bundles=None, search_popularity=None):
+        """
+        Data.json (or snapshots), columnar files, Returns.json, FastData.json and the
+        other preview bundles, tickers.json with its search index and the Tip.json
+        base of live-tip. `json_digits` is the significant-digits policy of the JSON
+        files (see JsonEncode.parse_digits), `bundles` a bundle spec file and
+        `search_popularity` a {label: score} JSON file ranking the search results.
+        A bundle over its byte budget fails the export (BundleBudgetError) only
+        after every file is written, so the other outputs stay consistent.
+        """
+        import Exports
+        from Bundles import check_budgets, load_specs, save_bundles
+        from JsonEncode import parse_digits, rounded_matrices
+        from LiveTip import save_tip
+        from SearchIndex import load_popularity, save_search_index
+        from Universe import tickers_map
+
+        assembled = self.assembled()
+        if not assembled.timeframes:
+            return
+        digits = parse_digits(json_digits)
+        universe = self.universe()
+        os.makedirs(self.public_dir, exist_ok=True)
+        Exports.save_data_json(assembled, self.public_dir, publish_mode, digits, universe)
+        # Same cells as Data.json, without building its row lists
+        matrices = rounded_matrices(assembled, digits, universe)
+        Exports.save_columnar(matrices, self.public_dir)
+        Exports.save_returns(matrices, self.public_dir)
+        manifest = save_bundles(assembled, self.public_dir, load_specs(bundles), digits, universe, check=False)
+        Exports.save_tickers(tickers_map(self.universe()), self.public_dir)
+        save_search_index(universe, self.public_dir, load_popularity(search_popularity))
+        save_tip(assembled, self.public_dir, tickers_map(universe), digits, universe)
+        check_budgets(manifest)
+
+    def live_tip(self, data_json=False):
+        """
+        Latest quotes of every column written over the last point of FastData.json, the
+        bundles and Tip.json (Data.json too with data_json=True), without a rebuild (see LiveTip).
+        """
+        from LiveTip import refresh_tip
+        refresh_tip(self.public_dir, provider=self.provider, data_json=data_json)
+
+    @timed("export_pyramid")
+    def export_pyramid(self, levels=None, method="minmax"):
+        """
+        Downsampled pyramid of the full daily series (public/pyramid/, see Downsample).
+        Points are picked per ticker, in USD and in gold, at each level.
+        """
+        from Denominators import denominate
+        from Downsample import PYRAMID_LEVELS, build_pyramid, write_pyramid
+
+        timeframe_dates = self.timeframe_dates()
+        archive = self.daily_archive()
+        dates, keys = archive.dates(), archive.columns
+        values = archive.values.T
+        print(f"Building the pyramid from {len(dates)} daily rows x {len(keys)} columns...")
+
+        windows = {}
+        for tf, tf_dates in timeframe_dates.items():
+            if tf_dates:
+                windows[tf] = (bisect_left(dates, tf_dates[0]), bisect_right(dates, tf_dates[-1]))
+        select_on = [denominate(values, keys, ["Gold"])[0]] if "Gold" in keys else None
+        pyramid = build_pyramid(values, windows, levels or PYRAMID_LEVELS, method, select_on)
+
+        out_dir = os.path.join(self.public_dir, "pyramid")
+        reference_columns = [c for c in ("Gold", "Silver", "Platinum", "Inflation Adjusted $") if c in keys]
+        write_pyramid(values, dates, keys, pyramid, windows, out_dir, method, reference_columns)
+        print(f"Successfully saved the downsampled pyramid to {out_dir}")
+
+    @timed("export_archive")
+    def export_archive(self, archive_dir=DEFAULT_ARCHIVE_DIR):
+        """
+        Float32 daily archive for date-range queries (see Archive), updated in place when possible.
+        """
+        from Archive import write_archive
+
+        archive = self.daily_archive()
+        written = write_archive(archive, archive_dir)
+        print(f"Saved the daily archive to {archive_dir} ({len(archive)} rows x {len(archive.columns)} columns, "
+              f"{written} rows written)")
+
+    @timed("export_correlations")
+    def export_correlations(self, denominator="Gold", neighbours=None, window=None):
+        """
+        Top-k correlation neighbours and relative-strength ranks vs gold of every
+        timeframe (public/correlations/, see Correlation).
+        """
+        from Correlation import DEFAULT_NEIGHBOURS, DEFAULT_WINDOW, save_correlations
+
+        assembled = self.assembled()
+        if not assembled.timeframes:
+            return
+        out_dir = os.path.join(self.public_dir, "correlations")
+        manifest = save_correlations(self.daily_archive(), assembled, out_dir, denominator,
+                                     neighbours or DEFAULT_NEIGHBOURS, window or DEFAULT_WINDOW)
+        print(f"Successfully saved correlations of {len(manifest['columns'])} columns in "
+              f"{manifest['denominator']} to {out_dir}")
+
+    @timed("export_csv")
+    def export_csv(self, output_file=DEFAULT_CSV_PATH):
+        """
+        Long-format weekly CSV (Date, Ticker, PriceGold, PriceUSD) from the stored daily closes.
+        """
+        import pandas as pd
+        from CsvExport import process_and_save_csv, weekly_close
+
+        daily = self.daily_close()
+        daily = daily.set_axis(pd.DatetimeIndex(daily.index))
+        process_and_save_csv(weekly_close(daily), daily.iloc[-1:], output_file)
+
+    def stats(self):
+        """
+        Summary of the price store and the published files, without loading any data.
+        """
+        lines = []
+        if os.path.exists(self.store_path):
+            conn = sqlite3.connect(self.store_path)
+            try:
+                n_symbols, first, last = conn.execute(
+                    "SELECT COUNT(*), MIN(first_date), MAX(last_date) FROM symbols").fetchone()
+                stale = conn.execute(
+                    "SELECT COUNT(*) FROM symbols WHERE last_date < (SELECT MAX(last_date) FROM symbols)").fetchone()[0]
+            finally:
+                conn.close()
+            lines.append(f"Price store: {self.store_path} ({os.path.getsize(self.store_path):,} bytes)")
+            lines.append(f"  {n_symbols} symbols, {first} .. {last}, {stale} behind the latest session")
+        else:
+            lines.append(f"Price store: {self.store_path} (missing)")
+
+        lines.append(f"Published files in {self.public_dir}:")
+        for name in sorted(os.listdir(self.public_dir)) if os.path.isdir(self.public_dir) else []:
+            path = os.path.join(self.public_dir, name)
+            if os.path.isdir(path):
+                size = sum(os.path.getsize(os.path.join(path, n)) for n in os.listdir(path))
+                name += "/"
+            else:
+                size = os.path.getsize(path)
+            lines.append(f"  {name:<20} {size:>12,} bytes")
+        return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Stock in Ounces data pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--public-dir", default=PUBLIC_DIR, help="Output folder (default: public/)")
+    common.add_argument("--store", default=DEFAULT_STORE_PATH, help="Price store path (default: cache/prices.sqlite)")
+    common.add_argument("--sp500-source", default="snapshot",
+                        help="S&P 500 constituents: snapshot (built-in), wikipedia, or the URL of a "
+                             "Wikipedia-style table or JSON list. Changes are diffed in cache/universe/.")
+
+    data = argparse.ArgumentParser(add_help=False, parents=[common])
+    data.add_argument("--offline", action="store_true",
+                      help="Use the price store, trading calendar and reference series as cached, without downloading.")
+    data.add_argument("--sampling", choices=["equidistant", "anchored"], default="equidistant",
+                      help="anchored: snap timeframe points to a fixed session grid so they stay stable between runs.")
+    data.add_argument("--quality", choices=["fix", "report", "off"], default="report",
+                      help="Data-quality checks: report (default: only write the report, publish the closes as "
+                           "stored), fix (also quarantine/interpolate the flagged closes before publishing) or off.")
+    data.add_argument("--quality-gate", action="store_true",
+                      help="Fail before writing any output when the quality checks find blocking issues.")
+    data.add_argument("--quality-report", default=None,
+                      help="Data-quality report path (default: cache/quality_report.json)")
+    data.add_argument("--total-return", action="store_true",
+                      help='Also write a total-return "<label> (TR)" column (dividends reinvested) for every dividend payer; '
+                           'closes are then split-adjusted only. Switching re-downloads the price store once.')
+    data.add_argument("--workers", type=int, default=1,
+                      help="Assemble the columns in up to this many processes; small panels stay in process (default: 1).")
+    data.add_argument("--report", default=DEFAULT_REPORT_PATH,
+                      help="Run report with per-stage timings and counters (default: cache/last_run.json)")
+    data.add_argument("--profile", default=None, help="Also write a cProfile dump to this path.")
+
+    universe = sub.add_parser("universe", parents=[common], help="List the assets in the universe.")
+    universe.add_argument("--json", action="store_true", help="Print the universe as JSON.")
+
+    sub.add_parser("fetch", parents=[data], help="Bring the local price store up to date.")
+    sub.add_parser("validate", parents=[data], help="Run the data-quality checks and write their report.")
+    sub.add_parser("assemble", parents=[data], help="Fetch and assemble the timeframes, print a summary.")
+
+    export_json = sub.add_parser("export-json", parents=[data], help="Write Data.json and the derived JSON/binary files.")
+    export_json.add_argument("--publish-mode", choices=["full", "delta"], default="full",
+                             help="full: rewrite public/Data.json. delta: also append to public/snapshots/ (base + deltas).")
+    export_json.add_argument("--json-digits", default=None, help=JSON_DIGITS_HELP)
+    export_json.add_argument("--bundles", default=None, help=BUNDLES_HELP)
+    export_json.add_argument("--search-popularity", default=None, help=SEARCH_POPULARITY_HELP)
+
+    export_csv = sub.add_parser("export-csv", parents=[data], help="Write the long-format weekly CSV.")
+    export_csv.add_argument("--output", default=DEFAULT_CSV_PATH, help="CSV path (default: public/data.csv); .gz for gzip, .parquet for Parquet")
+
+    pyramid = argparse.ArgumentParser(add_help=False)
+    pyramid.add_argument("--levels", type=int, nargs="+", default=None,
+                         help="Points per timeframe at each pyramid level (default: 100 400 1600)")
+    pyramid.add_argument("--method", choices=["minmax", "lttb"], default="minmax",
+                         help="minmax keeps every bucket's low and high, lttb keeps the line's shape.")
+    sub.add_parser("export-pyramid", parents=[data, pyramid],
+                   help="Write the downsampled multi-resolution series to public/pyramid/.")
+
+    archive = argparse.ArgumentParser(add_help=False)
+    archive.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR,
+                         help="Daily archive folder (default: cache/archive/)")
+    sub.add_parser("export-archive", parents=[data, archive],
+                   help="Write the float32 daily archive of every column (see Archive).")
+
+    correlations = argparse.ArgumentParser(add_help=False)
+    correlations.add_argument("--correlation-denominator", default="Gold",
+                              help="Denominator of the correlated log-returns (default: Gold)")
+    correlations.add_argument("--neighbours", type=int, default=None,
+                              help="Most and least correlated neighbours kept per column (default: 10)")
+    correlations.add_argument("--rs-window", type=int, default=None,
+                              help="Rows of the relative-strength return of each timeframe (default: 20)")
+    sub.add_parser("export-correlations", parents=[data, correlations],
+                   help="Write correlation neighbours and relative-strength ranks to public/correlations/.")
+
+    query = sub.add_parser("query", parents=[common, archive], help="Query the daily archive (written by export-archive).")
+    query.add_argument("--tickers", default=None, help="Comma-separated column labels (default: every column)")
+    query.add_argument("--start", default=None, help="First date, YYYY-MM-DD (default: the first session)")
+    query.add_argument("--end", default=None, help="Last date, YYYY-MM-DD (default: the last session)")
+    query.add_argument("--sampling", default="daily", help="daily, weekly, monthly or a number of points")
+    query.add_argument("--denominator", default="USD",
+                       help='USD, any column (Gold, Bitcoin, ...), a preset (Real Gold, Metals Basket) '
+                            'or a JSON spec such as {"components": {"Gold": 1, "Silver": 50}}')
+    query.add_argument("--json", action="store_true", help="Print {dates, columns, values} JSON instead of CSV.")
+
+    run = sub.add_parser("run", parents=[data, pyramid, archive, correlations], help="Fetch once, assemble once, write every output.")
+    run.add_argument("--publish-mode", choices=["full", "delta"], default="full")
+    run.add_argument("--json-digits", default=None, help=JSON_DIGITS_HELP)
+    run.add_argument("--bundles", default=None, help=BUNDLES_HELP)
+    run.add_argument("--search-popularity", default=None, help=SEARCH_POPULARITY_HELP)
+    run.add_argument("--csv", default=None, help="Also write the weekly CSV to this path.")
+    run.add_argument("--pyramid", action="store_true", help="Also write public/pyramid/.")
+    run.add_argument("--archive", action="store_true", help="Also update the daily archive (--archive-dir).")
+    run.add_argument("--correlations", action="store_true", help="Also write public/correlations/.")
+
+    live_tip = sub.add_parser("live-tip", parents=[common],
+                              help="Write the latest quotes over the last point of FastData.json, the bundles "
+                                   "and Tip.json, without a rebuild (intraday).")
+    live_tip.add_argument("--data-json", action="store_true", help="Also patch the last point of Data.json.")
+    live_tip.add_argument("--report", default=DEFAULT_REPORT_PATH,
+                          help="Run report with per-stage timings and counters (default: cache/last_run.json)")
+    live_tip.add_argument("--profile", default=None, help="Also write a cProfile dump to this path.")
+
+    sub.add_parser("stats", parents=[common], help="Summarize the price store and published files.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    pipeline = Pipeline(
+        public_dir=args.public_dir,
+        store_path=args.store,
+        sp500_source=args.sp500_source,
+        sampling=getattr(args, "sampling", "equidistant"),
+        offline=getattr(args, "offline", False),
+        workers=getattr(args, "workers", 1),
+        quality=getattr(args, "quality", "report"),
+        quality_gate=getattr(args, "quality_gate", False),
+        quality_report=getattr(args, "quality_report", None),
+        total_return=getattr(args, "total_return", False)
+    )
+
+    if args.command in ("universe", "stats", "query"):
+        run_command(pipeline, args)
+        return 0
+
+    # The report is written even when a stage fails, with status "error", and the exit code is 1
+    Instrument.reset()
+    status = "error"
+    try:
+        with Instrument.profiled(args.profile):
+            run_command(pipeline, args)
+        status = "ok"
+    except Exception:
+        traceback.print_exc()
+        print(f"Error: {args.command} failed.", file=sys.stderr)
+    finally:
+        Instrument.write_report(args.report, command=args.command, status=status, sampling=pipeline.sampling,
+                                publishMode=getattr(args, "publish_mode", None), offline=pipeline.offline,
+                                workers=pipeline.workers, quality=pipeline.quality, totalReturn=pipeline.total_return)
+    return 0 if status == "ok" else 1
+
+
+def run_command(pipeline, args):
+    if args.command == "universe":
+        universe = pipeline.universe()
+        if args.json:
+            print(json.dumps(universe, indent=2))
+        else:
+            for entry in universe:
+                print(f"{entry['symbol']:<10} {entry['type']:<7} {entry['label']}")
+            print(f"{len(universe)} assets")
+    elif args.command == "fetch":
+        pipeline.fetch()
+    elif args.command == "validate":
+        pipeline.validate()
+    elif args.command == "assemble":
+        final_data = pipeline.assemble()
+        for tf_label, tf_data in final_data.items():
+            print(f"{tf_label}: {len(tf_data['rows'])} rows x {len(tf_data['columns']) - 1} columns")
+    elif args.command == "export-json":
+        pipeline.export_json(args.publish_mode, args.json_digits, args.bundles, args.search_popularity)
+    elif args.command == "export-csv":
+        pipeline.export_csv(args.output)
+    elif args.command == "export-pyramid":
+        pipeline.export_pyramid(args.levels, args.method)
+    elif args.command == "export-archive":
+        pipeline.export_archive(args.archive_dir)
+    elif args.command == "export-correlations":
+        pipeline.export_correlations(args.correlation_denominator, args.neighbours, args.rs_window)
+    elif args.command == "query":
+        print_query(args)
+    elif args.command == "live-tip":
+        pipeline.live_tip(args.data_json)
+    elif args.command == "run":
+        pipeline.export_json(args.publish_mode, args.json_digits, args.bundles, args.search_popularity)
+        if args.pyramid:
+            pipeline.export_pyramid(args.levels, args.method)
+        if args.archive:
+            pipeline.export_archive(args.archive_dir)
+        if args.correlations:
+            pipeline.export_correlations(args.correlation_denominator, args.neighbours, args.rs_window)
+        if args.csv:
+            pipeline.export_csv(args.csv)
+    elif args.command == "stats":
+        print(pipeline.stats())
+
+
+def print_query(args):
+    """
+    Prints a daily archive query as CSV (Date, then one column per ticker; empty for no close) or JSON.
+    """
+    from Archive import PriceArchive
+
+    archive = PriceArchive.open(args.archive_dir)
+    denominator = json.loads(args.denominator) if args.denominator.startswith("{") else args.denominator
+    columns = [c.strip() for c in args.tickers.split(",")] if args.tickers else None
+    dates, columns, values = archive.query(columns, args.start, args.end, args.sampling, denominator)
+    cells = values.astype(object)
+    cells[values != values] = None
+    if args.json:
+        print(json.dumps({"dates": dates, "columns": columns, "values": cells.tolist()},
+                         separators=(',', ':')))
+        return
+    print(",".join(["Date"] + columns))
+    for date, row in zip(dates, cells.tolist()):
+        print(",".join([date] + ["" if v is None else f"{v:.6g}" for v in row]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from Adjustments import build_actions, dividend_growth
+from Assembly import build_close_matrix
+from Instrument import count, timed
+from Providers import YFinanceProvider, fetch_chunks
+
+# Default location of the on-disk price store (project_root/cache/prices.sqlite)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, "cache")
+DEFAULT_STORE_PATH = os.path.join(DEFAULT_CACHE_DIR, "prices.sqlite")
+
+CHUNK_SIZE = 100
+
+# How the stored closes are adjusted: as the provider returns them by default,
+# for splits only (yfinance auto_adjust=False) with total_return=True. Each
+# symbol records its basis; symbols stored before that fall back to the
+# "close_basis" meta key, and stores that predate it have the default basis.
+# Switching basis re-fetches a symbol's full history once.
+DEFAULT_BASIS = "provider-adjusted"
+TOTAL_RETURN_BASIS = "split-adjusted"
+
+# Relative difference between a stored and a re-downloaded close past which the
+# provider has adjusted the history again (a new dividend or split)
+ADJUSTMENT_TOLERANCE = 1e-6
+
+
+class PriceStore:
+    """
+    Daily Close prices per symbol kept in a local SQLite database.
+
+    Every symbol has a high-water mark (the last stored session), so a run only
+    needs to download the dates after it. Data.json is derived from this store
+    and never read back.
+
+    With update(total_return=True) the closes are split-adjusted and the
+    dividends and splits are kept in the "actions" table. A split that shows up
+    in an incremental download rescales the symbol's older closes and dividends
+    (the provider returns the new rows already split-adjusted), and every
+    dividend gets its total-return growth factor once (see Adjustments).
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS prices (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                close REAL NOT NULL,
+                PRIMARY KEY (symbol, date)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol TEXT PRIMARY KEY,
+                first_date TEXT,
+                last_date TEXT,
+                updated_at TEXT,
+                basis TEXT
+            );
+            CREATE TABLE IF NOT EXISTS actions (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                dividend REAL NOT NULL DEFAULT 0,
+                split REAL NOT NULL DEFAULT 1,
+                growth REAL,
+                PRIMARY KEY (symbol, date)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(symbols)")]
+        if "basis" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE symbols ADD COLUMN basis TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def high_water_marks(self):
+        """
+        Returns {symbol: last stored 'YYYY-MM-DD'} for every symbol with data.
+        """
+        rows = self.conn.execute("SELECT symbol, last_date FROM symbols WHERE last_date IS NOT NULL")
+        return dict(rows.fetchall())
+
+    @timed("store.write")
+    def write(self, close_matrix):
+        """
+        Upserts a date x symbol Close matrix (index of 'YYYY-MM-DD' strings)
+        and advances each symbol's high-water mark.
+        """
+        if close_matrix.empty:
+            return 0
+
+        long = close_matrix.stack().dropna()
+        long.index.names = ["date", "symbol"]
+        records = [(symbol, date, float(close)) for (date, symbol), close in long.items()]
+        if not records:
+            return 0
+
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO prices (symbol, date, close) VALUES (?, ?, ?)", records
+            )
+            spans = long.reset_index().groupby("symbol")["date"].agg(["min", "max"])
+            for symbol, (first, last) in spans.iterrows():
+                self.conn.execute("""
+                    INSERT INTO symbols (symbol, first_date, last_date, updated_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(symbol) DO UPDATE SET
+                        first_date = MIN(COALESCE(first_date, excluded.first_date), excluded.first_date),
+                        last_date = MAX(COALESCE(last_date, excluded.last_date), excluded.last_date),
+                        updated_at = excluded.updated_at
+                """, (symbol, first, last, now))
+        count("store.rows_written", len(records))
+        return len(records)
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @timed("store.write_actions")
+    def write_actions(self, actions, fetched_from=None):
+        """
+        Upserts dividend/split events (see Adjustments.build_actions()); their
+        growth factors are recomputed by refresh_growth(). `fetched_from` is
+        {symbol: first downloaded date}: a split not stored yet divides that
+        symbol's closes and dividends before this date by its ratio.
+        Returns the number of events written.
+        """
+        if not len(actions):
+            return 0
+        fetched_from = fetched_from or {}
+        known = set(self.conn.execute("SELECT symbol, date FROM actions WHERE split != 1").fetchall())
+        with self.conn:
+            for symbol, date, split in actions.loc[actions["split"] != 1.0, ["symbol", "date", "split"]].itertuples(
+                    index=False):
+                first = fetched_from.get(symbol)
+                if (symbol, date) in known or first is None:
+                    continue
+                print(f"New {split:g}:1 split for {symbol} on {date}, rescaling its history before {first}")
+                self.conn.execute("UPDATE prices SET close = close / ? WHERE symbol = ? AND date < ?",
+                                  (split, symbol, first))
+                self.conn.execute("UPDATE actions SET dividend = dividend / ? WHERE symbol = ? AND date < ?",
+                                  (split, symbol, first))
+                count("store.splits_applied")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO actions (symbol, date, dividend, split, growth) VALUES (?, ?, ?, ?, NULL)",
+                [(s, d, float(div), float(sp)) for s, d, div, sp in actions[["symbol", "date", "dividend", "split"]]
+                 .itertuples(index=False)])
+        count("store.actions_written", len(actions))
+        return len(actions)
+
+    def load_actions(self, symbols=None):
+        """
+        Returns the stored events as a DataFrame (symbol, date, dividend, split, growth).
+        """
+        actions = pd.read_sql_query("SELECT symbol, date, dividend, split, growth FROM actions ORDER BY date",
+                                    self.conn)
+        if symbols is not None:
+            actions = actions[actions["symbol"].isin(set(symbols))].reset_index(drop=True)
+        actions["growth"] = actions["growth"].astype(float)
+        return actions
+
+    @timed("store.refresh_growth")
+    def refresh_growth(self):
+        """
+        Computes the growth factor of every dividend that has none yet, with the
+        first stored close on or after its ex-date. Returns the number computed.
+        """
+        pending = pd.read_sql_query("""
+            SELECT a.symbol, a.date, a.dividend,
+                   (SELECT p.close FROM prices p WHERE p.symbol = a.symbol AND p.date >= a.date
+                    ORDER BY p.date LIMIT 1) AS ex_close
+            FROM actions a WHERE a.growth IS NULL AND a.dividend > 0
+        """, self.conn)
+        if pending.empty:
+            return 0
+        growth = dividend_growth(pending["dividend"], pending["ex_close"].astype(float))
+        done = [(float(g), s, d) for g, s, d in zip(growth, pending["symbol"], pending["date"]) if g == g]
+        with self.conn:
+            self.conn.executemany("UPDATE actions SET growth = ? WHERE symbol = ? AND date = ?", done)
+        print(f"Computed the total-return factor of {len(done)} dividends "
+              f"for {pending['symbol'].nunique()} symbols.")
+        return len(done)
+
+    @timed("store.load")
+    def load(self, symbols=None, dates=None):
+        """
+        Returns a date x symbol Close matrix indexed by 'YYYY-MM-DD' strings.
+        Restricting to `dates` only reads those rows from disk.
+        """
+        query = "SELECT p.date, p.symbol, p.close FROM prices p"
+        with self.conn:
+            self.conn.execute("DROP TABLE IF EXISTS temp.wanted_dates")
+            self.conn.execute("DROP TABLE IF EXISTS temp.wanted_symbols")
+            if dates is not None:
+                self.conn.execute("CREATE TEMP TABLE wanted_dates (date TEXT PRIMARY KEY)")
+                self.conn.executemany("INSERT OR IGNORE INTO wanted_dates VALUES (?)", ((d,) for d in dates))
+                query += " JOIN wanted_dates w ON w.date = p.date"
+            if symbols is not None:
+                self.conn.execute("CREATE TEMP TABLE wanted_symbols (symbol TEXT PRIMARY KEY)")
+                self.conn.executemany("INSERT OR IGNORE INTO wanted_symbols VALUES (?)", ((s,) for s in symbols))
+                query += " JOIN wanted_symbols s ON s.symbol = p.symbol"
+            long = pd.read_sql_query(query, self.conn)
+        count("store.rows_loaded", len(long))
+
+        matrix = long.pivot(index="date", columns="symbol", values="close").sort_index()
+        matrix.index.name = None
+        matrix.columns.name = None
+        if symbols is not None:
+            matrix = matrix.reindex(columns=list(dict.fromkeys(symbols)))
+        return matrix.astype(float)
+
+    def close_basis(self):
+        """
+        The basis shared by every stored symbol (see DEFAULT_BASIS).
+        """
+        return self.get_meta("close_basis") or DEFAULT_BASIS
+
+    def close_bases(self):
+        """
+        Returns {symbol: basis of its stored closes} for every symbol with data.
+        """
+        rows = self.conn.execute("SELECT symbol, basis FROM symbols WHERE last_date IS NOT NULL")
+        fallback = self.close_basis()
+        return {symbol: basis or fallback for symbol, basis in rows.fetchall()}
+
+    def previous_sessions(self):
+        """
+        Returns {symbol: stored session before its high-water mark}.
+        """
+        rows = self.conn.execute("""
+            SELECT s.symbol, (SELECT MAX(p.date) FROM prices p WHERE p.symbol = s.symbol AND p.date < s.last_date)
+            FROM symbols s WHERE s.last_date IS NOT NULL
+        """)
+        return {symbol: date for symbol, date in rows.fetchall() if date is not None}
+
+    def plan_fetch(self, symbols, today=None, total_return=False):
+        """
+        Groups symbols by the start date they need to be fetched from.
+        Returns {start: [symbols]}, where start=None means full history (new symbol).
+        Symbols whose high-water mark is already today are skipped. A symbol
+        gets its full history when its stored closes have another basis than
+        the one total_return asks for (see DEFAULT_BASIS).
+
+        In the default basis the provider re-adjusts the whole history for every
+        new dividend or split, so known symbols start one stored session before
+        their high-water mark: update() compares that settled close with the
+        stored one to detect it.
+        """
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        marks = self.high_water_marks()
+        basis = TOTAL_RETURN_BASIS if total_return else DEFAULT_BASIS
+        stale = {s for s, b in self.close_bases().items() if b != basis}
+        if stale:
+            print(f"Stored closes of {len(stale)} symbols are not {basis}, fetching their full history again.")
+        overlap = {} if total_return else self.previous_sessions()
+        plan = {}
+        for symbol in dict.fromkeys(symbols):
+            if symbol in stale:
+                plan.setdefault(None, []).append(symbol)
+                continue
+            last = marks.get(symbol)
+            if last is not None and last >= today:
+                continue
+            # Re-fetch the last stored session too, its close may have been intraday
+            plan.setdefault(overlap.get(symbol, last), []).append(symbol)
+        return plan
+
+    def set_basis(self, symbols, basis):
+        with self.conn:
+            self.conn.executemany("UPDATE symbols SET basis = ? WHERE symbol = ?", [(basis, s) for s in symbols])
+
+    def readjusted(self, close, start):
+        """
+        Symbols of a download starting at `start` whose close on that date no
+        longer matches the stored one (the provider adjusted their history again).
+        """
+        if start is None or start not in close.index:
+            return []
+        stored = self.load(list(close.columns), dates=[start])
+        if start not in stored.index:
+            return []
+        fetched, before = close.loc[start], stored.loc[start].reindex(close.columns)
+        moved = (fetched - before).abs() > ADJUSTMENT_TOLERANCE * before.abs()
+        return list(moved.index[moved & fetched.notna() & before.notna()])
+
+    def update(self, symbols, provider=None, chunk_size=CHUNK_SIZE, max_workers=4, today=None, total_return=False):
+        """
+        Brings every symbol up to date, fetching only what is missing:
+        brand-new symbols get their full history, known symbols only the
+        sessions since their high-water mark. With total_return=True the
+        closes are split-adjusted and the dividends and splits are stored too;
+        otherwise a symbol the provider has adjusted again since the last run
+        is fetched in full. Returns {"requested", "fetched", "rows", "up_to_date", "failed"}.
+        """
+        provider = provider or YFinanceProvider(total_return=total_return)
+        basis = TOTAL_RETURN_BASIS if total_return else DEFAULT_BASIS
+        plan = self.plan_fetch(symbols, today=today, total_return=total_return)
+        stale = {s for s, b in self.close_bases().items() if b != basis}
+        requested = len(dict.fromkeys(symbols))
+        summary = {"requested": requested, "fetched": 0, "rows": 0,
+                   "up_to_date": requested - sum(len(s) for s in plan.values()), "failed": {}}
+        # Per-symbol cache outcome: up to date (hit), incremental tail or full history (miss)
+        count("store.hit", summary["up_to_date"])
+        count("store.incremental", sum(len(s) for start, s in plan.items() if start is not None))
+        count("store.miss", len(plan.get(None, [])))
+
+        groups = sorted(plan.items(), key=lambda item: item[0] or "")
+        while groups:
+            start, group = groups.pop(0)
+            label = f"from {start}" if start else "full history"
+            print(f"Downloading {label} for {len(group)} tickers from {provider.name}...")
+            result = fetch_chunks(provider, group, start=start, chunk_size=chunk_size, max_workers=max_workers)
+            print(result.summary())
+
+            close = build_close_matrix(result.frames)
+            readjusted = [] if total_return else self.readjusted(close, start)
+            if readjusted:
+                print(f"{len(readjusted)} tickers were adjusted again since {start}, fetching their full history again.")
+                count("store.readjusted", len(readjusted))
+                stale.update(readjusted)
+                close = close.drop(columns=readjusted)
+                groups.append((None, readjusted))
+            summary["fetched"] += len(group) - len(result.failed) - len(readjusted)
+            summary["failed"].update(result.failed)
+            if start is None:
+                refetched = [s for s in close.columns if s in stale and close[s].notna().any()]
+                # Closes and events of the other basis do not apply to the new ones
+                with self.conn:
+                    self.conn.executemany("DELETE FROM prices WHERE symbol = ?", [(s,) for s in refetched])
+                    self.conn.executemany("DELETE FROM actions WHERE symbol = ?", [(s,) for s in refetched])
+                stale.difference_update(refetched)
+            if total_return:
+                fetched_from = {s: close.index[i] for s, i in zip(close.columns, close.notna().to_numpy().argmax(axis=0))
+                                if close[s].notna().any()}
+                self.write_actions(build_actions(result.frames), fetched_from)
+            summary["rows"] += self.write(close)
+            self.set_basis([s for s in close.columns if close[s].notna().any()], basis)
+
+        if total_return:
+            self.refresh_growth()
+        # Symbols that failed to switch keep their old basis and are fetched again next run
+        if not any(b != basis for b in self.close_bases().values()):
+            self.set_meta("close_basis", basis)
+        print(f"Price store: {summary['up_to_date']} symbols up to date, "
+              f"{summary['fetched']} fetched, {summary['rows']} rows written.")
+        if summary["failed"]:
+            print(f"Failed symbols: {', '.join(sorted(summary['failed']))}")
+        return summary
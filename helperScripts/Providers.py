@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+from Instrument import count, span
+
+
+class MarketDataProvider:
+    """
+    Base class for anything that can return OHLC history in the
+    yf.download(group_by='ticker') layout: columns are (symbol, field)
+    with at least a 'Close' field, indexed by date. 'Dividends' and 'Stock
+    Splits' fields, when present, carry the corporate actions, and the closes
+    next to them are adjusted for splits only (see Adjustments).
+
+    Subclasses implement _download(). Calls through download() are spaced
+    to honour the provider's requests_per_second limit across all threads.
+    """
+    name = "base"
+    requests_per_second = None
+
+    def __init__(self, requests_per_second=None):
+        if requests_per_second is not None:
+            self.requests_per_second = requests_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _throttle(self):
+        if not self.requests_per_second:
+            return
+        interval = 1.0 / self.requests_per_second
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+    def download(self, symbols, start=None, period=None, interval="1d"):
+        """
+        Downloads history for `symbols`. With neither start nor period the full history is returned.
+        """
+        self._throttle()
+        return self._download(list(symbols), start=start, period=period, interval=interval)
+
+    def _download(self, symbols, start=None, period=None, interval="1d"):
+        raise NotImplementedError
+
+
+def counting_session(counter="download.yfinance"):
+    """
+    A curl_cffi session (the one yfinance uses) that adds the body of every
+    response to the "<counter>.bytes" counter, or None without curl_cffi.
+    """
+    try:
+        from curl_cffi import requests as curl_requests
+    except ImportError:
+        return None
+
+    class CountingSession(curl_requests.Session):
+        def request(self, *args, **kwargs):
+            response = super().request(*args, **kwargs)
+            count(f"{counter}.bytes", len(response.content))
+            count(f"{counter}.responses")
+            return response
+
+    return CountingSession(impersonate="chrome")
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Yahoo Finance through yfinance (imported on first use). Every chunk goes
+    through one counting_session(), so the run report has the bytes downloaded.
+    Closes are yfinance's default adjusted closes; with total_return=True they
+    are adjusted for splits only and come with the dividend and split events.
+    """
+    name = "yfinance"
+    requests_per_second = 2
+
+    def __init__(self, requests_per_second=None, total_return=False):
+        super().__init__(requests_per_second)
+        self.total_return = total_return
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                self._session = counting_session()
+            return self._session
+
+    def _download(self, symbols, start=None, period=None, interval="1d"):
+        import yfinance as yf
+
+        options = dict(interval=interval, progress=False, threads=True, group_by='ticker', session=self.session())
+        if self.total_return:
+            # Unadjusted for dividends (they are applied by Adjustments), with the dividend and split events
+            options.update(auto_adjust=False, actions=True)
+        if start is not None:
+            return yf.download(symbols, start=start, **options)
+        return yf.download(symbols, period=period or "max", **options)
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Serves history from local CSV files (<fixture_dir>/<SYMBOL>.csv with Date and Close columns).
+    Symbols in `failing` make any chunk containing them raise, mimicking a bad symbol
+    that breaks a whole batched request.
+    """
+    name = "fixture"
+
+    def __init__(self, fixture_dir, failing=(), requests_per_second=None):
+        super().__init__(requests_per_second)
+        self.fixture_dir = fixture_dir
+        self.failing = set(failing)
+        self.calls = []
+
+    def _load(self, symbol):
+        path = os.path.join(self.fixture_dir, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return None
+        return pd.read_csv(path, parse_dates=["Date"], index_col="Date")
+
+    def _download(self, symbols, start=None, period=None, interval="1d"):
+        self.calls.append((tuple(symbols), start, period, interval))
+        bad = self.failing.intersection(symbols)
+        if bad:
+            raise RuntimeError(f"fixture failure for {sorted(bad)}")
+
+        parts = {}
+        for symbol in symbols:
+            df = self._load(symbol)
+            if df is None:
+                continue
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            if interval == "1wk":
+                df = df.resample("W-MON", label="left", closed="left").last().dropna(how="all")
+            elif period == "1d":
+                df = df.iloc[-1:]
+            for field in df.columns:
+                parts[(symbol, field)] = df[field]
+
+        columns = pd.MultiIndex.from_tuples(list(parts), names=["Ticker", "Price"]) if parts \
+            else pd.MultiIndex.from_arrays([[], []], names=["Ticker", "Price"])
+        frame = pd.DataFrame(parts, columns=columns)
+        frame.index.name = "Date"
+        return frame
+
+
+class FetchResult:
+    """
+    Outcome of fetch_chunks(): the downloaded frames plus the symbols that could
+    not be fetched (`failed`, symbol -> last error) or came back without any rows (`empty`).
+    """
+
+    def __init__(self, requested):
+        self.requested = list(requested)
+        self.frames = []
+        self.failed = {}
+        self.empty = []
+        self.attempts = 0
+
+    def summary(self):
+        lines = [f"Fetched {len(self.requested) - len(self.failed) - len(self.empty)}/{len(self.requested)} symbols "
+                 f"in {self.attempts} requests."]
+        if self.failed:
+            lines.append(f"Could not fetch {len(self.failed)} symbols: {', '.join(sorted(self.failed))}")
+        if self.empty:
+            lines.append(f"No data returned for {len(self.empty)} symbols: {', '.join(sorted(self.empty))}")
+        return "\n".join(lines)
+
+
+def _symbols_with_data(df):
+    if df is None or df.empty or not isinstance(df.columns, pd.MultiIndex):
+        return set()
+    close = df.xs("Close", level=1, axis=1)
+    return set(close.columns[close.notna().any()])
+
+
+def fetch_chunks(provider, symbols, start=None, period=None, interval="1d",
+                 chunk_size=100, max_workers=4, retries=2, backoff=1.0):
+    """
+    Downloads `symbols` in chunks on a bounded thread pool.
+
+    A chunk that raises is retried with exponential backoff (backoff, 2*backoff, ...);
+    once its retries are exhausted it is split in half, and halves that fail are
+    split again straight away, down to single symbols, so one bad symbol cannot
+    take its whole chunk down. Symbols that come back without rows are retried
+    together in a follow-up chunk with the same backoff before they are
+    reported as empty.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    result = FetchResult(symbols)
+
+    def run(chunk, delay):
+        if delay:
+            time.sleep(delay)
+        with span(f"download.{provider.name}"):
+            return provider.download(chunk, start=start, period=period, interval=interval)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+
+        def submit(chunk, attempt=0):
+            delay = backoff * 2 ** (attempt - 1) if 0 < attempt <= retries else 0
+            pending[pool.submit(run, chunk, delay)] = (chunk, attempt)
+
+        for i in range(0, len(symbols), chunk_size):
+            submit(symbols[i:i + chunk_size])
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk, attempt = pending.pop(future)
+                result.attempts += 1
+                count("download.requests")
+                try:
+                    df = future.result()
+                except Exception as e:
+                    count("download.errors")
+                    if attempt < retries:
+                        print(f"Error fetching chunk of {len(chunk)} ({e}), retry {attempt + 1}/{retries}...")
+                        submit(chunk, attempt + 1)
+                    elif len(chunk) > 1:
+                        half = len(chunk) // 2
+                        print(f"Chunk of {len(chunk)} keeps failing, splitting to isolate bad symbols...")
+                        # Halves skip the retry/backoff cycle, the chunk already had its retries
+                        submit(chunk[:half], retries + 1)
+                        submit(chunk[half:], retries + 1)
+                    else:
+                        print(f"Error fetching {chunk[0]}: {e}")
+                        result.failed[chunk[0]] = str(e)
+                    continue
+
+                result.frames.append(df)
+                count("download.rows", len(df))
+                count("download.cells", int(df.notna().to_numpy().sum()))
+                got = _symbols_with_data(df)
+                missing = [s for s in chunk if s not in got]
+                if missing and attempt < retries:
+                    # yfinance answers a throttled or bad ticker with an all-NaN column rather than an error
+                    print(f"No data for {len(missing)} symbols, retry {attempt + 1}/{retries}...")
+                    count("download.empty_retries")
+                    submit(missing, attempt + 1)
+                else:
+                    result.empty.extend(missing)
+
+    return result
@@ -0,0 +1,192 @@
+import json
+import os
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+COMPACT_EVERY = 30
+
+
+def split_rows(final_data):
+    """
+    Splits Data.json content into (columns, {date: values}, {timeframe: [dates]}).
+    A date sampled by several timeframes has a single row, so every row is stored once.
+    """
+    columns = None
+    rows = {}
+    timeframes = {}
+    for tf_label, tf_data in final_data.items():
+        if columns is None:
+            columns = tf_data["columns"][1:]
+        elif tf_data["columns"][1:] != columns:
+            raise ValueError(f"Timeframe {tf_label} has a different column set")
+
+        dates = []
+        for row in tf_data["rows"]:
+            date_str, values = row[0], row[1:]
+            if rows.setdefault(date_str, values) != values:
+                raise ValueError(f"Timeframes disagree on the row for {date_str}")
+            dates.append(date_str)
+        timeframes[tf_label] = dates
+    return columns or [], rows, timeframes
+
+
+def join_rows(columns, rows, timeframes):
+    """
+    Inverse of split_rows(): rebuilds the {timeframe: {columns, rows}} structure.
+    """
+    header = ["Date"] + columns
+    return {
+        tf_label: {"columns": header, "rows": [[d] + rows[d] for d in dates]}
+        for tf_label, dates in timeframes.items()
+    }
+
+
+def apply_delta(state, delta):
+    """
+    Applies one delta to a (columns, rows, timeframes) state and returns the new state.
+    Rows not present in the delta keep their values, remapped by column name
+    when the column set changed.
+    """
+    columns, rows, timeframes = state
+    new_columns = delta.get("columns", columns)
+    if new_columns != columns:
+        index = {c: i for i, c in enumerate(columns)}
+        remap = [index.get(c) for c in new_columns]
+        rows = {d: [None if i is None else values[i] for i in remap] for d, values in rows.items()}
+    else:
+        rows = dict(rows)
+
+    rows.update(delta.get("rows", {}))
+    timeframes = delta["timeframes"]
+
+    # Only keep rows that some timeframe still samples
+    live = set(d for dates in timeframes.values() for d in dates)
+    rows = {d: v for d, v in rows.items() if d in live}
+    return new_columns, rows, timeframes
+
+
+def merge(base, deltas):
+    """
+    Reference merge: base snapshot + ordered deltas -> exact Data.json content.
+    """
+    state = (base["columns"], base["rows"], base["timeframes"])
+    for delta in deltas:
+        state = apply_delta(state, delta)
+    return join_rows(*state)
+
+
+def make_delta(previous, current):
+    """
+    Returns the delta that turns state `previous` into state `current`:
+    every row that is new or whose values changed, the new date lists, and
+    the column list when it changed.
+    """
+    prev_columns, prev_rows, _ = previous
+    columns, rows, timeframes = current
+    if columns != prev_columns:
+        prev_columns, prev_rows, _ = apply_delta(previous, {"columns": columns, "timeframes": timeframes})
+
+    delta = {"timeframes": timeframes, "rows": {}}
+    if columns != previous[0]:
+        delta["columns"] = columns
+    for date_str, values in rows.items():
+        if prev_rows.get(date_str) != values:
+            delta["rows"][date_str] = values
+    return delta
+
+
+def _read_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_json(path, obj):
+    text = json.dumps(obj, indent=None, separators=(',', ':'))
+    with open(path, "w") as f:
+        f.write(text)
+    return len(text)
+
+
+def read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    return _read_json(path) if os.path.exists(path) else None
+
+
+def load_published(out_dir, manifest=None):
+    """
+    Reproduces Data.json content from the base snapshot and deltas in out_dir.
+    """
+    manifest = manifest or read_manifest(out_dir)
+    if manifest is None:
+        return {}
+    base = _read_json(os.path.join(out_dir, manifest["base"]))
+    deltas = [_read_json(os.path.join(out_dir, name)) for name in manifest["deltas"]]
+    return merge(base, deltas)
+
+
+def publish(final_data, out_dir, compact_every=None):
+    """
+    Publishes Data.json content as an immutable base snapshot plus append-only deltas.
+
+    Each run appends one small delta-<seq>.json holding only new or changed rows
+    and the day's date lists. Once there would be `compact_every` deltas (or the
+    deltas would outgrow the base) the current state is written out as a fresh
+    base and the old files are removed (`compact_every` defaults to
+    COMPACT_EVERY). Files are never rewritten in place.
+    """
+    return publish_rows(split_rows(final_data), out_dir, compact_every)
+
+
+def publish_rows(current, out_dir, compact_every=None):
+    """
+    publish() for Data.json content already split into (columns, {date: values},
+    {timeframe: [dates]}), e.g. JsonEncode.rounded_rows().
+    """
+    compact_every = compact_every or COMPACT_EVERY
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = read_manifest(out_dir)
+
+    seq = 1
+    stale = []
+    if manifest is not None:
+        base = _read_json(os.path.join(out_dir, manifest["base"]))
+        state = (base["columns"], base["rows"], base["timeframes"])
+        for name in manifest["deltas"]:
+            state = apply_delta(state, _read_json(os.path.join(out_dir, name)))
+
+        delta = make_delta(state, current)
+        if not delta["rows"] and "columns" not in delta and delta["timeframes"] == state[2]:
+            print("Published data unchanged, no delta written.")
+            return manifest
+
+        seq = manifest["sequence"] + 1
+        delta_bytes = manifest["deltaBytes"] + len(json.dumps(delta, separators=(',', ':')))
+        if len(manifest["deltas"]) + 1 < compact_every and delta_bytes < manifest["baseBytes"]:
+            name = f"delta-{seq:05d}.json"
+            size = _write_json(os.path.join(out_dir, name), delta)
+            manifest["deltas"].append(name)
+            manifest["deltaBytes"] += size
+            manifest["sequence"] = seq
+            _write_json(os.path.join(out_dir, MANIFEST_NAME), manifest)
+            print(f"Wrote {name} ({size:,} bytes, {len(delta['rows'])} rows).")
+            return manifest
+
+        print("Compacting deltas into a new base snapshot...")
+        stale = [manifest["base"]] + manifest["deltas"]
+
+    columns, rows, timeframes = current
+    name = f"base-{seq:05d}.json"
+    size = _write_json(os.path.join(out_dir, name), {"columns": columns, "rows": rows, "timeframes": timeframes})
+    manifest = {
+        "version": FORMAT_VERSION,
+        "sequence": seq,
+        "base": name,
+        "baseBytes": size,
+        "deltas": [],
+        "deltaBytes": 0
+    }
+    _write_json(os.path.join(out_dir, MANIFEST_NAME), manifest)
+    for stale_name in stale:
+        os.remove(os.path.join(out_dir, stale_name))
+    print(f"Wrote base snapshot {name} ({size:,} bytes).")
+    return manifest
@@ -0,0 +1,232 @@
+import io
+import json
+import os
+import time
+import urllib.error
+import urllib.request as request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Instrument import count, timed
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_REFERENCE_DIR = os.path.join(PROJECT_ROOT, "cache", "reference")
+
+CPI_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=CPIAUCSL"
+GOLD_URL = "https://raw.githubusercontent.com/datasets/gold-prices/main/data/monthly.csv"
+
+# CPI prints monthly and the gold dataset rarely changes; revalidate at most daily
+DEFAULT_TTL_HOURS = 24
+
+
+class ReferenceCache:
+    """
+    On-disk cache of the reference CSVs (cache/reference/<name>.csv).
+
+    Each file has a <name>.json sidecar with the source URL, the ETag and
+    Last-Modified headers of the last response and when it was fetched.
+    Within the TTL the cached copy is used as is; after it, the source is
+    revalidated with a conditional request (304 keeps the cached copy).
+    When the source cannot be reached, or offline=True, the cached copy is
+    used regardless of its age. Other text sources (e.g. the constituent
+    lists, see Constituents) reuse it with a different `suffix`.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_REFERENCE_DIR, ttl_hours=DEFAULT_TTL_HOURS, offline=False, suffix=".csv"):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        self.offline = offline
+        self.suffix = suffix
+
+    def _paths(self, name):
+        return os.path.join(self.cache_dir, f"{name}{self.suffix}"), os.path.join(self.cache_dir, f"{name}.json")
+
+    def _read(self, name):
+        data_path, meta_path = self._paths(name)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None, None
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        with open(data_path, "r") as f:
+            return f.read(), meta
+
+    def _write_meta(self, name, meta):
+        with open(self._paths(name)[1], "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def get(self, name, url, headers=None):
+        """
+        Returns the text for `url`, from the cache when it is fresh enough.
+        Returns None when there is neither a cached copy nor a reachable source.
+        """
+        text, meta = self._read(name)
+        if text is not None and meta.get("url") != url:
+            text, meta = None, None
+
+        if text is not None and (self.offline or time.time() - meta["fetchedAt"] < self.ttl_seconds):
+            count("reference.hit")
+            return text
+        if self.offline:
+            print(f"No cached copy of {name} for offline use.")
+            return None
+
+        headers = dict(headers or {})
+        if text is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("lastModified"):
+                headers["If-Modified-Since"] = meta["lastModified"]
+
+        print(f"Fetching {name} from {url}...")
+        try:
+            with request.urlopen(request.Request(url, headers=headers)) as response:
+                raw = response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and text is not None:
+                count("reference.revalidated")
+                meta["fetchedAt"] = time.time()
+                self._write_meta(name, meta)
+                return text
+            return self._fallback(name, text, e)
+        except Exception as e:
+            return self._fallback(name, text, e)
+
+        count("reference.miss")
+        count("download.bytes", len(raw))
+        text = raw.decode('utf-8')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path = self._paths(name)[0]
+        with open(data_path + ".tmp", "w") as f:
+            f.write(text)
+        os.replace(data_path + ".tmp", data_path)
+        self._write_meta(name, {
+            "url": url,
+            "etag": etag,
+            "lastModified": last_modified,
+            "fetchedAt": time.time(),
+            "fetchedAtIso": datetime.now().isoformat(timespec="seconds")
+        })
+        return text
+
+    def _fallback(self, name, text, error):
+        if text is None:
+            print(f"Error fetching {name}: {error}")
+            return None
+        print(f"Error fetching {name} ({error}), using the cached copy.")
+        count("reference.stale")
+        return text
+
+
+def _empty_monthly():
+    return pd.Series(dtype=float, index=pd.PeriodIndex([], freq="M"))
+
+
+def monthly_series(values):
+    """
+    Normalizes a {YYYY-MM: value} dict or a Series into a float Series with a
+    sorted monthly PeriodIndex.
+    """
+    values = pd.Series(values, dtype=float)
+    if not isinstance(values.index, pd.PeriodIndex):
+        values.index = pd.PeriodIndex(values.index, freq="M")
+    return values[~values.index.duplicated(keep="last")].sort_index()
+
+
+def monthly_join(series, dates, ffill=False):
+    """
+    Looks up each date's month in a monthly series in one vectorized join.
+    With ffill=True, months after the last value take the last value.
+    Returns a float array aligned with `dates` (NaN where nothing matched).
+    """
+    periods = pd.PeriodIndex(pd.DatetimeIndex(dates), freq="M")
+    if series is None or len(series) == 0:
+        return np.full(len(periods), np.nan)
+    series = monthly_series(series)
+    joined = series.reindex(periods, method="ffill" if ffill else None)
+    return joined.to_numpy(dtype=float, na_value=np.nan)
+
+
+def parse_cpi_multipliers(csv_text):
+    """
+    FRED CPIAUCSL CSV -> Series of Latest_CPI / Historical_CPI per month (rounded to 4 decimals).
+    """
+    df = pd.read_csv(io.StringIO(csv_text))
+    # Drop rows with NaN CPI values
+    df = df.dropna(subset=['CPIAUCSL'])
+    if df.empty:
+        return _empty_monthly()
+
+    latest_cpi = df['CPIAUCSL'].iloc[-1]
+    # Create a complete range of months from start to latest available month
+    df['observation_date'] = pd.to_datetime(df['observation_date'])
+    cpi = df.set_index('observation_date')['CPIAUCSL'].resample('MS').ffill()
+    cpi = cpi[cpi > 0]
+
+    # Python's round() on ~1k values, matching the previous per-row output exactly
+    multipliers = (latest_cpi / cpi).map(lambda v: round(v, 4))
+    multipliers.index = multipliers.index.to_period("M")
+    return multipliers
+
+
+def parse_historical_gold(csv_text):
+    """
+    datasets/gold-prices monthly CSV (Date=YYYY-MM, Price) -> Series of prices per month.
+    """
+    df = pd.read_csv(io.StringIO(csv_text)).dropna()
+    gold = pd.Series(df['Price'].to_numpy(dtype=float), index=pd.PeriodIndex(df['Date'], freq="M"))
+    return gold[~gold.index.duplicated(keep="last")].sort_index()
+
+
+@timed("reference.cpi")
+def load_cpi_multipliers(cache=None, url=CPI_URL):
+    """
+    CPI multipliers as a monthly Series (empty when unavailable).
+    """
+    text = (cache or ReferenceCache()).get("cpi", url)
+    if text is None:
+        return _empty_monthly()
+    try:
+        multipliers = parse_cpi_multipliers(text)
+    except Exception as e:
+        print(f"Error parsing CPI data: {e}")
+        return _empty_monthly()
+    print(f"Loaded {len(multipliers)} CPI data points.")
+    return multipliers
+
+
+@timed("reference.gold")
+def load_historical_gold(cache=None, url=GOLD_URL):
+    """
+    Monthly historical gold prices used as fallback for dates before Yahoo
+    Finance data (2000), as a monthly Series (empty when unavailable).
+    """
+    text = (cache or ReferenceCache()).get("gold", url)
+    if text is None:
+        return _empty_monthly()
+    try:
+        gold = parse_historical_gold(text)
+    except Exception as e:
+        print(f"Error parsing historical gold data: {e}")
+        return _empty_monthly()
+    print(f"Loaded {len(gold)} historical gold prices.")
+    return gold
+
+
+def get_cpi_multipliers(cache=None, url=CPI_URL):
+    """
+    Map of {YYYY-MM: multiplier}, Multiplier = Latest_CPI / Historical_CPI.
+    """
+    multipliers = load_cpi_multipliers(cache, url)
+    return dict(zip(multipliers.index.strftime('%Y-%m'), multipliers.tolist()))
+
+
+def get_historical_gold(cache=None, url=GOLD_URL):
+    """
+    Map of {YYYY-MM: price} of monthly historical gold prices.
+    """
+    gold = load_historical_gold(cache, url)
+    return dict(zip(gold.index.strftime('%Y-%m'), gold.tolist()))
@@ -0,0 +1,116 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from Assembly import rows_to_matrix
+from Denominators import denominate as denominate_prices, parse_denominator
+
+DENOMINATORS = ["USD", "Gold", "Silver", "Platinum", "Inflation Adjusted $"]
+METRICS = ["totalReturn", "cagr", "maxDrawdown", "volatility"]
+
+# Columns that are reference series rather than assets
+NON_ASSET_COLUMNS = {"Inflation Adjusted $"}
+
+
+def denominate(values, columns, denominators=DENOMINATORS):
+    """
+    Returns a (denominator, date, column) tensor of prices expressed in each denominator,
+    using the same conventions as the chart: metals divide the USD price,
+    "Inflation Adjusted $" multiplies it by the CPI multiplier.
+    A denominator missing from `columns` (or non-positive on a date) yields NaN.
+    Any spec accepted by Denominators.parse_denominator() works here too.
+    """
+    return denominate_prices(values, columns, denominators)
+
+
+def return_metrics(prices, dates):
+    """
+    Computes the metrics in METRICS for a (..., date, column) price tensor.
+
+    Returns are measured from each column's first to last valid point, CAGR uses
+    365.25-day years (like RoiCalc), max drawdown is the deepest fall from a running
+    peak and volatility is the annualized standard deviation of log returns between
+    consecutive sampled points. Output shape is (len(METRICS), ..., column).
+    """
+    days = pd.DatetimeIndex(dates).values.astype("datetime64[D]").astype(np.int64).astype(float)
+    n_dates = prices.shape[-2]
+    valid = ~np.isnan(prices)
+    has = valid.any(axis=-2)
+
+    first = np.argmax(valid, axis=-2)
+    last = n_dates - 1 - np.argmax(valid[..., ::-1, :], axis=-2)
+    start = np.take_along_axis(prices, first[..., None, :], axis=-2)[..., 0, :]
+    end = np.take_along_axis(prices, last[..., None, :], axis=-2)[..., 0, :]
+    years = (days[last] - days[first]) / 365.25 if n_dates else np.zeros_like(start)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        ok = has & (start > 0)
+        total = np.where(ok, end / start - 1, np.nan)
+        cagr = np.where(ok & (end > 0) & (years > 0), (end / start) ** (1 / np.where(years > 0, years, 1)) - 1, np.nan)
+
+        peak = np.fmax.accumulate(prices, axis=-2) if n_dates else prices
+        drawdown = np.where(peak > 0, prices / peak - 1, np.nan)
+        max_drawdown = np.fmin.reduce(drawdown, axis=-2) if n_dates else np.full(start.shape, np.nan)
+
+        positive = np.where(prices > 0, prices, np.nan)
+        log_returns = np.diff(np.log(positive), axis=-2)
+        dt = np.diff(days) / 365.25
+        scaled = log_returns / np.sqrt(np.where(dt > 0, dt, np.nan))[:, None]
+        count = (~np.isnan(scaled)).sum(axis=-2)
+        mean = np.nansum(scaled, axis=-2) / np.where(count > 0, count, 1)
+        var = np.nansum((scaled - mean[..., None, :]) ** 2, axis=-2) / np.where(count > 1, count - 1, 1)
+        volatility = np.where(count > 1, np.sqrt(var), np.nan)
+
+    return np.stack([total, cagr, max_drawdown, volatility])
+
+
+def compute_return_matrices(final_data, denominators=DENOMINATORS):
+    """
+    Computes every metric for every asset x timeframe x denominator.
+    Returns {"tickers", "denominators", "metrics", "timeframes": {tf: array}} where each
+    array is shaped (metric, denominator, ticker).
+    """
+    return compute_returns({tf_label: rows_to_matrix(tf_data) for tf_label, tf_data in final_data.items()},
+                           denominators)
+
+
+def compute_returns(matrices, denominators=DENOMINATORS):
+    """
+    compute_return_matrices() for {timeframe: (dates, columns, date x column values)}
+    matrices (see JsonEncode.rounded_matrices()), NaN for null.
+    """
+    denominators = [parse_denominator(d) for d in denominators]
+    result = {"tickers": None, "denominators": [d.name for d in denominators], "metrics": list(METRICS),
+              "timeframes": {}}
+    for tf_label, (dates, columns, values) in matrices.items():
+        keep = [i for i, c in enumerate(columns) if c not in NON_ASSET_COLUMNS]
+        if result["tickers"] is None:
+            result["tickers"] = [columns[i] for i in keep]
+
+        prices = denominate(values, columns, denominators)[:, :, keep]
+        result["timeframes"][tf_label] = return_metrics(prices, dates)
+    return result
+
+
+def save_return_matrices(matrices, output_path):
+    """
+    Writes the matrices as compact JSON: percentages rounded to 2 decimals,
+    nested as timeframes[tf][metric][denominator] -> list aligned with "tickers".
+    """
+    payload = {
+        "tickers": matrices["tickers"],
+        "denominators": matrices["denominators"],
+        "metrics": matrices["metrics"],
+        "unit": "percent",
+        "timeframes": {}
+    }
+    for tf_label, array in matrices["timeframes"].items():
+        pct = np.round(array * 100, 2)
+        cells = pct.astype(object)
+        cells[~np.isfinite(pct)] = None
+        payload["timeframes"][tf_label] = cells.tolist()
+
+    with open(output_path, "w") as f:
+        json.dump(payload, f, indent=None, separators=(',', ':'))
+    return payload
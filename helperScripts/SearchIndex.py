@@ -0,0 +1,259 @@
+"""
+Ticker search index written next to tickers.json (public/search.json).
+
+Every entry of the universe is indexed under normalized keys (lowercase
+ASCII letters and digits only):
+
+  - symbol keys: the whole symbol ("BRK-B" -> "brkb") and its first part ("brk")
+  - name keys: every word of the label and the display name except STOPWORDS,
+    and the whole name ("S&P 500 Index" -> "sp500index")
+
+Entries are sorted by popularity (see build_search_index()), so an entry's
+position is its popularity rank. Keys are one sorted table; each key has the
+entries it came from as refs, entry * 2 for a symbol key and entry * 2 + 1
+for a name key, stored as an int when there is one. The keys with a prefix
+are a contiguous range of the table found by two binary searches, and their
+refs a contiguous slice of the flattened refs; `heads` holds the first
+HEAD_SIZE results of every one and two character query, whose ranges are
+the longest.
+
+Every prefix one edit away (deletion, substitution, insertion or swap of two
+neighbours) of a query of at least TYPO_MIN_LENGTH characters is probed too.
+Results are ranked by RANKS (matches of the query itself first), then exact
+symbol, symbol prefix and name prefix, then popularity.
+SearchIndex.query() is the reference implementation of the lookup.
+"""
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from Instrument import count, timed
+
+FORMAT_VERSION = 1
+INDEX_NAME = "search.json"
+HEAD_LENGTH = 2
+HEAD_SIZE = 10
+TYPO_MIN_LENGTH = 3
+# How a match ranks before its kind and popularity: a key starting with the
+# query, then keys one edit away (whole keys before longer keys starting with
+# the edit, and a deletion, which is a shorter and broader prefix, after an
+# edit of the same length or longer)
+RANKS = {"exact": 0, "whole_typo": 1, "short_whole_typo": 2, "typo": 3, "short_typo": 4}
+
+# Categories in the order they rank when popularity scores tie
+TYPE_ORDER = ["Metal", "Index", "ETF", "Crypto", "SP500"]
+STOPWORDS = {"inc", "corp", "corporation", "co", "company", "companies", "the", "plc", "ltd", "group",
+             "holdings", "and", "of", "class"}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """
+    Lowercase ASCII letters and digits of `text`, accents folded ("Nestlé S.A." -> "nestlesa").
+    """
+    return "".join(_WORD.findall(_fold(text)))
+
+
+def _fold(text):
+    return unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().lower()
+
+
+def entry_keys(entry):
+    """
+    (symbol keys, name keys) of a universe entry.
+    """
+    parts = _WORD.findall(_fold(entry["symbol"]))
+    symbol_keys = {normalize(entry["symbol"])}
+    if parts:
+        symbol_keys.add(parts[0])
+    name_keys = set()
+    for text in (entry["label"], entry.get("name") or entry["label"]):
+        words = _WORD.findall(_fold(text))
+        name_keys.update(w for w in words if w not in STOPWORDS)
+        name_keys.add("".join(words))
+    symbol_keys.discard("")
+    name_keys.discard("")
+    return symbol_keys, name_keys - symbol_keys
+
+
+def popularity_order(universe, popularity=None):
+    """
+    The universe sorted by popularity: `popularity` scores ({label: number},
+    higher first) when given, then TYPE_ORDER, then the universe order (the
+    hand-picked groups are listed by prominence, crypto by market cap).
+    """
+    popularity = popularity or {}
+    ranked = sorted(enumerate(universe), key=lambda item: (
+        -popularity.get(item[1]["label"], 0),
+        TYPE_ORDER.index(item[1]["type"]) if item[1]["type"] in TYPE_ORDER else len(TYPE_ORDER),
+        item[0]))
+    return [entry for _, entry in ranked]
+
+
+def build_search_index(universe, popularity=None):
+    """
+    The search.json structure for a universe (see the module docstring).
+    """
+    ordered = popularity_order(universe, popularity)
+    types = list(dict.fromkeys(e["type"] for e in ordered))
+    postings = {}
+    entries = []
+    for i, entry in enumerate(ordered):
+        row = [entry["symbol"], entry["label"], types.index(entry["type"])]
+        if entry.get("name") and entry["name"] != entry["label"]:
+            row.append(entry["name"])
+        entries.append(row)
+        symbol_keys, name_keys = entry_keys(entry)
+        for key in symbol_keys:
+            postings.setdefault(key, []).append(i * 2)
+        for key in name_keys:
+            postings.setdefault(key, []).append(i * 2 + 1)
+
+    keys = sorted(postings)
+    index = {
+        "version": FORMAT_VERSION,
+        "types": types,
+        "entries": entries,
+        "keys": keys,
+        "refs": [refs[0] if len(refs) == 1 else refs for refs in (postings[k] for k in keys)],
+        "heads": {}
+    }
+    search = SearchIndex(index)
+    heads = sorted({key[:n] for key in keys for n in range(1, HEAD_LENGTH + 1) if len(key) >= n})
+    index["heads"] = {head: [i for i, _ in search.scan(head, HEAD_SIZE)] for head in heads}
+    count("search.keys", len(keys))
+    return index
+
+
+@timed("export.search")
+def save_search_index(universe, public_dir, popularity=None):
+    """
+    Writes public/search.json. Returns its size in bytes.
+    """
+    payload = json.dumps(build_search_index(universe, popularity), indent=None, separators=(',', ':'))
+    path = os.path.join(public_dir, INDEX_NAME)
+    with open(path, "w") as f:
+        f.write(payload)
+    count(f"bytes.{INDEX_NAME}", len(payload))
+    print(f"Successfully saved the search index to {path}")
+    return len(payload)
+
+
+def load_popularity(path=None):
+    """
+    {label: score} from a JSON file (e.g. page views per ticker), or None.
+    """
+    if not path:
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _edits(text, alphabet):
+    """
+    Every string one deletion, swap, substitution or insertion away from
+    `text` (possibly repeated, or `text` itself). Insertions after the last
+    character are left out: as prefixes they match a subset of what `text`
+    itself matches.
+    """
+    n = len(text)
+    variants = [text[:i] + text[i + 1:] for i in range(n)]
+    variants += [text[:i] + text[i + 1] + text[i] + text[i + 2:] for i in range(n - 1)]
+    variants += [text[:i] + c + text[i + 1:] for i in range(n) for c in alphabet]
+    variants += [text[:i] + c + text[i:] for i in range(n) for c in alphabet]
+    return variants
+
+
+class SearchIndex:
+    """
+    Prefix and typo-tolerant lookups over a search.json structure. The refs
+    are flattened into one array, so the refs of every key with a prefix are
+    one contiguous slice; probing all the typo variants of a query is a single
+    vectorized binary search.
+    """
+
+    def __init__(self, index):
+        self.entries = index["entries"]
+        self.types = index["types"]
+        self.keys = index["keys"]
+        self.heads = index.get("heads", {})
+        self.alphabet = sorted(set("".join(self.keys)))
+        refs = [r if isinstance(r, list) else [r] for r in index["refs"]]
+        self._keys = np.array(self.keys, dtype=str)
+        self._offsets = np.concatenate([[0], np.cumsum([len(r) for r in refs])]).astype(np.int64)
+        self._flat = np.fromiter((ref for r in refs for ref in r), dtype=np.int64, count=int(self._offsets[-1]))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def _scores(self, prefixes, ranks, query, whole_ranks=None):
+        """
+        Rank (rank, kind, entry) packed into one int per ref, for the refs of
+        every key starting with a prefix. Refs of a key equal to its prefix get
+        its `whole_ranks` rank instead when given.
+        """
+        prefixes = np.array(prefixes, dtype=str)
+        lo = np.searchsorted(self._keys, prefixes, side="left")
+        # "~" sorts after every letter and digit, so [lo, hi) is every key with the prefix
+        hi = np.searchsorted(self._keys, np.char.add(prefixes, "~"), side="left")
+        n = len(self.entries)
+        parts = []
+        for p in np.flatnonzero(hi > lo):
+            start, end = lo[p], hi[p]
+            refs = self._flat[self._offsets[start]:self._offsets[end]]
+            kind = np.where(refs & 1, 2, 1)
+            rank = np.full(len(refs), ranks[p], dtype=np.int64)
+            if self.keys[start] == prefixes[p]:
+                whole = int(self._offsets[start + 1] - self._offsets[start])
+                if self.keys[start] == query:
+                    # Symbol refs of the key equal to the query are exact symbol matches
+                    kind[:whole] = np.where(refs[:whole] & 1, 2, 0)
+                if whole_ranks is not None:
+                    rank[:whole] = whole_ranks[p]
+            parts.append(rank * 3 * n + kind * n + (refs >> 1))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def scan(self, query, limit=10, typos=True):
+        """
+        [(entry index, (typos, kind, entry))] of the best `limit` matches of a
+        normalized query, typos 1 for a match of an edit (see RANKS).
+        """
+        scores = self._scores([query], [RANKS["exact"]], query)
+        if typos and len(query) >= TYPO_MIN_LENGTH:
+            variants = _edits(query, self.alphabet)
+            # A deletion is a shorter prefix, which matches more keys than the query ever could
+            short = [len(v) < len(query) for v in variants]
+            ranks = [RANKS["short_typo" if is_short else "typo"] for is_short in short]
+            whole_ranks = [RANKS["short_whole_typo" if is_short else "whole_typo"] for is_short in short]
+            # The query itself comes back among its variants; its refs keep their exact ranks
+            scores = np.concatenate([scores, self._scores(variants, ranks, query, whole_ranks)])
+        if not len(scores):
+            return []
+        n = len(self.entries)
+        scores = np.sort(scores)
+        # Best score of every entry, then the best entries
+        entries, first = np.unique(scores % n, return_index=True)
+        best = np.sort(scores[first])[:limit]
+        return [(int(s % n), (int(s // (3 * n) > RANKS["exact"]), int(s // n % 3), int(s % n))) for s in best]
+
+    def query(self, text, limit=10, typos=True):
+        """
+        The best `limit` entries for what the user typed, as {symbol, label, name, type} dicts.
+        """
+        query = normalize(text)
+        if not query:
+            return []
+        head = self.heads.get(query) if len(query) <= HEAD_LENGTH and limit <= HEAD_SIZE else None
+        found = head[:limit] if head is not None else [i for i, _ in self.scan(query, limit, typos)]
+        return [self.entry(i) for i in found]
+
+    def entry(self, i):
+        row = self.entries[i]
+        return {"symbol": row[0], "label": row[1], "name": row[3] if len(row) > 3 else row[1],
+                "type": self.types[row[2]]}
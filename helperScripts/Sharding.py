@@ -0,0 +1,200 @@
+"""
+Column-sharded assembly across worker processes.
+
+Every worker builds a contiguous range of columns end to end: it takes its
+symbols' closes from the source, reindexes them to the dates and resolves
+them (rounding, stored values, gold/CPI fallbacks; see
+Assembly._resolve_columns()) straight into a shared output block. The source
+is either a date x symbol DataFrame, copied once into shared memory (workers
+only receive integer row/column positions into it), or a StoreCloses, which
+each worker reads and pivots from the price store for its own symbols only.
+Columns are independent, so the result is identical to the single-process
+path.
+
+Processes only pay off on large panels: shard_workers() stays in process
+below MIN_SHARD_CELLS cells per worker and never starts more workers than
+there are CPUs.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from Instrument import count, span
+
+# Smallest (dates x columns) block worth a worker process; below it the
+# process start-up and the shared-memory copies cost more than they save
+MIN_SHARD_CELLS = 2_000_000
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def shard_workers(n_rows, n_columns, workers):
+    """
+    How many processes to assemble an n_rows x n_columns block with: at most
+    `workers` and the available CPUs, with at least MIN_SHARD_CELLS cells each.
+    1 means the single-process path.
+    """
+    by_size = (n_rows * n_columns) // MIN_SHARD_CELLS
+    return int(max(1, min(workers, available_cpus(), by_size, n_columns)))
+
+
+def shard_bounds(n_columns, workers):
+    """
+    Splits range(n_columns) into at most `workers` contiguous (start, end) ranges of near-equal size.
+    """
+    n_shards = max(1, min(workers, n_columns))
+    edges = np.linspace(0, n_columns, n_shards + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def take_block(block, rows, cols):
+    """
+    block[rows][:, cols] as a new array, NaN where a position is -1 (as DataFrame.reindex gives for missing labels).
+    """
+    out = np.full((len(rows), len(cols)), np.nan)
+    row_ok, col_ok = rows >= 0, cols >= 0
+    if row_ok.any() and col_ok.any():
+        out[np.ix_(row_ok, col_ok)] = block[np.ix_(rows[row_ok], cols[col_ok])]
+    return out
+
+
+class StoreCloses:
+    """
+    Closes read from a PriceStore on demand, so a worker only loads and
+    pivots its own symbols' rows. With total_return=True, symbols with
+    TR_SUFFIX are the total-return closes of their base symbol (see Adjustments).
+    """
+
+    def __init__(self, path, total_return=False):
+        self.path = path
+        self.total_return = total_return
+
+    def labels(self, tickers_map):
+        """
+        `tickers_map` plus a "<label> (TR)" label for every dividend payer when total_return=True.
+        """
+        if not self.total_return:
+            return tickers_map
+        from Adjustments import TR_SUFFIX
+        from PriceStore import PriceStore
+        with PriceStore(self.path) as store:
+            actions = store.load_actions(list(tickers_map.values()))
+        paying = set(actions.loc[actions["dividend"] > 0, "symbol"])
+        labels = dict(tickers_map)
+        for label, symbol in tickers_map.items():
+            if symbol in paying:
+                labels[label + TR_SUFFIX] = symbol + TR_SUFFIX
+        return labels
+
+    def block(self, symbols, dates):
+        """
+        The (dates x symbols) float closes, NaN where nothing is stored.
+        """
+        from Adjustments import TR_SUFFIX, total_return_close
+        from PriceStore import PriceStore
+
+        base = list(dict.fromkeys(s[:-len(TR_SUFFIX)] if s.endswith(TR_SUFFIX) else s for s in symbols))
+        with PriceStore(self.path) as store:
+            close = store.load(base, dates=dates).reindex(index=dates)
+            if self.total_return:
+                close = pd.concat([close, total_return_close(close, store.load_actions(base))], axis=1)
+        return close.reindex(columns=symbols).to_numpy(dtype=float, copy=True)
+
+
+def _shared_array(shape, source=None):
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    array = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    if source is not None:
+        array[:] = source
+    return shm, array
+
+
+def _resolve_shard(source, out_name, shape, start, end, dates, keys, symbols, existing_lookup,
+                   cpi_multipliers, historical_gold, round_closes):
+    """
+    Worker body: loads and resolves columns [start, end) into the shared output.
+    `source` is a StoreCloses or (shared block name, block shape, row positions, column positions).
+    """
+    from Assembly import _resolve_columns
+
+    if isinstance(source, StoreCloses):
+        fetched = source.block(symbols, dates)
+    else:
+        in_name, in_shape, rows, cols = source
+        shm_in = shared_memory.SharedMemory(name=in_name)
+        try:
+            block = np.ndarray(in_shape, dtype=float, buffer=shm_in.buf)
+            fetched = take_block(block, rows, cols)
+            del block
+        finally:
+            shm_in.close()
+
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        out = np.ndarray(shape, dtype=float, buffer=shm_out.buf)
+        out[:, start:end] = _resolve_columns(fetched, dates, keys, existing_lookup,
+                                             cpi_multipliers, historical_gold, round_closes)
+        del out
+    finally:
+        shm_out.close()
+    return end - start
+
+
+def resolve_sharded(close, dates, keys, symbols, existing_lookup=None, cpi_multipliers=None,
+                    historical_gold=None, round_closes=True, workers=2):
+    """
+    Same result as Assembly.assemble_matrix() for `close` (a date x symbol
+    DataFrame or a StoreCloses) with keys[i] read from symbols[i], the columns
+    split over `workers` processes. Each worker only receives the stored
+    values and reference series its columns need, and the dates only when it
+    needs them (reading the store, stored values or a monthly fallback).
+    """
+    shape = (len(dates), len(keys))
+    bounds = shard_bounds(shape[1], workers)
+    shm_in = None
+    if isinstance(close, pd.DataFrame):
+        rows = close.index.get_indexer(dates)
+        # Created before the pool starts so the workers share the parent's resource tracker
+        shm_in, _ = _shared_array(close.shape, close.to_numpy(dtype=float))
+    shm_out, out = _shared_array(shape)
+    try:
+        with span("assemble.sharded"), ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+            futures = []
+            for start, end in bounds:
+                shard_keys, shard_symbols = keys[start:end], symbols[start:end]
+                wanted = set(shard_keys)
+                shard_existing = None
+                if existing_lookup:
+                    shard_existing = {d: {k: v for k, v in row.items() if k in wanted}
+                                      for d, row in existing_lookup.items()}
+                if shm_in is None:
+                    source = close
+                else:
+                    source = (shm_in.name, close.shape, rows, close.columns.get_indexer(shard_symbols))
+                needs_dates = (shm_in is None or bool(shard_existing)
+                               or bool(wanted.intersection(("Gold", "Inflation Adjusted $"))))
+                futures.append(pool.submit(
+                    _resolve_shard, source, shm_out.name, shape, start, end,
+                    dates if needs_dates else None, shard_keys, shard_symbols, shard_existing,
+                    cpi_multipliers if "Inflation Adjusted $" in wanted else None,
+                    historical_gold if "Gold" in wanted else None,
+                    round_closes
+                ))
+            for future in futures:
+                future.result()
+        count("assembly.shards", len(bounds))
+        return out.copy()
+    finally:
+        del out
+        for shm in (shm_in, shm_out):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
@@ -1,72 +1,185 @@
-import yfinance as yf
+import json
+import os
 import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
 
-def get_trading_days():
+from Instrument import count, span
+from Providers import YFinanceProvider
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CALENDAR_PATH = os.path.join(PROJECT_ROOT, "cache", "trading_days.json")
+
+# ^GSPC = S&P 500, its sessions are the NYSE trading days
+CALENDAR_SYMBOL = "^GSPC"
+
+TIMEFRAMES = {
+    "Max": 365 * 100,
+    "30y": 365 * 30,
+    "20y": 365 * 20,
+    "10y": 365 * 10,
+    "5y": 365 * 5,
+    "2y": 365 * 2,
+    "1y": 365,
+    "6m": 30 * 6,
+    "3m": 30 * 3
+}
+
+# Target ~100 points per timeframe
+TARGET_POINTS = 100
+
+# Average NYSE sessions per calendar day, used to size the anchored grid
+SESSIONS_PER_DAY = 252 / 365
+
+
+class TradingCalendar:
+    """
+    NYSE session dates cached on disk (cache/trading_days.json).
+
+    The first run downloads the full ^GSPC history; later runs only fetch the
+    last couple of weeks and append any new sessions, at most once per day.
+    With offline=True the cached dates are used as they are, whatever their age.
+    """
+
+    def __init__(self, path=DEFAULT_CALENDAR_PATH, provider=None, refresh_overlap_days=14, offline=False):
+        self.path = path
+        self.provider = provider
+        self.refresh_overlap_days = refresh_overlap_days
+        self.offline = offline
+        self._days = None
+
+    def _load_cache(self):
+        if not os.path.exists(self.path):
+            return None, None
+        try:
+            with open(self.path, "r") as f:
+                cached = json.load(f)
+            return cached.get("fetched_at"), pd.DatetimeIndex(cached["dates"])
+        except Exception as e:
+            print(f"Could not load trading calendar cache: {e}")
+            return None, None
+
+    def _save_cache(self, days):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({
+                "fetched_at": datetime.now().strftime("%Y-%m-%d"),
+                "dates": [d.strftime("%Y-%m-%d") for d in days]
+            }, f, indent=None, separators=(',', ':'))
+
+    def _fetch(self, start=None):
+        provider = self.provider or YFinanceProvider()
+        df = provider.download([CALENDAR_SYMBOL], start=start)
+        close = df[(CALENDAR_SYMBOL, "Close")] if isinstance(df.columns, pd.MultiIndex) else df["Close"]
+        index = close.dropna().index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return index.normalize()
+
+    def trading_days(self, today=None):
+        """
+        Returns the sorted, tz-naive DatetimeIndex of session dates.
+        """
+        if self._days is not None:
+            return self._days
+
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        with span("calendar"):
+            fetched_at, cached = self._load_cache()
+
+            if self.offline:
+                if cached is None or cached.empty:
+                    raise RuntimeError(f"No cached trading calendar at {self.path} for offline use.")
+                count("calendar.hit")
+                days = cached
+            elif cached is None or cached.empty:
+                print(f"Fetching full {CALENDAR_SYMBOL} history for the trading calendar...")
+                count("calendar.miss")
+                days = self._fetch()
+                self._save_cache(days)
+            elif fetched_at is not None and fetched_at >= today:
+                count("calendar.hit")
+                days = cached
+            else:
+                start = (cached[-1] - timedelta(days=self.refresh_overlap_days)).strftime("%Y-%m-%d")
+                print(f"Refreshing trading calendar from {start}...")
+                count("calendar.refresh")
+                try:
+                    tail = self._fetch(start=start)
+                    days = cached[cached < pd.Timestamp(start)].append(tail).unique().sort_values()
+                    self._save_cache(days)
+                except Exception as e:
+                    print(f"Could not refresh trading calendar, using cached dates: {e}")
+                    days = cached
+
+        self._days = pd.DatetimeIndex(days)
+        return self._days
+
+
+def get_trading_days(calendar=None):
+    """
+    Returns the list of valid NYSE trading days (cached, see TradingCalendar).
+    """
+    return (calendar or TradingCalendar()).trading_days()
+
+
+def _anchored_indices(start_idx, end_idx, days_back, target_points):
     """
-    Fetches S&P 500 history to get a list of valid NYSE trading days.
+    Picks sessions on a fixed grid: every `step`-th session counted from the
+    first session in the calendar, plus the latest session. The step only
+    depends on the horizon, so the grid does not move as days go by and
+    consecutive runs share all but the first and last few points.
     """
-    # ^GSPC = S&P 500
-    sp500 = yf.Ticker("^GSPC")
-    # Fetch max history to cover up to 50+ years
-    history = sp500.history(period="max")
-    return history.index
+    step = max(1, int(np.ceil(days_back * SESSIONS_PER_DAY / (target_points - 1))))
+    first = -(-start_idx // step) * step  # first grid point >= start_idx
+    indices = np.arange(first, end_idx, step)
+    if indices.size == 0 or indices[-1] != end_idx - 1:
+        indices = np.append(indices, end_idx - 1)
+    return indices
 
-def get_timeframe_dates():
+
+def get_timeframe_dates(sampling="equidistant", calendar=None, now=None, target_points=TARGET_POINTS):
     """
-    Generates dictionary of timeframes with ~100 equidistant points each.
+    Generates dictionary of timeframes with ~100 points each.
+
+    sampling="equidistant" spreads the points evenly over each window (they shift every day),
+    sampling="anchored" snaps them to a fixed session grid (see _anchored_indices).
     """
-    trading_days = get_trading_days()
+    trading_days = get_trading_days(calendar)
     # Ensure timezone awareness compatibility (remove timezone for comparison if needed, or keep it consistent)
     # yfinance usually returns timezone-aware timestamps. We'll convert to naive or compatible.
     if trading_days.tz is not None:
         trading_days = trading_days.tz_localize(None)
-    
-    now = datetime.now()
-    timeframes = {
-        "Max": 365 * 100,
-        "30y": 365 * 30,
-        "20y": 365 * 20,
-        "10y": 365 * 10,
-        "5y": 365 * 5,
-        "2y": 365 * 2,
-        "1y": 365,
-        "6m": 30 * 6,
-        "3m": 30 * 3
-    }
-    
+
+    days = trading_days.values  # sorted datetime64 array
+    now = now or datetime.now()
+    end_idx = int(np.searchsorted(days, np.datetime64(now), side="right"))
+
     result = {}
-    
-    for label, days_back in timeframes.items():
+
+    for label, days_back in TIMEFRAMES.items():
         start_date = now - timedelta(days=days_back)
-        
-        # Filter valid trading days within this range
-        mask = (trading_days >= start_date) & (trading_days <= now)
-        valid_days = trading_days[mask]
-        
-        if valid_days.empty:
+        start_idx = int(np.searchsorted(days, np.datetime64(start_date), side="left"))
+        total_days = end_idx - start_idx
+
+        if total_days <= 0:
             print(f"Warning: No valid trading days found for {label}")
             result[label] = []
             continue
 
-        total_days = len(valid_days)
-        
-        # Target ~100 points
-        target_points = 100
-        
         if total_days <= target_points:
             # If we have fewer than 100 days (e.g. 3m might be ~60-63 trading days), take all
-            selected_dates = valid_days
+            indices = np.arange(start_idx, end_idx)
+        elif sampling == "anchored":
+            indices = _anchored_indices(start_idx, end_idx, days_back, target_points)
         else:
             # Pick equidistant points
-            indices = np.linspace(0, total_days - 1, target_points, dtype=int)
-            selected_dates = valid_days[indices]
-            
+            indices = start_idx + np.linspace(0, total_days - 1, target_points, dtype=int)
+
         # Convert to string format 'YYYY-MM-DD'
-        result[label] = [date.strftime("%Y-%m-%d") for date in selected_dates]
+        result[label] = list(trading_days[indices].strftime("%Y-%m-%d"))
         print(f"{label}: Selected {len(result[label])} dates from {total_days} valid trading days.")
-        
+
     return result
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+# Universe of assets published by the pipeline.
+#
+# Every entry has a "label" (the column name in Data.json), the provider
+# "symbol", a display "name" and a "type". "Inflation Adjusted $" is a
+# reference series (symbol "CPI") and is never downloaded.
+import json
+
+# S&P 500 Tickers (Snapshot)
+SP500_TICKERS = [
+    'MMM', 'AOS', 'ABT', 'ABBV', 'ACN', 'ADBE', 'AMD', 'AES', 'AFL', 'A', 'APD', 'ABNB', 'AKAM', 'ALB', 'ARE', 'ALGN', 'ALLE', 'LNT', 'ALL', 'GOOGL', 'GOOG', 'MO', 'AMZN', 'AMCR', 'AEE', 'AEP', 'AXP', 'AIG', 'AMT', 'AWK', 'AMP', 'AME', 'AMGN', 'APH', 'ADI', 'AON', 'APA', 'APO', 'AAPL', 'AMAT', 'APP', 'APTV', 'ACGL', 'ADM', 'ARES', 'ANET', 'AJG', 'AIZ', 'T', 'ATO', 'ADSK', 'ADP', 'AZO', 'AVB', 'AVY', 'AXON', 'BKR', 'BALL', 'BAC', 'BAX', 'BDX', 'BRK-B', 'BBY', 'TECH', 'BIIB', 'BLK', 'BX', 'XYZ', 'BK', 'BA', 'BKNG', 'BSX', 'BMY', 'AVGO', 'BR', 'BRO', 'BF-B', 'BLDR', 'BG', 'BXP', 'CHRW', 'CDNS', 'CPT', 'CPB', 'COF', 'CAH', 'CCL', 'CARR', 'CVNA', 'CAT', 'CBOE', 'CBRE', 'CDW', 'COR', 'CNC', 'CNP', 'CF', 'CRL', 'SCHW', 'CHTR', 'CVX', 'CMG', 'CB', 'CHD', 'CIEN', 'CI', 'CINF', 'CTAS', 'CSCO', 'C', 'CFG', 'CLX', 'CME', 'CMS', 'KO', 'CTSH', 'COIN', 'CL', 'CMCSA', 'FIX', 'CAG', 'COP', 'ED', 'STZ', 'CEG', 'COO', 'CPRT', 'GLW', 'CPAY', 'CTVA', 'CSGP', 'COST', 'CTRA', 'CRH', 'CRWD', 'CCI', 'CSX', 'CMI', 'CVS', 'DHR', 'DRI', 'DDOG', 'DVA', 'DECK', 'DE', 'DELL', 'DAL', 'DVN', 'DXCM', 'FANG', 'DLR', 'DG', 'DLTR', 'D', 'DPZ', 'DASH', 'DOV', 'DOW', 'DHI', 'DTE', 'DUK', 'DD', 'ETN', 'EBAY', 'ECL', 'EIX', 'EW', 'EA', 'ELV', 'EME', 'EMR', 'ETR', 'EOG', 'EPAM', 'EQT', 'EFX', 'EQIX', 'EQR', 'ERIE', 'ESS', 'EL', 'EG', 'EVRG', 'ES', 'EXC', 'EXE', 'EXPE', 'EXPD', 'EXR', 'XOM', 'FFIV', 'FDS', 'FICO', 'FAST', 'FRT', 'FDX', 'FIS', 'FITB', 'FSLR', 'FE', 'FISV', 'F', 'FTNT', 'FTV', 'FOXA', 'FOX', 'BEN', 'FCX', 'GRMN', 'IT', 'GE', 'GEHC', 'GEV', 'GEN', 'GNRC', 'GD', 'GIS', 'GM', 'GPC', 'GILD', 'GPN', 'GL', 'GDDY', 'GS', 'HAL', 'HIG', 'HAS', 'HCA', 'DOC', 'HSIC', 'HSY', 'HPE', 'HLT', 'HOLX', 'HD', 'HON', 'HRL', 'HST', 'HWM', 'HPQ', 'HUBB', 'HUM', 'HBAN', 'HII', 'IBM', 'IEX', 'IDXX', 'ITW', 'INCY', 'IR', 'PODD', 'INTC', 'IBKR', 'ICE', 'IFF', 'IP', 'INTU', 'ISRG', 'IVZ', 'INVH', 'IQV', 'IRM', 'JBHT', 'JBL', 'JKHY', 'J', 'JNJ', 'JCI', 'JPM', 'KVUE', 'KDP', 'KEY', 'KEYS', 'KMB', 'KIM', 'KMI', 'KKR', 'KLAC', 'KHC', 'KR', 'LHX', 'LH', 'LRCX', 'LW', 'LVS', 'LDOS', 'LEN', 'LII', 'LLY', 'LIN', 'LYV', 'LMT', 'L', 'LOW', 'LULU', 'LYB', 'MTB', 'MPC', 'MAR', 'MRSH', 'MLM', 'MAS', 'MA', 'MTCH', 'MKC', 'MCD', 'MCK', 'MDT', 'MRK', 'META', 'MET', 'MTD', 'MGM', 'MCHP', 'MU', 'MSFT', 'MAA', 'MRNA', 'MOH', 'TAP', 'MDLZ', 'MPWR', 'MNST', 'MCO', 'MS', 'MOS', 'MSI', 'MSCI', 'NDAQ', 'NTAP', 'NFLX', 'NEM', 'NWSA', 'NWS', 'NEE', 'NKE', 'NI', 'NDSN', 'NSC', 'NTRS', 'NOC', 'NCLH', 'NRG', 'NUE', 'NVDA', 'NVR', 'NXPI', 'ORLY', 'OXY', 'ODFL', 'OMC', 'ON', 'OKE', 'ORCL', 'OTIS', 'PCAR', 'PKG', 'PLTR', 'PANW', 'PSKY', 'PH', 'PAYX', 'PAYC', 'PYPL', 'PNR', 'PEP', 'PFE', 'PCG', 'PM', 'PSX', 'PNW', 'PNC', 'POOL', 'PPG', 'PPL', 'PFG', 'PG', 'PGR', 'PLD', 'PRU', 'PEG', 'PTC', 'PSA', 'PHM', 'PWR', 'QCOM', 'DGX', 'Q', 'RL', 'RJF', 'RTX', 'O', 'REG', 'REGN', 'RF', 'RSG', 'RMD', 'RVTY', 'HOOD', 'ROK', 'ROL', 'ROP', 'ROST', 'RCL', 'SPGI', 'CRM', 'SNDK', 'SBAC', 'SLB', 'STX', 'SRE', 'NOW', 'SHW', 'SPG', 'SWKS', 'SJM', 'SW', 'SNA', 'SOLV', 'SO', 'LUV', 'SWK', 'SBUX', 'STT', 'STLD', 'STE', 'SYK', 'SMCI', 'SYF', 'SNPS', 'SYY', 'TMUS', 'TROW', 'TTWO', 'TPR', 'TRGP', 'TGT', 'TEL', 'TDY', 'TER', 'TSLA', 'TXN', 'TPL', 'TXT', 'TMO', 'TJX', 'TKO', 'TTD', 'TSCO', 'TT', 'TDG', 'TRV', 'TRMB', 'TFC', 'TYL', 'TSN', 'USB', 'UBER', 'UDR', 'ULTA', 'UNP', 'UAL', 'UPS', 'URI', 'UNH', 'UHS', 'VLO', 'VTR', 'VLTO', 'VRSN', 'VRSK', 'VZ', 'VRTX', 'VTRS', 'VICI', 'V', 'VST', 'VMC', 'WRB', 'GWW', 'WAB', 'WMT', 'DIS', 'WBD', 'WM', 'WAT', 'WEC', 'WFC', 'WELL', 'WST', 'WDC', 'WY', 'WSM', 'WMB', 'WTW', 'WDAY', 'WYNN', 'XEL', 'XYL', 'YUM', 'ZBRA', 'ZBH', 'ZTS'
+]
+
+# Define Tickers
+ASSETS = {
+    # Metals (Futures)
+    "Metals": {
+        "Gold": "GC=F",
+        "Silver": "SI=F",
+        "Platinum": "PL=F",
+        "Inflation Adjusted $": "CPI" # Special key for inflation
+    },
+    # Indices/ETFs
+    "Indices": {
+        "S&P 500 Index": "^GSPC"
+    },
+    # ETFs
+    "ETFs": {
+        "VTI": "VTI",
+        "VOO": "VOO",
+        "SPY": "SPY"
+    },
+    # Crypto (Top 10 by Market Cap - Simplified list)
+    "Crypto": {
+        "Bitcoin": "BTC-USD",
+        "Ethereum": "ETH-USD",
+        "Tether": "USDT-USD",
+        "BNB": "BNB-USD",
+        "Solana": "SOL-USD",
+        "XRP": "XRP-USD",
+        "USDC": "USDC-USD",
+        "Cardano": "ADA-USD",
+        "Avalanche": "AVAX-USD",
+        "Dogecoin": "DOGE-USD"
+    }
+}
+
+
+# Entry type per ASSETS group
+ASSET_TYPES = {
+    "Metals": "Metal",
+    "Indices": "Index",
+    "ETFs": "ETF",
+    "Crypto": "Crypto"
+}
+
+WIKIPEDIA_SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+
+WIKIPEDIA_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+def parse_sp500_source(text):
+    """
+    Parses an S&P 500 constituent list into [{symbol, name, type, added}].
+
+    Accepts the Wikipedia page (first table: Symbol, Security, ..., Date added)
+    or a JSON list of {"symbol", "name", "added"} objects. "added" is the
+    'YYYY-MM-DD' the company joined the index, or None when unknown.
+    """
+    if text.lstrip().startswith("["):
+        rows = json.loads(text)
+    else:
+        import io
+        import pandas as pd
+        df = pd.read_html(io.StringIO(text))[0]
+        added = df["Date added"] if "Date added" in df.columns else [None] * len(df)
+        rows = [{"symbol": symbol, "name": name, "added": date}
+                for symbol, name, date in zip(df["Symbol"], df["Security"], added)]
+
+    tickers_metadata = []
+    for row in rows:
+        symbol = str(row["symbol"]).replace('.', '-')
+        added = row.get("added")
+        added = str(added)[:10] if isinstance(added, str) and added[:4].isdigit() else None
+        tickers_metadata.append({"symbol": symbol, "name": row.get("name") or symbol, "type": "SP500", "added": added})
+    return tickers_metadata
+
+
+def get_sp500_tickers_and_names():
+    """Scrapes the list of S&P 500 tickers and names from Wikipedia."""
+    import requests
+
+    try:
+        response = requests.get(WIKIPEDIA_SP500_URL, headers=WIKIPEDIA_HEADERS)
+        response.raise_for_status()
+        return parse_sp500_source(response.text)
+    except Exception as e:
+        print(f"Error fetching S&P 500 tickers: {e}")
+        return []
+
+
+def static_groups():
+    """
+    {group: [{label, symbol, name, type}]} for the hand-picked ASSETS groups, in fetch order.
+    """
+    return {
+        group: [{"label": label, "symbol": symbol, "name": label, "type": ASSET_TYPES[group]}
+                for label, symbol in ASSETS[group].items()]
+        for group in ["Metals", "Crypto", "ETFs", "Indices"]
+    }
+
+
+def snapshot_sp500():
+    return [{"symbol": symbol, "name": symbol, "type": "SP500"} for symbol in SP500_TICKERS]
+
+
+def build_universe(sp500_source="snapshot", sp500=None):
+    """
+    Returns the list of {label, symbol, name, type} entries, in fetch order:
+    metals, crypto, ETFs, indices, then the S&P 500 constituents.
+    sp500_source="wikipedia" scrapes the live constituent list (with company
+    names) and falls back to the SP500_TICKERS snapshot if that fails.
+    An already resolved `sp500` list (see Constituents) is used as is.
+    """
+    universe = [entry for entries in static_groups().values() for entry in entries]
+
+    if sp500 is None:
+        sp500 = get_sp500_tickers_and_names() if sp500_source == "wikipedia" else []
+    if not sp500:
+        sp500 = snapshot_sp500()
+    for meta in sp500:
+        universe.append({"label": meta["symbol"], "symbol": meta["symbol"], "name": meta["name"], "type": meta["type"]})
+    return universe
+
+
+def fetch_symbols(universe):
+    """
+    Provider symbols to download for a universe (reference series excluded).
+    """
+    return [entry["symbol"] for entry in universe if entry["symbol"] != "CPI"]
+
+
+def tickers_map(universe):
+    """
+    {label: symbol} for a universe.
+    """
+    return {entry["label"]: entry["symbol"] for entry in universe}
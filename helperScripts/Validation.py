@@ -0,0 +1,326 @@
+"""
+Data-quality checks on the daily Close matrix, run between fetch and the exports.
+
+Every check is vectorized over the whole (date x symbol) matrix:
+
+    nonpositive    zero or negative closes
+    spike          a day-over-day move with an extreme robust z-score that is
+                   undone by the next move (a bad tick)
+    level_shift    the same kind of move that persists (unadjusted split, roll gap)
+    stale          the same close repeated for `stale_days` sessions in a row
+    gap            more than `gap_days` calendar days without a close inside a
+                   symbol's history
+    gold_mismatch  GC=F away from the historical monthly gold series by more than
+                   `gold_tolerance`
+
+Because every ticker is divided by gold, GC=F gets a tighter jump threshold and
+any gold anomaly left unfixed blocks publishing (see ValidationResult.blocking).
+What happens to flagged cells is set per check by the policy: "quarantine"
+(the cell becomes null; quarantined gold falls back to the historical series
+in Assembly), "interpolate" (linear between the neighbouring good closes) or
+"report" (left as is).
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Instrument import count, timed
+from ReferenceSeries import monthly_join
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_REPORT_PATH = os.path.join(PROJECT_ROOT, "cache", "quality_report.json")
+
+GOLD_SYMBOL = "GC=F"
+CHECKS = ("nonpositive", "spike", "level_shift", "stale", "gap", "gold_mismatch")
+
+DEFAULT_THRESHOLDS = {
+    "jump_z": 12.0,            # robust z-score of a day-over-day log return...
+    "jump_min": 0.25,          # ...that is also at least a 25% move
+    "gold_jump_min": 0.12,
+    "stale_days": 15,
+    "gap_days": 10,
+    "gold_tolerance": 0.25,    # the historical series is a monthly average
+    "max_bad_share": 0.01,     # gate: share of one symbol's closes flagged
+    "latest_bad_share": 0.05   # gate: share of symbols flagged on the latest session
+}
+
+DEFAULT_POLICY = {
+    "nonpositive": "quarantine",
+    "spike": "interpolate",
+    "level_shift": "report",
+    "stale": "report",
+    "gap": "report",
+    "gold_mismatch": "quarantine"
+}
+
+# Pegged to the dollar, so long flat runs are expected
+STALE_EXEMPT = ("USDT-USD", "USDC-USD")
+
+
+class QualityGateError(RuntimeError):
+    pass
+
+
+def _ffill(values):
+    return pd.DataFrame(values).ffill().to_numpy()
+
+
+def _previous(values):
+    """
+    For every cell, the last non-NaN value strictly before it in the same column.
+    """
+    prev = np.full(values.shape, np.nan)
+    prev[1:] = _ffill(values)[:-1]
+    return prev
+
+
+def _next(values):
+    """
+    For every cell, the first non-NaN value strictly after it in the same column.
+    """
+    nxt = np.full(values.shape, np.nan)
+    nxt[:-1] = pd.DataFrame(values).bfill().to_numpy()[1:]
+    return nxt
+
+
+def _run_lengths(flags, counted):
+    """
+    Length of the run of True `flags` ending at each cell; rows where `counted`
+    is False (no close that day) neither extend nor break a run.
+    """
+    total = np.cumsum(flags, axis=0)
+    resets = np.where(counted & ~flags, total, 0)
+    return total - np.maximum.accumulate(resets, axis=0)
+
+
+class ValidationResult:
+    """
+    Flags per check ({check: bool matrix}), the corrected matrix and the report.
+    """
+
+    def __init__(self, close, flags, details, fixed, thresholds, policy, seconds):
+        self.dates = list(close.index)
+        self.symbols = list(close.columns)
+        self.values = close.to_numpy(dtype=float)
+        self.flags = flags
+        self.details = details
+        self.fixed = fixed
+        self.thresholds = thresholds
+        self.policy = policy
+        self.seconds = seconds
+        changed = (self.values != fixed) & ~(np.isnan(self.values) & np.isnan(fixed))
+        rows, cols = np.nonzero(changed)
+        self.corrections = pd.Series(fixed[rows, cols],
+                                     index=pd.MultiIndex.from_arrays([np.array(self.dates, dtype=object)[rows],
+                                                                      np.array(self.symbols, dtype=object)[cols]]))
+
+    @property
+    def flagged(self):
+        return np.logical_or.reduce([self.flags[c] for c in CHECKS])
+
+    def unresolved(self):
+        """
+        Flags whose policy leaves the cell as it is.
+        """
+        return np.logical_or.reduce([self.flags[c] for c in CHECKS if self.policy.get(c, "report") == "report"] +
+                                    [np.zeros(self.values.shape, dtype=bool)])
+
+    def blocking(self):
+        """
+        Reasons the output should not be published, or [] when it can be.
+        """
+        reasons = []
+        unresolved = self.unresolved()
+        if GOLD_SYMBOL in self.symbols:
+            g = self.symbols.index(GOLD_SYMBOL)
+            for check in CHECKS:
+                # A gap leaves gold missing (historical fallback) rather than wrong
+                if check != "gap" and self.policy.get(check, "report") == "report" and self.flags[check][:, g].any():
+                    reasons.append(f"{GOLD_SYMBOL}: {int(self.flags[check][:, g].sum())} unresolved {check} cells")
+
+        present = (~np.isnan(self.values)).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = unresolved.sum(axis=0) / present
+        for c in np.flatnonzero(share > self.thresholds["max_bad_share"]):
+            reasons.append(f"{self.symbols[c]}: {share[c]:.1%} of closes flagged")
+
+        if len(self.dates):
+            reported = ~np.isnan(self.values[-1])
+            bad_latest = (self.flagged[-1] & reported).sum()
+            if reported.any() and bad_latest / reported.sum() > self.thresholds["latest_bad_share"]:
+                reasons.append(f"{bad_latest} of {reported.sum()} symbols flagged on {self.dates[-1]}")
+        return reasons
+
+    def apply(self, close):
+        """
+        Returns `close` (any date x symbol subset of the validated matrix) with the corrections applied.
+        """
+        if self.corrections.empty:
+            return close
+        close = close.copy()
+        rows = close.index.get_indexer(self.corrections.index.get_level_values(0))
+        cols = close.columns.get_indexer(self.corrections.index.get_level_values(1))
+        keep = (rows >= 0) & (cols >= 0)
+        values = close.to_numpy(dtype=float, copy=True)
+        values[rows[keep], cols[keep]] = self.corrections.to_numpy()[keep]
+        return pd.DataFrame(values, index=close.index, columns=close.columns)
+
+    def report(self, examples=20):
+        checks = {}
+        for check in CHECKS:
+            mask = self.flags[check]
+            rows, cols = np.nonzero(mask)
+            severity = self.details.get(check)
+            order = np.argsort(-np.abs(severity[rows, cols])) if severity is not None else np.arange(len(rows))
+            checks[check] = {
+                "action": self.policy.get(check, "report"),
+                "cells": int(len(rows)),
+                "symbols": sorted({self.symbols[c] for c in np.unique(cols)}),
+                "examples": [
+                    {"symbol": self.symbols[cols[i]], "date": self.dates[rows[i]],
+                     "value": None if np.isnan(self.values[rows[i], cols[i]]) else float(self.values[rows[i], cols[i]]),
+                     "fixed": None if np.isnan(self.fixed[rows[i], cols[i]]) else float(self.fixed[rows[i], cols[i]]),
+                     "score": None if severity is None else round(float(severity[rows[i], cols[i]]), 4)}
+                    for i in order[:examples]
+                ]
+            }
+        return {
+            "checkedAt": datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(self.seconds, 3),
+            "dates": len(self.dates),
+            "symbols": len(self.symbols),
+            "range": [self.dates[0], self.dates[-1]] if self.dates else None,
+            "thresholds": self.thresholds,
+            "corrected": int(len(self.corrections)),
+            "lagging": self.details.get("lagging", []),
+            "checks": checks,
+            "blocking": self.blocking()
+        }
+
+    def write_report(self, path=DEFAULT_REPORT_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def summary(self):
+        parts = [f"{check} {int(self.flags[check].sum())}" for check in CHECKS if self.flags[check].any()]
+        line = (f"Data quality: {len(self.symbols)} symbols x {len(self.dates)} dates checked in "
+                f"{self.seconds:.2f}s; " + (", ".join(parts) if parts else "no anomalies") +
+                f"; {len(self.corrections)} cells corrected.")
+        blocking = self.blocking()
+        if blocking:
+            line += "\nBlocking issues:\n  " + "\n  ".join(blocking)
+        return line
+
+
+def _interpolate(fixed, mask):
+    """
+    Replaces the cells in `mask` with a linear interpolation in time between the
+    closest good closes of the same column (NaN when there is none on one side).
+    """
+    rows = np.arange(fixed.shape[0])
+    for c in np.flatnonzero(mask.any(axis=0)):
+        col = fixed[:, c]
+        col[mask[:, c]] = np.nan
+        good = ~np.isnan(col)
+        if good.sum() < 2:
+            continue
+        targets = rows[mask[:, c]]
+        inside = (targets > rows[good][0]) & (targets < rows[good][-1])
+        col[targets[inside]] = np.interp(targets[inside], rows[good], col[good])
+
+
+@timed("validate.checks")
+def validate_closes(close, historical_gold=None, thresholds=None, policy=None):
+    """
+    Runs every check over a date x symbol Close matrix (index of 'YYYY-MM-DD'
+    strings, see PriceStore.load()) and applies the policy. Returns a ValidationResult.
+    """
+    start = time.perf_counter()
+    thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    policy = dict(DEFAULT_POLICY, **(policy or {}))
+    values = close.to_numpy(dtype=float)
+    symbols = list(close.columns)
+    shape = values.shape
+    present = ~np.isnan(values)
+    flags, details = {}, {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        flags["nonpositive"] = present & (values <= 0)
+        usable = present & ~flags["nonpositive"]
+
+        # Day-over-day log returns between consecutive usable closes, robust z-scores per column
+        logp = np.where(usable, np.log(np.where(usable, values, 1.0)), np.nan)
+        ret = logp - _previous(logp)
+        if shape[0]:
+            med = np.nanmedian(ret, axis=0)
+            mad = np.nanmedian(np.abs(ret - med), axis=0) * 1.4826
+        else:
+            med = mad = np.zeros(shape[1])
+        z = (ret - med) / np.maximum(np.nan_to_num(mad, nan=1.0), 1e-4)
+        jump_min = np.full(shape[1], np.log1p(thresholds["jump_min"]))
+        if GOLD_SYMBOL in symbols:
+            jump_min[symbols.index(GOLD_SYMBOL)] = np.log1p(thresholds["gold_jump_min"])
+        jump = (np.abs(z) > thresholds["jump_z"]) & (np.abs(ret) > jump_min)
+
+        # A spike is undone by the next move; the move back is part of the same spike
+        next_ret = _next(ret)
+        spike = jump & (np.sign(next_ret) == -np.sign(ret)) & (np.abs(ret + next_ret) < 0.5 * np.abs(ret))
+        after_spike = _previous(np.where(usable, spike.astype(float), np.nan)) == 1
+        flags["spike"] = spike
+        flags["level_shift"] = jump & ~spike & ~after_spike
+        details["spike"] = details["level_shift"] = z
+
+    # Identical closes in a row
+    same = usable & (values == _previous(np.where(usable, values, np.nan)))
+    run = _run_lengths(same, usable)
+    stale = run >= thresholds["stale_days"] - 1
+    stale[:, [i for i, s in enumerate(symbols) if s in STALE_EXEMPT]] = False
+    flags["stale"] = stale
+    details["stale"] = run.astype(float)
+
+    # Calendar days since the previous close inside each symbol's history
+    days = pd.DatetimeIndex(close.index).to_numpy().astype("datetime64[D]").astype(float) if shape[0] else np.zeros(0)
+    day_matrix = np.where(present, days[:, None], np.nan)
+    gap = day_matrix - _previous(day_matrix)
+    flags["gap"] = present & (gap > thresholds["gap_days"])
+    details["gap"] = np.nan_to_num(gap)
+    if shape[0]:
+        last_day = np.nanmax(day_matrix, axis=0)
+        behind = days[-1] - last_day
+        details["lagging"] = [{"symbol": symbols[c], "lastDate": close.index[present[:, c]][-1], "days": int(behind[c])}
+                              for c in np.flatnonzero(behind > thresholds["gap_days"])]
+
+    # GC=F against the historical monthly gold prices
+    flags["gold_mismatch"] = np.zeros(shape, dtype=bool)
+    details["gold_mismatch"] = np.zeros(shape)
+    if GOLD_SYMBOL in symbols and historical_gold is not None and len(historical_gold):
+        g = symbols.index(GOLD_SYMBOL)
+        reference = monthly_join(historical_gold, list(close.index))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            deviation = values[:, g] / reference - 1
+        flags["gold_mismatch"][:, g] = usable[:, g] & (np.abs(deviation) > thresholds["gold_tolerance"])
+        details["gold_mismatch"][:, g] = np.nan_to_num(deviation)
+        # Moving into or out of a mismatched stretch is the mismatch, not a separate level shift
+        mismatch = flags["gold_mismatch"][:, g]
+        entered = _previous(np.where(usable[:, g], mismatch.astype(float), np.nan)[:, None])[:, 0] == 1
+        flags["level_shift"][:, g] &= ~(mismatch | entered)
+
+    fixed = values.copy()
+    for check in CHECKS:
+        if policy.get(check) == "quarantine":
+            fixed[flags[check]] = np.nan
+    interpolate = np.logical_or.reduce([flags[c] for c in CHECKS if policy.get(c) == "interpolate"] +
+                                       [np.zeros(shape, dtype=bool)])
+    _interpolate(fixed, interpolate)
+
+    result = ValidationResult(close, flags, details, fixed, thresholds, policy, time.perf_counter() - start)
+    for check in CHECKS:
+        count(f"quality.{check}", int(flags[check].sum()))
+    count("quality.corrected", len(result.corrections))
+    return result
@@ -0,0 +1,45 @@
+import contextlib
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Tests import the pipeline modules the way the scripts do, and the synthetic
+# market generator from benchmarks/ (which puts helperScripts on sys.path)
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "benchmarks")
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+import synthetic  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def market():
+    """
+    A small synthetic market: 16 symbols (metals, SPY and 12 tickers) over 4 years.
+    """
+    return synthetic.make_market(16, 4)
+
+
+@pytest.fixture(scope="session")
+def assembled(market):
+    """
+    The AssembledData of `market`: equidistant timeframes over its sessions, closes not rounded.
+    """
+    from Assembly import assemble_data
+
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    timeframe_dates = synthetic.make_timeframe_dates(pd.DatetimeIndex(market.close.index), target_points=60)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return assemble_data(timeframe_dates, sorted(labels), labels, close,
+                             cpi_multipliers=market.cpi_multipliers, historical_gold=market.historical_gold)
+
+
+@pytest.fixture(scope="session")
+def final_data(assembled):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return assembled.to_final_data()
@@ -0,0 +1,119 @@
+import contextlib
+import io
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Instrument
+import synthetic
+from Adjustments import TR_SUFFIX, total_return_close
+from bench_adjustments import reinvested
+from PriceStore import DEFAULT_BASIS, TOTAL_RETURN_BASIS, PriceStore
+from Providers import YFinanceProvider
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def updated(tmp_path_factory):
+    """
+    A total-return store backfilled up to a week ago, then updated with a week in
+    which one ticker splits 3:1 and another pays a dividend.
+    """
+    market = synthetic.make_market(12, 4)
+    dates = market.close.index
+    before = dates[-6]
+    splitter, payer = market.symbols[10], market.symbols[11]
+    market.actions = pd.concat([market.actions, pd.DataFrame({
+        "symbol": [splitter, payer], "date": [dates[-3], dates[-2]],
+        "dividend": [0.0, 0.02 * market.close[payer].iloc[-2]], "split": [3.0, 1.0]})], ignore_index=True)
+    path = str(tmp_path_factory.mktemp("adjustments") / "prices.sqlite")
+    with synthetic.no_network(), PriceStore(path) as store:
+        quiet(store.update, market.symbols, provider=market.provider(until=before), today="2000-01-01",
+              total_return=True)
+        old_tr = total_return_close(store.load(), store.load_actions())
+        Instrument.reset()
+        quiet(store.update, market.symbols, provider=market.provider(), today="2100-01-01", total_return=True)
+        counters = dict(Instrument.report()["counters"])
+        close, actions = store.load(), store.load_actions()
+    return market, before, old_tr, counters, close, actions
+
+
+def test_update_rescales_splits_and_only_computes_new_dividends(updated):
+    market, before, _, counters, close, actions = updated
+    refetched = market.actions[market.actions["date"] >= before]
+    # The update downloads from the last stored session on, so its dividends are recomputed too
+    assert counters.get("adjust.growth", 0) == int((refetched["dividend"] > 0).sum())
+    assert counters.get("store.splits_applied", 0) == int((refetched.loc[refetched["date"] > before, "split"] != 1).sum())
+
+    expected = market.close.set_axis(market.close.index.strftime("%Y-%m-%d")).reindex(
+        index=close.index, columns=close.columns)
+    assert np.allclose(close.to_numpy(), expected.to_numpy(), rtol=1e-12, equal_nan=True)
+    stored = actions.set_index(["symbol", "date"])["dividend"]
+    truth = market.actions.assign(date=market.actions["date"].dt.strftime("%Y-%m-%d")).set_index(
+        ["symbol", "date"])["dividend"].reindex(stored.index)
+    assert np.allclose(stored.to_numpy(), truth.to_numpy(), rtol=1e-12)
+
+
+def test_total_return_matches_reinvestment_loop(updated):
+    _, _, _, _, close, actions = updated
+    tr = total_return_close(close, actions)
+    loop = reinvested(close, actions)
+    assert set(tr.columns) == set(loop.columns)
+    assert np.allclose(tr[loop.columns].to_numpy(), loop.to_numpy(), rtol=1e-10, equal_nan=True)
+
+    sampled = close.index[np.linspace(0, len(close) - 1, 50, dtype=int)]
+    sampled_tr = total_return_close(close.loc[sampled], actions)
+    assert np.allclose(sampled_tr.to_numpy(), tr.loc[sampled, sampled_tr.columns].to_numpy(), equal_nan=True)
+
+
+def test_earlier_total_return_rows_do_not_move(updated):
+    market, before, old_tr, _, close, actions = updated
+    tr = total_return_close(close, actions)
+    refetched = market.actions[market.actions["date"] >= before]
+    common = old_tr.index[old_tr.index < market.close.index[-3].strftime("%Y-%m-%d")]
+    split = set(refetched.loc[refetched["split"] != 1, "symbol"] + TR_SUFFIX)
+    others = [c for c in old_tr.columns if c not in split]
+    assert np.allclose(old_tr.loc[common, others].to_numpy(), tr.loc[common, others].to_numpy(), rtol=1e-12,
+                       equal_nan=True)
+
+
+def test_switching_basis_refetches_the_full_history(tmp_path):
+    market = synthetic.make_market(6, 2)
+    with synthetic.no_network(), PriceStore(str(tmp_path / "prices.sqlite")) as store:
+        quiet(store.update, market.symbols, provider=market.provider(until=market.close.index[-6]),
+              today="2000-01-01")
+        assert store.close_basis() == DEFAULT_BASIS
+        assert store.load_actions().empty
+        assert None not in quiet(store.plan_fetch, market.symbols, today="2100-01-01")
+
+        # Stores written before the basis was recorded keep their incremental updates
+        store.conn.execute("DELETE FROM meta")
+        assert None not in quiet(store.plan_fetch, market.symbols, today="2100-01-01")
+
+        assert list(quiet(store.plan_fetch, market.symbols, today="2100-01-01", total_return=True)) == [None]
+        quiet(store.update, market.symbols, provider=market.provider(), today="2100-01-01", total_return=True)
+        assert store.close_basis() == TOTAL_RETURN_BASIS
+        assert not store.load_actions().empty
+
+        assert list(quiet(store.plan_fetch, market.symbols, today="2100-01-01")) == [None]
+        quiet(store.update, market.symbols, provider=market.provider(), today="2100-01-01")
+        assert store.close_basis() == DEFAULT_BASIS
+        assert store.load_actions().empty
+
+
+def test_yfinance_keeps_default_adjustment_without_total_return(monkeypatch):
+    calls = []
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=lambda *a, **kw: calls.append(kw)))
+    for total_return in (False, True):
+        provider = YFinanceProvider(total_return=total_return)
+        monkeypatch.setattr(provider, "session", lambda: None)
+        provider._download(["SPY"], start="2026-01-02")
+    assert "auto_adjust" not in calls[0] and "actions" not in calls[0]
+    assert calls[1]["auto_adjust"] is False and calls[1]["actions"] is True
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pytest
+
+import Pipeline
+import synthetic
+from Archive import PriceArchive, read_manifest, sample_rows, to_days, write_archive
+from Assembly import assemble_data, assemble_matrix
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def same_float32(values, expected):
+    expected = expected.astype(np.float32).astype(float)
+    return np.array_equal(np.isnan(values), np.isnan(expected)) and np.array_equal(
+        values[~np.isnan(values)], expected[~np.isnan(expected)])
+
+
+@pytest.fixture(scope="module")
+def daily(market):
+    """
+    (close, labels, dates, keys, in-memory archive of every session).
+    """
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    keys = sorted(labels)
+    dates = list(close.index)
+    values = quiet(assemble_matrix, dates, keys, labels, close, cpi_multipliers=market.cpi_multipliers,
+                   historical_gold=market.historical_gold, round_closes=False)
+    return close, labels, dates, keys, PriceArchive.from_matrix(dates, keys, values)
+
+
+def test_update_only_writes_new_rows(daily, tmp_path):
+    _, _, dates, keys, memory = daily
+    archive_dir, fresh_dir = str(tmp_path / "updated"), str(tmp_path / "fresh")
+    write_archive(PriceArchive.from_matrix(dates[:-5], keys, memory.values.T[:-5]), archive_dir)
+    assert write_archive(memory, archive_dir) == 5
+    write_archive(memory, fresh_dir)
+    updated, fresh = PriceArchive.open(archive_dir), PriceArchive.open(fresh_dir)
+    assert np.array_equal(updated.values, fresh.values, equal_nan=True)
+    assert np.array_equal(updated.days, fresh.days)
+    assert read_manifest(archive_dir)["rows"] == len(dates)
+
+
+def test_file_queries_match_the_matrix(daily, tmp_path):
+    _, _, dates, keys, memory = daily
+    write_archive(memory, str(tmp_path))
+    archive = PriceArchive.open(str(tmp_path))
+    some = keys[3:8]
+    start, end = dates[-250], dates[-1]
+    queries = [
+        dict(columns=some),
+        dict(columns=some, start=start, end=end, denominator="Gold"),
+        dict(columns=some[:1], sampling="weekly"),
+        dict(start=start, end=end, sampling="monthly"),
+        dict(sampling=100, denominator="Real Gold"),
+    ]
+    for query in queries:
+        q_dates, q_columns, q_values = archive.query(**query)
+        e_dates, e_columns, expected = memory.query(**query)
+        assert (q_dates, q_columns) == (e_dates, e_columns)
+        if query.get("denominator"):
+            assert np.allclose(q_values, expected, rtol=1e-6, equal_nan=True), query
+        else:
+            assert same_float32(q_values, expected), query
+
+
+def test_sampling_and_denominator_semantics(daily, market):
+    _, _, dates, keys, memory = daily
+    some = keys[3:4]
+    _, _, gold = memory.query(["Gold"] + some)
+    _, _, ratio = memory.query(some, denominator="Gold")
+    assert np.allclose(ratio[:, 0], gold[:, 1] / gold[:, 0], equal_nan=True)
+    weekly = [dates[i] for i in sample_rows(to_days(dates), "weekly")]
+    expected = market.close.index.to_series().resample("W-SUN").last().dropna().dt.strftime("%Y-%m-%d")
+    assert weekly == list(expected)
+
+
+def test_timeframes_are_one_archive_query(daily, market, tmp_path):
+    close, labels, _, keys, memory = daily
+    timeframe_dates = synthetic.make_timeframe_dates(market.close.index, target_points=60)
+    assembled = quiet(assemble_data, timeframe_dates, keys, labels, close, cpi_multipliers=market.cpi_multipliers,
+                      historical_gold=market.historical_gold)
+    from_memory = memory.assembled(timeframe_dates)
+    assert from_memory.dates == assembled.dates and from_memory.timeframes == assembled.timeframes
+    assert np.array_equal(from_memory.values, assembled.values, equal_nan=True)
+    write_archive(memory, str(tmp_path))
+    assert same_float32(PriceArchive.open(str(tmp_path)).assembled(timeframe_dates).values, assembled.values)
+
+
+def test_export_json_does_not_build_the_daily_archive(market, tmp_path):
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    pipeline = Pipeline.Pipeline(public_dir=str(tmp_path), store_path=str(tmp_path / "prices.sqlite"), offline=True)
+    pipeline._universe = [{"label": label, "symbol": symbol, "name": label, "type": "SP500"}
+                          for label, symbol in market.tickers_map().items()]
+    pipeline._daily = close
+    pipeline._reference = (market.cpi_multipliers, market.historical_gold)
+    pipeline._timeframe_dates = synthetic.make_timeframe_dates(market.close.index, target_points=60)
+    pipeline.quality_report = str(tmp_path / "quality.json")
+    quiet(pipeline.export_json)
+    assert os.path.exists(tmp_path / "Data.json")
+    assert pipeline._archive is None
+
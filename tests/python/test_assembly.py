@@ -0,0 +1,53 @@
+import contextlib
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from Assembly import assemble_matrix, assemble_timeframes, build_close_matrix
+from bench_assembly import build_inputs, legacy_assemble
+
+
+def serialize(final_data):
+    return json.dumps(final_data, indent=None, separators=(',', ':')).encode()
+
+
+def test_vectorized_assembly_matches_the_legacy_loop():
+    inputs = build_inputs(12, 3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vectorized = assemble_timeframes(
+            inputs["timeframe_dates"], inputs["all_keys"], inputs["tickers_map"],
+            build_close_matrix(inputs["all_data_frames"]),
+            existing_lookup=inputs["existing_lookup"],
+            cpi_multipliers=inputs["cpi_multipliers"],
+            historical_gold=inputs["historical_gold"]
+        )
+    assert serialize(vectorized) == serialize(legacy_assemble(**inputs))
+
+
+def test_build_close_matrix_keeps_the_first_chunk_of_a_duplicated_symbol():
+    dates = pd.to_datetime(["2024-01-02", "2024-01-03"])
+    columns = pd.MultiIndex.from_tuples([("AAA", "Close")])
+    first = pd.DataFrame([[1.0], [np.nan]], index=dates, columns=columns)
+    second = pd.DataFrame([[9.0], [2.0]], index=dates, columns=columns)
+    close = build_close_matrix([first, second])
+    assert list(close.index) == ["2024-01-02", "2024-01-03"]
+    assert close["AAA"].tolist() == [1.0, 2.0]
+
+
+def test_assemble_matrix_fallbacks():
+    dates = ["2019-12-31", "2020-01-02", "2026-03-02"]
+    keys = ["AAA", "Gold", "Inflation Adjusted $"]
+    labels = {"AAA": "AAA", "Gold": "GC=F", "Inflation Adjusted $": "CPI"}
+    close = pd.DataFrame({"AAA": [1.23456, 2.0, np.nan], "GC=F": [np.nan, 1500.0, 2000.0]}, index=dates)
+    matrix = assemble_matrix(dates, keys, labels, close,
+                             existing_lookup={"2020-01-02": {"AAA": 7.0}},
+                             cpi_multipliers={"2019-12": 1.5, "2020-01": 1.4},
+                             historical_gold={"2019-12": 1480.0})
+    # Rounded closes, explicit values first, NaN where nothing is known
+    assert matrix[:, 0].tolist()[:2] == [1.2346, 7.0] and np.isnan(matrix[2, 0])
+    # Historical gold only where the close is missing
+    assert matrix[:, 1].tolist() == [1480.0, 1500.0, 2000.0]
+    # Months after the last CPI print use the latest multiplier
+    assert matrix[:, 2].tolist() == [1.5, 1.4, 1.4]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from BinaryFormat import read_binary, read_manifest, read_timeframe, write_binary, write_matrices
+from JsonEncode import load_json, parse_digits, rounded_matrices, write_timeframes
+
+
+def as_float32(value):
+    return None if value is None else float(np.float32(value))
+
+
+def test_round_trip_keeps_float32_values_and_nulls(final_data, tmp_path):
+    write_binary(final_data, tmp_path)
+    restored = read_binary(tmp_path)
+    assert list(restored) == list(final_data)
+    for tf_label, tf_data in final_data.items():
+        expected = [[row[0]] + [as_float32(v) for v in row[1:]] for row in tf_data["rows"]]
+        assert restored[tf_label]["columns"] == tf_data["columns"]
+        assert restored[tf_label]["rows"] == expected
+    assert any(v is None for row in restored["Max"]["rows"] for v in row)
+
+
+def test_single_column_is_one_byte_range(final_data, tmp_path):
+    manifest = write_binary(final_data, tmp_path)
+    tf = manifest["timeframes"]["Max"]
+    gold = manifest["columns"].index("Gold")
+    dates, columns = read_timeframe(tmp_path, "Max", columns=["Gold"])
+    with open(tmp_path / tf["file"], "rb") as f:
+        f.seek(gold * tf["columnBytes"])
+        raw = np.frombuffer(f.read(tf["columnBytes"]), dtype="<f4")
+    assert dates == [row[0] for row in final_data["Max"]["rows"]]
+    assert np.array_equal(columns["Gold"], raw, equal_nan=True)
+    assert read_manifest(tmp_path)["timeframes"]["Max"]["byteLength"] == len(manifest["columns"]) * tf["columnBytes"]
+
+
+def test_empty_timeframe_and_mismatched_columns(tmp_path):
+    empty = {"1y": {"columns": ["Date", "Gold"], "rows": []}}
+    write_binary(empty, tmp_path)
+    dates, columns = read_timeframe(tmp_path, "1y")
+    assert dates == [] and len(columns["Gold"]) == 0
+    with pytest.raises(ValueError):
+        write_binary({"1y": {"columns": ["Date", "Gold"], "rows": [["2024-01-02", 1.0]]},
+                      "Max": {"columns": ["Date", "Silver"], "rows": [["2024-01-02", 1.0]]}}, tmp_path)
+
+
+def test_matrices_write_the_data_json_cells(assembled, tmp_path):
+    digits = parse_digits("Metal=8,Stock=3")
+    write_timeframes(str(tmp_path / "Data.json"), assembled, digits=digits)
+    write_matrices(rounded_matrices(assembled, digits), tmp_path / "columnar")
+    data = load_json(str(tmp_path / "Data.json"))
+    restored = read_binary(tmp_path / "columnar")
+    assert list(restored) == list(data)
+    for tf_label, tf_data in data.items():
+        expected = [[row[0]] + [as_float32(v) for v in row[1:]] for row in tf_data["rows"]]
+        assert restored[tf_label]["rows"] == expected, tf_label
@@ -0,0 +1,77 @@
+import contextlib
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+import Pipeline
+from bench_bundles import build_inputs
+from Bundles import BUNDLES_DIR, REFERENCE_COLUMNS, BundleBudgetError, check_budgets, save_bundles, total_returns
+
+TIGHT = {"name": "tight", "columns": [{"type": "Crypto"}], "reference": True, "timeframes": ["Max", "1y"],
+         "budget": 6 * 1024}
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return build_inputs(40, 6)
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_default_bundles(inputs, tmp_path):
+    assembled, universe = inputs
+    manifest = quiet(save_bundles, assembled, str(tmp_path), universe=universe)
+    assert all(b["bytes"] <= b["budget"] for b in manifest)
+    assert read(tmp_path / BUNDLES_DIR / "manifest.json")["bundles"] == manifest
+
+    fast = read(tmp_path / "FastData.json")
+    assert list(fast) == ["Max"] and fast["Max"]["columns"] == ["Date", "Gold", "SPY", "Inflation Adjusted $"]
+    assert [r[0] for r in fast["Max"]["rows"]] == assembled.timeframe_dates("Max")
+
+    crypto = read(tmp_path / BUNDLES_DIR / "crypto.json")
+    assert crypto["Max"]["columns"] == ["Date"] + REFERENCE_COLUMNS + sorted(
+        e["label"] for e in universe if e["type"] == "Crypto")
+
+    movers = read(tmp_path / BUNDLES_DIR / "movers.json")
+    ranked = sorted((r, k) for r, k in zip(total_returns(assembled, "3m"), assembled.keys)
+                    if not np.isnan(r) and k not in REFERENCE_COLUMNS)
+    assert set(movers["3m"]["columns"][5:]) == {k for _, k in ranked[-10:]} | {k for _, k in ranked[:10]}
+
+
+def test_budget_reduces_points_then_raises(inputs, tmp_path):
+    assembled, universe = inputs
+    entry = quiet(save_bundles, assembled, str(tmp_path), [TIGHT], universe=universe)[0]
+    assert entry["reduced"] and entry["bytes"] <= entry["budget"]
+
+    impossible = [dict(TIGHT, name="impossible", budget=512)]
+    with pytest.raises(BundleBudgetError):
+        quiet(save_bundles, assembled, str(tmp_path), impossible, universe=universe)
+    # Written either way; with check=False the caller checks later
+    assert os.path.exists(tmp_path / BUNDLES_DIR / "impossible.json")
+    manifest = quiet(save_bundles, assembled, str(tmp_path), impossible, universe=universe, check=False)
+    with pytest.raises(BundleBudgetError):
+        check_budgets(manifest)
+
+
+def test_export_writes_every_file_before_failing_on_a_budget(inputs, tmp_path):
+    assembled, universe = inputs
+    specs = tmp_path / "specs.json"
+    specs.write_text(json.dumps([dict(TIGHT, name="impossible", budget=512)]))
+    public_dir = tmp_path / "public"
+    pipeline = Pipeline.Pipeline(public_dir=str(public_dir), store_path=str(tmp_path / "prices.sqlite"), offline=True)
+    pipeline._assembled, pipeline._universe = assembled, universe
+    with pytest.raises(BundleBudgetError):
+        quiet(pipeline.export_json, bundles=str(specs))
+    for name in ("Data.json", "Returns.json", "tickers.json", "search.json", "Tip.json", "bundles/impossible.json"):
+        assert os.path.exists(public_dir / name), name
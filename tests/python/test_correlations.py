@@ -0,0 +1,82 @@
+import contextlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from Archive import PriceArchive
+from Assembly import assemble_matrix
+from bench_correlations import gold_returns
+from Correlation import (MANIFEST_NAME, NO_RANK, correlation_block, pair_moments, rs_ranks, save_correlations,
+                         top_neighbours)
+
+BLOCK = 4
+K = 5
+
+
+@pytest.fixture(scope="module")
+def returns(market):
+    return gold_returns(market, 600)
+
+
+@pytest.fixture(scope="module")
+def expected(returns):
+    """
+    pandas' pairwise-complete float64 correlations.
+    """
+    return pd.DataFrame(returns.astype(float)).corr(min_periods=20).to_numpy(copy=True)
+
+
+def test_blocked_correlations_match_dataframe_corr(returns, expected):
+    n_cols = returns.shape[1]
+    x, x2, mask = pair_moments(returns)
+    blocked = np.vstack([correlation_block(x, x2, mask, lo, min(lo + BLOCK, n_cols))[0]
+                         for lo in range(0, n_cols, BLOCK)])
+    assert np.allclose(blocked, expected, atol=2e-4, equal_nan=True)
+
+
+def test_neighbours_are_the_highest_and_lowest_correlations(returns, expected):
+    with_index, with_corr, _, against_corr, observations = top_neighbours(returns, K, block=BLOCK)
+    others = expected.copy()
+    np.fill_diagonal(others, np.nan)
+    highest = np.sort(np.where(np.isnan(others), -np.inf, others), axis=1)[:, ::-1][:, :K]
+    lowest = np.sort(np.where(np.isnan(others), np.inf, others), axis=1)[:, :K]
+    assert np.allclose(with_corr, highest, atol=2e-4)
+    assert np.allclose(against_corr, lowest, atol=2e-4)
+    assert (with_index != np.arange(returns.shape[1])[:, None]).all()
+    assert np.array_equal(observations, (~np.isnan(returns)).sum(axis=0))
+
+
+def test_rs_ranks_match_dataframe_rank(market):
+    prices = market.close.iloc[-200:].drop(columns="GC=F").div(market.close["GC=F"].iloc[-200:], axis=0)
+    prices.iloc[:50, ::5] = np.nan
+    window = 20
+    strength = np.log(prices).diff(window)
+    pct = strength.rank(axis=1, method="first").sub(1).mul(100).div(strength.notna().sum(axis=1) - 1, axis=0)
+    expected_ranks = np.where(strength.notna(), np.round(pct.fillna(0).to_numpy()), NO_RANK)
+    assert np.array_equal(rs_ranks(prices.to_numpy(), window), expected_ranks.astype(np.uint8))
+
+
+def test_save_correlations_writes_every_timeframe(market, tmp_path):
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    keys, dates = sorted(labels), list(close.index)
+    with contextlib.redirect_stdout(io.StringIO()):
+        values = assemble_matrix(dates, keys, labels, close, cpi_multipliers=market.cpi_multipliers,
+                                 historical_gold=market.historical_gold, round_closes=False)
+    archive = PriceArchive.from_matrix(dates, keys, values)
+    assembled = archive.assembled(synthetic.make_timeframe_dates(market.close.index, target_points=60))
+    manifest = save_correlations(archive, assembled, str(tmp_path), block=BLOCK)
+    with open(tmp_path / MANIFEST_NAME) as f:
+        assert json.load(f) == manifest
+    assert set(manifest["timeframes"]) == set(assembled.timeframes)
+    for tf, entry in manifest["timeframes"].items():
+        ranks = np.fromfile(os.path.join(tmp_path, entry["rsFile"]), dtype=np.uint8)
+        assert ranks.size == len(entry["dates"]) * len(manifest["columns"]), tf
+        with open(tmp_path / entry["file"]) as f:
+            neighbours = json.load(f)
+        assert len(neighbours["with"]) == len(manifest["columns"]), tf
@@ -0,0 +1,63 @@
+import contextlib
+import gzip
+import io
+import os
+
+import pandas as pd
+import pytest
+
+import synthetic
+from CsvExport import process_and_save_csv, weekly_close
+from bench_csv_export import legacy_process_and_save_csv
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def export(weekly, latest, path, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        process_and_save_csv(weekly, latest, str(path), **kwargs)
+
+
+@pytest.fixture
+def daily():
+    """
+    Three symbols over four weeks: gaps, a missing gold close and a week without any.
+    """
+    return pd.read_csv(os.path.join(FIXTURES, "daily_close.csv"), index_col="Date", parse_dates=True)
+
+
+@pytest.mark.parametrize("chunk_dates", [1, 2, 256])
+def test_fixture_export_matches_the_expected_csv(daily, tmp_path, chunk_dates):
+    path = tmp_path / "data.csv"
+    export(weekly_close(daily.iloc[:-1]), daily.iloc[-1:], path, chunk_dates=chunk_dates)
+    with open(os.path.join(FIXTURES, "weekly_long.csv"), "r") as f:
+        assert path.read_text() == f.read()
+
+
+def test_gzip_output_is_the_same_csv(daily, tmp_path):
+    export(weekly_close(daily.iloc[:-1]), daily.iloc[-1:], tmp_path / "data.csv")
+    export(weekly_close(daily.iloc[:-1]), daily.iloc[-1:], tmp_path / "data.csv.gz")
+    with gzip.open(tmp_path / "data.csv.gz", "rt") as f:
+        assert f.read() == (tmp_path / "data.csv").read_text()
+
+
+def test_streaming_export_matches_the_legacy_export(tmp_path):
+    daily = synthetic.make_close_panel(25, 3)
+    weekly = weekly_close(daily.iloc[:-1])
+    export(weekly, daily.iloc[-1:], tmp_path / "stream.csv", chunk_dates=16)
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy_process_and_save_csv(weekly, daily.iloc[-1:], str(tmp_path / "legacy.csv"))
+    assert (tmp_path / "stream.csv").read_bytes() == (tmp_path / "legacy.csv").read_bytes()
+
+
+def test_latest_row_is_only_appended_when_newer(daily, tmp_path):
+    weekly = weekly_close(daily)
+    export(weekly, daily.loc[["2024-01-16"]], tmp_path / "data.csv")
+    dates = pd.read_csv(tmp_path / "data.csv")["Date"].unique().tolist()
+    assert dates == ["2024-01-01", "2024-01-08", "2024-01-15", "2024-01-22"]
+
+
+def test_no_gold_column_writes_nothing(daily, tmp_path):
+    daily = daily.drop(columns="GC=F")
+    export(weekly_close(daily), daily.iloc[-1:], tmp_path / "data.csv")
+    assert not (tmp_path / "data.csv").exists()
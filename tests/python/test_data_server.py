@@ -0,0 +1,54 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from bench_data_server import build_public_dir, get, start_server
+
+SERIES = "/series?tickers=T00010,GC=F,Inflation%20Adjusted%20%24&tf=5y,1y"
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    public_dir = str(tmp_path_factory.mktemp("public"))
+    final_data, _ = build_public_dir(public_dir, 16, 6)
+    process, port = start_server(public_dir)
+    yield port, public_dir, final_data
+    process.terminate()
+    process.wait()
+
+
+def test_series_is_the_data_json_subset(server):
+    port, _, final_data = server
+    labels = ["T00010", "Gold", "Inflation Adjusted $"]
+    status, headers, body = get(port, SERIES, {"Accept-Encoding": "gzip"})
+    assert status == 200 and headers.get("Content-Encoding") == "gzip"
+    expected = {}
+    for tf in ("5y", "1y"):
+        columns = final_data[tf]["columns"]
+        idx = [0] + [columns.index(label) for label in labels]
+        expected[tf] = {"columns": ["Date"] + labels, "rows": [[row[i] for i in idx] for row in final_data[tf]["rows"]]}
+    assert gzip.decompress(body) == json.dumps(expected, separators=(',', ':')).encode()
+
+    status, _, _ = get(port, SERIES, {"Accept-Encoding": "gzip", "If-None-Match": headers["ETag"]})
+    assert status == 304
+
+
+def test_rejects_unknown_tickers_and_timeframes(server):
+    port = server[0]
+    assert get(port, "/series?tickers=NOPE")[0] == 404
+    assert get(port, "/series?tickers=Gold&tf=7y")[0] == 400
+
+
+def test_files_ranges_and_compression(server):
+    port, public_dir, _ = server
+    with open(os.path.join(public_dir, "columnar", "1y.f32"), "rb") as f:
+        raw = f.read()
+    status, _, body = get(port, "/columnar/1y.f32", {"Range": "bytes=400-799"})
+    assert status == 206 and body == raw[400:800]
+
+    status, headers, body = get(port, "/Data.json", {"Accept-Encoding": "gzip"})
+    with open(os.path.join(public_dir, "Data.json"), "rb") as f:
+        assert status == 200 and gzip.decompress(body) == f.read()
+    assert get(port, "/Data.json", {"If-None-Match": headers["ETag"], "Accept-Encoding": "gzip"})[0] == 304
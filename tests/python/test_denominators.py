@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from bench_denominators import DENOMINATORS, build_matrices, reference
+from Denominators import DenominatorEngine, parse_denominator
+
+
+@pytest.fixture(scope="module")
+def matrices():
+    return build_matrices(12, 6)
+
+
+def test_lru_evicts_least_recently_used(matrices):
+    engine = DenominatorEngine(matrices, max_cached=3)
+    for spec in DENOMINATORS[:5]:
+        engine.ratio(spec, "1y")
+    engine.ratio(DENOMINATORS[4], "1y")
+    engine.ratio(DENOMINATORS[0], "1y")
+    assert len(engine._cache) == 3
+    assert (engine.hits, engine.misses) == (1, 6)
+
+
+def test_cache_tells_baskets_apart_by_weight(matrices):
+    dates, columns, values = matrices["1y"]
+    engine = DenominatorEngine(matrices)
+    for silver in (50, 80):
+        spec = {"components": {"Gold": 1, "Silver": silver}}
+        expected = reference(values, columns, spec, range(len(columns)))
+        assert np.allclose(engine.ratio(spec, "1y"), expected, rtol=1e-12, equal_nan=True), silver
+    assert engine.misses == 2
+    # The same basket under another name is the same matrix
+    engine.ratio({"name": "Gold and Silver", "components": {"Silver": 80, "Gold": 1}}, "1y")
+    assert (engine.hits, engine.misses) == (1, 2)
+
+
+@pytest.mark.parametrize("tf", ["1y", "5y", "Daily"])
+def test_ratio_and_batch_match_cell_by_cell_reference(matrices, tf):
+    dates, columns, values = matrices[tf]
+    sample = list(range(len(columns)))
+    engine = DenominatorEngine(matrices)
+    tensors = DenominatorEngine(matrices).batch(DENOMINATORS)
+    for d, spec in enumerate(DENOMINATORS):
+        expected = reference(values, columns, spec, sample)
+        name = parse_denominator(spec).name
+        assert np.allclose(tensors[tf][d], expected, rtol=1e-12, equal_nan=True), name
+        assert np.allclose(engine.ratio(spec, tf), expected, rtol=1e-12, equal_nan=True), name
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import synthetic
+from bench_downsample import equidistant_mask
+from Downsample import METHODS, PYRAMID_LEVELS, build_pyramid, downsample_mask, reconstruction_error
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return synthetic.make_close_panel(20, 20).to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("level", PYRAMID_LEVELS)
+def test_beats_equidistant_sampling_on_drawdowns(raw, method, level):
+    mask = downsample_mask(raw, level, method)
+    errors = reconstruction_error(raw, mask)
+    equi = reconstruction_error(raw, equidistant_mask(raw, level))
+    assert np.nanmedian(errors["drawdownError"]) <= np.nanmedian(equi["drawdownError"])
+    assert mask.sum(axis=0).max() <= level
+    assert not (mask & np.isnan(raw)).any()
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_keeps_first_and_last_valid_point(raw, method):
+    mask = downsample_mask(raw, 100, method)
+    valid = ~np.isnan(raw)
+    cols = np.flatnonzero(valid.any(axis=0))
+    first = np.argmax(valid, axis=0)[cols]
+    last = raw.shape[0] - 1 - np.argmax(valid[::-1], axis=0)[cols]
+    assert mask[first, cols].all() and mask[last, cols].all()
+
+
+def test_minmax_keeps_global_low_and_high(raw):
+    mask = downsample_mask(raw, 100, "minmax")
+    cols = np.flatnonzero((~np.isnan(raw)).any(axis=0))
+    assert mask[np.nanargmin(raw[:, cols], axis=0), cols].all()
+    assert mask[np.nanargmax(raw[:, cols], axis=0), cols].all()
+
+
+def test_build_pyramid_stops_at_first_full_level(raw):
+    windows = {"Max": (0, len(raw)), "1y": (len(raw) - 252, len(raw))}
+    pyramid = build_pyramid(raw, windows)
+    assert list(pyramid["Max"]) == list(PYRAMID_LEVELS)
+    assert list(pyramid["1y"]) == [100, 400]
+    assert pyramid["1y"][400].shape == (252, raw.shape[1])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        downsample_mask(np.zeros((10, 1)), 5, "median")
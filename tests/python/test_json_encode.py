@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pytest
+
+from JsonEncode import DEFAULT_DIGITS, _fast_backend, column_types, parse_digits, round_significant, write_timeframes
+
+BACKENDS = ["json"] + (["orjson"] if _fast_backend() is not None else [])
+
+
+def decoded_values(rows):
+    return np.array([[np.nan if v is None else v for v in r[1:]] for r in rows], dtype=float)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("spec", [None, "4", "Metal=8,Stock=5"])
+def test_decodes_to_assembled_values_within_their_digits(assembled, tmp_path, backend, spec):
+    digits = parse_digits(spec)
+    path = str(tmp_path / "Data.json")
+    write_timeframes(path, assembled, digits=digits, backend=backend)
+    with open(path) as f:
+        decoded = json.load(f)
+
+    policy = np.array([digits.get(t, digits["Stock"]) for t in column_types(assembled.keys)])
+    assert list(decoded) == list(assembled.timeframes)
+    for tf, indices in assembled.timeframes.items():
+        rows = decoded[tf]["rows"]
+        assert decoded[tf]["columns"] == ["Date"] + assembled.keys
+        assert [r[0] for r in rows] == assembled.timeframe_dates(tf)
+        values, expected = decoded_values(rows), assembled.values[indices]
+        assert np.array_equal(np.isnan(values), np.isnan(expected))
+        present = ~np.isnan(expected)
+        tolerance = 0.5 * 10.0 ** (1 - np.broadcast_to(policy, expected.shape)[present]) * (1 + 1e-9)
+        assert (np.abs(values[present] / expected[present] - 1) <= tolerance).all()
+        # Short decimals: rounding again changes nothing
+        assert np.array_equal(round_significant(values, policy), values, equal_nan=True)
+
+
+def test_backends_decode_to_the_same_values(assembled, tmp_path):
+    decoded = []
+    for backend in BACKENDS:
+        path = str(tmp_path / f"{backend}.json")
+        write_timeframes(path, assembled, backend=backend)
+        with open(path) as f:
+            decoded.append(json.load(f))
+    assert all(d == decoded[0] for d in decoded)
+
+
+def test_columns_and_timeframes_subset(assembled, tmp_path):
+    path = str(tmp_path / "Fast.json")
+    keys = ["Gold", assembled.keys[-1]]
+    write_timeframes(path, assembled, columns=keys, timeframes=["1y", "nope"])
+    with open(path) as f:
+        decoded = json.load(f)
+    assert list(decoded) == ["1y"] and decoded["1y"]["columns"] == ["Date"] + keys
+
+
+def test_parse_digits():
+    assert parse_digits(None) == DEFAULT_DIGITS
+    assert set(parse_digits("5").values()) == {5}
+    assert parse_digits("Metal=9")["Metal"] == 9 and parse_digits("Metal=9")["Stock"] == DEFAULT_DIGITS["Stock"]
+
+
+def test_round_significant():
+    values = np.array([[123456.789, 0.000123456, np.nan, 0.0]])
+    assert np.array_equal(round_significant(values, 3), [[123000.0, 0.000123, np.nan, 0.0]], equal_nan=True)
@@ -0,0 +1,93 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pytest
+
+import synthetic
+from Adjustments import TR_SUFFIX
+from bench_live_tip import dividend_events, publish
+from JsonEncode import dump_json, load_json
+from LiveTip import TIP_NAME, patch_timeframes, refresh_tip
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def refreshed(market, tmp_path_factory):
+    """
+    Outputs published as of the previous session, then refreshed with the latest
+    quotes; returns (close, before, provider, tip, rebuilt tip, public_dir).
+    """
+    close = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    labels = market.tickers_map()
+    events = dividend_events(market, close)
+    public_dir = str(tmp_path_factory.mktemp("public"))
+    rebuild_dir = str(tmp_path_factory.mktemp("rebuild"))
+    with synthetic.no_network():
+        quiet(publish, close.iloc[:-1], market, labels, events, public_dir)
+        before = {name: load_json(os.path.join(public_dir, name)) for name in ("Data.json", "FastData.json")}
+        provider = market.provider()
+        tip = quiet(refresh_tip, public_dir, provider=provider, data_json=True)
+    quiet(publish, close, market, labels, events, rebuild_dir)
+    return close, before, provider, tip, load_json(os.path.join(rebuild_dir, TIP_NAME)), public_dir
+
+
+def test_quotes_come_from_one_request(refreshed):
+    close, _, provider, tip, _, _ = refreshed
+    assert len(provider.calls) == 1 and provider.calls[0][2] == "1d"
+    assert tip["date"] == close.index[-1]
+
+
+def test_tip_matches_a_full_rebuild(refreshed):
+    _, _, _, tip, rebuilt, _ = refreshed
+    # CPI and the Gold fallback aside
+    expected = dict(zip(rebuilt["columns"], rebuilt["values"]))
+    values = dict(zip(tip["columns"], tip["values"]))
+    quoted = [c for c, s in zip(tip["columns"], tip["symbols"]) if s and not s.endswith(TR_SUFFIX)]
+    assert tip["quoted"] == len(quoted)
+    assert all(values[c] == expected[c] for c in quoted)
+    tr = [c for c in tip["columns"] if c.endswith(TR_SUFFIX)]
+    assert tr
+    assert np.allclose([values[c] for c in tr], [expected[c] for c in tr], rtol=1e-5)
+
+
+def test_only_the_last_point_changes(refreshed, market):
+    close, before, _, tip, _, public_dir = refreshed
+    values = dict(zip(tip["columns"], tip["values"]))
+    quoted = {c for c, s in zip(tip["columns"], tip["symbols"]) if s and not s.endswith(TR_SUFFIX)}
+    for name, old in before.items():
+        new = load_json(os.path.join(public_dir, name))
+        for tf, tf_data in new.items():
+            rows = tf_data["rows"]
+            assert rows[:-1] == old[tf]["rows"] and rows[-1][0] == close.index[-1], (name, tf)
+            row = dict(zip(tf_data["columns"], rows[-1]))
+            assert all(row[c] == values[c] for c in tf_data["columns"][1:] if c in quoted), (name, tf)
+
+    # A second refresh in the same session replaces the tip row
+    patched = load_json(os.path.join(public_dir, "Data.json"))
+    with synthetic.no_network():
+        quiet(refresh_tip, public_dir, provider=market.provider(), data_json=True)
+    assert load_json(os.path.join(public_dir, "Data.json")) == patched
+
+
+def test_no_session_leaves_the_timeframes_alone(market, tmp_path, monkeypatch):
+    data = {"1y": {"columns": ["Date", "SPY"], "rows": [["2026-01-02", 1.0]]}}
+    assert patch_timeframes(data, None, ["SPY"], [2.0]) == 0
+    assert data["1y"]["rows"] == [["2026-01-02", 1.0]]
+
+    # A tip written before any close, refreshed without a quote
+    tip = {"date": None, "base": None, "asOf": None, "columns": ["Missing"], "symbols": ["MISSING"],
+           "digits": [6], "values": [None], "baseValues": [None], "quoted": 0}
+    dump_json(str(tmp_path / TIP_NAME), tip)
+    dump_json(str(tmp_path / "FastData.json"), data)
+    # The missing quote is asked for again before it is reported empty
+    monkeypatch.setattr("Providers.time.sleep", lambda seconds: None)
+    with synthetic.no_network():
+        refreshed_tip = quiet(refresh_tip, str(tmp_path), provider=market.provider())
+    assert refreshed_tip["date"] is None and refreshed_tip["asOf"]
+    assert load_json(str(tmp_path / "FastData.json")) == data
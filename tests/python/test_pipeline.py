@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import Pipeline
+
+
+@pytest.fixture
+def report(tmp_path):
+    return tmp_path / "last_run.json"
+
+
+def run(report, *argv):
+    return Pipeline.main([*argv, "--report", str(report), "--store", str(report.parent / "prices.sqlite"),
+                          "--public-dir", str(report.parent / "public")])
+
+
+def test_successful_command_returns_zero(report):
+    assert run(report, "fetch", "--offline") == 0
+    assert json.loads(report.read_text())["meta"]["status"] == "ok"
+
+
+def test_failing_command_returns_non_zero_and_reports_the_error(report, monkeypatch):
+    def fail(self):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(Pipeline.Pipeline, "fetch", fail)
+    assert run(report, "fetch") == 1
+    assert json.loads(report.read_text())["meta"]["status"] == "error"
+
+
+def test_offline_pipeline_does_not_refresh_the_calendar(tmp_path):
+    pipeline = Pipeline.Pipeline(public_dir=str(tmp_path), store_path=str(tmp_path / "prices.sqlite"), offline=True)
+    assert pipeline.calendar().offline
+    assert pipeline.calendar() is pipeline.calendar()
+
+
+def test_quality_defaults_to_report(report):
+    assert Pipeline.Pipeline().quality == "report"
+    assert Pipeline.build_parser().parse_args(["export-json"]).quality == "report"
+    assert run(report, "fetch", "--offline") == 0
+    assert json.loads(report.read_text())["meta"]["quality"] == "report"
@@ -0,0 +1,126 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+import Instrument
+import synthetic
+from PriceStore import DEFAULT_BASIS, TOTAL_RETURN_BASIS, PriceStore
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def day(date):
+    return date.strftime("%Y-%m-%d")
+
+
+class FailingProvider(synthetic.SyntheticProvider):
+    """
+    Raises for every chunk that contains one of `bad`.
+    """
+
+    def __init__(self, market, bad, until=None):
+        super().__init__(market, until)
+        self.bad = set(bad)
+
+    def _download(self, symbols, start=None, period=None, interval="1d"):
+        if self.bad.intersection(symbols):
+            raise RuntimeError("rate limited")
+        return super()._download(symbols, start=start, period=period, interval=interval)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("Providers.time.sleep", lambda seconds: None)
+
+
+@pytest.fixture()
+def market():
+    return synthetic.make_market(6, 2)
+
+
+@pytest.fixture()
+def store(tmp_path):
+    with synthetic.no_network(), PriceStore(str(tmp_path / "prices.sqlite")) as store:
+        yield store
+
+
+def test_plan_starts_after_the_high_water_marks(market, store):
+    dates = market.close.index
+    assert list(quiet(store.plan_fetch, market.symbols)) == [None]
+    quiet(store.update, market.symbols, provider=market.provider(until=dates[-6]), today="2000-01-01")
+
+    marks = store.high_water_marks()
+    assert marks == {s: day(market.close[s][:dates[-6]].dropna().index[-1]) for s in market.symbols}
+    assert store.previous_sessions() == {s: day(market.close[s][:dates[-6]].dropna().index[-2])
+                                         for s in market.symbols}
+    # The default basis starts one settled session earlier, the total-return one at the mark
+    plan = store.plan_fetch(market.symbols, today="2100-01-01")
+    assert sorted(s for group in plan.values() for s in group) == sorted(market.symbols)
+    assert all(start == store.previous_sessions()[s] for start, group in plan.items() for s in group)
+    store.set_basis(market.symbols, TOTAL_RETURN_BASIS)
+    plan = store.plan_fetch(market.symbols, today="2100-01-01", total_return=True)
+    assert all(start == marks[s] for start, group in plan.items() for s in group)
+
+    # Symbols already at today are skipped, unknown ones get their full history
+    store.set_basis(market.symbols, DEFAULT_BASIS)
+    assert store.plan_fetch(market.symbols, today=max(marks.values())) == {}
+    assert store.plan_fetch(["NEW"], today="2100-01-01") == {None: ["NEW"]}
+
+
+def test_incremental_update_downloads_the_tail(market, store):
+    dates = market.close.index
+    quiet(store.update, market.symbols, provider=market.provider(until=dates[-6]), today="2000-01-01")
+    provider = market.provider()
+    Instrument.reset()
+    summary = quiet(store.update, market.symbols, provider=provider, today="2100-01-01")
+    counters = dict(Instrument.report()["counters"])
+    assert all(start is not None and start >= day(dates[-8]) for _, start, _, _ in provider.calls)
+    assert counters["store.incremental"] == len(market.symbols) and "store.readjusted" not in counters
+    assert summary["fetched"] == len(market.symbols) and not summary["failed"]
+    expected = market.close.set_axis(market.close.index.strftime("%Y-%m-%d"))
+    close = store.load(market.symbols)
+    assert np.allclose(close.to_numpy(), expected.reindex(close.index).to_numpy(), equal_nan=True)
+    assert store.high_water_marks() == {s: day(market.close[s].dropna().index[-1]) for s in market.symbols}
+
+
+def test_failed_basis_switch_keeps_the_old_basis(market, store):
+    quiet(store.update, market.symbols, provider=market.provider(), today="2000-01-01")
+    bad = market.symbols[-1]
+    summary = quiet(store.update, market.symbols, provider=FailingProvider(market, [bad]), today="2000-01-01",
+                    total_return=True)
+    assert list(summary["failed"]) == [bad]
+    assert store.close_basis() == DEFAULT_BASIS
+    bases = store.close_bases()
+    assert bases[bad] == DEFAULT_BASIS
+    assert all(bases[s] == TOTAL_RETURN_BASIS for s in market.symbols if s != bad)
+
+    # Only the symbol left behind is fetched in full again
+    assert quiet(store.plan_fetch, market.symbols, today="2000-01-01", total_return=True) == {None: [bad]}
+    quiet(store.update, market.symbols, provider=market.provider(), today="2000-01-01", total_return=True)
+    assert store.close_basis() == TOTAL_RETURN_BASIS
+
+
+def test_readjusted_history_is_fetched_again(market, store):
+    dates = market.close.index
+    quiet(store.update, market.symbols, provider=market.provider(until=dates[-6]), today="2000-01-01")
+
+    # A dividend two sessions ago: the provider now returns every earlier close adjusted for it
+    payer = market.symbols[-1]
+    close = market.close.copy()
+    close.loc[close.index < dates[-2], payer] *= 0.97
+    adjusted = synthetic.SyntheticMarket(close, market.index_level, market.cpi_multipliers, market.historical_gold)
+    provider = adjusted.provider()
+    Instrument.reset()
+    summary = quiet(store.update, market.symbols, provider=provider, today="2100-01-01")
+    assert dict(Instrument.report()["counters"])["store.readjusted"] == 1
+    assert provider.calls[-1][:2] == ((payer,), None)
+    assert summary["fetched"] == len(market.symbols)
+
+    expected = close.set_axis(close.index.strftime("%Y-%m-%d"))
+    stored = store.load(market.symbols)
+    assert np.allclose(stored.to_numpy(), expected.reindex(stored.index).to_numpy(), rtol=1e-12, equal_nan=True)
@@ -0,0 +1,94 @@
+import contextlib
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+import Instrument
+from Providers import FixtureProvider, counting_session, fetch_chunks
+
+
+def write_fixtures(directory, symbols):
+    dates = pd.bdate_range("2024-01-01", periods=5)
+    for i, symbol in enumerate(symbols):
+        pd.DataFrame({"Date": dates, "Close": [10.0 + i] * 5}).to_csv(directory / f"{symbol}.csv", index=False)
+
+
+def test_failing_chunks_are_retried_then_split_down_to_the_bad_symbol(tmp_path):
+    symbols = [f"S{i}" for i in range(8)]
+    write_fixtures(tmp_path, symbols[:-1])
+    provider = FixtureProvider(tmp_path, failing=["S3"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fetch_chunks(provider, symbols, chunk_size=4, retries=1, backoff=0)
+    assert list(result.failed) == ["S3"]
+    assert result.empty == ["S7"]
+    fetched = {s for frame in result.frames for s in frame.columns.get_level_values(0)}
+    assert fetched == set(symbols) - {"S3", "S7"}
+    # The failing chunk: first try and one retry, then halves and quarters down to S3;
+    # the other chunk once, then S7 alone once more
+    assert result.attempts == len(provider.calls) == (2 + 2 + 2) + (1 + 1)
+
+
+class FlakyProvider(FixtureProvider):
+    """
+    Leaves the symbols in `flaky` out of their first response, like a throttled yfinance.
+    """
+
+    def __init__(self, fixture_dir, flaky):
+        super().__init__(fixture_dir)
+        self.flaky = set(flaky)
+
+    def _download(self, symbols, start=None, period=None, interval="1d"):
+        df = super()._download(symbols, start=start, period=period, interval=interval)
+        dropped = self.flaky.intersection(symbols)
+        self.flaky.difference_update(dropped)
+        return df.drop(columns=list(dropped), level=0)
+
+
+def test_empty_symbols_are_retried_with_backoff(tmp_path, monkeypatch):
+    symbols = [f"S{i}" for i in range(6)]
+    write_fixtures(tmp_path, symbols[:-1])
+    delays = []
+    monkeypatch.setattr("Providers.time.sleep", delays.append)
+    provider = FlakyProvider(tmp_path, flaky=["S1", "S4"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fetch_chunks(provider, symbols, chunk_size=3, retries=2, backoff=0.5)
+    fetched = {s for frame in result.frames for s in frame.columns.get_level_values(0)}
+    assert fetched == set(symbols) - {"S5"}
+    assert result.empty == ["S5"] and not result.failed
+    # S1 and S4 come back on their first retry, S5 is asked for once more
+    assert sorted(call[0] for call in provider.calls[2:]) == [("S1",), ("S4", "S5"), ("S5",)]
+    assert sorted(delays) == [0.5, 0.5, 1.0]
+
+
+class Payload(BaseHTTPRequestHandler):
+    body = b"x" * 1234
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_counting_session_counts_downloaded_bytes():
+    session = counting_session()
+    if session is None:
+        pytest.skip("curl_cffi is not installed")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Payload)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        Instrument.reset()
+        for _ in range(3):
+            session.get(f"http://127.0.0.1:{server.server_port}/chart")
+        counters = Instrument.report()["counters"]
+    finally:
+        server.shutdown()
+    assert counters["download.yfinance.bytes"] == 3 * len(Payload.body)
+    assert counters["download.yfinance.responses"] == 3
@@ -0,0 +1,82 @@
+import contextlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Exports import save_data_json
+from JsonEncode import load_json, parse_digits, round_significant
+from Publish import load_published, merge, publish, split_rows
+from bench_publish import next_day, to_assembled
+
+
+def serialize(final_data):
+    return json.dumps(final_data, indent=None, separators=(',', ':'))
+
+
+def quiet_publish(final_data, out_dir, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return publish(final_data, out_dir, **kwargs)
+
+
+def test_base_and_deltas_reproduce_every_day(final_data, tmp_path):
+    quiet_publish(final_data, tmp_path, compact_every=4)
+    last_date = pd.Timestamp(final_data["Max"]["rows"][-1][0])
+    for day, date in enumerate(pd.bdate_range(last_date + pd.Timedelta(days=1), periods=9)):
+        final_data = next_day(final_data, date.strftime("%Y-%m-%d"), 1 + 0.001 * (day % 7 - 3))
+        manifest = quiet_publish(final_data, tmp_path, compact_every=4)
+        assert serialize(load_published(tmp_path)) == serialize(final_data)
+        assert len(manifest["deltas"]) < 4
+        # Only the files of the manifest are left after a compaction
+        assert sorted(os.listdir(tmp_path)) == sorted(["manifest.json", manifest["base"]] + manifest["deltas"])
+
+
+@pytest.mark.parametrize("spec", [None, "4", "Metal=8,Stock=3"])
+def test_delta_mode_reproduces_full_mode_data_json(final_data, tmp_path, spec):
+    digits = parse_digits(spec)
+    full_dir, delta_dir = tmp_path / "full", tmp_path / "delta"
+    full_dir.mkdir()
+    last_date = pd.Timestamp(final_data["Max"]["rows"][-1][0])
+    for day, date in enumerate(pd.bdate_range(last_date + pd.Timedelta(days=1), periods=3)):
+        final_data = next_day(final_data, date.strftime("%Y-%m-%d"), 1.001 + 0.0001 * day)
+        assembled = to_assembled(final_data)
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_data_json(assembled, str(full_dir), "full", digits)
+            save_data_json(assembled, str(delta_dir), "delta", digits)
+        assert load_published(delta_dir / "snapshots") == load_json(str(full_dir / "Data.json"))
+        # The frontend still loads Data.json
+        assert load_json(str(delta_dir / "Data.json")) == load_json(str(full_dir / "Data.json"))
+    # The digits policy applies to the snapshots as well
+    if spec == "4":
+        values = np.array([v for row in load_published(delta_dir / "snapshots")["Max"]["rows"]
+                           for v in row[1:] if v is not None])
+        assert np.array_equal(round_significant(values, 4), values)
+
+
+def test_unchanged_data_writes_no_delta(final_data, tmp_path):
+    first = quiet_publish(final_data, tmp_path)
+    assert quiet_publish(final_data, tmp_path) == first
+    assert first["deltas"] == []
+
+
+def test_column_changes_are_remapped(tmp_path):
+    dates = [d.strftime("%Y-%m-%d") for d in pd.bdate_range("2024-01-01", periods=40)]
+    day1 = {"1y": {"columns": ["Date", "A", "B"], "rows": [[d, 1.0, float(i)] for i, d in enumerate(dates)]}}
+    day2 = {"1y": {"columns": ["Date", "B", "C"],
+                   "rows": [[d, float(i), None] for i, d in enumerate(dates)] + [["2024-03-01", 2.5, 3.0]]}}
+    quiet_publish(day1, tmp_path)
+    manifest = quiet_publish(day2, tmp_path)
+    assert len(manifest["deltas"]) == 1
+    assert load_published(tmp_path) == day2
+
+
+def test_split_rows_rejects_disagreeing_timeframes():
+    columns, rows, timeframes = split_rows({"1y": {"columns": ["Date", "A"], "rows": [["2024-01-02", 1.0]]},
+                                            "Max": {"columns": ["Date", "A"], "rows": [["2024-01-02", 1.0]]}})
+    assert rows == {"2024-01-02": [1.0]} and merge({"columns": columns, "rows": rows, "timeframes": timeframes}, [])
+    with pytest.raises(ValueError):
+        split_rows({"1y": {"columns": ["Date", "A"], "rows": [["2024-01-02", 1.0]]},
+                    "Max": {"columns": ["Date", "A"], "rows": [["2024-01-02", 2.0]]}})
@@ -0,0 +1,120 @@
+import contextlib
+import hashlib
+import io
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from bench_reference_series import legacy_cpi_multipliers, legacy_historical_gold, legacy_lookup
+from ReferenceSeries import (ReferenceCache, get_cpi_multipliers, get_historical_gold,
+                             load_cpi_multipliers, load_historical_gold, monthly_join)
+
+FIXTURES = {
+    "/cpi.csv": synthetic.make_cpi_csv(),
+    "/gold.csv": synthetic.make_gold_csv()
+}
+LAST_MODIFIED = formatdate(usegmt=True)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves FIXTURES with ETag/Last-Modified and answers conditional requests with 304.
+    """
+    requests = []
+
+    def do_GET(self):
+        FixtureHandler.requests.append(self.path)
+        body = FIXTURES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+@pytest.fixture
+def server():
+    FixtureHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_cache_ttl_revalidation_and_offline_fallback(server, tmp_path):
+    cpi_url, gold_url = base_url(server) + "/cpi.csv", base_url(server) + "/gold.csv"
+    cache_dir = str(tmp_path)
+    requests = FixtureHandler.requests
+
+    cache = ReferenceCache(cache_dir)
+    cpi = quiet(load_cpi_multipliers, cache, cpi_url)
+    quiet(load_historical_gold, cache, gold_url)
+    assert len(requests) == 2 and len(cpi) > 0
+
+    # Fresh within the TTL: served from the cache
+    quiet(load_cpi_multipliers, cache, cpi_url)
+    assert len(requests) == 2
+
+    # Expired: revalidated with a conditional request (304)
+    expired = ReferenceCache(cache_dir, ttl_hours=0)
+    assert quiet(load_cpi_multipliers, expired, cpi_url).equals(cpi)
+    assert len(requests) == 3
+
+    # Source down, or offline: the cached copy
+    server.shutdown()
+    server.server_close()
+    assert quiet(load_cpi_multipliers, expired, cpi_url).equals(cpi)
+    assert quiet(load_cpi_multipliers, ReferenceCache(cache_dir, offline=True), cpi_url).equals(cpi)
+    assert quiet(load_cpi_multipliers, ReferenceCache(str(tmp_path / "empty"), offline=True), cpi_url).empty
+
+
+def test_parsed_series_match_row_by_row_parse(server, tmp_path):
+    cache = ReferenceCache(str(tmp_path))
+    cpi_map = quiet(get_cpi_multipliers, cache, base_url(server) + "/cpi.csv")
+    gold_map = quiet(get_historical_gold, cache, base_url(server) + "/gold.csv")
+    assert cpi_map == legacy_cpi_multipliers(FIXTURES["/cpi.csv"])
+    assert gold_map == legacy_historical_gold(FIXTURES["/gold.csv"])
+
+
+def test_monthly_join_matches_dict_lookups():
+    cpi_map = legacy_cpi_multipliers(FIXTURES["/cpi.csv"])
+    # Dates from before the first CPI print to past the last one
+    dates = list(pd.bdate_range(end="2026-12-31", periods=2000).strftime("%Y-%m-%d"))
+    joined = monthly_join(cpi_map, dates, ffill=True)
+    joined = np.where(np.isnan(joined), cpi_map[max(cpi_map)], joined)
+    assert np.array_equal(joined, legacy_lookup(dates, cpi_map))
+
+
+def test_monthly_join_without_ffill_leaves_gaps():
+    joined = monthly_join({"2020-01": 1.5, "2020-03": 2.0}, ["2020-01-15", "2020-02-03", "2020-03-31", "2020-04-01"])
+    assert joined[0] == 1.5 and joined[2] == 2.0
+    assert np.isnan(joined[1]) and np.isnan(joined[3])
+    assert np.isnan(monthly_join({}, ["2020-01-15"])).all()
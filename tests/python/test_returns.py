@@ -0,0 +1,81 @@
+import json
+import math
+
+import numpy as np
+
+from JsonEncode import load_json, parse_digits, rounded_matrices, write_timeframes
+from Returns import DENOMINATORS, METRICS, compute_return_matrices, compute_returns, save_return_matrices
+
+
+def naive_metrics(dates, usd, ref, mode):
+    """
+    Per-ticker reference using plain Python loops.
+    """
+    series = []
+    for d, p, r in zip(dates, usd, ref):
+        if p is None or (mode != "USD" and (r is None or r <= 0)):
+            series.append((d, None))
+        elif mode == "USD":
+            series.append((d, p))
+        elif mode == "Inflation Adjusted $":
+            series.append((d, p * r))
+        else:
+            series.append((d, p / r))
+
+    points = [(d, v) for d, v in series if v is not None]
+    if not points or points[0][1] <= 0:
+        return [None] * len(METRICS)
+    (d0, v0), (d1, v1) = points[0], points[-1]
+    years = (np.datetime64(d1) - np.datetime64(d0)).astype(int) / 365.25
+    total = v1 / v0 - 1
+    cagr = (v1 / v0) ** (1 / years) - 1 if years > 0 and v1 > 0 else None
+
+    peak, max_dd = -math.inf, 0.0
+    for _, v in points:
+        peak = max(peak, v)
+        max_dd = min(max_dd, v / peak - 1)
+
+    scaled = []
+    for (da, va), (db, vb) in zip(series, series[1:]):
+        if va and vb and va > 0 and vb > 0:
+            dt = (np.datetime64(db) - np.datetime64(da)).astype(int) / 365.25
+            scaled.append(math.log(vb / va) / math.sqrt(dt))
+    vol = float(np.std(scaled, ddof=1)) if len(scaled) > 1 else None
+    return [total, cagr, max_dd, vol]
+
+
+def test_every_ticker_matches_the_per_ticker_reference(final_data):
+    matrices = compute_return_matrices(final_data)
+    assert "Inflation Adjusted $" not in matrices["tickers"]
+    for tf_label, tf_data in final_data.items():
+        columns = tf_data["columns"]
+        dates = [row[0] for row in tf_data["rows"]]
+        array = matrices["timeframes"][tf_label]
+        assert array.shape == (len(METRICS), len(DENOMINATORS), len(matrices["tickers"]))
+        for t, ticker in enumerate(matrices["tickers"]):
+            usd = [row[columns.index(ticker)] for row in tf_data["rows"]]
+            for d, name in enumerate(DENOMINATORS):
+                ref = [row[columns.index(name)] for row in tf_data["rows"]] if name in columns else [None] * len(usd)
+                expected = np.array([np.nan if v is None else v for v in naive_metrics(dates, usd, ref, name)])
+                assert np.allclose(array[:, d, t], expected, rtol=1e-9, atol=1e-12, equal_nan=True), \
+                    f"{tf_label} {ticker} {name}"
+
+
+def test_saved_matrices_are_rounded_percentages(final_data, tmp_path):
+    path = tmp_path / "Returns.json"
+    save_return_matrices(compute_return_matrices(final_data), path)
+    payload = json.loads(path.read_text())
+    assert payload["unit"] == "percent"
+    cells = [v for metric in payload["timeframes"]["Max"] for row in metric for v in row]
+    assert all(v is None or round(v, 2) == v for v in cells)
+    assert any(v is not None for v in cells)
+
+
+def test_returns_of_the_matrices_match_data_json(assembled, tmp_path):
+    digits = parse_digits("4")
+    write_timeframes(str(tmp_path / "Data.json"), assembled, digits=digits)
+    from_json = compute_return_matrices(load_json(str(tmp_path / "Data.json")))
+    from_matrices = compute_returns(rounded_matrices(assembled, digits))
+    assert from_matrices["tickers"] == from_json["tickers"]
+    for tf_label, array in from_json["timeframes"].items():
+        assert np.array_equal(from_matrices["timeframes"][tf_label], array, equal_nan=True), tf_label
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from bench_search import make_queries, make_universe
+from SearchIndex import SearchIndex, build_search_index, entry_keys, normalize
+
+SYMBOLS = 2000
+# Share of single-edit typos whose entry is in the top 10 (about 0.99 on this universe)
+RECALL_FLOOR = 0.95
+
+
+@pytest.fixture(scope="module")
+def search():
+    universe = make_universe(SYMBOLS)
+    index = build_search_index(universe)
+    prefixes, typos = make_queries(universe, 1000, np.random.default_rng(11))
+    return SearchIndex(index), prefixes, typos
+
+
+@pytest.fixture(scope="module")
+def entries_keys(search):
+    index = search[0]
+    return [entry_keys(index.entry(i)) for i in range(len(index.entries))]
+
+
+def brute_force(entries_keys, query, limit):
+    """
+    Best `limit` entry positions for an exact prefix query, checking every key of every entry.
+    """
+    ranked = []
+    for i, (symbol_keys, name_keys) in enumerate(entries_keys):
+        if query in symbol_keys:
+            ranked.append((0, i))
+        elif any(k.startswith(query) for k in symbol_keys):
+            ranked.append((1, i))
+        elif any(k.startswith(query) for k in name_keys):
+            ranked.append((2, i))
+    return [i for _, i in sorted(ranked)[:limit]]
+
+
+def one_edit(a, b):
+    """
+    True when b is a, or one deletion, insertion, substitution or swap of neighbours away from it.
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) <= 1 or (len(diff) == 2 and diff[1] == diff[0] + 1
+                                  and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    short, long_ = (a, b) if len(a) < len(b) else (b, a)
+    return any(long_[:i] + long_[i + 1:] == short for i in range(len(long_)))
+
+
+def test_prefix_results_match_a_full_scan(search, entries_keys):
+    index, prefixes, _ = search
+    # Heads (one and two characters) included
+    for q in prefixes[:300] + sorted(index.heads)[:200]:
+        expected = [index.entries[i][1] for i in brute_force(entries_keys, normalize(q), 10)]
+        assert [e["label"] for e in index.query(q, 10, typos=False)] == expected, q
+
+
+def test_typo_results_match_a_full_scan(search, entries_keys):
+    index, _, typos = search
+    all_keys = [(k, i) for i, (symbol_keys, name_keys) in enumerate(entries_keys) for k in symbol_keys | name_keys]
+    for typo, _ in typos[:30]:
+        exact = brute_force(entries_keys, typo, 10 ** 6)
+        near = {i for k, i in all_keys if any(one_edit(typo, k[:n]) for n in (len(typo) - 1, len(typo), len(typo) + 1)
+                                              if 0 < n <= len(k))} - set(exact)
+        got = index.scan(typo, 10 ** 6)
+        assert [i for i, r in got if r[0] == 0] == exact, typo
+        assert {i for i, r in got if r[0] == 1} == near, typo
+
+
+def test_limit_cuts_the_full_ranking(search):
+    index, prefixes, typos = search
+    for q in [normalize(p) for p in prefixes[:50]] + [t for t, _ in typos[:50]]:
+        assert index.scan(q, 10) == index.scan(q, 10 ** 6)[:10], q
+
+
+def test_typo_recall_floor(search):
+    index, _, typos = search
+    found = sum(label in [e["label"] for e in index.query(typo, 10)] for typo, label in typos)
+    assert found / len(typos) >= RECALL_FLOOR, f"{found}/{len(typos)}"
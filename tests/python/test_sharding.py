@@ -0,0 +1,103 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+import Sharding
+from Adjustments import TR_SUFFIX, with_total_return
+from Assembly import assemble_matrix
+from bench_parallel_assembly import build_inputs
+from Instrument import report, reset
+from PriceStore import PriceStore
+from Sharding import StoreCloses, shard_bounds, shard_workers, take_block
+
+
+@pytest.fixture
+def always_shard(monkeypatch):
+    # Shard even the small test panels, on any number of CPUs
+    monkeypatch.setattr(Sharding, "MIN_SHARD_CELLS", 1)
+    monkeypatch.setattr(Sharding, "available_cpus", lambda: 8)
+
+
+def test_shard_workers_falls_back_on_small_panels(monkeypatch):
+    monkeypatch.setattr(Sharding, "available_cpus", lambda: 8)
+    assert shard_workers(1000, 100, 4) == 1
+    assert shard_workers(20000, 500, 4) == 4
+    assert shard_workers(2_000_000, 3, 8) == 3
+    monkeypatch.setattr(Sharding, "available_cpus", lambda: 2)
+    assert shard_workers(20000, 500, 8) == 2
+
+
+def test_shard_bounds_cover_every_column():
+    bounds = shard_bounds(10, 4)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+    assert shard_bounds(2, 8) == [(0, 1), (1, 2)]
+
+
+def test_take_block_matches_reindex():
+    close = pd.DataFrame([[1.0, 2.0], [3.0, np.nan]], index=["2024-01-02", "2024-01-03"], columns=["A", "B"])
+    dates, symbols = ["2024-01-01", "2024-01-03"], ["B", "C", "A"]
+    got = take_block(close.to_numpy(), close.index.get_indexer(dates), close.columns.get_indexer(symbols))
+    expected = close.reindex(index=dates, columns=symbols).to_numpy()
+    assert np.array_equal(got, expected, equal_nan=True)
+    assert np.isnan(take_block(np.empty((0, 0)), np.array([-1]), np.array([-1]))).all()
+
+
+def test_sharded_matches_single_process(always_shard):
+    timeframe_dates, all_keys, tickers_map, close, existing_lookup = build_inputs(40, 4)
+    dates = sorted(set(d for tf_dates in timeframe_dates.values() for d in tf_dates))
+    kwargs = dict(existing_lookup=existing_lookup, cpi_multipliers=synthetic.make_cpi_multipliers(),
+                  historical_gold=synthetic.make_historical_gold())
+    single = assemble_matrix(dates, all_keys, tickers_map, close, **kwargs)
+    reset()
+    sharded = assemble_matrix(dates, all_keys, tickers_map, close, workers=3, **kwargs)
+    assert report()["counters"]["assembly.shards"] == 3
+    assert np.array_equal(single, sharded, equal_nan=True)
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    panel = synthetic.make_close_panel(12, 2)
+    panel.index = panel.index.strftime("%Y-%m-%d")
+    symbols = list(panel.columns[3:])
+    actions = pd.DataFrame({"symbol": symbols[:4], "date": [panel.index[100 + i] for i in range(4)],
+                            "dividend": [0.5, 0.25, 1.0, 0.75], "split": [1.0] * 4})
+    path = str(tmp_path / "prices.sqlite")
+    with PriceStore(path) as store, contextlib.redirect_stdout(io.StringIO()):
+        store.write(panel)
+        store.write_actions(actions)
+        store.refresh_growth()
+    return path, panel
+
+
+def test_store_closes_match_loaded_closes(store_path):
+    path, panel = store_path
+    tickers_map = {"Gold": "GC=F", **{s: s for s in panel.columns[3:]}}
+    dates = list(panel.index[::5])
+    with PriceStore(path) as store:
+        close = store.load(list(tickers_map.values()), dates=dates).reindex(index=dates)
+        expected_close, expected_labels = with_total_return(close, tickers_map, store.load_actions())
+
+    source = StoreCloses(path, total_return=True)
+    labels = source.labels(tickers_map)
+    assert labels == expected_labels
+    assert sum(label.endswith(TR_SUFFIX) for label in labels) == 4
+    keys = sorted(labels)
+    symbols = [labels[k] for k in keys]
+    expected = expected_close.reindex(columns=symbols).to_numpy()
+    assert np.array_equal(source.block(symbols, dates), expected, equal_nan=True)
+
+
+def test_sharded_store_reads_match_single_process(store_path, always_shard):
+    path, panel = store_path
+    source = StoreCloses(path, total_return=True)
+    labels = source.labels({"Gold": "GC=F", "Inflation Adjusted $": "CPI", **{s: s for s in panel.columns[3:]}})
+    keys, dates = sorted(labels), list(panel.index[::3])
+    kwargs = dict(cpi_multipliers=synthetic.make_cpi_multipliers(), historical_gold=synthetic.make_historical_gold())
+    single = assemble_matrix(dates, keys, labels, source, **kwargs)
+    sharded = assemble_matrix(dates, keys, labels, source, workers=4, **kwargs)
+    assert np.array_equal(single, sharded, equal_nan=True)
@@ -0,0 +1,33 @@
+import socket
+
+import numpy as np
+import pytest
+
+import synthetic
+
+
+def test_make_market_is_deterministic_and_shaped_like_the_pipeline_inputs():
+    market = synthetic.make_market(20, 3)
+    again = synthetic.make_market(20, 3)
+    assert market.close.equals(again.close)
+    assert market.symbols[:4] == ["GC=F", "SI=F", "PL=F", "SPY"]
+    assert len(market.close) == 3 * 252
+    assert np.nanmin(market.close.to_numpy()) > 0
+    assert market.tickers_map()["Gold"] == "GC=F"
+    assert set(market.actions.columns) == {"symbol", "date", "dividend", "split"}
+
+
+def test_provider_serves_until_a_date_then_the_latest_session():
+    market = synthetic.make_market(12, 2)
+    until = market.close.index[-5]
+    frame = market.provider(until=until).download(["SPY"])
+    assert frame.index[-1] == until
+    latest = market.provider().download(["SPY", "UNKNOWN"], period="1d")
+    assert list(latest.columns.get_level_values(0).unique()) == ["SPY"]
+    assert latest.index[-1] == market.close.index[-1]
+
+
+def test_no_network_refuses_connections():
+    with synthetic.no_network():
+        with pytest.raises(ConnectionRefusedError):
+            socket.create_connection(("example.com", 80))
@@ -0,0 +1,80 @@
+import contextlib
+import io
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import synthetic
+from Providers import FixtureProvider
+from TimeFrame import CALENDAR_SYMBOL, TIMEFRAMES, TradingCalendar, get_timeframe_dates
+
+# 40 years of weekday sessions up to 2026-08-14
+SESSIONS = pd.bdate_range(end="2026-08-14", periods=40 * 261)
+
+
+def index_provider(directory, sessions=SESSIONS):
+    """
+    A FixtureProvider serving the calendar index over `sessions`.
+    """
+    directory.mkdir(exist_ok=True)
+    pd.DataFrame({"Date": sessions, "Close": 100.0}).to_csv(directory / f"{CALENDAR_SYMBOL}.csv", index=False)
+    return FixtureProvider(str(directory))
+
+
+def trading_days(calendar, today):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return calendar.trading_days(today=today)
+
+
+def test_calendar_downloads_once_then_refreshes_the_tail(tmp_path):
+    path = tmp_path / "trading_days.json"
+
+    first = index_provider(tmp_path / "until", SESSIONS[:-9])
+    days = trading_days(TradingCalendar(path, provider=first), "2026-01-01")
+    assert days[-1] == SESSIONS[-10] and first.calls[0][1] is None
+
+    # Fetched today: the cache is used as is
+    same_day = index_provider(tmp_path / "all")
+    assert trading_days(TradingCalendar(path, provider=same_day), "2026-01-01")[-1] == SESSIONS[-10]
+    assert same_day.calls == []
+
+    # A later day only downloads the last couple of weeks
+    later = index_provider(tmp_path / "all")
+    days = trading_days(TradingCalendar(path, provider=later), "2100-01-01")
+    assert list(days) == list(SESSIONS)
+    assert later.calls[0][1] == (SESSIONS[-10] - timedelta(days=14)).strftime("%Y-%m-%d")
+
+
+def test_offline_calendar_uses_the_cache_whatever_its_age(tmp_path):
+    path = tmp_path / "trading_days.json"
+    path.write_text(json.dumps({"fetched_at": "2001-01-01", "dates": ["2024-01-02", "2024-01-03"]}))
+    with synthetic.no_network():
+        days = trading_days(TradingCalendar(path, offline=True), "2100-01-01")
+    assert [d.strftime("%Y-%m-%d") for d in days] == ["2024-01-02", "2024-01-03"]
+
+    with pytest.raises(RuntimeError):
+        trading_days(TradingCalendar(tmp_path / "missing.json", offline=True), "2100-01-01")
+
+
+@pytest.mark.parametrize("sampling", ["equidistant", "anchored"])
+def test_timeframe_dates_are_sessions_within_each_window(tmp_path, sampling):
+    calendar = TradingCalendar(tmp_path / "trading_days.json", provider=index_provider(tmp_path / "index"))
+    now = datetime(2026, 8, 14, 23, 59)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = get_timeframe_dates(sampling, calendar, now)
+    sessions = set(SESSIONS.strftime("%Y-%m-%d"))
+    assert list(result) == list(TIMEFRAMES)
+    for dates in result.values():
+        assert dates == sorted(set(dates)) and set(dates) <= sessions
+        # The anchored grid assumes 252 sessions a year; weekdays give a few more points
+        assert len(dates) <= (100 if sampling == "equidistant" else 105) and dates[-1] == "2026-08-14"
+
+
+def test_anchored_points_stay_put_from_one_day_to_the_next(tmp_path):
+    calendar = TradingCalendar(tmp_path / "trading_days.json", provider=index_provider(tmp_path / "index"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        today = get_timeframe_dates("anchored", calendar, datetime(2026, 8, 14, 23, 59))["10y"]
+        yesterday = get_timeframe_dates("anchored", calendar, datetime(2026, 8, 13, 23, 59))["10y"]
+    assert len(set(today) & set(yesterday)) >= len(today) - 3
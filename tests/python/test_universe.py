@@ -0,0 +1,131 @@
+import contextlib
+import io
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+import synthetic
+from bench_universe import make_constituents, make_page
+from Constituents import SP500_LIST, UniverseManager
+from PriceStore import PriceStore
+from Providers import FixtureProvider
+from Universe import SP500_TICKERS
+
+PAGES = {}
+N = 40
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    PAGES.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def refresh(cache_dir, url, today, ttl_hours=0):
+    manager = UniverseManager(str(cache_dir), sp500_source=url, ttl_hours=ttl_hours)
+    with contextlib.redirect_stdout(io.StringIO()):
+        diff = manager.refresh(today=today)
+    return manager, diff
+
+
+def dashed(constituents):
+    return [c["symbol"].replace(".", "-") for c in constituents]
+
+
+def test_constituent_changes_are_diffed_and_dated(base_url, tmp_path):
+    cache_dir, url = tmp_path / "universe", base_url + "/sp500.html"
+    first = make_constituents(N)
+    PAGES["/sp500.html"] = make_page(first)
+
+    manager, diff = refresh(cache_dir, url, "2026-01-02")
+    members = manager.members(SP500_LIST)
+    assert diff[SP500_LIST]["initial"] and len(members) == N
+    assert manager.added_symbols() == []
+    assert members["S00001"]["since"] == "1958-03-04"
+    assert "B0000-B" in members
+
+    # Index changes: two companies leave, three join
+    joining = make_constituents(3, start=N)
+    second = [c for c in first if c["symbol"] not in ("S00003", "S00007")] + joining
+    PAGES["/sp500.html"] = make_page(second)
+    manager, diff = refresh(cache_dir, url, "2026-03-20")
+    added = sorted(dashed(joining))
+    assert sorted(manager.added_symbols()) == added
+    assert diff[SP500_LIST]["removed"] == ["S00003", "S00007"]
+    assert list(diff) == [SP500_LIST]
+    assert manager.members(SP500_LIST, include_removed=True)["S00003"]["until"] == "2026-03-20"
+    assert manager.members(SP500_LIST)[added[0]]["since"] == joining[0]["added"]
+    labels = [e["label"] for e in manager.universe()]
+    assert "S00003" not in labels and added[0] in labels
+
+    # Source down: the cached page, then the previous list, is kept
+    del PAGES["/sp500.html"]
+    manager, diff = refresh(cache_dir, url, "2026-03-21")
+    assert diff == {} and len(manager.members(SP500_LIST)) == N + 1
+    os.remove(cache_dir / "sp500.html")
+    manager, diff = refresh(cache_dir, url, "2026-03-22")
+    assert diff == {} and len(manager.members(SP500_LIST)) == N + 1
+
+    # A JSON list works the same way
+    PAGES["/sp500.json"] = json.dumps(second[:-1])
+    manager, diff = refresh(cache_dir, base_url + "/sp500.json", "2026-04-01")
+    assert diff[SP500_LIST]["removed"] == [added[-1]] and not diff[SP500_LIST]["added"]
+
+    with open(cache_dir / "constituents.json") as f:
+        history = json.load(f)["history"]
+    assert [h["date"] for h in history] == ["2026-03-20", "2026-04-01"]
+
+
+def test_only_added_symbols_are_backfilled(tmp_path):
+    first = make_constituents(N)
+    second = [c for c in first if c["symbol"] not in ("S00003", "S00007")] + make_constituents(3, start=N)
+    everyone = list(dict.fromkeys(dashed(first + second)))
+    panel = synthetic.make_close_panel(len(everyone), years=1)
+    fixture_dir = tmp_path / "fixtures"
+    fixture_dir.mkdir()
+    for symbol, column in zip(everyone, panel.columns):
+        pd.DataFrame({"Close": panel[column]}).rename_axis("Date").to_csv(fixture_dir / f"{symbol}.csv")
+
+    with PriceStore(str(tmp_path / "prices.sqlite")) as store, contextlib.redirect_stdout(io.StringIO()):
+        provider = FixtureProvider(str(fixture_dir))
+        store.update(dashed(first), provider=provider, today="2026-01-02")
+        plan = store.plan_fetch(dashed(second), today="2100-01-01")
+        assert sorted(plan.get(None, [])) == sorted(set(dashed(second)) - set(dashed(first)))
+        store.update(dashed(second), provider=provider, today="2100-01-01")
+        # Removed symbols keep their stored history
+        assert store.load(["S00003", "S00007"]).notna().sum().min() > 200
+
+
+def test_saved_wikipedia_page(tmp_path):
+    path = os.path.join(os.path.dirname(synthetic.HELPER_DIR), "sp500.html")
+    if not os.path.exists(path):
+        pytest.skip("no saved sp500.html")
+    manager, _ = refresh(tmp_path, "file://" + path, "2026-01-02")
+    members = manager.members(SP500_LIST)
+    assert len(members) > 400
+    # The saved page and the built-in snapshot describe the same index
+    assert len(set(members) & set(SP500_TICKERS)) > 0.9 * len(SP500_TICKERS)
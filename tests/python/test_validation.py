@@ -0,0 +1,75 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+import synthetic
+from bench_validation import inject, make_panel
+from ReferenceSeries import monthly_series
+from Validation import GOLD_SYMBOL, validate_closes
+
+
+def validate(panel, historical_gold, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return validate_closes(panel, historical_gold=historical_gold, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def historical_gold():
+    return monthly_series(synthetic.make_historical_gold(end="2024-12"))
+
+
+@pytest.fixture(scope="module")
+def panels(historical_gold):
+    clean = make_panel(40, 8, historical_gold)
+    damaged, expected = inject(clean, historical_gold)
+    return clean, damaged, expected, validate(damaged, historical_gold)
+
+
+def test_clean_panel_is_not_flagged(panels, historical_gold):
+    clean = panels[0]
+    baseline = validate(clean, historical_gold)
+    assert baseline.flagged.sum() <= clean.size * 1e-5
+    assert baseline.blocking() == []
+
+
+def test_every_injected_anomaly_is_flagged(panels):
+    _, damaged, expected, result = panels
+    symbols = list(damaged.columns)
+    for check, cells in expected.items():
+        missed = [(damaged.index[r], s) for r, s in cells if not result.flags[check][r, symbols.index(s)]]
+        assert not missed, check
+
+
+def test_fix_policy_quarantines_and_interpolates(panels):
+    clean, damaged, expected, result = panels
+    fixed = result.apply(damaged)
+    for r, s in expected["nonpositive"]:
+        assert np.isnan(fixed.iloc[r][s])
+    for r, s in expected["spike"]:
+        assert abs(fixed.iloc[r][s] / clean.iloc[r][s] - 1) <= 0.1
+    assert fixed[GOLD_SYMBOL].iloc[[r for r, _ in expected["gold_mismatch"]]].isna().all()
+    untouched = fixed.drop(columns=[s for cells in expected.values() for _, s in cells])
+    assert untouched.equals(damaged[untouched.columns])
+    # The gold spikes and mismatch were fixed; one ticker's split is reported, not blocking
+    assert result.blocking() == []
+
+
+def test_report_policy_leaves_closes_and_blocks_on_gold(panels, historical_gold):
+    _, damaged, _, _ = panels
+    report = validate(damaged, historical_gold, policy={check: "report" for check in ("spike", "gold_mismatch")})
+    assert report.apply(damaged).equals(damaged.where(damaged > 0))
+    assert any(reason.startswith(GOLD_SYMBOL) for reason in report.blocking())
+
+
+def test_gold_level_shift_blocks_publishing(panels, historical_gold):
+    _, damaged, _, _ = panels
+    gold_level = damaged.copy()
+    gold_level.iloc[-300:, list(damaged.columns).index(GOLD_SYMBOL)] *= 0.5
+    assert any(reason.startswith(GOLD_SYMBOL) for reason in validate(gold_level, historical_gold).blocking())
+
+
+def test_inject_needs_enough_tickers(historical_gold):
+    with pytest.raises(ValueError):
+        inject(make_panel(10, 4, historical_gold), historical_gold)